@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能检查工具包
+包含合成数据生成和各列表、报表操作的SQL查询次数检查
+"""
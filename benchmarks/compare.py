@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能测试结果比较
+按场景比较两个结果文件的中位耗时，超过阈值的变慢标记为性能回退
+
+用法: python -m benchmarks.compare baseline.json current.json [--threshold 0.1] [--min-delta-ms 5]
+"""
+
+import sys
+import json
+import argparse
+from typing import Any, Dict, List, Tuple
+
+
+def load_result(path: str) -> Dict[str, Any]:
+    """
+    读取结果文件
+    :param path: 文件路径
+    :return: 结果字典
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.1,
+                    min_delta: float = 0.005) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    比较两次运行的结果
+    耗时增加比例超过threshold且增加量超过min_delta时判定为回退，避免很短的场景因抖动误报
+    :param baseline: 基准结果
+    :param current: 当前结果
+    :param threshold: 回退比例阈值，0.1表示慢10%
+    :param min_delta: 最小回退耗时（秒）
+    :return: 各场景比较结果列表和提示信息列表
+    """
+    notes = []
+    if baseline.get("config") != current.get("config"):
+        notes.append(f"两次运行的数据规模或参数不同: {baseline.get('config')} / {current.get('config')}")
+    base_env = baseline.get("environment", {})
+    current_env = current.get("environment", {})
+    for key in ("python", "sqlite", "machine", "packages"):
+        if base_env.get(key) != current_env.get(key):
+            notes.append(f"运行环境 {key} 不同: {base_env.get(key)} / {current_env.get(key)}")
+
+    rows = []
+    base_results = baseline.get("results", {})
+    current_results = current.get("results", {})
+    for name in list(base_results) + [name for name in current_results if name not in base_results]:
+        before = base_results.get(name)
+        after = current_results.get(name)
+        row = {"name": name, "before": None, "after": None, "ratio": None, "verdict": ""}
+        if before and before.get("status") == "ok":
+            row["before"] = before["median"]
+        if after and after.get("status") == "ok":
+            row["after"] = after["median"]
+
+        if before is None:
+            row["verdict"] = "新增"
+        elif after is None:
+            row["verdict"] = "缺失"
+        elif after.get("status") == "error":
+            row["verdict"] = "出错"
+        elif row["before"] is None or row["after"] is None:
+            row["verdict"] = "跳过"
+        else:
+            row["ratio"] = row["after"] / row["before"] if row["before"] else None
+            delta = row["after"] - row["before"]
+            if row["ratio"] is not None and row["ratio"] > 1 + threshold and delta > min_delta:
+                row["verdict"] = "回退"
+            elif row["ratio"] is not None and row["ratio"] < 1 - threshold and -delta > min_delta:
+                row["verdict"] = "提升"
+        rows.append(row)
+    return rows, notes
+
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    """
+    生成比较结果表格
+    :param rows: 比较结果列表
+    :return: 表格文本
+    """
+    def ms(value):
+        return f"{value * 1000:.1f}" if value is not None else "-"
+
+    lines = [f"{'场景':<32} {'基准ms':>10} {'当前ms':>10} {'比例':>7}  结论"]
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}" if row["ratio"] is not None else "-"
+        lines.append(f"{row['name']:<32} {ms(row['before']):>10} {ms(row['after']):>10} {ratio:>7}  {row['verdict']}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    """
+    命令行入口
+    :param argv: 命令行参数
+    :return: 退出码，有回退或出错的场景时为1
+    """
+    parser = argparse.ArgumentParser(description="比较两次性能测试结果")
+    parser.add_argument("baseline", help="基准结果文件")
+    parser.add_argument("current", help="当前结果文件")
+    parser.add_argument("--threshold", type=float, default=0.1, help="回退比例阈值，默认0.1即慢10%%")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="最小回退耗时（毫秒）")
+    args = parser.parse_args(argv)
+
+    rows, notes = compare_results(load_result(args.baseline), load_result(args.current),
+                                  args.threshold, args.min_delta_ms / 1000)
+    for note in notes:
+        print(f"注意: {note}", file=sys.stderr)
+    print(format_table(rows))
+
+    failed = [row["name"] for row in rows if row["verdict"] in ("回退", "出错")]
+    if failed:
+        print(f"\n{len(failed)} 个场景回退或出错: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
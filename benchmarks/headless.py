@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+无界面视图实例
+跳过控件创建直接构造视图对象，计时时只执行取数和计算逻辑，
+控件调用全部落到空对象上
+"""
+
+from typing import Any, Dict, Optional
+
+
+class NullWidget:
+    """空控件，任意属性访问、调用、下标都返回自身，迭代为空"""
+
+    def __getattr__(self, name: str) -> 'NullWidget':
+        return self
+
+    def __call__(self, *args, **kwargs) -> 'NullWidget':
+        return self
+
+    def __getitem__(self, key: Any) -> 'NullWidget':
+        return self
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        pass
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self) -> int:
+        return 0
+
+    def __bool__(self) -> bool:
+        return False
+
+
+class StaticVar:
+    """代替tk变量，保存固定的值"""
+
+    def __init__(self, value: Any = ""):
+        self.value = value
+
+    def get(self) -> Any:
+        return self.value
+
+    def set(self, value: Any) -> None:
+        self.value = value
+
+
+_headless_classes: Dict[type, type] = {}
+
+
+def make_view(view_class: type, language_utils: Any, variables: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    构造不创建控件的视图实例
+    :param view_class: 视图类
+    :param language_utils: 语言工具实例
+    :param variables: 视图使用的tk变量名到值的映射
+    :return: 视图实例，未设置的属性都是空控件
+    """
+    headless_class = _headless_classes.get(view_class)
+    if headless_class is None:
+        headless_class = type(f"Headless{view_class.__name__}", (view_class,),
+                              {"__getattr__": lambda self, name: NullWidget()})
+        _headless_classes[view_class] = headless_class
+
+    view = headless_class.__new__(headless_class)
+    view.language_utils = language_utils
+    for name, value in (variables or {}).items():
+        setattr(view, name, StaticVar(value))
+    return view
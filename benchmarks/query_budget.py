@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQL查询次数检查
+在两种数据规模的合成数据库上执行各列表、报表和仪表盘的取数操作，
+检查每个操作执行的语句数不超过预算，并且不随数据行数增长（即没有N+1查询）
+
+用法: python -m benchmarks.query_budget [--small 40] [--large 160] [--months 3]
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+from typing import Callable, Dict, List, Tuple
+
+from database import query_stats
+from database.db_manager import close_all_connections
+from benchmarks.seed import create_database, seed_database
+
+# 生成数据时会切换当前目录，先固定项目根目录以便之后导入界面模块
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def _charge_list(month):
+    from views.charge_view import ChargeView
+    ChargeView.fetch_charge_list(month)
+
+
+def _reading_list(month):
+    from views.reading_view import ReadingView
+    ReadingView.fetch_reading_list(month)
+
+
+def _monthly_report(month):
+    from views.report_view import ReportView
+    ReportView.fetch_monthly_report_data(month)
+
+
+def _arrears(month):
+    from models.payment import Payment
+    from utils.language_utils import LanguageUtils
+    Payment.get_arrears(LanguageUtils().get_text)
+
+
+def _dashboard(month):
+    from views.dashboard.data_cards import DataCards
+    DataCards.compute_tenant_stats()
+    DataCards.compute_meter_stats()
+    DataCards.compute_charge_stats(month)
+    DataCards.compute_unpaid_amount(month)
+
+
+# 检查项：名称 -> (取数函数, 语句数预算)
+# 预算为当前实现的语句数加少量余量，新增查询时需同步调整
+SCENARIOS: Dict[str, Tuple[Callable[[str], None], int]] = {
+    "ChargeView.load_charge_list": (_charge_list, 5),
+    "ReadingView.load_reading_list": (_reading_list, 6),
+    "ReportView.generate_monthly_report": (_monthly_report, 4),
+    "PaymentView.query_arrears": (_arrears, 2),
+    "DataCards.refresh_data": (_dashboard, 8),
+}
+
+
+def measure(tenant_count: int, month_count: int) -> Dict[str, List[dict]]:
+    """
+    在新建的合成数据库上执行全部检查项并统计语句
+    :param tenant_count: 租户数量
+    :param month_count: 月份数量
+    :return: 检查项名称到语句统计列表的字典
+    """
+    work_dir = tempfile.mkdtemp(prefix="sdcbsf_budget_")
+    old_cwd = os.getcwd()
+    try:
+        create_database(work_dir)
+        info = seed_database(tenant_count, month_count)
+        month = info["months"][-1]
+
+        recorder = query_stats.enable()
+        results = {}
+        for name, (func, _) in SCENARIOS.items():
+            with query_stats.scope(name):
+                func(month)
+            results[name] = recorder.statement_stats(name)
+        return results
+    finally:
+        query_stats.disable()
+        close_all_connections()
+        os.chdir(old_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def check(small: Dict[str, List[dict]], large: Dict[str, List[dict]]) -> List[str]:
+    """
+    比较两种规模下的语句数，返回不通过的检查项说明
+    :param small: 小规模数据的统计
+    :param large: 大规模数据的统计
+    :return: 错误说明列表，全部通过时为空
+    """
+    errors = []
+    for name, (_, budget) in SCENARIOS.items():
+        small_count = sum(stat["count"] for stat in small[name])
+        large_count = sum(stat["count"] for stat in large[name])
+        print(f"{name:<40} {small_count:>4} {large_count:>4}  预算 {budget}")
+
+        problems = []
+        if large_count > budget:
+            problems.append(f"语句数 {large_count} 超过预算 {budget}")
+        if large_count > small_count:
+            problems.append(f"语句数随数据量增长（{small_count} -> {large_count}）")
+        if problems:
+            # 列出重复执行的语句，通常就是循环内的查询
+            repeated = sorted((stat for stat in large[name] if stat["count"] > 1),
+                              key=lambda stat: stat["count"], reverse=True)
+            detail = "\n".join(f"    {stat['count']:>5}x {stat['sql']}" for stat in repeated)
+            errors.append(f"{name}: {'；'.join(problems)}" + (f"\n{detail}" if detail else ""))
+    return errors
+
+
+def main(argv=None) -> int:
+    """
+    命令行入口
+    :param argv: 命令行参数
+    :return: 退出码，全部通过时为0
+    """
+    parser = argparse.ArgumentParser(description="检查各操作的SQL语句数")
+    parser.add_argument("--small", type=int, default=40, help="小规模租户数量")
+    parser.add_argument("--large", type=int, default=160, help="大规模租户数量")
+    parser.add_argument("--months", type=int, default=3, help="月份数量")
+    args = parser.parse_args(argv)
+
+    small = measure(args.small, args.months)
+    large = measure(args.large, args.months)
+
+    print(f"{'操作':<40} {'小':>4} {'大':>4}")
+    errors = check(small, large)
+    if errors:
+        print("\n查询次数检查未通过:", file=sys.stderr)
+        for error in errors:
+            print(error, file=sys.stderr)
+        return 1
+    print("查询次数检查通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
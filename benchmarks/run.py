@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能测试执行入口
+在指定规模的合成数据库上逐个执行场景并计时，结果连同运行环境信息写入JSON文件
+
+用法:
+    python -m benchmarks.run --scale small --months 36 --repeat 3 --output results.json
+    python -m benchmarks.run --tenants 2000 --scenario report. --scenario charge.search
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import datetime
+import platform
+import statistics
+import subprocess
+import tempfile
+from typing import Any, Dict, List, Optional
+
+# 执行期间会切换当前目录，先固定项目根目录以便导入项目模块
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from database.db_manager import get_db, close_all_connections
+from benchmarks.seed import SCALES, build_cached_database, month_list
+from benchmarks.scenarios import BenchContext, Scenario, select_scenarios
+
+# 结果文件格式版本
+RESULT_FORMAT = 1
+# 记录版本号的依赖包
+TRACKED_PACKAGES = ("openpyxl", "reportlab", "matplotlib", "numpy", "pandas")
+
+
+def log(message: str) -> None:
+    """
+    输出进度信息到标准错误
+    :param message: 信息
+    """
+    print(message, file=sys.stderr, flush=True)
+
+
+def environment_metadata() -> Dict[str, Any]:
+    """
+    收集运行环境信息，比较结果时用于判断两次运行是否可比
+    :return: 环境信息字典
+    """
+    from importlib import metadata
+
+    packages = {}
+    for package in TRACKED_PACKAGES:
+        try:
+            packages[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            packages[package] = None
+
+    commit = None
+    try:
+        completed = subprocess.run(["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT,
+                                   capture_output=True, text=True, timeout=10)
+        if completed.returncode == 0:
+            commit = completed.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        pass
+
+    return {
+        "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "sqlite": sqlite3.sqlite_version,
+        "packages": packages,
+        "git_commit": commit,
+    }
+
+
+def restore_working_database(seed_path: str, db_path: str) -> None:
+    """
+    用合成数据覆盖工作数据库，关闭现有连接，下次get_db()时重新连接
+    :param seed_path: 合成数据库文件
+    :param db_path: 工作数据库文件
+    """
+    close_all_connections()
+    for suffix in ("-wal", "-shm", "-journal"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    shutil.copyfile(seed_path, db_path)
+    get_db()
+
+
+def run_scenario(scenario: Scenario, ctx: BenchContext, repeat: int, seed_path: str) -> Dict[str, Any]:
+    """
+    执行单个场景
+    :param scenario: 场景
+    :param ctx: 场景执行环境
+    :param repeat: 重复次数
+    :param seed_path: 合成数据库文件，修改数据的场景每次执行前从此复制
+    :return: 场景结果
+    """
+    timings: List[float] = []
+    try:
+        argument = None
+        for index in range(repeat):
+            if scenario.mutates or index == 0:
+                if scenario.mutates:
+                    restore_working_database(seed_path, ctx.db_path)
+                argument = scenario.setup(ctx)
+            started = time.perf_counter()
+            scenario.run(ctx, argument)
+            timings.append(time.perf_counter() - started)
+    except ImportError as e:
+        # 缺少可选依赖（如reportlab）时跳过该场景
+        return {"status": "skipped", "error": str(e), "runs": timings}
+    except Exception as e:
+        return {"status": "error", "error": f"{type(e).__name__}: {e}", "runs": timings}
+    finally:
+        if scenario.mutates:
+            restore_working_database(seed_path, ctx.db_path)
+
+    return {
+        "status": "ok",
+        "runs": timings,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "max": max(timings),
+    }
+
+
+def run_benchmarks(tenant_count: int, month_count: int, max_meters: int, seed: int, repeat: int,
+                   patterns: Optional[List[str]], cache_dir: str) -> Dict[str, Any]:
+    """
+    生成（或复用）合成数据库并执行选中的场景
+    :param tenant_count: 租户数量
+    :param month_count: 月份数量
+    :param max_meters: 每个租户最多的水电表数量
+    :param seed: 随机种子
+    :param repeat: 每个场景的重复次数
+    :param patterns: 场景名称前缀，为空时执行全部场景
+    :param cache_dir: 合成数据库缓存目录
+    :return: 结果字典
+    """
+    from utils.language_utils import LanguageUtils
+
+    os.makedirs(cache_dir, exist_ok=True)
+    start_month = "2023-01"
+    seed_path = build_cached_database(cache_dir, tenant_count, month_count, max_meters, start_month, seed,
+                                      progress=log)
+
+    work_dir = tempfile.mkdtemp(prefix="sdcbsf_bench_")
+    old_cwd = os.getcwd()
+    results = {}
+    try:
+        os.chdir(work_dir)
+        db_path = os.path.join(work_dir, "water_electricity.db")
+        restore_working_database(seed_path, db_path)
+        ctx = BenchContext(work_dir, db_path, month_list(start_month, month_count), LanguageUtils())
+
+        for scenario in select_scenarios(patterns):
+            log(f"执行 {scenario.name} ...")
+            result = run_scenario(scenario, ctx, repeat, seed_path)
+            results[scenario.name] = result
+            if result["status"] == "ok":
+                log(f"  中位数 {result['median'] * 1000:.1f} ms（{len(result['runs'])} 次）")
+            else:
+                log(f"  {result['status']}: {result['error']}")
+    finally:
+        close_all_connections()
+        os.chdir(old_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "format": RESULT_FORMAT,
+        "environment": environment_metadata(),
+        "config": {
+            "tenants": tenant_count,
+            "months": month_count,
+            "max_meters": max_meters,
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None) -> int:
+    """
+    命令行入口
+    :param argv: 命令行参数
+    :return: 退出码，有场景执行出错时为1
+    """
+    parser = argparse.ArgumentParser(description="执行性能测试场景")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="预设数据规模")
+    parser.add_argument("--tenants", type=int, help="租户数量，指定时覆盖--scale")
+    parser.add_argument("--months", type=int, default=36, help="月份数量")
+    parser.add_argument("--max-meters", type=int, default=4, help="每个租户最多的水电表数量")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子")
+    parser.add_argument("--repeat", type=int, default=3, help="每个场景的重复次数")
+    parser.add_argument("--scenario", action="append", help="只执行名称以此开头的场景，可重复指定")
+    parser.add_argument("--cache-dir", default=os.path.join(tempfile.gettempdir(), "sdcbsf_bench_cache"),
+                        help="合成数据库缓存目录")
+    parser.add_argument("--output", help="结果JSON文件，未指定时输出到标准输出")
+    args = parser.parse_args(argv)
+
+    tenant_count = args.tenants or SCALES[args.scale]
+    output = os.path.abspath(args.output) if args.output else None
+    report = run_benchmarks(tenant_count, args.months, args.max_meters, args.seed, max(args.repeat, 1),
+                            args.scenario, os.path.abspath(args.cache_dir))
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text)
+        log(f"结果已写入 {output}")
+    else:
+        print(text)
+
+    return 1 if any(result["status"] == "error" for result in report["results"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
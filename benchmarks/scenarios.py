@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能测试场景
+每个场景包含不计时的准备函数和计时的执行函数，
+执行函数调用程序中实际使用的取数、计算和导出代码
+"""
+
+import os
+from collections import namedtuple
+from typing import Any, Callable, List, Optional
+
+from database.db_manager import get_db
+from benchmarks.headless import make_view
+
+# 场景定义
+# mutates为True的场景会修改数据库，每次执行前都从合成数据重新复制数据库
+Scenario = namedtuple("Scenario", ["name", "setup", "run", "mutates"])
+
+
+class BenchContext:
+    """场景执行环境"""
+
+    def __init__(self, work_dir: str, db_path: str, months: List[str], language_utils: Any):
+        """
+        初始化场景执行环境
+        :param work_dir: 工作目录（即当前目录）
+        :param db_path: 数据库文件路径
+        :param months: 合成数据包含的月份
+        :param language_utils: 语言工具实例
+        """
+        self.work_dir = work_dir
+        self.db_path = db_path
+        self.months = months
+        self.month = months[-1]
+        self.language_utils = language_utils
+        self.export_dir = os.path.join(work_dir, "exports")
+        self.backup_dir = os.path.join(work_dir, "backup")
+        os.makedirs(self.export_dir, exist_ok=True)
+
+    def get_text(self, key: str) -> str:
+        """
+        获取翻译文本
+        :param key: 文本键名
+        :return: 翻译后的文本
+        """
+        return self.language_utils.get_text(key)
+
+
+def _next_month(month: str) -> str:
+    """
+    获取下一个月份
+    :param month: 月份，格式为YYYY-MM
+    :return: 下一个月份
+    """
+    year, mon = (int(part) for part in month.split("-"))
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+
+# ---------- 费用计算 ----------
+
+def _run_charge_calculation(ctx: BenchContext, _):
+    from models.charge import Charge
+    Charge.calculate_month(ctx.month)
+
+
+# ---------- 抄表导入 ----------
+
+def _setup_reading_import(ctx: BenchContext) -> str:
+    """
+    生成下一个月的抄表导入文件，每块水电表一行
+    :param ctx: 场景执行环境
+    :return: 导入文件路径
+    """
+    from openpyxl import Workbook
+    from utils.reading_import import EXPECTED_HEADERS
+
+    month = _next_month(ctx.month)
+    sql = """
+    SELECT t.name, m.meter_no, m.meter_type, r.current_reading
+    FROM meter_readings r
+    JOIN meters m ON r.meter_id = m.id
+    JOIN tenants t ON m.tenant_id = t.id
+    WHERE r.reading_date = ?
+    ORDER BY m.id
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(EXPECTED_HEADERS)
+    for index, (tenant_name, meter_no, meter_type, previous) in enumerate(get_db().fetch_all(sql, (f"{ctx.month}-25",))):
+        usage = 10 + index % 30 if meter_type == "水" else 100 + index % 500
+        ws.append([tenant_name, meter_no, meter_type, previous, previous + usage, 0, usage, f"{month}-25", "抄表员"])
+    file_path = os.path.join(ctx.work_dir, f"readings_{month}.xlsx")
+    wb.save(file_path)
+    return file_path
+
+
+def _run_reading_import(ctx: BenchContext, file_path: str):
+    from utils import reading_import
+
+    headers, rows, datemode = reading_import.load_rows(file_path)
+    records, _ = reading_import.parse_rows(headers, rows, datemode)
+    if reading_import.find_duplicates(records):
+        raise RuntimeError("导入文件与已有抄表记录重复")
+    reading_import.save_records(records)
+
+
+# ---------- 列表查询 ----------
+
+def _run_charge_search(ctx: BenchContext, _):
+    from views.charge_view import ChargeView
+
+    view = make_view(ChargeView, ctx.language_utils, {
+        "month_var": ctx.month,
+        "tenant_type_var": "",
+        "tenant_var": "",
+        "status_var": ctx.get_text("unpaid"),
+    })
+    view.search_charges()
+
+
+def _run_reading_list(ctx: BenchContext, _):
+    from views.reading_view import ReadingView
+    ReadingView.fetch_reading_list(ctx.month)
+
+
+def _run_arrears(ctx: BenchContext, _):
+    from models.payment import Payment
+    Payment.get_arrears(ctx.get_text)
+
+
+def _run_dashboard(ctx: BenchContext, _):
+    from views.dashboard.data_cards import DataCards
+    DataCards.compute_tenant_stats()
+    DataCards.compute_meter_stats()
+    DataCards.compute_charge_stats(ctx.month)
+    DataCards.compute_unpaid_amount(ctx.month)
+
+
+# ---------- 报表 ----------
+
+# 报表类型 -> (报表文本生成方法, 是否需要统计方式参数)
+REPORT_TYPES = {
+    "monthly": ("generate_monthly_report", False),
+    "tenant_detail": ("generate_tenant_detail_report", False),
+    "payment_stat": ("generate_payment_stat_report", True),
+    "settlement": ("generate_settlement_report", False),
+}
+
+
+def _report_view(ctx: BenchContext):
+    from views.report_view import ReportView
+    return make_view(ReportView, ctx.language_utils)
+
+
+def _report_exporter(ctx: BenchContext):
+    from utils.report_export import ReportExporter
+    return ReportExporter(ctx.language_utils)
+
+
+def _make_report_runner(report_type: str, output: str) -> Callable[[BenchContext, Any], None]:
+    """
+    创建报表场景的执行函数
+    :param report_type: 报表类型
+    :param output: 输出方式，text（生成报表文本）、xlsx或pdf
+    :return: 执行函数
+    """
+    generate_name, needs_stat_type = REPORT_TYPES[report_type]
+
+    def run(ctx: BenchContext, _):
+        stat_type = ctx.get_text("by_tenant")
+        if output == "text":
+            extra = (stat_type,) if needs_stat_type else ()
+            getattr(_report_view(ctx), generate_name)(ctx.month, "", *extra)
+        else:
+            file_path = os.path.join(ctx.export_dir, f"{report_type}_{ctx.month}.{output}")
+            _report_exporter(ctx).export(report_type, ctx.month, file_path, output, "", stat_type)
+
+    return run
+
+
+# ---------- 备份 ----------
+
+def _run_backup_snapshot(ctx: BenchContext, _):
+    from utils.backup_utils import BackupUtils
+    if not BackupUtils.create_snapshot(ctx.db_path, ctx.backup_dir):
+        raise RuntimeError("创建快照失败")
+
+
+def _run_backup_copy(ctx: BenchContext, _):
+    from utils.backup_utils import BackupUtils
+    if not BackupUtils.backup_database(ctx.db_path, ctx.backup_dir):
+        raise RuntimeError("备份数据库失败")
+
+
+def _no_setup(_ctx: BenchContext) -> None:
+    return None
+
+
+def build_scenarios() -> List[Scenario]:
+    """
+    创建全部场景，按执行顺序排列
+    :return: 场景列表
+    """
+    scenarios = [
+        Scenario("charge.calculate_month", _no_setup, _run_charge_calculation, True),
+        Scenario("reading.import_xlsx", _setup_reading_import, _run_reading_import, True),
+        Scenario("charge.search", _no_setup, _run_charge_search, False),
+        Scenario("reading.list", _no_setup, _run_reading_list, False),
+        Scenario("payment.arrears", _no_setup, _run_arrears, False),
+        Scenario("dashboard.snapshot", _no_setup, _run_dashboard, False),
+    ]
+    for report_type in REPORT_TYPES:
+        for output in ("text", "xlsx", "pdf"):
+            scenarios.append(Scenario(f"report.{report_type}.{output}", _no_setup,
+                                      _make_report_runner(report_type, output), False))
+    scenarios.append(Scenario("backup.copy", _no_setup, _run_backup_copy, False))
+    # 快照在同一仓库中重复执行，第二次起只写入变化的块
+    scenarios.append(Scenario("backup.snapshot", _no_setup, _run_backup_snapshot, False))
+    return scenarios
+
+
+def select_scenarios(patterns: Optional[List[str]]) -> List[Scenario]:
+    """
+    按名称前缀筛选场景
+    :param patterns: 名称前缀列表，为空时返回全部场景
+    :return: 场景列表
+    """
+    scenarios = build_scenarios()
+    if not patterns:
+        return scenarios
+    return [scenario for scenario in scenarios if any(scenario.name.startswith(p) for p in patterns)]
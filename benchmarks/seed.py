@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成数据生成模块
+按固定随机种子生成租户、水电表、抄表记录、费用和收费记录，
+同样的参数总是生成同样的数据
+"""
+
+import os
+import random
+import shutil
+from typing import Any, Dict, List, Optional
+
+from database.init_db import init_database
+from database.db_manager import get_db, close_all_connections
+from models.charge import Charge
+
+# 租户类型
+TENANT_TYPES = ("办公室", "门面")
+# 收费方式
+PAYMENT_METHODS = ("现金", "微信", "支付宝", "银行转账")
+# 默认单价，与初始化数据一致
+WATER_PRICE = 3.5
+ELECTRICITY_PRICE = 0.8
+# 预设数据规模：名称 -> 租户数量
+SCALES = {"small": 500, "medium": 5000, "large": 50000}
+
+
+def month_list(start_month: str, count: int) -> List[str]:
+    """
+    生成连续的月份列表
+    :param start_month: 起始月份，格式为YYYY-MM
+    :param count: 月份数量
+    :return: 月份列表
+    """
+    year, month = (int(part) for part in start_month.split("-"))
+    months = []
+    for _ in range(count):
+        months.append(f"{year:04d}-{month:02d}")
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    return months
+
+
+def create_database(directory: str) -> str:
+    """
+    在指定目录创建空数据库
+    数据库路径与程序一致，为当前目录下的water_electricity.db，因此会切换当前目录
+    :param directory: 数据库所在目录
+    :return: 数据库文件路径
+    """
+    os.makedirs(directory, exist_ok=True)
+    os.chdir(directory)
+    init_database()
+    return os.path.join(directory, "water_electricity.db")
+
+
+def seed_database(tenant_count: int, month_count: int, max_meters: int = 4,
+                  start_month: str = "2023-01", seed: int = 1) -> Dict[str, Any]:
+    """
+    向当前数据库写入合成数据
+    每个租户有1到max_meters块水电表，每块表每月一条抄表记录，
+    每个租户每月一条费用记录，金额按程序的规则取整到元，约七成费用已缴清、一成部分缴纳
+    :param tenant_count: 租户数量
+    :param month_count: 月份数量
+    :param max_meters: 每个租户最多的水电表数量
+    :param start_month: 起始月份，格式为YYYY-MM
+    :param seed: 随机种子
+    :return: 各表写入的行数和月份列表
+    """
+    rng = random.Random(seed)
+    db = get_db()
+    months = month_list(start_month, month_count)
+
+    def next_id(table):
+        return (db.fetch_one(f"SELECT COALESCE(MAX(id), 0) FROM {table}")[0] or 0) + 1
+
+    # 租户
+    tenant_start = next_id("tenants")
+    tenant_rows = []
+    for offset in range(tenant_count):
+        tenant_id = tenant_start + offset
+        tenant_rows.append((tenant_id, f"租户{tenant_id:05d}", rng.choice(TENANT_TYPES),
+                            f"{tenant_id % 20 + 1}栋{tenant_id}号", f"联系人{tenant_id}",
+                            f"138{tenant_id:08d}", 1 if rng.random() < 0.05 else 0))
+    db.execute_many("""
+    INSERT INTO tenants (id, name, type, address, contact_person, phone, deactivated)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, tenant_rows)
+
+    # 水电表，第一块为水表，第二块为电表，其余随机
+    meter_id = next_id("meters")
+    meter_rows = []
+    tenant_meters = {}
+    for tenant in tenant_rows:
+        tenant_id = tenant[0]
+        meters = []
+        for index in range(rng.randint(1, max_meters)):
+            meter_type = ("水", "电")[index] if index < 2 else rng.choice(("水", "电"))
+            meter_rows.append((meter_id, f"M{meter_id:07d}", meter_type, tenant_id, tenant[3],
+                               round(rng.uniform(0, 500), 1)))
+            meters.append((meter_id, meter_type, meter_rows[-1][5]))
+            meter_id += 1
+        tenant_meters[tenant_id] = meters
+    db.execute_many("""
+    INSERT INTO meters (id, meter_no, meter_type, tenant_id, location, initial_reading)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """, meter_rows)
+
+    # 抄表记录、费用和收费记录按月生成，每月写入一次，大规模数据不必全部留在内存中
+    counts = {"readings": 0, "charges": 0, "payments": 0}
+    charge_id = next_id("charges")
+    last_readings = {meter[0]: meter[2] for meters in tenant_meters.values() for meter in meters}
+    for month in months:
+        reading_rows = []
+        charge_rows = []
+        payment_rows = []
+        reading_date = f"{month}-25"
+        for tenant_id, meters in tenant_meters.items():
+            usage = {"水": 0.0, "电": 0.0}
+            for meter_id, meter_type, _ in meters:
+                delta = round(rng.uniform(1, 40) if meter_type == "水" else rng.uniform(20, 800), 1)
+                previous = last_readings[meter_id]
+                current = round(previous + delta, 1)
+                last_readings[meter_id] = current
+                usage[meter_type] += delta
+                reading_rows.append((meter_id, reading_date, current, previous, delta, "抄表员"))
+
+            water_usage, electricity_usage = round(usage["水"], 1), round(usage["电"], 1)
+            water_charge = Charge.round_amount(water_usage * WATER_PRICE)
+            electricity_charge = Charge.round_amount(electricity_usage * ELECTRICITY_PRICE)
+            total = Charge.round_amount(water_charge + electricity_charge)
+            roll = rng.random()
+            if roll < 0.7:
+                status, paid = "已缴", total
+            elif roll < 0.8:
+                status, paid = "部分缴纳", round(total * rng.uniform(0.2, 0.8), 2)
+            else:
+                status, paid = "未缴", 0
+            charge_rows.append((charge_id, tenant_id, month, water_usage, WATER_PRICE, water_charge,
+                                electricity_usage, ELECTRICITY_PRICE, electricity_charge, total, status))
+            if paid:
+                payment_rows.append((charge_id, f"{month}-28", paid, rng.choice(PAYMENT_METHODS), f"联系人{tenant_id}"))
+            charge_id += 1
+
+        db.execute_many("""
+        INSERT INTO meter_readings (meter_id, reading_date, current_reading, previous_reading, usage, reader)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """, reading_rows)
+        db.execute_many("""
+        INSERT INTO charges (id, tenant_id, month, water_usage, water_price, water_charge,
+                             electricity_usage, electricity_price, electricity_charge, total_charge, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, charge_rows)
+        db.execute_many("""
+        INSERT INTO payments (charge_id, payment_date, amount, payment_method, payer)
+        VALUES (?, ?, ?, ?, ?)
+        """, payment_rows)
+        counts["readings"] += len(reading_rows)
+        counts["charges"] += len(charge_rows)
+        counts["payments"] += len(payment_rows)
+
+    return {
+        "months": months,
+        "tenants": len(tenant_rows),
+        "meters": len(meter_rows),
+        **counts,
+    }
+
+
+def build_cached_database(cache_dir: str, tenant_count: int, month_count: int, max_meters: int = 4,
+                          start_month: str = "2023-01", seed: int = 1,
+                          progress: Optional[Any] = None) -> str:
+    """
+    生成合成数据库并缓存，参数相同时直接复用已生成的文件
+    生成在临时目录中完成后再改名，中断时不会留下不完整的缓存
+    :param cache_dir: 缓存目录
+    :param tenant_count: 租户数量
+    :param month_count: 月份数量
+    :param max_meters: 每个租户最多的水电表数量
+    :param start_month: 起始月份
+    :param seed: 随机种子
+    :param progress: 开始生成时调用的回调，参数为说明文字
+    :return: 缓存的数据库文件路径
+    """
+    name = f"seed_t{tenant_count}_m{month_count}_x{max_meters}_{start_month}_s{seed}.db"
+    cached_path = os.path.join(cache_dir, name)
+    if os.path.exists(cached_path):
+        return cached_path
+
+    if progress:
+        progress(f"生成合成数据: {tenant_count} 个租户，{month_count} 个月")
+    old_cwd = os.getcwd()
+    build_dir = os.path.join(cache_dir, name + ".build")
+    shutil.rmtree(build_dir, ignore_errors=True)
+    try:
+        db_path = create_database(build_dir)
+        seed_database(tenant_count, month_count, max_meters, start_month, seed)
+        close_all_connections()
+        os.replace(db_path, cached_path)
+    finally:
+        os.chdir(old_cwd)
+        shutil.rmtree(build_dir, ignore_errors=True)
+    return cached_path
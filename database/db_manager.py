@@ -6,8 +6,12 @@
 """
 
 import sqlite3
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
+from database import query_stats
+
 class DBManager:
     """数据库管理类"""
     
@@ -19,12 +23,16 @@ class DBManager:
         self.db_path = db_path
         self.conn = None
         self.cursor = None
+        self.generation = 0
         self.connect()
+        # 登记实例，恢复数据库时需要关闭所有线程的连接
+        _db_instances.add(self)
     
     def connect(self):
         """建立数据库连接"""
         try:
             self.conn = sqlite3.connect(self.db_path)
+            self.generation = _connection_generation
             self.cursor = self.conn.cursor()
             # 启用外键约束
             self.cursor.execute("PRAGMA foreign_keys = ON;")
@@ -52,10 +60,75 @@ class DBManager:
             print(f"自动更新表结构失败: {e}")
             self.conn.rollback()
     
+    def enable_wal(self, busy_timeout_ms=10000):
+        """
+        开启WAL日志模式，写入时不阻塞其他连接的读取，多个程序可同时使用同一数据库
+        WAL模式保存在数据库文件中，对之后所有连接生效
+        :param busy_timeout_ms: 数据库被其他连接锁定时的等待时间（毫秒）
+        :return: 是否已处于WAL模式
+        """
+        try:
+            self.cursor.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)};")
+            self.cursor.execute("PRAGMA journal_mode = WAL;")
+            mode = self.cursor.fetchone()[0]
+            # WAL模式下NORMAL同步级别已能保证数据库不损坏
+            self.cursor.execute("PRAGMA synchronous = NORMAL;")
+            return str(mode).lower() == 'wal'
+        except sqlite3.Error as e:
+            print(f"开启WAL模式失败: {e}")
+            return False
+    
     def close(self):
         """关闭数据库连接"""
         if self.conn:
             self.conn.close()
+            self.conn = None
+            self.cursor = None
+    
+    def _run(self, sql, params=None):
+        """
+        执行一条语句，开启SQL统计时返回开始时间
+        :param sql: SQL语句
+        :param params: SQL参数
+        :return: 开始时间，未开启统计时为None
+        """
+        started = time.perf_counter() if query_stats.get_recorder() else None
+        if params:
+            self.cursor.execute(sql, params)
+        else:
+            self.cursor.execute(sql)
+        return started
+    
+    def _record(self, started, sql, params, row_count):
+        """
+        记录语句执行情况，未开启SQL统计时不做任何处理
+        :param started: _run返回的开始时间
+        :param sql: SQL语句
+        :param params: SQL参数
+        :param row_count: 返回或影响的行数
+        """
+        recorder = query_stats.get_recorder()
+        if recorder is None or started is None:
+            return
+        recorder.record(sql, params, max(row_count, 0), time.perf_counter() - started, self._explain)
+    
+    def _explain(self, sql, params):
+        """
+        获取语句的查询计划
+        :param sql: SQL语句
+        :param params: SQL参数
+        :return: 查询计划行列表
+        """
+        return self.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+    
+    def scope(self, name):
+        """
+        SQL统计的操作范围上下文
+        用法: with db.scope('ChargeView.load_charge_list'): ...
+        :param name: 范围名称
+        :return: 上下文管理器
+        """
+        return query_stats.scope(name)
     
     def execute(self, sql, params=None):
         """
@@ -65,17 +138,55 @@ class DBManager:
         :return: 执行结果
         """
         try:
-            if params:
-                self.cursor.execute(sql, params)
-            else:
-                self.cursor.execute(sql)
+            started = self._run(sql, params)
             self.conn.commit()
+            self._record(started, sql, params, self.cursor.rowcount)
             return True
         except sqlite3.Error as e:
             print(f"SQL执行失败: {e}\nSQL: {sql}\nParams: {params}")
             self.conn.rollback()
             return False
     
+    def execute_many(self, sql, params_list):
+        """
+        使用同一条SQL批量执行多组参数，在一个事务内提交
+        :param sql: SQL语句
+        :param params_list: 参数列表
+        :return: 执行结果
+        """
+        params_list = list(params_list)
+        if not params_list:
+            return True
+        try:
+            started = time.perf_counter() if query_stats.get_recorder() else None
+            self.cursor.executemany(sql, params_list)
+            self.conn.commit()
+            self._record(started, sql, params_list[0], self.cursor.rowcount)
+            return True
+        except sqlite3.Error as e:
+            print(f"SQL批量执行失败: {e}\nSQL: {sql}\nRows: {len(params_list)}")
+            self.conn.rollback()
+            return False
+    
+    @contextmanager
+    def transaction(self, immediate=False):
+        """
+        事务上下文，块内执行的多条语句在退出时一并提交，出错时回滚并重新抛出异常
+        用法: with db.transaction() as tx: tx.execute_many(sql, rows)
+        默认在第一条写入语句时才开始事务，之前的查询读到的数据可能已被其他连接修改；
+        先查询再按查询结果写入时使用immediate=True，进入时即取得写锁，块内的查询和写入在同一事务中
+        :param immediate: 是否以BEGIN IMMEDIATE开始事务
+        :return: 上下文管理器，提供不单独提交的execute、execute_many、insert和查询
+        """
+        if immediate and not self.conn.in_transaction:
+            self.cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield _Transaction(self)
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+    
     def fetch_one(self, sql, params=None):
         """
         获取单条查询结果
@@ -84,11 +195,10 @@ class DBManager:
         :return: 查询结果
         """
         try:
-            if params:
-                self.cursor.execute(sql, params)
-            else:
-                self.cursor.execute(sql)
-            return self.cursor.fetchone()
+            started = self._run(sql, params)
+            result = self.cursor.fetchone()
+            self._record(started, sql, params, 1 if result else 0)
+            return result
         except sqlite3.Error as e:
             print(f"查询失败: {e}\nSQL: {sql}\nParams: {params}")
             return None
@@ -101,11 +211,10 @@ class DBManager:
         :return: 查询结果列表
         """
         try:
-            if params:
-                self.cursor.execute(sql, params)
-            else:
-                self.cursor.execute(sql)
-            return self.cursor.fetchall()
+            started = self._run(sql, params)
+            result = self.cursor.fetchall()
+            self._record(started, sql, params, len(result))
+            return result
         except sqlite3.Error as e:
             print(f"查询失败: {e}\nSQL: {sql}\nParams: {params}")
             return []
@@ -119,15 +228,40 @@ class DBManager:
         :return: 查询结果列表
         """
         try:
-            if params:
-                self.cursor.execute(sql, params)
-            else:
-                self.cursor.execute(sql)
-            return self.cursor.fetchmany(size)
+            started = self._run(sql, params)
+            result = self.cursor.fetchmany(size)
+            self._record(started, sql, params, len(result))
+            return result
         except sqlite3.Error as e:
             print(f"查询失败: {e}\nSQL: {sql}\nParams: {params}")
             return []
     
+    def iter_rows(self, sql, params=None, batch_size=500):
+        """
+        逐批读取查询结果，用于导出等大结果集，内存占用与结果行数无关
+        使用独立游标，迭代期间仍可调用其他查询方法
+        :param sql: SQL查询语句
+        :param params: SQL参数
+        :param batch_size: 每批从游标读取的行数
+        :return: 逐行返回查询结果的生成器
+        """
+        cursor = self.conn.cursor()
+        started = time.perf_counter() if query_stats.get_recorder() else None
+        row_count = 0
+        try:
+            cursor.execute(sql, params or ())
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                row_count += len(batch)
+                yield from batch
+        except sqlite3.Error as e:
+            print(f"查询失败: {e}\nSQL: {sql}\nParams: {params}")
+        finally:
+            cursor.close()
+            self._record(started, sql, params, row_count)
+    
     def insert(self, table, data):
         """
         插入数据
@@ -137,8 +271,10 @@ class DBManager:
         """
         try:
             # 获取表结构，检查是否有create_time和update_time字段
-            self.cursor.execute(f"PRAGMA table_info({table})")
+            pragma_sql = f"PRAGMA table_info({table})"
+            started = self._run(pragma_sql)
             columns = [column[1] for column in self.cursor.fetchall()]
+            self._record(started, pragma_sql, None, len(columns))
             
             # 只在表有对应字段时添加时间
             if 'create_time' in columns and 'create_time' not in data:
@@ -150,8 +286,10 @@ class DBManager:
             placeholders = ', '.join(['?' for _ in data])
             sql = f"INSERT INTO {table} ({keys}) VALUES ({placeholders})"
             
-            self.cursor.execute(sql, tuple(data.values()))
+            params = tuple(data.values())
+            started = self._run(sql, params)
             self.conn.commit()
+            self._record(started, sql, params, self.cursor.rowcount)
             return self.cursor.lastrowid
         except sqlite3.Error as e:
             print(f"插入失败: {e}\nTable: {table}\nData: {data}")
@@ -168,8 +306,10 @@ class DBManager:
         """
         try:
             # 获取表结构，检查是否有update_time字段
-            self.cursor.execute(f"PRAGMA table_info({table})")
+            pragma_sql = f"PRAGMA table_info({table})"
+            started = self._run(pragma_sql)
             columns = [column[1] for column in self.cursor.fetchall()]
+            self._record(started, pragma_sql, None, len(columns))
             
             # 只在表有对应字段时添加时间
             if 'update_time' in columns:
@@ -178,8 +318,10 @@ class DBManager:
             set_clause = ', '.join([f"{key} = ?" for key in data.keys()])
             sql = f"UPDATE {table} SET {set_clause} WHERE {condition}"
             
-            self.cursor.execute(sql, tuple(data.values()))
+            params = tuple(data.values())
+            started = self._run(sql, params)
             self.conn.commit()
+            self._record(started, sql, params, self.cursor.rowcount)
             return True
         except sqlite3.Error as e:
             print(f"更新失败: {e}\nTable: {table}\nData: {data}\nCondition: {condition}")
@@ -195,8 +337,9 @@ class DBManager:
         """
         try:
             sql = f"DELETE FROM {table} WHERE {condition}"
-            self.cursor.execute(sql)
+            started = self._run(sql)
             self.conn.commit()
+            self._record(started, sql, None, self.cursor.rowcount)
             return True
         except sqlite3.Error as e:
             print(f"删除失败: {e}\nTable: {table}\nCondition: {condition}")
@@ -210,12 +353,77 @@ class DBManager:
         """
         return self.cursor.lastrowid
 
+class _Transaction:
+    """事务内的语句执行器，语句不单独提交，由DBManager.transaction统一提交"""
+    
+    def __init__(self, db):
+        self.db = db
+    
+    def execute(self, sql, params=None):
+        """
+        执行SQL语句
+        :param sql: SQL语句
+        :param params: SQL参数
+        :return: 影响的行数
+        """
+        started = self.db._run(sql, params)
+        row_count = self.db.cursor.rowcount
+        self.db._record(started, sql, params, row_count)
+        return row_count
+    
+    def execute_many(self, sql, params_list):
+        """
+        使用同一条SQL批量执行多组参数
+        :param sql: SQL语句
+        :param params_list: 参数列表
+        :return: 影响的行数
+        """
+        params_list = list(params_list)
+        if not params_list:
+            return 0
+        started = time.perf_counter() if query_stats.get_recorder() else None
+        self.db.cursor.executemany(sql, params_list)
+        row_count = self.db.cursor.rowcount
+        self.db._record(started, sql, params_list[0], row_count)
+        return row_count
+    
+    def fetch_all(self, sql, params=None):
+        """
+        在事务内查询
+        :param sql: SQL查询语句
+        :param params: SQL参数
+        :return: 查询结果列表
+        """
+        started = self.db._run(sql, params)
+        result = self.db.cursor.fetchall()
+        self.db._record(started, sql, params, len(result))
+        return result
+    
+    def fetch_one(self, sql, params=None):
+        """
+        在事务内查询单条结果
+        :param sql: SQL查询语句
+        :param params: SQL参数
+        :return: 查询结果
+        """
+        started = self.db._run(sql, params)
+        result = self.db.cursor.fetchone()
+        self.db._record(started, sql, params, 1 if result else 0)
+        return result
+
 # 导入线程本地存储
 import threading
+import weakref
 
 # 线程本地存储，用于存储每个线程的数据库连接
 thread_local = threading.local()
 
+# 所有已创建的数据库实例
+_db_instances = weakref.WeakSet()
+
+# 连接代数，每次关闭全部连接后加一，旧代数的连接在使用前重新建立
+_connection_generation = 0
+
 def get_db():
     """
     获取当前线程的数据库实例
@@ -224,4 +432,32 @@ def get_db():
     """
     if not hasattr(thread_local, "db_manager"):
         thread_local.db_manager = DBManager()
-    return thread_local.db_manager
\ No newline at end of file
+    elif thread_local.db_manager.conn is None or thread_local.db_manager.generation != _connection_generation:
+        # 数据库文件已被替换，关闭旧连接后重新连接
+        thread_local.db_manager.close()
+        thread_local.db_manager.connect()
+    return thread_local.db_manager
+
+def get_connection_generation():
+    """
+    获取当前连接代数，数据库文件被替换后会变化，缓存数据库内容的模块据此判断缓存是否失效
+    :return: 连接代数
+    """
+    return _connection_generation
+
+def close_all_connections():
+    """
+    关闭所有线程的数据库连接
+    各线程下次调用get_db()时自动重新连接，用于替换数据库文件前释放文件句柄
+    """
+    global _connection_generation
+    _connection_generation += 1
+    
+    for db_manager in list(_db_instances):
+        try:
+            db_manager.close()
+        except sqlite3.ProgrammingError:
+            # 其他线程创建的连接只能由该线程关闭，其下次调用get_db()时处理
+            pass
+        except sqlite3.Error as e:
+            print(f"关闭数据库连接失败: {e}")
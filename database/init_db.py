@@ -5,6 +5,8 @@
 负责创建数据库表结构和添加默认数据
 """
 
+import sqlite3
+
 from database.db_manager import DBManager
 
 def init_database():
@@ -26,12 +28,30 @@ def init_database():
     # 创建抄表记录表
     create_meter_readings_table(db)
     
+    # 创建区间用量表
+    create_meter_intervals_tables(db)
+    
+    # 创建电价方案表
+    create_tariffs_tables(db)
+    
     # 创建费用表
     create_charges_table(db)
     
+    # 创建费用明细表
+    create_charge_items_table(db)
+    
+    # 创建待重算费用日志表
+    create_charge_dirty_table(db)
+    
     # 创建收费记录表
     create_payments_table(db)
     
+    # 费用表唯一索引，依赖收费记录表和费用明细表
+    create_charges_unique_index(db)
+    
+    # 费用状态触发器，依赖收费记录表
+    create_charge_status_triggers(db)
+    
     # 创建结算记录表
     create_settlements_table(db)
     
@@ -140,6 +160,54 @@ def create_meter_readings_table(db):
     db.execute("CREATE INDEX IF NOT EXISTS idx_meter_readings_date ON meter_readings(reading_date);")
     db.execute("CREATE INDEX IF NOT EXISTS idx_meter_readings_reader ON meter_readings(reader);")
 
+def create_meter_intervals_tables(db):
+    """
+    创建智能表区间用量表及按日、按月汇总表
+    区间用量表以(meter_id, ts)为主键且不带rowid，数据按表和时间顺序存放，范围查询只读取连续的页
+    ts为本地时间按UTC换算的秒数，value为该区间的用量；汇总表的profile为96个15分钟时段的用量曲线
+    """
+    db.execute("""
+    CREATE TABLE IF NOT EXISTS meter_intervals (
+        meter_id INTEGER NOT NULL,
+        ts INTEGER NOT NULL,
+        value REAL NOT NULL,
+        PRIMARY KEY (meter_id, ts),
+        FOREIGN KEY (meter_id) REFERENCES meters(id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+    """)
+    db.execute("""
+    CREATE TABLE IF NOT EXISTS meter_interval_daily (
+        meter_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        usage REAL NOT NULL,
+        points INTEGER NOT NULL,
+        last_ts INTEGER NOT NULL,
+        profile BLOB,
+        PRIMARY KEY (meter_id, day),
+        FOREIGN KEY (meter_id) REFERENCES meters(id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+    """)
+    db.execute("""
+    CREATE TABLE IF NOT EXISTS meter_interval_monthly (
+        meter_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        usage REAL NOT NULL,
+        points INTEGER NOT NULL,
+        profile BLOB,
+        PRIMARY KEY (meter_id, month),
+        FOREIGN KEY (meter_id) REFERENCES meters(id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+    """)
+    
+    # 早期创建的汇总表没有分时曲线列
+    for table in ("meter_interval_daily", "meter_interval_monthly"):
+        columns = [column[1] for column in db.fetch_all(f"PRAGMA table_info({table});")]
+        if 'profile' not in columns:
+            db.execute(f"ALTER TABLE {table} ADD COLUMN profile BLOB;")
+    
+    # 按月份汇总全部水电表时使用
+    db.execute("CREATE INDEX IF NOT EXISTS idx_meter_interval_monthly_month ON meter_interval_monthly(month);")
+
 def create_charges_table(db):
     """
     创建费用表
@@ -169,6 +237,216 @@ def create_charges_table(db):
     db.execute("CREATE INDEX IF NOT EXISTS idx_charges_month ON charges(month);")
     db.execute("CREATE INDEX IF NOT EXISTS idx_charges_status ON charges(status);")
 
+def create_charges_unique_index(db):
+    """
+    为费用表建立(租户, 月份)唯一索引，每个租户每月只有一条费用
+    旧版本并发计算可能产生重复记录，建立索引前先合并，需在收费记录表和费用明细表创建之后调用
+    """
+    merge_duplicate_charges(db)
+    db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_charges_tenant_month ON charges(tenant_id, month);")
+
+def merge_duplicate_charges(db):
+    """
+    合并同一租户同一月份的重复费用记录
+    保留ID最小的一条（即原来按租户和月份查询时取到的记录），其余记录的收费记录转到保留的记录上，
+    然后删除其余记录及其明细，保留记录的状态按已收金额重新确定；全部在一个事务内完成
+    :return: 删除的重复记录数
+    """
+    duplicates = db.fetch_all("""
+    SELECT c.id, k.keep_id FROM charges c
+    JOIN (SELECT tenant_id, month, MIN(id) AS keep_id FROM charges
+          GROUP BY tenant_id, month HAVING COUNT(*) > 1) k
+      ON c.tenant_id = k.tenant_id AND c.month = k.month
+    WHERE c.id != k.keep_id
+    """)
+    if not duplicates:
+        return 0
+    
+    try:
+        with db.transaction() as tx:
+            tx.execute_many("UPDATE payments SET charge_id = ? WHERE charge_id = ?",
+                            [(keep_id, charge_id) for charge_id, keep_id in duplicates])
+            tx.execute_many("DELETE FROM charge_items WHERE charge_id = ?",
+                            [(charge_id,) for charge_id, _ in duplicates])
+            tx.execute_many("DELETE FROM charges WHERE id = ?",
+                            [(charge_id,) for charge_id, _ in duplicates])
+            tx.execute_many(f"UPDATE charges SET status = {charge_status_case('total_charge', 'charges.id')} WHERE id = ?",
+                            [(keep_id,) for keep_id in {keep_id for _, keep_id in duplicates}])
+        print(f"已合并重复费用记录 {len(duplicates)} 条")
+        return len(duplicates)
+    except sqlite3.Error as e:
+        print(f"合并重复费用记录失败: {e}")
+        return 0
+
+def charge_status_case(total_expr, charge_id_expr):
+    """
+    生成按已收金额确定费用状态的SQL表达式，规则与Charge.status_for_paid一致
+    状态保存为固定的中文代码（未缴/已缴/部分缴纳），界面显示时再翻译，与当前界面语言无关；
+    总费用为0且没有收费记录的费用为未缴，只有登记过收费才会成为已缴
+    :param total_expr: 总费用表达式
+    :param charge_id_expr: 费用ID表达式
+    :return: CASE表达式
+    """
+    paid = f"(SELECT COALESCE(SUM(amount), 0) FROM payments WHERE charge_id = {charge_id_expr})"
+    return f"""CASE
+        WHEN {paid} > 0 AND ROUND({total_expr} - {paid}, 2) <= 0 THEN '已缴'
+        WHEN {paid} > 0 THEN '部分缴纳'
+        ELSE '未缴'
+    END"""
+
+def create_charge_status_triggers(db):
+    """
+    创建维护费用状态的触发器
+    新增、修改、删除收费记录以及费用总额或状态被写入时，在同一事务内按已收金额重新确定状态，
+    任何代码路径都不再需要自行计算或写入状态；首次创建触发器时修复一次已有费用的状态
+    """
+    charge_status = charge_status_case('total_charge', 'charges.id')
+    new_charge_status = charge_status_case('NEW.total_charge', 'NEW.id')
+    
+    # 状态规则修改后，旧规则创建的触发器删除重建，并按新规则修复已有费用的状态
+    existing = db.fetch_all("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN "
+                            "('trg_payments_status_insert', 'trg_payments_status_update', 'trg_payments_status_delete', "
+                            "'trg_charges_status_insert', 'trg_charges_status_update')")
+    outdated = [name for name, sql in existing if charge_status not in sql and new_charge_status not in sql]
+    for name in outdated:
+        db.execute(f"DROP TRIGGER IF EXISTS {name};")
+    exists = bool(existing) and not outdated
+    
+    db.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_payments_status_insert AFTER INSERT ON payments
+    BEGIN
+        UPDATE charges SET status = {charge_status} WHERE id = NEW.charge_id;
+    END;
+    """)
+    db.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_payments_status_update AFTER UPDATE OF charge_id, amount ON payments
+    BEGIN
+        UPDATE charges SET status = {charge_status} WHERE id IN (OLD.charge_id, NEW.charge_id);
+    END;
+    """)
+    db.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_payments_status_delete AFTER DELETE ON payments
+    BEGIN
+        UPDATE charges SET status = {charge_status} WHERE id = OLD.charge_id;
+    END;
+    """)
+    # 写入的状态与已收金额不符时（包括旧版本写入的翻译文本）改为正确的状态；
+    # 触发器自身的UPDATE不会再次触发（recursive_triggers默认关闭）
+    db.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_charges_status_insert AFTER INSERT ON charges
+    WHEN NEW.status IS NOT {new_charge_status}
+    BEGIN
+        UPDATE charges SET status = {new_charge_status} WHERE id = NEW.id;
+    END;
+    """)
+    db.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_charges_status_update AFTER UPDATE OF total_charge, status ON charges
+    WHEN NEW.status IS NOT {new_charge_status}
+    BEGIN
+        UPDATE charges SET status = {new_charge_status} WHERE id = NEW.id;
+    END;
+    """)
+    
+    if not exists:
+        repaired = repair_charge_status(db)
+        if repaired:
+            print(f"已修复费用状态 {repaired} 条")
+
+def repair_charge_status(db):
+    """
+    按已收金额一次性修复所有状态不正确的费用
+    :return: 修复的费用数
+    """
+    charge_status = charge_status_case('total_charge', 'charges.id')
+    try:
+        with db.transaction() as tx:
+            rows = tx.fetch_all(f"SELECT COUNT(*) FROM charges WHERE status IS NOT {charge_status}")
+            tx.execute(f"UPDATE charges SET status = {charge_status} WHERE status IS NOT {charge_status}")
+        return rows[0][0] if rows else 0
+    except sqlite3.Error as e:
+        print(f"修复费用状态失败: {e}")
+        return 0
+
+def create_tariffs_tables(db):
+    """
+    创建电价方案表、分时时段表和阶梯价格表
+    """
+    db.execute("""
+    CREATE TABLE IF NOT EXISTS tariffs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        resource_type TEXT NOT NULL,
+        tenant_type TEXT NOT NULL DEFAULT '全部',
+        default_band TEXT NOT NULL DEFAULT '平',
+        start_date DATE NOT NULL,
+        end_date DATE,
+        create_time DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    """)
+    db.execute("""
+    CREATE TABLE IF NOT EXISTS tariff_bands (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tariff_id INTEGER NOT NULL,
+        band TEXT NOT NULL,
+        start_time TEXT NOT NULL,
+        end_time TEXT NOT NULL,
+        FOREIGN KEY (tariff_id) REFERENCES tariffs(id) ON DELETE CASCADE
+    );
+    """)
+    db.execute("""
+    CREATE TABLE IF NOT EXISTS tariff_rates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tariff_id INTEGER NOT NULL,
+        band TEXT NOT NULL,
+        tier_start REAL NOT NULL DEFAULT 0,
+        price REAL NOT NULL,
+        FOREIGN KEY (tariff_id) REFERENCES tariffs(id) ON DELETE CASCADE
+    );
+    """)
+    
+    # 添加索引
+    db.execute("CREATE INDEX IF NOT EXISTS idx_tariffs_resource_type ON tariffs(resource_type, start_date);")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_tariff_bands_tariff_id ON tariff_bands(tariff_id);")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_tariff_rates_tariff_id ON tariff_rates(tariff_id);")
+
+def create_charge_items_table(db):
+    """
+    创建费用明细表，保存每笔费用按时段和阶梯拆分的用量和金额
+    """
+    sql = """
+    CREATE TABLE IF NOT EXISTS charge_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        charge_id INTEGER NOT NULL,
+        resource_type TEXT NOT NULL,
+        band TEXT NOT NULL DEFAULT '',
+        tier INTEGER NOT NULL DEFAULT 0,
+        usage REAL NOT NULL,
+        price REAL NOT NULL,
+        amount REAL NOT NULL,
+        FOREIGN KEY (charge_id) REFERENCES charges(id) ON DELETE CASCADE
+    );
+    """
+    db.execute(sql)
+    
+    # 添加索引
+    db.execute("CREATE INDEX IF NOT EXISTS idx_charge_items_charge_id ON charge_items(charge_id);")
+
+def create_charge_dirty_table(db):
+    """
+    创建待重算费用日志表，记录抄表、水电表或价格变化后需要重新计算费用的租户和月份
+    同一租户月份再次登记时替换为新的id，费用计算只清除读取时的记录，计算期间新登记的保留
+    """
+    sql = """
+    CREATE TABLE IF NOT EXISTS charge_dirty (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tenant_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        mark_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (month, tenant_id)
+    );
+    """
+    db.execute(sql)
+
 def create_payments_table(db):
     """
     创建收费记录表
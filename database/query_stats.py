@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQL执行统计模块
+按需开启，记录每条语句的规范化SQL、参数个数、返回行数和耗时，
+并按操作范围（scope）汇总，用于定位N+1查询和慢查询
+"""
+
+import os
+import re
+import time
+import atexit
+import logging
+import threading
+import functools
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+# 单条语句的执行记录
+StatementRecord = namedtuple(
+    "StatementRecord",
+    ["scope", "sql", "param_count", "row_count", "elapsed", "timestamp"]
+)
+
+# 未指定操作范围时使用的名称
+NO_SCOPE = "-"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"IN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"VALUES\s*\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    规范化SQL语句，去掉字面量和多余空白，使同一模式的语句可以合并统计
+    :param sql: SQL语句
+    :return: 规范化后的SQL
+    """
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _VALUES_LIST.sub("VALUES (...)", sql)
+    return sql
+
+
+class QueryRecorder:
+    """SQL执行记录器"""
+
+    def __init__(self, capacity: int = 10000, slow_threshold_ms: Optional[float] = None,
+                 slow_log_file: str = "slow_query.log"):
+        """
+        初始化记录器
+        :param capacity: 环形缓冲区容量，超出后丢弃最早的记录，汇总统计不受影响
+        :param slow_threshold_ms: 慢查询阈值（毫秒），为None时不记录慢查询
+        :param slow_log_file: 慢查询日志文件
+        """
+        self.records = deque(maxlen=capacity)
+        self.slow_threshold_ms = slow_threshold_ms
+        self.slow_log_file = slow_log_file
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # (scope, sql) -> [次数, 总耗时, 最大耗时, 总行数]
+        self._stats: Dict[tuple, List[float]] = {}
+        self._slow_logger = None
+
+    # ---------- 操作范围 ----------
+
+    def _scope_stack(self) -> List[str]:
+        """
+        获取当前线程的操作范围栈
+        :return: 范围名称列表
+        """
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current_scope(self) -> str:
+        """
+        获取当前线程的操作范围，嵌套时用 > 连接
+        :return: 范围名称
+        """
+        stack = self._scope_stack()
+        return " > ".join(stack) if stack else NO_SCOPE
+
+    @contextmanager
+    def scope(self, name: str):
+        """
+        操作范围上下文，范围内执行的语句归入该范围统计
+        :param name: 范围名称，如 ChargeView.load_charge_list
+        """
+        stack = self._scope_stack()
+        stack.append(name)
+        try:
+            yield self
+        finally:
+            stack.pop()
+
+    # ---------- 记录 ----------
+
+    def record(self, sql: str, params: Any, row_count: int, elapsed: float,
+               explain: Optional[Callable[[str, Any], List[tuple]]] = None) -> None:
+        """
+        记录一条语句的执行情况
+        :param sql: 原始SQL语句
+        :param params: SQL参数
+        :param row_count: 返回或影响的行数
+        :param elapsed: 耗时（秒）
+        :param explain: 获取查询计划的函数，慢查询时调用
+        """
+        normalized = normalize_sql(sql)
+        scope = self.current_scope()
+        param_count = len(params) if params else 0
+        record = StatementRecord(scope, normalized, param_count, row_count, elapsed, time.time())
+
+        with self._lock:
+            self.records.append(record)
+            stats = self._stats.get((scope, normalized))
+            if stats is None:
+                self._stats[(scope, normalized)] = [1, elapsed, elapsed, row_count]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] = max(stats[2], elapsed)
+                stats[3] += row_count
+
+        if self.slow_threshold_ms is not None and elapsed * 1000 >= self.slow_threshold_ms:
+            self._log_slow(record, sql, params, explain)
+
+    def _log_slow(self, record: StatementRecord, sql: str, params: Any,
+                  explain: Optional[Callable[[str, Any], List[tuple]]]) -> None:
+        """
+        记录慢查询及其查询计划
+        :param record: 执行记录
+        :param sql: 原始SQL语句
+        :param params: SQL参数
+        :param explain: 获取查询计划的函数
+        """
+        if self._slow_logger is None:
+            logger = logging.getLogger("database.slow_query")
+            if not logger.handlers:
+                handler = logging.FileHandler(os.path.join(os.getcwd(), self.slow_log_file), encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+                logger.addHandler(handler)
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+            self._slow_logger = logger
+
+        plan_lines = []
+        if explain and sql.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+            try:
+                # 查询计划每行为 (id, parent, notused, detail)
+                plan_lines = [f"    {row[-1]}" for row in explain(sql, params)]
+            except Exception as e:
+                plan_lines = [f"    获取查询计划失败: {e}"]
+
+        self._slow_logger.info(
+            f"慢查询 {record.elapsed * 1000:.1f} ms [{record.scope}] 行数={record.row_count} "
+            f"参数={record.param_count}\n  {record.sql}" + ("\n" + "\n".join(plan_lines) if plan_lines else "")
+        )
+
+    def reset(self) -> None:
+        """
+        清空记录和汇总统计
+        """
+        with self._lock:
+            self.records.clear()
+            self._stats.clear()
+
+    # ---------- 报告 ----------
+
+    def statement_stats(self, scope: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        获取按语句汇总的统计
+        :param scope: 只返回指定范围（含其嵌套子范围）的统计，为None时返回全部
+        :return: 统计列表，每项包含scope、sql、count、total、max、rows
+        """
+        with self._lock:
+            items = list(self._stats.items())
+
+        result = []
+        for (stat_scope, sql), (count, total, max_elapsed, rows) in items:
+            if scope is not None and stat_scope != scope and not stat_scope.startswith(scope + " > "):
+                continue
+            result.append({
+                "scope": stat_scope,
+                "sql": sql,
+                "count": count,
+                "total": total,
+                "max": max_elapsed,
+                "rows": rows,
+            })
+        return result
+
+    def scope_stats(self) -> List[Dict[str, Any]]:
+        """
+        获取按操作范围汇总的统计
+        :return: 统计列表，每项包含scope、statements、distinct、total、rows
+        """
+        scopes: Dict[str, Dict[str, Any]] = {}
+        for stat in self.statement_stats():
+            item = scopes.setdefault(stat["scope"], {
+                "scope": stat["scope"], "statements": 0, "distinct": 0, "total": 0.0, "rows": 0
+            })
+            item["statements"] += stat["count"]
+            item["distinct"] += 1
+            item["total"] += stat["total"]
+            item["rows"] += stat["rows"]
+        return sorted(scopes.values(), key=lambda item: item["total"], reverse=True)
+
+    def report(self, top_n: int = 20, order_by: str = "total") -> str:
+        """
+        生成文本报告：各操作范围汇总以及耗时（或次数）最多的前N条语句
+        :param top_n: 语句数量
+        :param order_by: 排序字段，total（总耗时）或count（次数）
+        :return: 报告文本
+        """
+        lines = ["=== SQL统计：操作范围 ==="]
+        lines.append(f"{'语句数':>8} {'模式数':>6} {'总耗时ms':>10} {'行数':>8}  范围")
+        for item in self.scope_stats():
+            lines.append(f"{item['statements']:>8} {item['distinct']:>6} {item['total'] * 1000:>10.1f} "
+                         f"{item['rows']:>8}  {item['scope']}")
+
+        stats = sorted(self.statement_stats(), key=lambda stat: stat[order_by], reverse=True)[:top_n]
+        lines.append("")
+        lines.append(f"=== SQL统计：前{top_n}条语句（按{'总耗时' if order_by == 'total' else '次数'}） ===")
+        lines.append(f"{'次数':>8} {'总耗时ms':>10} {'最大ms':>8} {'行数':>8}  范围 / SQL")
+        for stat in stats:
+            lines.append(f"{stat['count']:>8} {stat['total'] * 1000:>10.1f} {stat['max'] * 1000:>8.1f} "
+                         f"{stat['rows']:>8}  [{stat['scope']}] {stat['sql']}")
+        return "\n".join(lines)
+
+
+# 当前生效的记录器，为None时不做任何统计
+_recorder: Optional[QueryRecorder] = None
+
+
+def get_recorder() -> Optional[QueryRecorder]:
+    """
+    获取当前生效的记录器
+    :return: 记录器，未开启统计时返回None
+    """
+    return _recorder
+
+
+def enable(capacity: int = 10000, slow_threshold_ms: Optional[float] = None,
+           slow_log_file: str = "slow_query.log") -> QueryRecorder:
+    """
+    开启SQL执行统计
+    :param capacity: 环形缓冲区容量
+    :param slow_threshold_ms: 慢查询阈值（毫秒）
+    :param slow_log_file: 慢查询日志文件
+    :return: 记录器
+    """
+    global _recorder
+    _recorder = QueryRecorder(capacity, slow_threshold_ms, slow_log_file)
+    return _recorder
+
+
+def disable() -> Optional[QueryRecorder]:
+    """
+    关闭SQL执行统计
+    :return: 关闭前的记录器
+    """
+    global _recorder
+    recorder, _recorder = _recorder, None
+    return recorder
+
+
+@contextmanager
+def scope(name: str):
+    """
+    操作范围上下文，未开启统计时不做任何处理
+    :param name: 范围名称
+    """
+    recorder = _recorder
+    if recorder is None:
+        yield None
+        return
+    with recorder.scope(name):
+        yield recorder
+
+
+def scoped(name: str):
+    """
+    操作范围装饰器，被装饰函数内执行的语句归入该范围统计
+    :param name: 范围名称
+    :return: 装饰器
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with scope(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _enable_from_environment() -> None:
+    """
+    根据环境变量开启统计：SDCBSF_QUERY_STATS=1 开启，
+    SDCBSF_SLOW_QUERY_MS 设置慢查询阈值，程序退出时输出报告
+    """
+    if os.environ.get("SDCBSF_QUERY_STATS", "").lower() not in ("1", "true", "yes"):
+        return
+
+    slow_ms = os.environ.get("SDCBSF_SLOW_QUERY_MS")
+    recorder = enable(slow_threshold_ms=float(slow_ms) if slow_ms else None)
+    atexit.register(lambda: print(recorder.report()))
+
+
+_enable_from_environment()
@@ -4,6 +4,7 @@
 水电费抄收管理系统主程序入口
 """
 
+import multiprocessing
 import tkinter as tk
 
 # 使用统一的路径处理模块
@@ -57,4 +58,6 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
+    # 打包为可执行文件后，批量生成账单的工作进程需要此调用才能正常启动
+    multiprocessing.freeze_support()
     main()
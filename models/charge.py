@@ -7,12 +7,14 @@
 
 import logging
 import os
+import sqlite3
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Callable, Iterator
 
 from database.db_manager import get_db
 from models.tenant import Tenant
-from models.price import Price
+from models.price import PriceBook
+from models.charge_journal import ChargeJournal
 from utils.settings_utils import SettingsUtils
 
 # 配置日志
@@ -26,11 +28,47 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 费用状态代码，保存在charges.status中，与界面语言无关；由数据库触发器按已收金额维护
+STATUS_UNPAID = '未缴'
+STATUS_PAID = '已缴'
+STATUS_PARTIAL = '部分缴纳'
+# 状态代码 -> 显示文本的翻译键
+STATUS_TEXT_KEYS = {
+    STATUS_UNPAID: 'unpaid',
+    STATUS_PAID: 'paid',
+    STATUS_PARTIAL: 'partially_paid',
+}
+
+# 按(租户, 月份)写入费用，已有记录时更新用量和金额，状态由触发器按已收金额重新确定
+UPSERT_SQL = """
+INSERT INTO charges (tenant_id, month, water_usage, water_price, water_charge, electricity_usage,
+                     electricity_price, electricity_charge, total_charge, status, update_time)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(tenant_id, month) DO UPDATE SET
+    water_usage = excluded.water_usage,
+    water_price = excluded.water_price,
+    water_charge = excluded.water_charge,
+    electricity_usage = excluded.electricity_usage,
+    electricity_price = excluded.electricity_price,
+    electricity_charge = excluded.electricity_charge,
+    total_charge = excluded.total_charge,
+    update_time = excluded.update_time
+"""
+
 class Charge:
     """费用类"""
     
+    @staticmethod
+    def round_amount(amount: float) -> float:
+        """
+        费用金额取整到元，与calculate_month中np.round的规则相同（四舍六入五成双）
+        :param amount: 金额
+        :return: 取整后的金额
+        """
+        return float(round(amount))
+    
     def __init__(self, id: Optional[int] = None, tenant_id: Optional[int] = None, month: str = '', water_usage: float = 0.0, water_price: float = 0.0, water_charge: float = 0.0,
-                 electricity_usage: float = 0.0, electricity_price: float = 0.0, electricity_charge: float = 0.0, total_charge: float = 0.0, status: str = '未缴', create_time: Optional[datetime] = None, update_time: Optional[datetime] = None):
+                 electricity_usage: float = 0.0, electricity_price: float = 0.0, electricity_charge: float = 0.0, total_charge: float = 0.0, status: str = STATUS_UNPAID, create_time: Optional[datetime] = None, update_time: Optional[datetime] = None):
         """
         初始化费用对象
         :param id: 费用ID
@@ -85,22 +123,23 @@ class Charge:
                 'status': self.status
             }
             result = db.update('charges', data, f'id = {self.id}')
+            if result:
+                # 状态以触发器确定的为准
+                row = db.fetch_one("SELECT status FROM charges WHERE id = ?", (self.id,))
+                if row:
+                    self.status = row[0]
         else:
-            # 插入新费用
-            data: Dict[str, Any] = {
-                'tenant_id': self.tenant_id,
-                'month': self.month,
-                'water_usage': self.water_usage,
-                'water_price': self.water_price,
-                'water_charge': self.water_charge,
-                'electricity_usage': self.electricity_usage,
-                'electricity_price': self.electricity_price,
-                'electricity_charge': self.electricity_charge,
-                'total_charge': self.total_charge,
-                'status': self.status
-            }
-            self.id = db.insert('charges', data)
-            result = self.id is not None
+            # 插入新费用，该租户当月已有费用时更新原记录，不会产生重复记录
+            result = db.execute(UPSERT_SQL, (
+                self.tenant_id, self.month, self.water_usage, self.water_price, self.water_charge,
+                self.electricity_usage, self.electricity_price, self.electricity_charge, self.total_charge,
+                self.status, datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            ))
+            if result:
+                row = db.fetch_one("SELECT id, status FROM charges WHERE tenant_id = ? AND month = ?",
+                                   (self.tenant_id, self.month))
+                if row:
+                    self.id, self.status = row
         
         return bool(result)
     
@@ -115,6 +154,65 @@ class Charge:
         db = get_db()
         return bool(db.delete('charges', f'id = {self.id}'))
     
+    @classmethod
+    def get_delete_blockers(cls, charge_ids: List[int], executor=None) -> Dict[int, str]:
+        """
+        一次查询检查费用能否删除：已有收费记录的费用不能删除，原因按费用状态细分；
+        状态由收费记录得出，没有收费记录的费用（包括总费用为0的）总是可以删除
+        :param charge_ids: 费用ID列表
+        :param executor: 事务执行器，为None时直接查询
+        :return: 不能删除的费用ID到原因代码的字典，原因为paid、partially_paid、has_payments或not_found
+        """
+        charge_ids = list(dict.fromkeys(charge_ids))
+        fetch_all = (executor or get_db()).fetch_all
+        found = {}
+        for start in range(0, len(charge_ids), 500):
+            chunk = charge_ids[start:start + 500]
+            rows = fetch_all(f"""
+            SELECT c.id, c.status, EXISTS(SELECT 1 FROM payments WHERE charge_id = c.id)
+            FROM charges c WHERE c.id IN ({', '.join('?' for _ in chunk)})
+            """, tuple(chunk))
+            found.update((charge_id, (status, has_payments)) for charge_id, status, has_payments in rows)
+        
+        blockers = {}
+        for charge_id in charge_ids:
+            if charge_id not in found:
+                blockers[charge_id] = 'not_found'
+                continue
+            status, has_payments = found[charge_id]
+            if not has_payments:
+                continue
+            if status == STATUS_PAID:
+                blockers[charge_id] = 'paid'
+            elif status == STATUS_PARTIAL:
+                blockers[charge_id] = 'partially_paid'
+            else:
+                blockers[charge_id] = 'has_payments'
+        return blockers
+    
+    @classmethod
+    def delete_many(cls, charge_ids: List[int]) -> Dict[str, Any]:
+        """
+        批量删除费用
+        在一个BEGIN IMMEDIATE事务内检查全部费用，不能删除的跳过，其余按ID分批删除（明细随费用级联删除），
+        检查之后其他连接不能再为这些费用登记收费
+        :param charge_ids: 费用ID列表
+        :return: 结果字典，键deleted为已删除的费用ID列表，blocked为不能删除的费用ID到原因代码的字典，
+                 原因代码见get_delete_blockers；写入失败时全部回滚，deleted为空，error为错误信息
+        """
+        db = get_db()
+        try:
+            with db.transaction(immediate=True) as tx:
+                blocked = cls.get_delete_blockers(charge_ids, tx)
+                deletable = [charge_id for charge_id in dict.fromkeys(charge_ids) if charge_id not in blocked]
+                for start in range(0, len(deletable), 500):
+                    chunk = deletable[start:start + 500]
+                    tx.execute(f"DELETE FROM charges WHERE id IN ({', '.join('?' for _ in chunk)})", tuple(chunk))
+            return {'deleted': deletable, 'blocked': blocked}
+        except sqlite3.Error as e:
+            logger.error(f"批量删除费用失败：{str(e)}")
+            return {'deleted': [], 'blocked': {}, 'error': str(e)}
+    
     def load_tenant_info(self) -> None:
         """
         加载关联的租户信息
@@ -122,6 +220,67 @@ class Charge:
         if self.tenant_id:
             self.tenant = Tenant.get_by_id(self.tenant_id)
     
+    @classmethod
+    def attach_tenants(cls, charges: List['Charge']) -> None:
+        """
+        为费用列表批量关联租户信息，效果等同于逐条调用load_tenant_info
+        :param charges: 费用列表
+        """
+        tenant_ids = {charge.tenant_id for charge in charges if charge.tenant_id}
+        if not tenant_ids:
+            return
+        tenant_map = Tenant.get_map(tenant_ids)
+        for charge in charges:
+            if charge.tenant_id:
+                charge.tenant = tenant_map.get(charge.tenant_id)
+    
+    @classmethod
+    def get_map(cls, charge_ids: Optional[List[int]] = None) -> Dict[int, 'Charge']:
+        """
+        批量获取费用，用于关联费用信息，避免逐条查询
+        :param charge_ids: 费用ID集合，为None或数量较多时读取全部费用
+        :return: 费用ID到费用对象的字典
+        """
+        db = get_db()
+        sql = "SELECT * FROM charges"
+        params: tuple = ()
+        if charge_ids is not None:
+            charge_ids = list(set(charge_ids))
+            if not charge_ids:
+                return {}
+            # SQLite参数个数有限制，ID较多时直接读取全表
+            if len(charge_ids) <= 500:
+                sql += f" WHERE id IN ({', '.join('?' for _ in charge_ids)})"
+                params = tuple(charge_ids)
+        results = db.fetch_all(sql, params)
+        
+        charges: List['Charge'] = [cls(*result) for result in results]
+        cls.attach_tenants(charges)
+        return {charge.id: charge for charge in charges}
+    
+    @classmethod
+    def get_by_months(cls, months: List[str]) -> List['Charge']:
+        """
+        获取多个月份的费用
+        :param months: 月份列表（如['2023-05', '2023-06']）
+        :return: 费用列表
+        """
+        months = sorted(set(months))
+        if not months:
+            return []
+        
+        db = get_db()
+        sql = f"""
+        SELECT * FROM charges 
+        WHERE month IN ({', '.join('?' for _ in months)}) 
+        ORDER BY month, tenant_id
+        """
+        results = db.fetch_all(sql, tuple(months))
+        
+        charges: List['Charge'] = [cls(*result) for result in results]
+        cls.attach_tenants(charges)
+        return charges
+    
     @classmethod
     def get_by_id(cls, charge_id: int) -> Optional['Charge']:
         """
@@ -139,6 +298,28 @@ class Charge:
             return charge
         return None
     
+    @classmethod
+    def iter_month_rows(cls, month: str, tenant_id: Optional[int] = None) -> Iterator[tuple]:
+        """
+        逐行读取指定月份的费用，租户名称在查询中关联，不创建费用对象，用于报表导出
+        :param month: 月份（如2023-05）
+        :param tenant_id: 租户ID，为None时读取全部租户
+        :return: 行迭代器，每行为(租户名称, 月份, 水用量, 水单价, 水费, 电用量, 电单价, 电费, 总费用, 状态)
+        """
+        sql = """
+        SELECT COALESCE(t.name, '未知租户'), c.month, c.water_usage, c.water_price, c.water_charge,
+               c.electricity_usage, c.electricity_price, c.electricity_charge, c.total_charge, c.status
+        FROM charges c
+        LEFT JOIN tenants t ON c.tenant_id = t.id
+        WHERE c.month = ?
+        """
+        params = [month]
+        if tenant_id is not None:
+            sql += " AND c.tenant_id = ?"
+            params.append(tenant_id)
+        sql += " ORDER BY c.tenant_id"
+        return get_db().iter_rows(sql, tuple(params))
+    
     @classmethod
     def get_by_month(cls, month: str) -> List['Charge']:
         """
@@ -157,9 +338,10 @@ class Charge:
         charges: List['Charge'] = []
         for result in results:
             charge = cls(*result)
-            charge.load_tenant_info()
             charges.append(charge)
         
+        # 批量关联租户信息，避免逐条查询
+        cls.attach_tenants(charges)
         return charges
     
     @classmethod
@@ -182,9 +364,10 @@ class Charge:
         charges: List['Charge'] = []
         for result in results:
             charge = cls(*result)
-            charge.load_tenant_info()
             charges.append(charge)
         
+        # 批量关联租户信息，避免逐条查询
+        cls.attach_tenants(charges)
         return charges
     
     @classmethod
@@ -224,10 +407,10 @@ class Charge:
             
             logger.info(f"获取到租户信息：ID={tenant.id}, 名称={tenant.name}, 类型={tenant.type}")
             
-            # 获取当前价格
-            logger.info(f"开始获取 {tenant.type} 类型租户的最新水价和电价")
-            water_price_obj = Price.get_current_price('水', tenant.type)
-            electricity_price_obj = Price.get_current_price('电', tenant.type)
+            # 获取费用月份生效的价格，重新计算历史月份时不会用到之后调整的价格
+            logger.info(f"开始获取 {tenant.type} 类型租户{month}月份的水价和电价")
+            water_price_obj = PriceBook.price_for_month('水', tenant.type, month)
+            electricity_price_obj = PriceBook.price_for_month('电', tenant.type, month)
             
             water_price = water_price_obj.price if water_price_obj else 0.0
             electricity_price = electricity_price_obj.price if electricity_price_obj else 0.0
@@ -247,54 +430,415 @@ class Charge:
             logger.info(f"处理后的用量：用水量={water_usage}吨, 用电量={electricity_usage}度")
             
             # 计算水费
-            water_charge = round(water_usage * water_price)
+            water_charge = cls.round_amount(water_usage * water_price)
             logger.info(f"计算水费：{water_usage}吨 × {water_price}元/吨 = {water_charge}元")
             
             # 计算电费
-            electricity_charge = round(electricity_usage * electricity_price)
+            electricity_charge = cls.round_amount(electricity_usage * electricity_price)
             logger.info(f"计算电费：{electricity_usage}度 × {electricity_price}元/度 = {electricity_charge}元")
             
             # 计算总费用
-            total_charge = round(water_charge + electricity_charge)
+            total_charge = cls.round_amount(water_charge + electricity_charge)
             logger.info(f"计算总费用：{water_charge}元 + {electricity_charge}元 = {total_charge}元")
             
-            # 检查是否已存在该月份的费用记录
-            existing_charge = cls.get_by_tenant_and_month(tenant_id, month)
-            
-            if existing_charge:
-                logger.info(f"更新现有费用记录：ID={existing_charge.id}")
-                # 更新现有记录
-                existing_charge.water_usage = water_usage
-                existing_charge.water_price = water_price
-                existing_charge.water_charge = water_charge
-                existing_charge.electricity_usage = electricity_usage
-                existing_charge.electricity_price = electricity_price
-                existing_charge.electricity_charge = electricity_charge
-                existing_charge.total_charge = total_charge
-                logger.info(f"费用记录更新完成：ID={existing_charge.id}")
-                return existing_charge
-            else:
-                logger.info(f"创建新费用记录")
-                # 创建新费用对象
-                charge = cls(
-                    tenant_id=tenant_id,
-                    month=month,
-                    water_usage=water_usage,
-                    water_price=water_price,
-                    water_charge=water_charge,
-                    electricity_usage=electricity_usage,
-                    electricity_price=electricity_price,
-                    electricity_charge=electricity_charge,
-                    total_charge=total_charge,
-                    status='未缴'
-                )
-                logger.info(f"新费用记录创建完成：租户ID={tenant_id}, 月份={month}, 总费用={total_charge}元")
-                return charge
+            # 不再预先查询已有记录，保存时按(租户, 月份)插入或更新，已有记录的状态保持不变
+            charge = cls(
+                tenant_id=tenant_id,
+                month=month,
+                water_usage=water_usage,
+                water_price=water_price,
+                water_charge=water_charge,
+                electricity_usage=electricity_usage,
+                electricity_price=electricity_price,
+                electricity_charge=electricity_charge,
+                total_charge=total_charge,
+                status=STATUS_UNPAID
+            )
+            logger.info(f"费用记录计算完成：租户ID={tenant_id}, 月份={month}, 总费用={total_charge}元")
+            return charge
                 
         except Exception as e:
             logger.error(f"计算费用失败：{str(e)}", exc_info=True)
             return None
     
+    @classmethod
+    def calculate_month(cls, month: str, progress: Optional[Callable[[int, int], None]] = None,
+                        batch_size: int = 1000, incremental: bool = False) -> Dict[str, int]:
+        """
+        计算所有租户指定月份的费用并保存
+        用量用一次查询取出，有区间数据的智能表先汇总生成当月抄表记录；
+        各租户类型的电价方案编译为数组，按用量向量整体计费，没有方案时按单一价格计费，
+        金额取整规则与calculate_charge相同；费用按(租户, 月份)批量插入或更新，不需要预先查询已有费用，
+        按时段和阶梯的明细写入charge_items。
+        增量模式只重算待重算日志中登记的租户，费用、明细和日志清除在同一事务内完成
+        :param month: 费用月份
+        :param progress: 进度回调，参数为已写入数和总数
+        :param batch_size: 每个事务写入的记录数
+        :param incremental: 是否只重算登记过的租户
+        :return: 新增、更新、失败和未变化跳过的租户数，键为added、updated、failed、skipped
+        """
+        import numpy as np
+        from models.interval import MeterInterval
+        from models.reading import MeterReading
+        
+        logger.info(f"开始批量计算{month}月份费用")
+        # 智能表没有人工抄表记录时，先由区间数据的月汇总生成抄表记录
+        posted = MeterInterval.post_monthly_readings(month)
+        if posted:
+            logger.info(f"由区间数据生成{month}月份抄表记录 {posted} 条")
+        # 先读取日志再读取数据，计算期间新登记的租户留待下次计算
+        entries = ChargeJournal.get_dirty(month)
+        tenants = Tenant.get_all()
+        skipped = 0
+        if incremental:
+            dirty_tenants = {tenant_id for _, tenant_id in entries}
+            skipped = sum(1 for tenant in tenants if tenant.id not in dirty_tenants)
+            tenants = [tenant for tenant in tenants if tenant.id in dirty_tenants]
+            logger.info(f"增量计算{month}月份费用：登记{len(tenants)}户，跳过{skipped}户")
+        usage_map = MeterReading.get_monthly_usage(month)
+        
+        usage_by_resource = {
+            resource_type: [usage_map.get(tenant.id, {}).get(resource_type, 0) for tenant in tenants]
+            for resource_type in ('水', '电')
+        }
+        billed = cls._bill(month, [tenant.id for tenant in tenants], [tenant.type for tenant in tenants],
+                           usage_by_resource)
+        
+        water_usage, water_price, water_charge, water_items = billed['水']
+        electricity_usage, electricity_price, electricity_charge, electricity_items = billed['电']
+        total_charge = np.round(water_charge + electricity_charge)
+        
+        update_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        rows = [
+            (tenant.id, month, float(water_usage[i]), float(water_price[i]), float(water_charge[i]),
+             float(electricity_usage[i]), float(electricity_price[i]), float(electricity_charge[i]),
+             float(total_charge[i]), STATUS_UNPAID, update_time)
+            for i, tenant in enumerate(tenants)
+        ]
+        
+        db = get_db()
+        # 新增数由写入前后的记录数得出，不需要逐户查询是否已有费用
+        count_sql = "SELECT COUNT(*) FROM charges WHERE month = ?"
+        before = db.fetch_one(count_sql, (month,))[0]
+        
+        result = {'added': 0, 'updated': 0, 'failed': 0, 'skipped': skipped}
+        tenant_ids = [tenant.id for tenant in tenants]
+        items = water_items + electricity_items
+        failed_tenants = set()
+        if incremental:
+            # 增量计算的户数很少，全部写入和日志清除放在一个事务内，失败时日志保留
+            try:
+                with db.transaction() as tx:
+                    tx.execute_many(UPSERT_SQL, rows)
+                    cls._save_items(month, tenant_ids, items, set(), tx)
+                    ChargeJournal.clear([entry_id for entry_id, _ in entries], tx)
+            except sqlite3.Error as e:
+                logger.error(f"增量计算{month}月份费用失败：{str(e)}")
+                failed_tenants.update(tenant_ids)
+            if progress:
+                progress(len(rows), len(rows))
+        else:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                if not db.execute_many(UPSERT_SQL, batch):
+                    failed_tenants.update(row[0] for row in batch)
+                if progress:
+                    progress(min(start + batch_size, len(rows)), len(rows))
+        
+        result['failed'] = len(failed_tenants)
+        result['added'] = db.fetch_one(count_sql, (month,))[0] - before
+        result['updated'] = len(rows) - result['failed'] - result['added']
+        if incremental:
+            logger.info(f"{month}月份费用增量计算完成：新增{result['added']}户，更新{result['updated']}户，"
+                        f"失败{result['failed']}户，跳过{skipped}户")
+            return result
+        
+        cls._save_items(month, tenant_ids, items, failed_tenants)
+        # 全量计算后清除本月登记，写入失败的租户保留
+        try:
+            with db.transaction() as tx:
+                ChargeJournal.clear([entry_id for entry_id, tenant_id in entries if tenant_id not in failed_tenants], tx)
+        except sqlite3.Error as e:
+            logger.error(f"清除{month}月份待重算日志失败：{str(e)}")
+        
+        logger.info(f"{month}月份费用计算完成：新增{result['added']}户，更新{result['updated']}户，失败{result['failed']}户")
+        return result
+    
+    @classmethod
+    def _bill(cls, month: str, tenant_ids: List[int], tenant_types: List[str],
+              usage_by_resource: Dict[str, List[float]]) -> Dict[str, tuple]:
+        """
+        按用量向量批量计费，calculate_month和rebill共用
+        :param month: 费用月份
+        :param tenant_ids: 租户ID列表
+        :param tenant_types: 与tenant_ids对齐的租户类型列表
+        :param usage_by_resource: 资源类型到各户用量列表的字典
+        :return: 资源类型到(用量, 单价, 金额, 明细)的字典，前三项为数组，
+                 明细为(租户序号, 资源类型, 时段, 阶梯, 用量, 单价, 金额)列表
+        """
+        import numpy as np
+        from models.interval import MeterInterval
+        from models.meter import Meter
+        from models.tariff import get_compiled_tariffs
+        
+        tenant_index = {tenant_id: i for i, tenant_id in enumerate(tenant_ids)}
+        tenant_types = np.array(tenant_types, dtype=object)
+        
+        # 各户分时曲线，由其名下同类水电表的月曲线相加
+        profile_blobs = MeterInterval.get_monthly_profiles(month)
+        meter_map = Meter.get_map(profile_blobs.keys()) if profile_blobs else {}
+        
+        billed = {}
+        for resource_type in ('水', '电'):
+            usage = np.maximum(np.asarray(usage_by_resource[resource_type], dtype=np.float64), 0.0)
+            
+            rows, blobs = [], []
+            for meter_id, blob in profile_blobs.items():
+                meter = meter_map.get(meter_id)
+                if meter and meter.meter_type == resource_type and meter.tenant_id in tenant_index:
+                    rows.append(tenant_index[meter.tenant_id])
+                    blobs.append(blob)
+            profiles = None
+            if rows:
+                profiles = np.zeros((len(tenant_ids), 96), dtype=np.float64)
+                np.add.at(profiles, np.array(rows), np.frombuffer(b''.join(blobs), dtype=np.float64).reshape(-1, 96))
+            
+            amount = np.zeros(len(tenant_ids), dtype=np.float64)
+            price = np.zeros(len(tenant_ids), dtype=np.float64)
+            items = []
+            for tenant_type, compiled in get_compiled_tariffs(resource_type, month, set(tenant_types)).items():
+                selected = np.nonzero(tenant_types == tenant_type)[0]
+                item_usage, item_amount = compiled.bill(usage[selected],
+                                                        profiles[selected] if profiles is not None else None)
+                amount[selected] = item_amount.sum(axis=(1, 2))
+                if compiled.tariff_id is None:
+                    price[selected] = compiled.base_price
+                else:
+                    # 分时阶梯计费的单价列保存平均单价
+                    selected_usage = usage[selected]
+                    safe_usage = np.where(selected_usage > 0, selected_usage, 1.0)
+                    price[selected] = np.where(selected_usage > 0, np.round(amount[selected] / safe_usage, 4),
+                                               compiled.base_price)
+                for i, band, tier in zip(*np.nonzero(item_usage > 0)):
+                    items.append((int(selected[i]), resource_type, compiled.band_names[band], int(tier),
+                                  round(float(item_usage[i, band, tier]), 4), float(compiled.prices[band, tier]),
+                                  round(float(item_amount[i, band, tier]), 2)))
+            billed[resource_type] = (usage, price, np.round(amount), items)
+        return billed
+    
+    @classmethod
+    def _save_items(cls, month: str, tenant_ids: List[int], items: List[tuple], skip_tenants: set,
+                    executor: Any = None) -> bool:
+        """
+        替换指定月份费用的明细，只处理tenant_ids中的租户
+        :param month: 费用月份
+        :param tenant_ids: 租户ID列表，明细中的租户序号按此列表解析
+        :param items: (租户序号, 资源类型, 时段, 阶梯, 用量, 单价, 金额)列表
+        :param skip_tenants: 费用写入失败、不更新明细的租户ID
+        :param executor: 外层事务的执行器，为None时单独开启事务；在外层事务中出错时异常直接抛出
+        :return: 是否保存成功
+        """
+        db = get_db()
+        wanted = set(tenant_ids)
+        charge_ids: Dict[int, int] = {}
+        for charge_id, tenant_id in (executor or db).fetch_all(
+                "SELECT id, tenant_id FROM charges WHERE month = ? ORDER BY tenant_id, id", (month,)):
+            if tenant_id in wanted:
+                charge_ids.setdefault(tenant_id, charge_id)
+        
+        rows = []
+        for tenant_no, resource_type, band, tier, usage, price, amount in items:
+            tenant_id = tenant_ids[tenant_no]
+            if tenant_id in skip_tenants or tenant_id not in charge_ids:
+                continue
+            rows.append((charge_ids[tenant_id], resource_type, band, tier, usage, price, amount))
+        
+        kept = [charge_id for tenant_id, charge_id in charge_ids.items() if tenant_id not in skip_tenants]
+        
+        def replace(tx):
+            for start in range(0, len(kept), 500):
+                chunk = kept[start:start + 500]
+                tx.execute(f"DELETE FROM charge_items WHERE charge_id IN ({', '.join('?' for _ in chunk)})",
+                           tuple(chunk))
+            tx.execute_many("""
+            INSERT INTO charge_items (charge_id, resource_type, band, tier, usage, price, amount)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        
+        if executor is not None:
+            replace(executor)
+            return True
+        try:
+            with db.transaction() as tx:
+                replace(tx)
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"保存{month}月份费用明细失败：{str(e)}")
+            return False
+    
+    @staticmethod
+    def status_for_paid(total_charge: float, paid: float) -> str:
+        """
+        根据应收和已收金额确定费用状态，规则与数据库中维护状态的触发器一致，没有收款时总是未缴
+        :param total_charge: 总费用
+        :param paid: 已收金额
+        :return: 状态代码（未缴/已缴/部分缴纳）
+        """
+        if paid > 0 and round(total_charge - paid, 2) <= 0:
+            return STATUS_PAID
+        if paid > 0:
+            return STATUS_PARTIAL
+        return STATUS_UNPAID
+    
+    @staticmethod
+    def status_text(status: str, get_text: Optional[Callable[[str], str]] = None) -> str:
+        """
+        获取状态代码的显示文本
+        :param status: 状态代码
+        :param get_text: 获取翻译文本的函数，为None时返回状态代码本身
+        :return: 显示文本
+        """
+        if get_text is None:
+            return status
+        return get_text(STATUS_TEXT_KEYS.get(status, status))
+    
+    @classmethod
+    def repair_status(cls) -> int:
+        """
+        按已收金额修复所有状态不正确的费用，用于旧版本写入了翻译文本或状态与收费记录不一致的数据库
+        :return: 修复的费用数
+        """
+        from database.init_db import repair_charge_status
+        
+        return repair_charge_status(get_db())
+    
+    @classmethod
+    def rebill(cls, start_month: str, end_month: str, scopes: Optional[List[tuple]] = None,
+               progress: Optional[Callable[[str, int, int], None]] = None) -> Dict[str, Any]:
+        """
+        价格更正后重新计算一段月份内受影响的已有费用
+        受影响的费用、租户类型和已收金额用一次查询取出，按费用中已记录的用量以各月生效的价格重新计费；
+        收费记录保持不变，状态按已收金额重新确定；每个月的费用和明细在一个事务内写入，失败的月份整体回滚
+        :param start_month: 开始月份YYYY-MM（包含）
+        :param end_month: 结束月份YYYY-MM（包含）
+        :param scopes: 受影响的(资源类型, 租户类型)列表，租户类型为“全部”或None表示所有类型，为None时重新计算全部费用
+        :param progress: 进度回调，参数为月份、已完成月数和总月数
+        :return: 结果字典，键months、charges、changed为处理的月数、费用数和金额或状态有变化的费用数，
+                 failed_months为写入失败的月份列表，diffs为有变化的费用列表
+        """
+        import numpy as np
+        
+        sql = """
+        SELECT c.id, c.tenant_id, t.name, t.type, c.month, c.water_usage, c.electricity_usage,
+               c.water_charge, c.electricity_charge, c.total_charge, c.status, COALESCE(p.paid, 0)
+        FROM charges c
+        JOIN tenants t ON c.tenant_id = t.id
+        LEFT JOIN (SELECT charge_id, SUM(amount) AS paid FROM payments GROUP BY charge_id) p ON p.charge_id = c.id
+        WHERE c.month BETWEEN ? AND ?
+        """
+        params: List[Any] = [start_month, end_month]
+        if scopes is not None:
+            clauses = []
+            for resource_type, tenant_type in scopes:
+                usage_column = 'c.water_usage' if resource_type == '水' else 'c.electricity_usage'
+                if tenant_type and tenant_type != '全部':
+                    clauses.append(f"({usage_column} > 0 AND t.type = ?)")
+                    params.append(tenant_type)
+                else:
+                    clauses.append(f"{usage_column} > 0")
+            if not clauses:
+                return {'months': 0, 'charges': 0, 'changed': 0, 'failed_months': [], 'diffs': []}
+            sql += f" AND ({' OR '.join(clauses)})"
+        sql += " ORDER BY c.month, c.id"
+        
+        db = get_db()
+        by_month: Dict[str, List[tuple]] = {}
+        for row in db.fetch_all(sql, tuple(params)):
+            by_month.setdefault(row[4], []).append(row)
+        
+        update_sql = """
+        UPDATE charges SET water_price = ?, water_charge = ?, electricity_price = ?, electricity_charge = ?,
+                           total_charge = ?, status = ?, update_time = ?
+        WHERE id = ?
+        """
+        item_sql = """
+        INSERT INTO charge_items (charge_id, resource_type, band, tier, usage, price, amount)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """
+        
+        result: Dict[str, Any] = {'months': 0, 'charges': 0, 'changed': 0, 'failed_months': [], 'diffs': []}
+        update_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for done, (month, rows) in enumerate(sorted(by_month.items()), 1):
+            billed = cls._bill(month, [row[1] for row in rows], [row[3] for row in rows], {
+                '水': [row[5] for row in rows],
+                '电': [row[6] for row in rows],
+            })
+            _, water_price, water_charge, water_items = billed['水']
+            _, electricity_price, electricity_charge, electricity_items = billed['电']
+            total_charge = np.round(water_charge + electricity_charge)
+            
+            updates = []
+            diffs = []
+            for i, row in enumerate(rows):
+                charge_id, tenant_id, tenant_name, _, _, _, _, _, _, old_total, old_status, paid = row
+                new_total = float(total_charge[i])
+                new_status = cls.status_for_paid(new_total, paid)
+                updates.append((float(water_price[i]), float(water_charge[i]), float(electricity_price[i]),
+                                float(electricity_charge[i]), new_total, new_status, update_time, charge_id))
+                if new_total != old_total or new_status != old_status:
+                    diffs.append({
+                        'charge_id': charge_id,
+                        'tenant_id': tenant_id,
+                        'tenant_name': tenant_name,
+                        'month': month,
+                        'old_total': old_total,
+                        'new_total': new_total,
+                        'difference': round(new_total - old_total, 2),
+                        'paid': paid,
+                        'old_status': old_status,
+                        'new_status': new_status,
+                    })
+            # 明细中的序号换成费用ID
+            items = [(rows[item[0]][0],) + item[1:] for item in water_items + electricity_items]
+            charge_ids = [row[0] for row in rows]
+            
+            try:
+                with db.transaction() as tx:
+                    tx.execute_many(update_sql, updates)
+                    for start in range(0, len(charge_ids), 500):
+                        chunk = charge_ids[start:start + 500]
+                        tx.execute(f"DELETE FROM charge_items WHERE charge_id IN ({', '.join('?' for _ in chunk)})",
+                                   tuple(chunk))
+                    tx.execute_many(item_sql, items)
+                result['months'] += 1
+                result['charges'] += len(rows)
+                result['changed'] += len(diffs)
+                result['diffs'].extend(diffs)
+            except sqlite3.Error as e:
+                logger.error(f"重新计算{month}月份费用失败：{str(e)}")
+                result['failed_months'].append(month)
+            if progress:
+                progress(month, done, len(by_month))
+        
+        logger.info(f"{start_month}至{end_month}费用重新计算完成：{result['charges']}条费用，"
+                    f"{result['changed']}条有变化，失败月份{result['failed_months']}")
+        return result
+    
+    def get_items(self) -> List[Dict[str, Any]]:
+        """
+        获取费用按时段和阶梯拆分的明细
+        :return: 明细列表，每项包含resource_type、band、tier、usage、price、amount
+        """
+        if not self.id:
+            return []
+        db = get_db()
+        sql = """
+        SELECT resource_type, band, tier, usage, price, amount FROM charge_items
+        WHERE charge_id = ? ORDER BY resource_type, band, tier
+        """
+        keys = ('resource_type', 'band', 'tier', 'usage', 'price', 'amount')
+        return [dict(zip(keys, row)) for row in db.fetch_all(sql, (self.id,))]
+    
     @classmethod
     def get_all(cls) -> List['Charge']:
         """
@@ -308,9 +852,10 @@ class Charge:
         charges: List['Charge'] = []
         for result in results:
             charge = cls(*result)
-            charge.load_tenant_info()
             charges.append(charge)
         
+        # 批量关联租户信息，避免逐条查询
+        cls.attach_tenants(charges)
         return charges
     
     @classmethod
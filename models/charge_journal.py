@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+待重算费用日志
+抄表记录、水电表归属或价格变化时登记受影响的(租户, 月份)，
+增量计算费用时只重算登记过的租户，计算完成后在同一事务内清除
+"""
+
+from database.db_manager import get_db
+
+# 同一租户月份再次登记时替换为新id，清除时只删除读取到的id，计算期间的新登记不会丢失
+MARK_SQL = "INSERT OR REPLACE INTO charge_dirty (tenant_id, month) VALUES (?, ?)"
+MARK_METER_MONTH_SQL = """
+INSERT OR REPLACE INTO charge_dirty (tenant_id, month)
+SELECT tenant_id, ? FROM meters WHERE id = ? AND tenant_id IS NOT NULL
+"""
+
+class ChargeJournal:
+    """待重算费用日志类，只提供类方法"""
+
+    @classmethod
+    def mark(cls, pairs, executor=None):
+        """
+        登记需要重算的租户和月份
+        :param pairs: (租户ID, 月份YYYY-MM)的可迭代对象
+        :param executor: 事务执行器，为None时单独提交
+        """
+        (executor or get_db()).execute_many(MARK_SQL, list(set(pairs)))
+
+    @classmethod
+    def mark_meter_months(cls, pairs, executor=None):
+        """
+        按水电表登记，租户取水电表当前的归属
+        :param pairs: (表ID, 月份YYYY-MM)的可迭代对象
+        :param executor: 事务执行器，为None时单独提交
+        """
+        (executor or get_db()).execute_many(MARK_METER_MONTH_SQL,
+                                            [(month, meter_id) for meter_id, month in set(pairs)])
+
+    @classmethod
+    def mark_reading(cls, reading_id):
+        """
+        登记一条抄表记录所在月份和所属租户
+        修改抄表记录时在修改前后各调用一次，月份或水电表变化时两边都会重算
+        :param reading_id: 抄表记录ID
+        """
+        get_db().execute("""
+        INSERT OR REPLACE INTO charge_dirty (tenant_id, month)
+        SELECT m.tenant_id, substr(r.reading_date, 1, 7) FROM meter_readings r
+        JOIN meters m ON r.meter_id = m.id
+        WHERE r.id = ? AND m.tenant_id IS NOT NULL
+        """, (reading_id,))
+
+    @classmethod
+    def mark_readings(cls, reading_ids, executor):
+        """
+        登记多条抄表记录所在月份和所属租户，效果等同于逐条调用mark_reading
+        :param reading_ids: 抄表记录ID列表
+        :param executor: 事务执行器
+        """
+        reading_ids = list(reading_ids)
+        for start in range(0, len(reading_ids), 500):
+            chunk = reading_ids[start:start + 500]
+            executor.execute(f"""
+            INSERT OR REPLACE INTO charge_dirty (tenant_id, month)
+            SELECT DISTINCT m.tenant_id, substr(r.reading_date, 1, 7) FROM meter_readings r
+            JOIN meters m ON r.meter_id = m.id
+            WHERE r.id IN ({', '.join('?' for _ in chunk)}) AND m.tenant_id IS NOT NULL
+            """, tuple(chunk))
+    
+    @classmethod
+    def mark_meter_history(cls, meter_id, tenant_ids):
+        """
+        水电表改变归属后，登记该表有抄表记录的所有月份，原租户和新租户都需要重算
+        :param meter_id: 表ID
+        :param tenant_ids: 租户ID列表
+        """
+        get_db().execute_many("""
+        INSERT OR REPLACE INTO charge_dirty (tenant_id, month)
+        SELECT DISTINCT ?, substr(reading_date, 1, 7) FROM meter_readings WHERE meter_id = ?
+        """, [(tenant_id, meter_id) for tenant_id in set(tenant_ids) if tenant_id])
+
+    @classmethod
+    def mark_price(cls, resource_type, tenant_type, start_date, end_date=None):
+        """
+        价格变化后登记生效期间内已有费用的租户和月份，价格适用的租户类型为“全部”时登记所有类型
+        :param resource_type: 资源类型（水/电），只登记该资源有用量的费用
+        :param tenant_type: 租户类型
+        :param start_date: 生效开始日期
+        :param end_date: 生效结束日期，为空表示长期有效
+        """
+        if not start_date:
+            return
+        usage_column = 'c.water_usage' if resource_type == '水' else 'c.electricity_usage'
+        sql = f"""
+        INSERT OR REPLACE INTO charge_dirty (tenant_id, month)
+        SELECT c.tenant_id, c.month FROM charges c
+        JOIN tenants t ON c.tenant_id = t.id
+        WHERE c.month >= ? AND {usage_column} > 0
+        """
+        params = [str(start_date)[:7]]
+        if end_date:
+            sql += " AND c.month <= ?"
+            params.append(str(end_date)[:7])
+        if tenant_type and tenant_type != '全部':
+            sql += " AND t.type = ?"
+            params.append(tenant_type)
+        get_db().execute(sql, tuple(params))
+
+    @classmethod
+    def get_dirty(cls, month):
+        """
+        获取指定月份登记的租户
+        :param month: 月份YYYY-MM
+        :return: (日志ID, 租户ID)列表
+        """
+        return get_db().fetch_all("SELECT id, tenant_id FROM charge_dirty WHERE month = ?", (month,))
+
+    @classmethod
+    def clear(cls, entry_ids, executor):
+        """
+        清除已处理的登记
+        :param entry_ids: 日志ID列表
+        :param executor: 事务执行器
+        """
+        entry_ids = list(entry_ids)
+        for start in range(0, len(entry_ids), 500):
+            chunk = entry_ids[start:start + 500]
+            executor.execute(f"DELETE FROM charge_dirty WHERE id IN ({', '.join('?' for _ in chunk)})", tuple(chunk))
+
+    @classmethod
+    def count(cls, month=None):
+        """
+        获取登记数
+        :param month: 月份YYYY-MM，为None时统计全部
+        :return: 登记数
+        """
+        db = get_db()
+        if month:
+            result = db.fetch_one("SELECT COUNT(*) FROM charge_dirty WHERE month = ?", (month,))
+        else:
+            result = db.fetch_one("SELECT COUNT(*) FROM charge_dirty")
+        return result[0] if result else 0
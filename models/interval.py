@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+区间用量模型
+负责智能表15分钟或1小时区间用量的批量写入、按日按月汇总和范围查询，
+月汇总可生成当月抄表记录，供费用计算使用
+"""
+
+import sqlite3
+from array import array
+from datetime import datetime, timedelta
+
+from database.db_manager import get_db
+from models.meter import Meter
+from models.price import month_end
+from models.reading import MeterReading
+
+# 时间戳起点，ts为本地时间按UTC换算的秒数，换算和按日分组都不受时区影响
+EPOCH = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+# 分时曲线按15分钟划分时段，每天96个时段；按小时采集的数据落在整点所在时段
+SLOT_SECONDS = 900
+SLOTS_PER_DAY = SECONDS_PER_DAY // SLOT_SECONDS
+
+class MeterInterval:
+    """区间用量类，只提供类方法，数据以数组形式读写"""
+
+    @staticmethod
+    def to_timestamp(value):
+        """
+        将时间转换为存储用的秒数
+        :param value: 秒数、datetime或"YYYY-MM-DD HH:MM[:SS]"格式的字符串
+        :return: 秒数
+        """
+        if isinstance(value, datetime):
+            return int((value - EPOCH).total_seconds())
+        if isinstance(value, str):
+            return int((datetime.fromisoformat(value.strip()) - EPOCH).total_seconds())
+        return int(value)
+
+    @staticmethod
+    def day_of(ts):
+        """
+        获取时间戳所在的日期
+        :param ts: 秒数
+        :return: 日期字符串YYYY-MM-DD
+        """
+        return (EPOCH + timedelta(seconds=ts - ts % SECONDS_PER_DAY)).strftime("%Y-%m-%d")
+
+    @classmethod
+    def append_many(cls, rows, chunk_size=50000):
+        """
+        批量写入区间用量，同一表同一时间的数据覆盖旧值
+        写入和受影响日期、月份的汇总在一个事务内完成
+        :param rows: (表ID, 时间, 用量)的可迭代对象，时间格式同to_timestamp
+        :param chunk_size: 每次executemany的行数
+        :return: 是否写入成功，失败时全部回滚
+        """
+        insert_sql = "INSERT OR REPLACE INTO meter_intervals (meter_id, ts, value) VALUES (?, ?, ?)"
+
+        db = get_db()
+        days = set()
+        try:
+            with db.transaction() as tx:
+                chunk = []
+                for meter_id, ts, value in rows:
+                    ts = cls.to_timestamp(ts)
+                    chunk.append((int(meter_id), ts, float(value)))
+                    days.add((int(meter_id), ts - ts % SECONDS_PER_DAY))
+                    if len(chunk) >= chunk_size:
+                        tx.execute_many(insert_sql, chunk)
+                        chunk = []
+                tx.execute_many(insert_sql, chunk)
+                cls._refresh_rollups(tx, days)
+            return True
+        except (ValueError, TypeError) as e:
+            print(f"区间用量数据格式错误: {e}")
+            return False
+        except sqlite3.Error as e:
+            print(f"写入区间用量失败: {e}")
+            return False
+
+    @classmethod
+    def _refresh_rollups(cls, tx, days):
+        """
+        重算受影响日期的日汇总和所在月份的月汇总
+        每组表用两条INSERT ... SELECT ... GROUP BY语句完成：日汇总按(表, 日期)从区间数据分组重算，
+        月汇总按(表, 月份)从日汇总分组重算；分时曲线由注册到连接上的聚合函数累加
+        :param tx: 事务执行器
+        :param days: (表ID, 当天0点秒数)集合
+        """
+        if not days:
+            return
+        conn = tx.db.conn
+        conn.create_aggregate("interval_profile", 2, _IntervalProfile)
+        conn.create_aggregate("sum_profiles", 1, _SumProfiles)
+
+        # 受影响的时间范围：从最早一天的0点到最晚一天的24点，范围内未变化的日期重算结果不变
+        first_day = min(day_start for _, day_start in days)
+        last_day = max(day_start for _, day_start in days)
+        first_month, last_month = cls.day_of(first_day)[:7], cls.day_of(last_day)[:7]
+        meter_ids = sorted({meter_id for meter_id, _ in days})
+        for start in range(0, len(meter_ids), 500):
+            chunk = meter_ids[start:start + 500]
+            placeholders = ', '.join('?' for _ in chunk)
+            tx.execute(f"""
+            INSERT OR REPLACE INTO meter_interval_daily (meter_id, day, usage, points, last_ts, profile)
+            SELECT meter_id, date(ts - ts % {SECONDS_PER_DAY}, 'unixepoch'), SUM(value), COUNT(*), MAX(ts),
+                   interval_profile(ts, value)
+            FROM meter_intervals
+            WHERE meter_id IN ({placeholders}) AND ts >= ? AND ts < ?
+            GROUP BY meter_id, ts / {SECONDS_PER_DAY}
+            """, (*chunk, first_day, last_day + SECONDS_PER_DAY))
+            # 旧版本写入的日汇总没有分时曲线，月曲线中不包含这些日期
+            tx.execute(f"""
+            INSERT OR REPLACE INTO meter_interval_monthly (meter_id, month, usage, points, profile)
+            SELECT meter_id, substr(day, 1, 7), TOTAL(usage), SUM(points), sum_profiles(profile)
+            FROM meter_interval_daily
+            WHERE meter_id IN ({placeholders}) AND day BETWEEN ? AND ?
+            GROUP BY meter_id, substr(day, 1, 7)
+            """, (*chunk, f"{first_month}-01", f"{last_month}-31"))
+
+    @staticmethod
+    def unpack_profile(blob):
+        """
+        解析分时曲线
+        :param blob: 数据库中保存的分时曲线
+        :return: 各时段用量数组，没有数据时返回None
+        """
+        if not blob:
+            return None
+        profile = array('d')
+        profile.frombytes(blob)
+        return profile
+
+    @classmethod
+    def append_series(cls, meter_id, start, values, interval_minutes=15):
+        """
+        写入一块表从start开始的等间隔用量序列
+        :param meter_id: 表ID
+        :param start: 第一个区间的时间
+        :param values: 各区间用量，可为列表或NumPy数组
+        :param interval_minutes: 区间长度（分钟）
+        :return: 是否写入成功
+        """
+        start_ts = cls.to_timestamp(start)
+        step = interval_minutes * 60
+        return cls.append_many((meter_id, start_ts + i * step, value) for i, value in enumerate(values))
+
+    @classmethod
+    def get_range(cls, meter_id, start, end):
+        """
+        查询一块表在时间范围内的区间用量，用于绘制曲线
+        :param meter_id: 表ID
+        :param start: 开始时间（包含）
+        :param end: 结束时间（不包含）
+        :return: (时间数组datetime64[s], 用量数组float64)
+        """
+        import numpy as np
+
+        db = get_db()
+        sql = "SELECT ts, value FROM meter_intervals WHERE meter_id = ? AND ts >= ? AND ts < ? ORDER BY ts"
+        rows = db.fetch_all(sql, (meter_id, cls.to_timestamp(start), cls.to_timestamp(end)))
+        timestamps = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        values = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+        return timestamps.astype("datetime64[s]"), values
+
+    @classmethod
+    def get_daily(cls, meter_id, start_day, end_day):
+        """
+        查询一块表在日期范围内的每日用量
+        :param meter_id: 表ID
+        :param start_day: 开始日期YYYY-MM-DD（包含）
+        :param end_day: 结束日期YYYY-MM-DD（包含）
+        :return: (日期数组datetime64[D], 用量数组float64)
+        """
+        import numpy as np
+
+        db = get_db()
+        sql = """
+        SELECT day, usage FROM meter_interval_daily
+        WHERE meter_id = ? AND day BETWEEN ? AND ? ORDER BY day
+        """
+        rows = db.fetch_all(sql, (meter_id, start_day, end_day))
+        days = np.array([row[0] for row in rows], dtype="datetime64[D]")
+        usages = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+        return days, usages
+
+    @classmethod
+    def get_monthly_usage(cls, month):
+        """
+        获取指定月份各表的区间用量合计
+        :param month: 月份（如2023-05）
+        :return: 表ID到用量的字典
+        """
+        db = get_db()
+        sql = "SELECT meter_id, usage FROM meter_interval_monthly WHERE month = ?"
+        return {meter_id: usage for meter_id, usage in db.fetch_all(sql, (month,))}
+
+    @classmethod
+    def get_monthly_profiles(cls, month):
+        """
+        获取指定月份各表的分时曲线，用于分时电价计费
+        曲线为按本机字节序保存的96个float64，第i个值为当月每天第i个15分钟时段的用量合计
+        :param month: 月份（如2023-05）
+        :return: 表ID到曲线原始字节的字典，没有曲线的表不在其中
+        """
+        db = get_db()
+        sql = "SELECT meter_id, profile FROM meter_interval_monthly WHERE month = ? AND profile IS NOT NULL"
+        return {meter_id: profile for meter_id, profile in db.fetch_all(sql, (month,))}
+
+    @classmethod
+    def post_monthly_readings(cls, month, reader="自动抄表"):
+        """
+        按月汇总为有区间数据的表生成当月抄表记录，抄表日期为当月最后一天
+        上次读数取最近一次抄表记录，当前读数为上次读数加当月用量；
+        当月已有抄表记录的表不处理，未结束的月份不生成，避免不完整的用量被计费
+        :param month: 月份（如2023-05）
+        :param reader: 抄表人
+        :return: 生成的抄表记录数
+        """
+        if month >= datetime.now().strftime("%Y-%m"):
+            return 0
+        usage_map = cls.get_monthly_usage(month)
+        if not usage_map:
+            return 0
+
+        existing = MeterReading.get_existing_months(usage_map.keys(), [month])
+        meter_ids = [meter_id for meter_id in usage_map if (meter_id, month) not in existing]
+        if not meter_ids:
+            return 0
+        last_readings = MeterReading.get_last_readings(meter_ids)
+        meter_map = Meter.get_map(meter_ids)
+
+        reading_date = month_end(month)
+        readings = []
+        for meter_id in meter_ids:
+            meter = meter_map.get(meter_id)
+            if meter is None:
+                continue
+            last_date, previous_reading = last_readings.get(meter_id, (None, meter.initial_reading))
+            # 之后的月份已有抄表记录时不再补录
+            if last_date and last_date > reading_date:
+                continue
+            usage = round(usage_map[meter_id], 2)
+            readings.append(MeterReading(
+                meter_id=meter_id,
+                reading_date=reading_date,
+                current_reading=round(previous_reading + usage, 2),
+                previous_reading=previous_reading,
+                usage=usage,
+                reader=reader,
+                remark="区间数据汇总"
+            ))
+
+        if not MeterReading.insert_many(readings):
+            return 0
+        return len(readings)
+
+class _IntervalProfile:
+    """SQLite聚合函数interval_profile(ts, value)：把一天内的区间用量累加为96个时段的分时曲线"""
+
+    def __init__(self):
+        self.profile = array('d', bytes(8 * SLOTS_PER_DAY))
+
+    def step(self, ts, value):
+        self.profile[ts % SECONDS_PER_DAY // SLOT_SECONDS] += value
+
+    def finalize(self):
+        return self.profile.tobytes()
+
+class _SumProfiles:
+    """SQLite聚合函数sum_profiles(profile)：累加日分时曲线，没有曲线的行跳过"""
+
+    def __init__(self):
+        self.profile = array('d', bytes(8 * SLOTS_PER_DAY))
+
+    def step(self, blob):
+        daily = MeterInterval.unpack_profile(blob)
+        if daily:
+            for slot in range(SLOTS_PER_DAY):
+                self.profile[slot] += daily[slot]
+
+    def finalize(self):
+        return self.profile.tobytes()
@@ -6,6 +6,7 @@
 """
 
 from database.db_manager import get_db
+from models.charge_journal import ChargeJournal
 
 class Meter:
     """水电表类"""
@@ -45,6 +46,8 @@ class Meter:
         self.initial_reading = round(self.initial_reading, 2)
         
         if self.id:
+            # 归属租户或类型变化时，该表历史月份的费用都需要重算
+            previous = db.fetch_one("SELECT tenant_id, meter_type FROM meters WHERE id = ?", (self.id,))
             # 更新现有表
             data = {
                 'meter_no': self.meter_no,
@@ -55,6 +58,8 @@ class Meter:
                 'status': self.status
             }
             result = db.update('meters', data, f'id = {self.id}')
+            if result and previous and (previous[0] != self.tenant_id or previous[1] != self.meter_type):
+                ChargeJournal.mark_meter_history(self.id, [previous[0], self.tenant_id])
         else:
             # 插入新表
             data = {
@@ -109,6 +114,28 @@ class Meter:
             return cls(*result)
         return None
     
+    @classmethod
+    def get_map(cls, meter_ids=None):
+        """
+        批量获取水电表，用于列表数据关联表信息，避免逐条查询
+        :param meter_ids: 表ID集合，为None或数量较多时读取全部水电表
+        :return: 表ID到水电表对象的字典
+        """
+        db = get_db()
+        sql = "SELECT * FROM meters"
+        params = ()
+        if meter_ids is not None:
+            meter_ids = list(set(meter_ids))
+            if not meter_ids:
+                return {}
+            # SQLite参数个数有限制，ID较多时直接读取全表
+            if len(meter_ids) <= 500:
+                sql += f" WHERE id IN ({', '.join('?' for _ in meter_ids)})"
+                params = tuple(meter_ids)
+        results = db.fetch_all(sql, params)
+        
+        return {result[0]: cls(*result) for result in results}
+    
     @classmethod
     def get_by_tenant(cls, tenant_id):
         """
@@ -130,29 +157,50 @@ class Meter:
         :return: 水电表列表
         """
         db = get_db()
-        sql = "SELECT * FROM meters"
-        params = []
-        
-        if filters:
-            where_clauses = []
-            if 'meter_type' in filters and filters['meter_type']:
-                where_clauses.append("meter_type = ?")
-                params.append(filters['meter_type'])
-            if 'status' in filters and filters['status']:
-                where_clauses.append("status = ?")
-                params.append(filters['status'])
-            if 'tenant_id' in filters and filters['tenant_id']:
-                where_clauses.append("tenant_id = ?")
-                params.append(filters['tenant_id'])
-            
-            if where_clauses:
-                sql += " WHERE " + " AND ".join(where_clauses)
-        
-        sql += " ORDER BY meter_type, meter_no"
-        results = db.fetch_all(sql, tuple(params))
+        where, params = cls._filter_clause(filters)
+        sql = "SELECT * FROM meters" + where + " ORDER BY meter_type, meter_no"
+        results = db.fetch_all(sql, params)
         
         return [cls(*result) for result in results]
     
+    @classmethod
+    def _filter_clause(cls, filters, prefix=""):
+        """
+        生成水电表过滤条件
+        :param filters: 过滤条件，支持meter_type、status、tenant_id和meter_no（包含匹配）
+        :param prefix: 列名前缀，如连接查询时的表别名"m."
+        :return: WHERE子句（无条件时为空字符串）和参数元组
+        """
+        where_clauses = []
+        params = []
+        if filters:
+            for key in ('meter_type', 'status', 'tenant_id'):
+                if key in filters and filters[key]:
+                    where_clauses.append(f"{prefix}{key} = ?")
+                    params.append(filters[key])
+            if 'meter_no' in filters and filters['meter_no']:
+                where_clauses.append(f"instr({prefix}meter_no, ?) > 0")
+                params.append(filters['meter_no'])
+        where = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        return where, tuple(params)
+    
+    @classmethod
+    def iter_export_rows(cls, filters=None):
+        """
+        逐行读取导出用的水电表信息，租户名称在查询中关联，不创建水电表对象
+        :param filters: 过滤条件，与get_all相同，另支持meter_no
+        :return: 行迭代器，每行为(ID, 表编号, 类型, 租户名称, 位置, 初始读数, 状态, 创建时间)
+        """
+        where, params = cls._filter_clause(filters, "m.")
+        sql = f"""
+        SELECT m.id, m.meter_no, m.meter_type, COALESCE(t.name, '未知租户'), m.location,
+               m.initial_reading, m.status, COALESCE(m.create_time, '')
+        FROM meters m
+        LEFT JOIN tenants t ON m.tenant_id = t.id{where}
+        ORDER BY m.meter_type, m.meter_no
+        """
+        return get_db().iter_rows(sql, params)
+    
     @classmethod
     def get_last_reading(cls, meter_id):
         """
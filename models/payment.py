@@ -5,8 +5,10 @@
 负责处理收费信息的录入、查询和管理
 """
 
+import sqlite3
+
 from database.db_manager import get_db
-from models.charge import Charge
+from models.charge import Charge, STATUS_PAID
 
 class Payment:
     """收费记录类"""
@@ -36,7 +38,7 @@ class Payment:
     def save(self):
         """
         保存收费记录
-        如果是新记录则插入，否则更新
+        如果是新记录则插入，否则更新；关联费用的状态由数据库触发器在同一事务内更新
         :return: 是否保存成功
         """
         db = get_db()
@@ -72,7 +74,7 @@ class Payment:
     
     def delete(self):
         """
-        删除收费记录
+        删除收费记录，关联费用的状态由数据库触发器在同一事务内更新
         :return: 是否删除成功
         """
         if not self.id:
@@ -81,6 +83,186 @@ class Payment:
         db = get_db()
         return db.delete('payments', f'id = {self.id}')
     
+    @classmethod
+    def post_batch(cls, payments):
+        """
+        批量登记收费记录
+        所有费用的剩余应收金额用一次查询取出逐条校验，通过校验的收费记录用executemany批量插入并一次提交，
+        查询和插入在同一个BEGIN IMMEDIATE事务中，其他连接不能在校验之后写入同一费用的收费记录；
+        费用状态由数据库触发器在同一事务内更新；写入失败时整批回滚
+        :param payments: 未保存的收费记录列表，金额超过剩余应收金额、金额不为正或费用不存在的记录不写入
+        :return: 与payments顺序一致的结果列表，每项包含charge_id、amount、success、payment_id、message；
+                 写入成功的收费记录同时设置id
+        """
+        results = []
+        for payment in payments:
+            payment.amount = round(payment.amount, 2)
+            results.append({'charge_id': payment.charge_id, 'amount': payment.amount,
+                            'success': False, 'payment_id': None, 'message': ''})
+        if not payments:
+            return results
+        
+        db = get_db()
+        charge_ids = sorted({payment.charge_id for payment in payments if payment.charge_id})
+        try:
+            with db.transaction(immediate=True) as tx:
+                # 剩余应收金额，同一费用在本批中有多笔时依次扣减
+                due = {}
+                for start in range(0, len(charge_ids), 500):
+                    chunk = charge_ids[start:start + 500]
+                    rows = tx.fetch_all(f"""
+                    SELECT c.id, c.total_charge - COALESCE((SELECT SUM(amount) FROM payments WHERE charge_id = c.id), 0)
+                    FROM charges c WHERE c.id IN ({', '.join('?' for _ in chunk)})
+                    """, tuple(chunk))
+                    due.update((charge_id, round(amount, 2)) for charge_id, amount in rows)
+                
+                accepted = []
+                for payment, result in zip(payments, results):
+                    remaining = due.get(payment.charge_id)
+                    if remaining is None:
+                        result['message'] = '费用记录不存在'
+                    elif payment.amount <= 0:
+                        result['message'] = '收费金额必须大于0'
+                    elif payment.amount > remaining:
+                        result['message'] = f'收费金额超过应收金额{remaining:.2f}'
+                    else:
+                        due[payment.charge_id] = round(remaining - payment.amount, 2)
+                        accepted.append((payment, result))
+                
+                # 事务持有写锁，本批插入的记录ID都大于插入前的最大ID，按插入顺序一次取回
+                last_id = tx.fetch_all("SELECT COALESCE(MAX(id), 0) FROM payments")[0][0]
+                tx.execute_many("""
+                INSERT INTO payments (charge_id, payment_date, amount, payment_method, payer, notes)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """, [(payment.charge_id, payment.payment_date, payment.amount, payment.payment_method,
+                       payment.payer, payment.notes) for payment, _ in accepted])
+                new_ids = [row[0] for row in tx.fetch_all("SELECT id FROM payments WHERE id > ? ORDER BY id",
+                                                          (last_id,))]
+                for (payment, result), payment_id in zip(accepted, new_ids):
+                    payment.id = payment_id
+                    result['payment_id'] = payment_id
+                    result['success'] = True
+        except sqlite3.Error as e:
+            print(f"批量收费失败: {e}")
+            for payment, result in zip(payments, results):
+                payment.id = None
+                result['success'] = False
+                result['payment_id'] = None
+                result['message'] = result['message'] or f'写入失败: {e}'
+        return results
+    
+    @classmethod
+    def allocate(cls, tenant_id, amount, payment_date, payment_method='现金', payer='', notes='', dry_run=False):
+        """
+        把租户一次交来的款项按月份从早到晚分摊到未结清的费用上，效果等同于只有一笔款项的allocate_many
+        :param tenant_id: 租户ID
+        :param amount: 款项金额
+        :param payment_date: 收费日期
+        :param payment_method: 支付方式
+        :param payer: 收费人
+        :param notes: 备注
+        :param dry_run: 为True时只计算分摊结果，不写入
+        :return: 分摊结果，格式见allocate_many
+        """
+        return cls.allocate_many([{
+            'tenant_id': tenant_id, 'amount': amount, 'payment_date': payment_date,
+            'payment_method': payment_method, 'payer': payer, 'notes': notes,
+        }], dry_run)[0]
+    
+    @classmethod
+    def allocate_many(cls, lump_sums, dry_run=False):
+        """
+        按先到期先还的顺序分摊多笔款项
+        涉及租户的全部未结清费用及剩余应收金额用一次查询按月份取出，在内存中依次分摊，
+        生成的收费记录在一个事务内批量插入，费用状态由数据库触发器在同一事务内更新；写入失败时整批回滚
+        查询和插入在同一个BEGIN IMMEDIATE事务中，分摊依据的剩余应收金额不会在写入前被其他连接改变
+        同一租户有多笔款项时按传入顺序分摊，前一笔款项结清的费用不再分给后一笔
+        :param lump_sums: 款项列表，每项为包含tenant_id、amount、payment_date的字典，
+                          可选payment_method（默认现金）、payer、notes
+        :param dry_run: 为True时只计算分摊结果，不写入
+        :return: 与lump_sums顺序一致的结果列表，每项包含tenant_id、amount、allocated（已分摊金额）、
+                 unallocated（没有可分摊费用的余额）、allocations（[{charge_id, month, amount}]）、success、message
+        """
+        results = []
+        for lump_sum in lump_sums:
+            results.append({
+                'tenant_id': lump_sum.get('tenant_id'),
+                'amount': round(lump_sum.get('amount') or 0, 2),
+                'allocated': 0.0,
+                'unallocated': 0.0,
+                'allocations': [],
+                'success': False,
+                'message': '',
+            })
+        
+        tenant_ids = sorted({result['tenant_id'] for result in results if result['tenant_id']})
+        if not tenant_ids:
+            for result in results:
+                result['message'] = '租户不存在'
+            return results
+        
+        db = get_db()
+        try:
+            # 只计算分摊结果时不需要写锁
+            with db.transaction(immediate=not dry_run) as tx:
+                # 租户ID -> 按月份排序的[费用ID, 月份, 剩余应收金额]
+                open_charges = {}
+                for start in range(0, len(tenant_ids), 500):
+                    chunk = tenant_ids[start:start + 500]
+                    rows = tx.fetch_all(f"""
+                    SELECT c.tenant_id, c.id, c.month,
+                           c.total_charge - COALESCE((SELECT SUM(amount) FROM payments WHERE charge_id = c.id), 0)
+                    FROM charges c
+                    WHERE c.tenant_id IN ({', '.join('?' for _ in chunk)}) AND c.status != ?
+                    ORDER BY c.tenant_id, c.month, c.id
+                    """, tuple(chunk) + (STATUS_PAID,))
+                    for tenant_id, charge_id, month, due in rows:
+                        if round(due, 2) > 0:
+                            open_charges.setdefault(tenant_id, []).append([charge_id, month, round(due, 2)])
+                
+                rows = []
+                for lump_sum, result in zip(lump_sums, results):
+                    if not result['tenant_id']:
+                        result['message'] = '租户不存在'
+                        continue
+                    if result['amount'] <= 0:
+                        result['message'] = '收费金额必须大于0'
+                        continue
+                    charges = open_charges.get(result['tenant_id'], [])
+                    remaining = result['amount']
+                    for charge in charges:
+                        if remaining <= 0:
+                            break
+                        charge_id, month, due = charge
+                        if due <= 0:
+                            continue
+                        amount = min(due, remaining)
+                        charge[2] = round(due - amount, 2)
+                        remaining = round(remaining - amount, 2)
+                        result['allocations'].append({'charge_id': charge_id, 'month': month, 'amount': amount})
+                        rows.append((charge_id, lump_sum.get('payment_date'), amount,
+                                     lump_sum.get('payment_method') or '现金', lump_sum.get('payer') or '',
+                                     lump_sum.get('notes') or ''))
+                    result['allocated'] = round(result['amount'] - remaining, 2)
+                    result['unallocated'] = remaining
+                    result['success'] = bool(result['allocations'])
+                    if not result['allocations']:
+                        result['message'] = '没有未结清的费用'
+                    elif remaining > 0:
+                        result['message'] = f'余额{remaining:.2f}没有可分摊的费用'
+                
+                if rows and not dry_run:
+                    tx.execute_many("""
+                    INSERT INTO payments (charge_id, payment_date, amount, payment_method, payer, notes)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """, rows)
+        except sqlite3.Error as e:
+            print(f"分摊收费失败: {e}")
+            for result in results:
+                result['success'] = False
+                result['message'] = f'写入失败: {e}'
+        return results
+    
     def load_charge_info(self):
         """
         加载关联的费用信息
@@ -88,6 +270,75 @@ class Payment:
         if self.charge_id:
             self.charge = Charge.get_by_id(self.charge_id)
     
+    @classmethod
+    def attach_charges(cls, payments):
+        """
+        为收费记录列表批量关联费用信息，效果等同于逐条调用load_charge_info
+        :param payments: 收费记录列表
+        """
+        charge_ids = {payment.charge_id for payment in payments if payment.charge_id}
+        if not charge_ids:
+            return
+        charge_map = Charge.get_map(charge_ids)
+        for payment in payments:
+            if payment.charge_id:
+                payment.charge = charge_map.get(payment.charge_id)
+    
+    @classmethod
+    def get_paid_totals(cls, month=None):
+        """
+        按费用汇总已收金额
+        :param month: 费用月份（如2023-05），为None时汇总全部费用
+        :return: 费用ID到已收金额的字典，没有收费记录的费用不在字典中
+        """
+        db = get_db()
+        if month:
+            sql = """
+            SELECT p.charge_id, SUM(p.amount) FROM payments p
+            JOIN charges c ON p.charge_id = c.id
+            WHERE c.month = ?
+            GROUP BY p.charge_id
+            """
+            results = db.fetch_all(sql, (month,))
+        else:
+            sql = "SELECT charge_id, SUM(amount) FROM payments GROUP BY charge_id"
+            results = db.fetch_all(sql)
+        
+        return {charge_id: total or 0 for charge_id, total in results}
+    
+    @classmethod
+    def get_arrears(cls, get_text=None):
+        """
+        查询所有欠费信息
+        费用状态由数据库维护，直接按状态筛选，已收金额在同一查询中汇总；总费用为0的未缴费用没有欠费，不列出
+        :param get_text: 获取状态显示文本的函数，为None时status为状态代码
+        :return: 欠费列表
+        """
+        db = get_db()
+        sql = """
+        SELECT c.id, c.tenant_id, t.name, c.month, c.total_charge, COALESCE(p.paid, 0), c.status
+        FROM charges c
+        LEFT JOIN tenants t ON c.tenant_id = t.id
+        LEFT JOIN (SELECT charge_id, SUM(amount) AS paid FROM payments GROUP BY charge_id) p ON p.charge_id = c.id
+        WHERE c.status != ? AND ROUND(c.total_charge - COALESCE(p.paid, 0), 2) > 0
+        ORDER BY c.month DESC, c.tenant_id
+        """
+        results = db.fetch_all(sql, (STATUS_PAID,))
+        
+        arrears_list = []
+        for charge_id, tenant_id, tenant_name, month, total_charge, received, status in results:
+            arrears_list.append({
+                "charge_id": charge_id,
+                "tenant_id": tenant_id,
+                "tenant_name": tenant_name or "未知租户",
+                "month": month,
+                "total_charge": total_charge,
+                "received": received,
+                "arrears": total_charge - received,
+                "status": Charge.status_text(status, get_text)
+            })
+        return arrears_list
+    
     @classmethod
     def get_by_id(cls, payment_id):
         """
@@ -123,9 +374,10 @@ class Payment:
         payments = []
         for result in results:
             payment = cls(*result)
-            payment.load_charge_info()
             payments.append(payment)
         
+        # 批量关联费用信息，避免逐条查询
+        cls.attach_charges(payments)
         return payments
     
     @classmethod
@@ -147,11 +399,46 @@ class Payment:
         payments = []
         for result in results:
             payment = cls(*result)
-            payment.load_charge_info()
             payments.append(payment)
         
+        # 批量关联费用信息，避免逐条查询
+        cls.attach_charges(payments)
         return payments
     
+    @classmethod
+    def iter_month_rows(cls, month):
+        """
+        逐行读取指定月份的收费记录，租户名称在查询中关联，不创建收费记录对象
+        :param month: 月份（如2023-05）
+        :return: 行迭代器，每行为(租户名称, 金额, 收费日期, 支付方式, 收款人)
+        """
+        sql = """
+        SELECT COALESCE(t.name, '未知租户'), p.amount, p.payment_date, p.payment_method, p.payer
+        FROM payments p
+        JOIN charges c ON p.charge_id = c.id
+        LEFT JOIN tenants t ON c.tenant_id = t.id
+        WHERE c.month = ?
+        ORDER BY p.payment_date DESC
+        """
+        return get_db().iter_rows(sql, (month,))
+    
+    @classmethod
+    def count_by_month(cls, month):
+        """
+        统计指定月份的收费记录条数
+        :param month: 月份（如2023-05）
+        :return: 收费记录条数
+        """
+        db = get_db()
+        sql = """
+        SELECT COUNT(*) FROM payments p
+        JOIN charges c ON p.charge_id = c.id
+        WHERE c.month = ?
+        """
+        result = db.fetch_one(sql, (month,))
+        
+        return result[0] if result else 0
+    
     @classmethod
     def get_total_by_month(cls, month):
         """
@@ -182,7 +469,8 @@ class Payment:
         payments = []
         for result in results:
             payment = cls(*result)
-            payment.load_charge_info()
             payments.append(payment)
         
+        # 批量关联费用信息，避免逐条查询
+        cls.attach_charges(payments)
         return payments
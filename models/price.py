@@ -5,7 +5,22 @@
 负责处理水电费价格相关的数据操作
 """
 
-from database.db_manager import get_db
+import bisect
+import calendar
+import threading
+from datetime import datetime
+
+from database.db_manager import get_db, get_connection_generation
+from models.charge_journal import ChargeJournal
+
+def month_end(month):
+    """
+    获取月份最后一天，账期内的价格以月末生效的为准
+    :param month: 月份YYYY-MM
+    :return: 日期YYYY-MM-DD
+    """
+    year, mon = (int(part) for part in month.split('-'))
+    return f"{month}-{calendar.monthrange(year, mon)[1]:02d}"
 
 class Price:
     """价格类"""
@@ -41,6 +56,10 @@ class Price:
         self.price = round(self.price, 2)
         
         if self.id:
+            # 修改前的生效期间和范围内的费用也需要重算
+            previous = Price.get_by_id(self.id)
+            if previous:
+                ChargeJournal.mark_price(previous.resource_type, previous.tenant_type, previous.start_date, previous.end_date)
             # 更新现有价格
             data = {
                 'resource_type': self.resource_type,
@@ -62,6 +81,9 @@ class Price:
             self.id = db.insert('prices', data)
             result = self.id is not None
         
+        PriceBook.invalidate()
+        if result:
+            ChargeJournal.mark_price(self.resource_type, self.tenant_type, self.start_date, self.end_date)
         return result
     
     def delete(self):
@@ -73,7 +95,11 @@ class Price:
             return False
         
         db = get_db()
-        return db.delete('prices', f'id = {self.id}')
+        result = db.delete('prices', f'id = {self.id}')
+        PriceBook.invalidate()
+        if result:
+            ChargeJournal.mark_price(self.resource_type, self.tenant_type, self.start_date, self.end_date)
+        return result
     
     @classmethod
     def get_by_id(cls, price_id):
@@ -98,33 +124,7 @@ class Price:
         :param tenant_type: 租户类型（办公室/门面）
         :return: 价格对象或None
         """
-        db = get_db()
-        
-        # 先查找特定租户类型的价格
-        sql = """
-        SELECT * FROM prices 
-        WHERE resource_type = ? AND tenant_type = ? AND end_date IS NULL 
-        ORDER BY start_date DESC 
-        LIMIT 1
-        """
-        result = db.fetch_one(sql, (resource_type, tenant_type))
-        
-        if result:
-            return cls(*result)
-        
-        # 如果没有特定租户类型的价格，查找通用价格
-        sql = """
-        SELECT * FROM prices 
-        WHERE resource_type = ? AND tenant_type = '全部' AND end_date IS NULL 
-        ORDER BY start_date DESC 
-        LIMIT 1
-        """
-        result = db.fetch_one(sql, (resource_type,))
-        
-        if result:
-            return cls(*result)
-        
-        return None
+        return PriceBook.current_price(resource_type, tenant_type)
     
     @classmethod
     def get_all(cls, filters=None):
@@ -153,3 +153,98 @@ class Price:
         results = db.fetch_all(sql, tuple(params))
         
         return [cls(*result) for result in results]
+
+class PriceBook:
+    """
+    价格簿
+    一次读取全部价格，按(资源类型, 租户类型)建立按开始日期排序的生效区间索引，
+    用二分查找获取任意日期生效的价格；价格保存、删除或数据库被恢复后自动重新加载
+    """
+    
+    _lock = threading.Lock()
+    # (资源类型, 租户类型) -> (开始日期列表, 价格列表)，两个列表按开始日期对齐
+    _index = None
+    _generation = None
+    
+    @classmethod
+    def invalidate(cls):
+        """
+        清除索引，下次查询时重新加载
+        """
+        with cls._lock:
+            cls._index = None
+    
+    @classmethod
+    def _get_index(cls):
+        """
+        获取价格索引，未加载或已失效时从数据库读取
+        :return: 价格索引
+        """
+        with cls._lock:
+            generation = get_connection_generation()
+            if cls._index is None or cls._generation != generation:
+                db = get_db()
+                # 开始日期相同时后添加的价格排在后面，查询时优先
+                results = db.fetch_all("SELECT * FROM prices ORDER BY start_date, id")
+                index = {}
+                for result in results:
+                    price = Price(*result)
+                    starts, prices = index.setdefault((price.resource_type, price.tenant_type or '全部'), ([], []))
+                    starts.append(str(price.start_date))
+                    prices.append(price)
+                cls._index = index
+                cls._generation = generation
+            return cls._index
+    
+    @classmethod
+    def _find(cls, index, resource_type, tenant_type, date):
+        """
+        在一个租户类型的价格中查找指定日期生效的价格
+        :return: 价格对象或None
+        """
+        entry = index.get((resource_type, tenant_type))
+        if not entry:
+            return None
+        starts, prices = entry
+        position = bisect.bisect_right(starts, date) - 1
+        # 开始日期不晚于date的价格中，从最晚的往前找第一条尚未结束的
+        while position >= 0:
+            price = prices[position]
+            if not price.end_date or str(price.end_date) >= date:
+                return price
+            position -= 1
+        return None
+    
+    @classmethod
+    def price_at(cls, resource_type, tenant_type, date):
+        """
+        获取指定日期生效的价格，该租户类型没有价格时使用“全部”的价格
+        :param resource_type: 资源类型（水/电）
+        :param tenant_type: 租户类型
+        :param date: 日期YYYY-MM-DD
+        :return: 价格对象或None
+        """
+        index = cls._get_index()
+        return (cls._find(index, resource_type, tenant_type, date)
+                or cls._find(index, resource_type, '全部', date))
+    
+    @classmethod
+    def price_for_month(cls, resource_type, tenant_type, month):
+        """
+        获取费用月份适用的价格，以月末生效的价格为准
+        :param resource_type: 资源类型（水/电）
+        :param tenant_type: 租户类型
+        :param month: 费用月份YYYY-MM
+        :return: 价格对象或None
+        """
+        return cls.price_at(resource_type, tenant_type, month_end(month))
+    
+    @classmethod
+    def current_price(cls, resource_type, tenant_type):
+        """
+        获取今天生效的价格
+        :param resource_type: 资源类型（水/电）
+        :param tenant_type: 租户类型
+        :return: 价格对象或None
+        """
+        return cls.price_at(resource_type, tenant_type, datetime.now().strftime('%Y-%m-%d'))
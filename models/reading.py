@@ -5,7 +5,10 @@
 负责处理抄表数据的录入、查询和管理
 """
 
+import sqlite3
+
 from database.db_manager import get_db
+from models.charge_journal import ChargeJournal
 from models.meter import Meter
 
 class MeterReading:
@@ -46,6 +49,8 @@ class MeterReading:
         db = get_db()
         
         if self.id:
+            # 修改前的月份和租户也需要重算
+            ChargeJournal.mark_reading(self.id)
             # 更新现有记录
             data = {
                 'meter_id': self.meter_id,
@@ -73,8 +78,111 @@ class MeterReading:
             self.id = db.insert('meter_readings', data)
             result = self.id is not None
         
+        if result:
+            ChargeJournal.mark_reading(self.id)
         return result
     
+    @classmethod
+    def insert_many(cls, readings, executor=None):
+        """
+        在一个事务内批量插入新的抄表记录，不回填记录ID
+        :param readings: 抄表记录对象列表
+        :param executor: 事务执行器，为None时单独开启事务；传入时在调用方的事务内写入，出错时抛出异常由调用方回滚
+        :return: 是否保存成功，失败时整批回滚
+        """
+        sql = """
+        INSERT INTO meter_readings (meter_id, reading_date, current_reading, previous_reading, usage, adjustment, reader, remark)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        
+        def write(tx):
+            tx.execute_many(sql, [
+                (r.meter_id, r.reading_date, r.current_reading, r.previous_reading, r.usage, r.adjustment, r.reader, r.remark)
+                for r in readings
+            ])
+            ChargeJournal.mark_meter_months(((r.meter_id, str(r.reading_date)[:7]) for r in readings), tx)
+        
+        if executor is not None:
+            write(executor)
+            return True
+        db = get_db()
+        try:
+            with db.transaction() as tx:
+                write(tx)
+            return True
+        except sqlite3.Error as e:
+            print(f"批量插入抄表记录失败: {e}")
+            return False
+    
+    @classmethod
+    def get_last_readings(cls, meter_ids):
+        """
+        批量获取水电表最近一次抄表的日期和读数，与逐表调用Meter.get_last_reading结果一致
+        :param meter_ids: 表ID集合
+        :return: 表ID到(抄表日期, 当前读数)的字典，没有抄表记录的表不在其中
+        """
+        meter_ids = list(set(meter_ids))
+        if not meter_ids:
+            return {}
+        db = get_db()
+        # SQLite中与MAX()同时查询的列取自最大值所在的行
+        sql = "SELECT meter_id, MAX(reading_date), current_reading FROM meter_readings"
+        params = ()
+        # SQLite参数个数有限制，ID较多时直接汇总全表
+        if len(meter_ids) <= 500:
+            sql += f" WHERE meter_id IN ({', '.join('?' for _ in meter_ids)})"
+            params = tuple(meter_ids)
+        sql += " GROUP BY meter_id"
+        wanted = set(meter_ids)
+        return {meter_id: (reading_date, current_reading)
+                for meter_id, reading_date, current_reading in db.fetch_all(sql, params)
+                if meter_id in wanted}
+    
+    @classmethod
+    def get_existing_months(cls, meter_ids, months):
+        """
+        批量查询水电表在指定月份是否已有抄表记录
+        :param meter_ids: 表ID集合
+        :param months: 月份集合，格式为YYYY-MM
+        :return: 已有抄表记录的(表ID, 月份)集合
+        """
+        meter_ids = set(meter_ids)
+        months = sorted(set(months))
+        if not meter_ids or not months:
+            return set()
+        db = get_db()
+        sql = f"""
+        SELECT DISTINCT meter_id, substr(reading_date, 1, 7) FROM meter_readings
+        WHERE substr(reading_date, 1, 7) IN ({', '.join('?' for _ in months)})
+        """
+        return {(meter_id, month) for meter_id, month in db.fetch_all(sql, months) if meter_id in meter_ids}
+    
+    @classmethod
+    def get_monthly_usage(cls, month):
+        """
+        汇总指定月份各租户的水、电用量
+        每块表取当月第一条抄表记录，与逐表查询当月抄表记录的结果一致
+        :param month: 月份（如2023-05）
+        :return: 租户ID到{'水': 用量, '电': 用量}的字典
+        """
+        db = get_db()
+        sql = """
+        SELECT mr.meter_id, m.tenant_id, m.meter_type, mr.usage FROM meter_readings mr
+        JOIN meters m ON mr.meter_id = m.id
+        WHERE strftime('%Y-%m', mr.reading_date) = ?
+        ORDER BY mr.meter_id, mr.id
+        """
+        usage_map = {}
+        seen_meters = set()
+        for meter_id, tenant_id, meter_type, usage in db.fetch_all(sql, (month,)):
+            if meter_id in seen_meters:
+                continue
+            seen_meters.add(meter_id)
+            tenant_usage = usage_map.setdefault(tenant_id, {'水': 0, '电': 0})
+            if meter_type in tenant_usage:
+                tenant_usage[meter_type] += usage
+        return usage_map
+    
     def delete(self):
         """
         删除抄表记录
@@ -83,9 +191,64 @@ class MeterReading:
         if not self.id:
             return False
         
+        ChargeJournal.mark_reading(self.id)
         db = get_db()
         return db.delete('meter_readings', f'id = {self.id}')
     
+    @classmethod
+    def get_delete_blockers(cls, reading_ids, executor=None):
+        """
+        一次查询检查抄表记录能否删除：所属租户在抄表月份已生成费用的记录不能删除
+        :param reading_ids: 抄表记录ID列表
+        :param executor: 事务执行器，为None时直接查询
+        :return: 不能删除的记录ID到原因代码的字典，原因为charged或not_found
+        """
+        reading_ids = list(dict.fromkeys(reading_ids))
+        fetch_all = (executor or get_db()).fetch_all
+        found = {}
+        for start in range(0, len(reading_ids), 500):
+            chunk = reading_ids[start:start + 500]
+            rows = fetch_all(f"""
+            SELECT r.id, EXISTS(SELECT 1 FROM charges c
+                                WHERE c.tenant_id = m.tenant_id AND c.month = substr(r.reading_date, 1, 7))
+            FROM meter_readings r
+            LEFT JOIN meters m ON r.meter_id = m.id
+            WHERE r.id IN ({', '.join('?' for _ in chunk)})
+            """, tuple(chunk))
+            found.update(rows)
+        
+        blockers = {}
+        for reading_id in reading_ids:
+            if reading_id not in found:
+                blockers[reading_id] = 'not_found'
+            elif found[reading_id]:
+                blockers[reading_id] = 'charged'
+        return blockers
+    
+    @classmethod
+    def delete_many(cls, reading_ids):
+        """
+        批量删除抄表记录
+        在一个BEGIN IMMEDIATE事务内检查全部记录，已计费的跳过，其余登记待重算后按ID分批删除，
+        检查之后其他连接不能再用这些记录计算费用
+        :param reading_ids: 抄表记录ID列表
+        :return: 结果字典，键deleted为已删除的记录ID列表，blocked为不能删除的记录ID到原因代码的字典；
+                 写入失败时全部回滚，deleted为空，error为错误信息
+        """
+        db = get_db()
+        try:
+            with db.transaction(immediate=True) as tx:
+                blocked = cls.get_delete_blockers(reading_ids, tx)
+                deletable = [reading_id for reading_id in dict.fromkeys(reading_ids) if reading_id not in blocked]
+                ChargeJournal.mark_readings(deletable, tx)
+                for start in range(0, len(deletable), 500):
+                    chunk = deletable[start:start + 500]
+                    tx.execute(f"DELETE FROM meter_readings WHERE id IN ({', '.join('?' for _ in chunk)})", tuple(chunk))
+            return {'deleted': deletable, 'blocked': blocked}
+        except sqlite3.Error as e:
+            print(f"批量删除抄表记录失败: {e}")
+            return {'deleted': [], 'blocked': {}, 'error': str(e)}
+    
     def load_meter_info(self):
         """
         加载关联的水电表信息
@@ -93,6 +256,20 @@ class MeterReading:
         if self.meter_id:
             self.meter = Meter.get_by_id(self.meter_id)
     
+    @classmethod
+    def attach_meters(cls, readings):
+        """
+        为抄表记录列表批量关联水电表信息，效果等同于逐条调用load_meter_info
+        :param readings: 抄表记录列表
+        """
+        meter_ids = {reading.meter_id for reading in readings if reading.meter_id}
+        if not meter_ids:
+            return
+        meter_map = Meter.get_map(meter_ids)
+        for reading in readings:
+            if reading.meter_id:
+                reading.meter = meter_map.get(reading.meter_id)
+    
     @classmethod
     def get_by_id(cls, reading_id):
         """
@@ -154,9 +331,10 @@ class MeterReading:
                 adjustment=result[8] if len(result) > 8 else 0,
                 remark=result[9] if len(result) > 9 else ''
             )
-            reading.load_meter_info()
             readings.append(reading)
         
+        # 批量关联水电表信息，避免逐条查询
+        cls.attach_meters(readings)
         return readings
     
     @classmethod
@@ -191,9 +369,10 @@ class MeterReading:
                 adjustment=result[8] if len(result) > 8 else 0,
                 remark=result[9] if len(result) > 9 else ''
             )
-            reading.load_meter_info()
             readings.append(reading)
         
+        # 批量关联水电表信息，避免逐条查询
+        cls.attach_meters(readings)
         return readings
     
     @classmethod
@@ -259,11 +438,56 @@ class MeterReading:
                 adjustment=result[8] if len(result) > 8 else 0,
                 remark=result[9] if len(result) > 9 else ''
             )
-            reading.load_meter_info()
             readings.append(reading)
         
+        # 批量关联水电表信息，避免逐条查询
+        cls.attach_meters(readings)
         return readings
     
+    @classmethod
+    def iter_export_rows(cls, month=None, tenant_name=None):
+        """
+        逐行读取导出用的抄表数据，租户和水电表信息在查询中关联，不创建抄表记录对象
+        :param month: 月份（如2023-05），为空时不过滤
+        :param tenant_name: 租户名称，为空时不过滤
+        :return: 行迭代器，每行为(ID, 租户名称, 表编号, 表类型, 上次读数, 当前读数, 调整值, 用量, 抄表日期, 抄表人)
+        """
+        where_clauses = []
+        params = []
+        if month:
+            where_clauses.append("mr.reading_date LIKE ?")
+            params.append(f"{month}%")
+        if tenant_name:
+            where_clauses.append("t.name = ?")
+            params.append(tenant_name)
+        where = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        sql = f"""
+        SELECT mr.id, t.name, m.meter_no, m.meter_type, mr.previous_reading, mr.current_reading,
+               mr.adjustment, mr.usage, mr.reading_date, mr.reader
+        FROM meter_readings mr
+        JOIN meters m ON mr.meter_id = m.id
+        JOIN tenants t ON m.tenant_id = t.id{where}
+        ORDER BY strftime('%Y-%m', mr.reading_date) DESC, t.name ASC
+        """
+        return get_db().iter_rows(sql, tuple(params))
+    
+    @classmethod
+    def get_month_totals(cls, month):
+        """
+        按租户和表类型汇总指定月份的上次读数和当前读数
+        :param month: 月份（如2023-05）
+        :return: {(租户ID, 表类型): (上次读数合计, 当前读数合计)}
+        """
+        db = get_db()
+        sql = """
+        SELECT m.tenant_id, m.meter_type, SUM(mr.previous_reading), SUM(mr.current_reading)
+        FROM meter_readings mr
+        JOIN meters m ON mr.meter_id = m.id
+        WHERE strftime('%Y-%m', mr.reading_date) = ?
+        GROUP BY m.tenant_id, m.meter_type
+        """
+        return {(row[0], row[1]): (row[2] or 0, row[3] or 0) for row in db.fetch_all(sql, (month,))}
+    
     @classmethod
     def exists(cls, meter_id, reading_date):
         """
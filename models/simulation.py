@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+价格模拟模型
+按历史费用中的用量试算候选价格下的收入，只读取数据库，不写入费用表
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from database.db_manager import get_db
+
+# 候选价格，(资源类型, 租户类型) -> 单价，租户类型为“全部”时适用于没有单独价格的类型
+PriceSet = Dict[Tuple[str, str], float]
+
+class SimulationResult:
+    """
+    一个候选价格方案的模拟结果
+    baseline和simulated为月份×租户类型的收入矩阵
+    """
+
+    def __init__(self, name: str, months: List[str], tenant_types: List[str], baseline, simulated):
+        """
+        初始化模拟结果
+        :param name: 方案名称
+        :param months: 月份列表，对应矩阵的行
+        :param tenant_types: 租户类型列表，对应矩阵的列
+        :param baseline: 实际收入矩阵
+        :param simulated: 模拟收入矩阵
+        """
+        self.name = name
+        self.months = months
+        self.tenant_types = tenant_types
+        self.baseline = baseline
+        self.simulated = simulated
+
+    @property
+    def delta(self):
+        """模拟收入与实际收入之差"""
+        return self.simulated - self.baseline
+
+    def rows(self) -> List[dict]:
+        """
+        按月份和租户类型展开结果
+        :return: 每项包含month、tenant_type、baseline、simulated、delta
+        """
+        result = []
+        for i, month in enumerate(self.months):
+            for j, tenant_type in enumerate(self.tenant_types):
+                result.append({
+                    'month': month,
+                    'tenant_type': tenant_type,
+                    'baseline': float(self.baseline[i, j]),
+                    'simulated': float(self.simulated[i, j]),
+                    'delta': float(self.simulated[i, j] - self.baseline[i, j]),
+                })
+        return result
+
+    def totals(self) -> dict:
+        """
+        获取整个期间的合计
+        :return: 包含baseline、simulated、delta的字典
+        """
+        baseline = float(self.baseline.sum())
+        simulated = float(self.simulated.sum())
+        return {'baseline': baseline, 'simulated': simulated, 'delta': simulated - baseline}
+
+class PriceSimulation:
+    """
+    价格模拟
+    一次读取期间内各月各户的用量和实际金额，之后每个候选价格方案都在内存中按数组整体试算
+    """
+
+    def __init__(self, start_month: str, end_month: str):
+        """
+        初始化价格模拟并读取数据
+        :param start_month: 开始月份YYYY-MM（包含）
+        :param end_month: 结束月份YYYY-MM（包含）
+        """
+        self.start_month = start_month
+        self.end_month = end_month
+        self.load()
+
+    def load(self) -> None:
+        """
+        读取期间内的费用记录，转换为按列存放的数组
+        """
+        import numpy as np
+
+        db = get_db()
+        sql = """
+        SELECT c.month, t.type, c.water_usage, c.water_charge, c.electricity_usage, c.electricity_charge
+        FROM charges c
+        JOIN tenants t ON c.tenant_id = t.id
+        WHERE c.month BETWEEN ? AND ?
+        """
+        rows = db.fetch_all(sql, (self.start_month, self.end_month))
+
+        self.months = sorted({row[0] for row in rows})
+        self.tenant_types = sorted({row[1] for row in rows})
+        month_index = {month: i for i, month in enumerate(self.months)}
+        type_index = {tenant_type: i for i, tenant_type in enumerate(self.tenant_types)}
+
+        count = len(rows)
+        self.month_idx = np.fromiter((month_index[row[0]] for row in rows), dtype=np.int64, count=count)
+        self.type_idx = np.fromiter((type_index[row[1]] for row in rows), dtype=np.int64, count=count)
+        # 资源类型 -> (用量, 实际金额)
+        self.columns = {
+            '水': (np.fromiter((row[2] or 0 for row in rows), dtype=np.float64, count=count),
+                  np.fromiter((row[3] or 0 for row in rows), dtype=np.float64, count=count)),
+            '电': (np.fromiter((row[4] or 0 for row in rows), dtype=np.float64, count=count),
+                  np.fromiter((row[5] or 0 for row in rows), dtype=np.float64, count=count)),
+        }
+        # 实际收入按费用记录的水电金额之和取整，与计费规则一致
+        self.baseline_total = np.round(self.columns['水'][1] + self.columns['电'][1])
+        self.baseline = self._aggregate(self.baseline_total)
+
+    def _aggregate(self, values):
+        """
+        按月份和租户类型汇总
+        :param values: 与费用记录对齐的数组
+        :return: 月份×租户类型的矩阵
+        """
+        import numpy as np
+
+        width = len(self.tenant_types)
+        cells = len(self.months) * width
+        sums = np.bincount(self.month_idx * width + self.type_idx, weights=values, minlength=cells)
+        return sums.reshape(len(self.months), width)
+
+    def evaluate(self, prices: PriceSet, name: str = '') -> SimulationResult:
+        """
+        按候选价格试算收入，没有候选价格的资源和租户类型保持实际金额
+        :param prices: 候选价格
+        :param name: 方案名称
+        :return: 模拟结果
+        """
+        import numpy as np
+
+        total = np.zeros(len(self.month_idx), dtype=np.float64)
+        for resource_type, (usage, actual) in self.columns.items():
+            default = prices.get((resource_type, '全部'))
+            unit = np.array([prices.get((resource_type, tenant_type), default) for tenant_type in self.tenant_types],
+                            dtype=object)
+            has_price = np.array([price is not None for price in unit], dtype=bool)
+            unit_price = np.where(has_price, unit, 0.0).astype(np.float64)
+            candidate = np.round(np.maximum(usage, 0.0) * unit_price[self.type_idx])
+            total += np.where(has_price[self.type_idx], candidate, actual)
+        return SimulationResult(name, self.months, self.tenant_types, self.baseline,
+                                self._aggregate(np.round(total)))
+
+    def evaluate_many(self, scenarios: Dict[str, PriceSet]) -> List[SimulationResult]:
+        """
+        试算多个候选价格方案
+        :param scenarios: 方案名称到候选价格的字典
+        :return: 模拟结果列表，顺序与scenarios一致
+        """
+        return [self.evaluate(prices, name) for name, prices in scenarios.items()]
+
+    @staticmethod
+    def parse_price_set(text: str) -> Optional[PriceSet]:
+        """
+        解析文本形式的候选价格，格式为“资源类型[:租户类型]=单价”，多项用逗号分隔，如“水=4, 电:门面=1.1”
+        :param text: 候选价格文本
+        :return: 候选价格，格式不正确时返回None
+        """
+        prices: PriceSet = {}
+        for part in text.replace('，', ',').split(','):
+            part = part.strip()
+            if not part:
+                continue
+            key, sep, value = part.partition('=')
+            resource_type, _, tenant_type = key.strip().partition(':')
+            resource_type = resource_type.strip()
+            if not sep or resource_type not in ('水', '电'):
+                return None
+            try:
+                price = float(value)
+            except ValueError:
+                return None
+            if price < 0:
+                return None
+            prices[(resource_type, tenant_type.strip() or '全部')] = price
+        return prices or None
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+电价方案模型
+负责阶梯、分时电价方案的保存和查询，并把方案编译为数组，按用量向量批量计费
+"""
+
+import sqlite3
+
+from database.db_manager import get_db
+from models.charge_journal import ChargeJournal
+from models.price import PriceBook, month_end
+
+# 一天的15分钟时段数，与区间用量的分时曲线一致
+SLOTS_PER_DAY = 96
+# 单一价格折算成方案时使用的时段名
+FLAT_BAND = ''
+
+class Tariff:
+    """
+    电价方案类
+    一个方案对应一种资源和一种租户类型，在生效期间内替代单一价格
+    bands为分时时段[(时段名, 开始HH:MM, 结束HH:MM)]，结束早于开始表示跨零点，未覆盖的时间属于默认时段
+    rates为各时段的阶梯价格[(时段名, 阶梯起点用量, 单价)]，阶梯按当月总用量划分
+    """
+
+    def __init__(self, id=None, name='', resource_type='电', tenant_type='全部', default_band='平',
+                 start_date='', end_date=None, create_time=None, bands=None, rates=None):
+        """
+        初始化电价方案对象
+        :param id: 方案ID
+        :param name: 方案名称
+        :param resource_type: 资源类型（水/电）
+        :param tenant_type: 租户类型，全部表示所有类型
+        :param default_band: 默认时段名
+        :param start_date: 生效开始日期
+        :param end_date: 生效结束日期，为空表示长期有效
+        :param create_time: 创建时间
+        :param bands: 分时时段列表
+        :param rates: 阶梯价格列表
+        """
+        self.id = id
+        self.name = name
+        self.resource_type = resource_type
+        self.tenant_type = tenant_type
+        self.default_band = default_band
+        self.start_date = start_date
+        self.end_date = end_date
+        self.create_time = create_time
+        self.bands = list(bands or [])
+        self.rates = list(rates or [])
+
+    def save(self):
+        """
+        保存电价方案及其时段和阶梯价格，在一个事务内完成
+        :return: 是否保存成功
+        """
+        # 先编译一次，方案不完整时不保存
+        try:
+            self.compile()
+        except ValueError as e:
+            print(f"电价方案无效: {e}")
+            return False
+
+        db = get_db()
+        previous = Tariff.get_by_id(self.id) if self.id else None
+        try:
+            with db.transaction() as tx:
+                values = (self.name, self.resource_type, self.tenant_type, self.default_band,
+                          self.start_date, self.end_date)
+                if self.id:
+                    tx.execute("""
+                    UPDATE tariffs SET name = ?, resource_type = ?, tenant_type = ?, default_band = ?,
+                                       start_date = ?, end_date = ?
+                    WHERE id = ?
+                    """, values + (self.id,))
+                    tx.execute("DELETE FROM tariff_bands WHERE tariff_id = ?", (self.id,))
+                    tx.execute("DELETE FROM tariff_rates WHERE tariff_id = ?", (self.id,))
+                else:
+                    tx.execute("""
+                    INSERT INTO tariffs (name, resource_type, tenant_type, default_band, start_date, end_date)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """, values)
+                    self.id = db.cursor.lastrowid
+                tx.execute_many("INSERT INTO tariff_bands (tariff_id, band, start_time, end_time) VALUES (?, ?, ?, ?)",
+                                [(self.id,) + tuple(band) for band in self.bands])
+                tx.execute_many("INSERT INTO tariff_rates (tariff_id, band, tier_start, price) VALUES (?, ?, ?, ?)",
+                                [(self.id,) + tuple(rate) for rate in self.rates])
+            for tariff in (previous, self):
+                if tariff:
+                    ChargeJournal.mark_price(tariff.resource_type, tariff.tenant_type, tariff.start_date, tariff.end_date)
+            return True
+        except sqlite3.Error as e:
+            print(f"保存电价方案失败: {e}")
+            return False
+
+    def delete(self):
+        """
+        删除电价方案，时段和阶梯价格级联删除
+        :return: 是否删除成功
+        """
+        if not self.id:
+            return False
+
+        db = get_db()
+        result = db.delete('tariffs', f'id = {self.id}')
+        if result:
+            ChargeJournal.mark_price(self.resource_type, self.tenant_type, self.start_date, self.end_date)
+        return result
+
+    @classmethod
+    def _load(cls, rows):
+        """
+        由方案行创建对象并批量加载时段和阶梯价格
+        :param rows: tariffs表的行
+        :return: 电价方案列表
+        """
+        tariffs = [cls(*row) for row in rows]
+        if not tariffs:
+            return tariffs
+
+        db = get_db()
+        by_id = {tariff.id: tariff for tariff in tariffs}
+        for tariff_id, band, start_time, end_time in db.fetch_all(
+                "SELECT tariff_id, band, start_time, end_time FROM tariff_bands ORDER BY id"):
+            if tariff_id in by_id:
+                by_id[tariff_id].bands.append((band, start_time, end_time))
+        for tariff_id, band, tier_start, price in db.fetch_all(
+                "SELECT tariff_id, band, tier_start, price FROM tariff_rates ORDER BY id"):
+            if tariff_id in by_id:
+                by_id[tariff_id].rates.append((band, tier_start, price))
+        return tariffs
+
+    @classmethod
+    def get_by_id(cls, tariff_id):
+        """
+        根据ID获取电价方案
+        :param tariff_id: 方案ID
+        :return: 电价方案对象或None
+        """
+        db = get_db()
+        result = db.fetch_one("SELECT * FROM tariffs WHERE id = ?", (tariff_id,))
+        return cls._load([result])[0] if result else None
+
+    @classmethod
+    def get_all(cls):
+        """
+        获取所有电价方案
+        :return: 电价方案列表
+        """
+        db = get_db()
+        return cls._load(db.fetch_all("SELECT * FROM tariffs ORDER BY resource_type, tenant_type, start_date DESC"))
+
+    @classmethod
+    def get_effective(cls, resource_type, date):
+        """
+        获取指定日期生效的各租户类型的电价方案
+        同一租户类型有多个方案同时生效时取开始日期最晚的
+        :param resource_type: 资源类型（水/电）
+        :param date: 日期YYYY-MM-DD
+        :return: 租户类型到电价方案的字典，键“全部”为通用方案
+        """
+        db = get_db()
+        sql = """
+        SELECT * FROM tariffs
+        WHERE resource_type = ? AND start_date <= ? AND (end_date IS NULL OR end_date = '' OR end_date >= ?)
+        ORDER BY start_date
+        """
+        effective = {}
+        for tariff in cls._load(db.fetch_all(sql, (resource_type, date, date))):
+            effective[tariff.tenant_type or '全部'] = tariff
+        return effective
+
+    @staticmethod
+    def _slot_of(time_text):
+        """
+        将HH:MM转换为15分钟时段序号
+        :param time_text: 时间
+        :return: 时段序号，24:00为96
+        """
+        try:
+            hour, minute = (int(part) for part in str(time_text).split(':'))
+        except ValueError:
+            raise ValueError(f"时间格式不正确，应为HH:MM: {time_text}")
+        slot = (hour * 60 + minute) // 15
+        if hour < 0 or not 0 <= minute < 60 or minute % 15 or slot > SLOTS_PER_DAY:
+            raise ValueError(f"时段边界必须是00:00到24:00之间的整15分钟: {time_text}")
+        return slot
+
+    def compile(self):
+        """
+        把方案编译为计费用的数组
+        :return: 编译后的方案
+        :raises ValueError: 方案不完整
+        """
+        band_names = [self.default_band]
+        for band, _, _ in self.bands:
+            if band not in band_names:
+                band_names.append(band)
+
+        slot_band = [0] * SLOTS_PER_DAY
+        for band, start_time, end_time in self.bands:
+            start, end = self._slot_of(start_time), self._slot_of(end_time)
+            slots = range(start, end) if start < end else list(range(start, SLOTS_PER_DAY)) + list(range(0, end))
+            for slot in slots:
+                slot_band[slot] = band_names.index(band)
+
+        rates_by_band = {}
+        for band, tier_start, price in self.rates:
+            rates_by_band.setdefault(band, []).append((float(tier_start), float(price)))
+        if self.default_band not in rates_by_band:
+            raise ValueError(f"默认时段“{self.default_band}”没有价格")
+
+        # 所有时段共用同一组阶梯分界，某时段没有单独价格时使用默认时段的价格
+        thresholds = sorted({tier_start for rates in rates_by_band.values() for tier_start, _ in rates} | {0.0})
+        prices = []
+        for band in band_names:
+            rates = sorted(rates_by_band.get(band, rates_by_band[self.default_band]))
+            row = []
+            for threshold in thresholds:
+                applicable = [price for tier_start, price in rates if tier_start <= threshold]
+                row.append(applicable[-1] if applicable else rates[0][1])
+            prices.append(row)
+
+        return CompiledTariff(self.id, band_names, thresholds, prices, slot_band)
+
+class CompiledTariff:
+    """
+    编译后的电价方案
+    prices为时段×阶梯的单价矩阵，band_matrix把96个时段的用量映射到各分时时段
+    """
+
+    def __init__(self, tariff_id, band_names, thresholds, prices, slot_band):
+        """
+        初始化编译后的方案
+        :param tariff_id: 方案ID，由单一价格折算时为None
+        :param band_names: 分时时段名列表，第一个为默认时段
+        :param thresholds: 阶梯起点用量列表，从0开始递增
+        :param prices: 时段×阶梯的单价
+        :param slot_band: 每个15分钟时段所属的分时时段序号
+        """
+        import numpy as np
+
+        self.tariff_id = tariff_id
+        self.band_names = list(band_names)
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.band_matrix = np.zeros((SLOTS_PER_DAY, len(self.band_names)), dtype=np.float64)
+        self.band_matrix[np.arange(SLOTS_PER_DAY), np.asarray(slot_band)] = 1.0
+
+    @classmethod
+    def flat(cls, price):
+        """
+        由单一价格构造方案，结果与用量直接乘单价相同
+        :param price: 单价
+        :return: 编译后的方案
+        """
+        return cls(None, [FLAT_BAND], [0.0], [[price]], [0] * SLOTS_PER_DAY)
+
+    @property
+    def base_price(self):
+        """默认时段第一阶梯的单价"""
+        return float(self.prices[0, 0])
+
+    def bill(self, usage, profiles=None):
+        """
+        按用量向量批量计费
+        各时段用量按分时曲线的比例拆分当月用量，没有曲线的全部计入默认时段；
+        当月总用量按阶梯分段，各时段用量按相同比例落入各阶梯
+        :param usage: 各户当月用量，形状(n,)
+        :param profiles: 各户分时曲线，形状(n, 96)，可为None
+        :return: (各明细用量, 各明细金额)，形状均为(n, 时段数, 阶梯数)
+        """
+        import numpy as np
+
+        usage = np.maximum(np.asarray(usage, dtype=np.float64), 0.0)
+        band_usage = np.zeros((len(usage), len(self.band_names)), dtype=np.float64)
+        band_usage[:, 0] = usage
+        if profiles is not None and len(self.band_names) > 1:
+            by_band = profiles @ self.band_matrix
+            totals = by_band.sum(axis=1)
+            has_profile = totals > 0
+            band_usage[has_profile] = by_band[has_profile] / totals[has_profile, None] * usage[has_profile, None]
+
+        upper = np.append(self.thresholds[1:], np.inf)
+        tier_usage = np.clip(usage[:, None] - self.thresholds[None, :], 0.0, upper - self.thresholds)
+        tier_share = np.divide(tier_usage, usage[:, None], out=np.zeros_like(tier_usage),
+                               where=usage[:, None] > 0)
+
+        item_usage = band_usage[:, :, None] * tier_share[:, None, :]
+        return item_usage, item_usage * self.prices[None, :, :]
+
+def get_compiled_tariffs(resource_type, month, tenant_types):
+    """
+    获取账期内各租户类型使用的计费方案
+    优先使用该租户类型的电价方案，其次使用通用电价方案，都没有时按账期内生效的单一价格计费
+    :param resource_type: 资源类型（水/电）
+    :param month: 费用月份YYYY-MM
+    :param tenant_types: 租户类型集合
+    :return: 租户类型到编译后方案的字典
+    """
+    effective = Tariff.get_effective(resource_type, month_end(month))
+    compiled_by_id = {}
+    result = {}
+    for tenant_type in tenant_types:
+        tariff = effective.get(tenant_type) or effective.get('全部')
+        if tariff is not None:
+            if tariff.id not in compiled_by_id:
+                compiled_by_id[tariff.id] = tariff.compile()
+            result[tenant_type] = compiled_by_id[tariff.id]
+        else:
+            price_obj = PriceBook.price_for_month(resource_type, tenant_type, month)
+            result[tenant_type] = CompiledTariff.flat(price_obj.price if price_obj else 0.0)
+    return result
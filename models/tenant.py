@@ -117,6 +117,31 @@ class Tenant:
                       deactivated=bool(result[7]), create_time=result[8], update_time=result[9])
         return None
     
+    @classmethod
+    def get_map(cls, tenant_ids=None):
+        """
+        批量获取租户，用于列表数据关联租户信息，避免逐条查询
+        :param tenant_ids: 租户ID集合，为None或数量较多时读取全部租户
+        :return: 租户ID到租户对象的字典
+        """
+        db = get_db()
+        sql = "SELECT id, name, type, address, contact_person, phone, email, deactivated, create_time, update_time FROM tenants"
+        params = ()
+        if tenant_ids is not None:
+            tenant_ids = list(set(tenant_ids))
+            if not tenant_ids:
+                return {}
+            # SQLite参数个数有限制，ID较多时直接读取全表
+            if len(tenant_ids) <= 500:
+                sql += f" WHERE id IN ({', '.join('?' for _ in tenant_ids)})"
+                params = tuple(tenant_ids)
+        results = db.fetch_all(sql, params)
+        
+        return {result[0]: cls(id=result[0], name=result[1], type=result[2], address=result[3], 
+                               contact_person=result[4], phone=result[5], email=result[6], 
+                               deactivated=bool(result[7]), create_time=result[8], update_time=result[9])
+                for result in results}
+    
     @classmethod
     def get_all(cls, filters=None):
         """
@@ -125,27 +150,48 @@ class Tenant:
         :return: 租户列表
         """
         db = get_db()
+        where, params = cls._filter_clause(filters)
         sql = "SELECT id, name, type, address, contact_person, phone, email, deactivated, create_time, update_time FROM tenants"
-        params = []
+        sql += where + " ORDER BY name"
+        results = db.fetch_all(sql, params)
         
+        return [cls(id=result[0], name=result[1], type=result[2], address=result[3], 
+                  contact_person=result[4], phone=result[5], email=result[6], 
+                  deactivated=bool(result[7]), create_time=result[8], update_time=result[9]) for result in results]
+    
+    @classmethod
+    def _filter_clause(cls, filters):
+        """
+        生成租户过滤条件
+        :param filters: 过滤条件，支持name（模糊匹配）和type
+        :return: WHERE子句（无条件时为空字符串）和参数元组
+        """
+        where_clauses = []
+        params = []
         if filters:
-            where_clauses = []
             if 'name' in filters and filters['name']:
                 where_clauses.append("name LIKE ?")
                 params.append(f"%{filters['name']}%")
             if 'type' in filters and filters['type']:
                 where_clauses.append("type = ?")
                 params.append(filters['type'])
-            
-            if where_clauses:
-                sql += " WHERE " + " AND ".join(where_clauses)
-        
-        sql += " ORDER BY name"
-        results = db.fetch_all(sql, tuple(params))
-        
-        return [cls(id=result[0], name=result[1], type=result[2], address=result[3], 
-                  contact_person=result[4], phone=result[5], email=result[6], 
-                  deactivated=bool(result[7]), create_time=result[8], update_time=result[9]) for result in results]
+        where = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        return where, tuple(params)
+    
+    @classmethod
+    def iter_export_rows(cls, filters=None):
+        """
+        逐行读取导出用的租户信息，不创建租户对象
+        :param filters: 过滤条件，与get_all相同
+        :return: 行迭代器，每行为(ID, 名称, 类型, 联系人, 电话, 邮箱, 地址, 创建时间)
+        """
+        where, params = cls._filter_clause(filters)
+        sql = f"""
+        SELECT id, name, type, contact_person, phone, email, address, COALESCE(create_time, '')
+        FROM tenants{where}
+        ORDER BY name
+        """
+        return get_db().iter_rows(sql, params)
     
     @classmethod
     def search(cls, keyword):
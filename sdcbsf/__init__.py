@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+水电费抄收管理系统命令行工具
+不依赖图形界面，用于脚本和定时任务执行批量操作，入口为 python -m sdcbsf
+"""
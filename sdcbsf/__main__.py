@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行工具入口
+"""
+
+import sys
+
+from sdcbsf.cli import main
+
+sys.exit(main())
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行工具
+提供数据库初始化、抄表导入、区间用量导入、电价方案导入、费用计算、费用重新计算、报表导出、原始数据导出、批量生成账单、欠费查询、流水分摊、费用状态修复、备份、恢复和抄表数据接收服务命令，
+全部复用模型和导出代码，不导入tkinter；进度输出到标准错误，结果输出到标准输出
+
+用法:
+    python -m sdcbsf [--data-dir DIR] init-db
+    python -m sdcbsf import-readings readings.xlsx
+    python -m sdcbsf calculate-charges --month 2024-05
+    python -m sdcbsf rebill --from 2024-01 --to 2024-05 --scope 电:门面
+    python -m sdcbsf export-report --type monthly --month 2024-05 --format pdf
+    python -m sdcbsf export-raw --from 2023-01 --to 2024-05 --output bi_export
+    python -m sdcbsf generate-bills --month 2024-05 --output bills
+    python -m sdcbsf arrears --format csv
+    python -m sdcbsf allocate-payments statement.csv
+    python -m sdcbsf repair-status
+    python -m sdcbsf backup
+    python -m sdcbsf restore 20240531230000
+    python -m sdcbsf serve --host 0.0.0.0 --port 8765
+    python -m sdcbsf import-intervals intervals.csv
+    python -m sdcbsf import-tariff tariff.json
+"""
+
+import os
+import sys
+import csv
+import json
+import argparse
+from datetime import datetime
+from typing import Callable, List, Optional
+
+# 数据库文件名，与图形界面一致，位于数据目录下
+DB_FILENAME = "water_electricity.db"
+# 报表类型，与报表管理界面一致
+REPORT_TYPES = ("monthly", "tenant_detail", "payment_stat", "settlement")
+# 可导出的原始数据表，与utils.raw_export.EXPORT_TABLES一致
+RAW_EXPORT_TABLES = ("tenants", "meters", "meter_readings", "charges", "payments", "settlements")
+
+# 退出码
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+def log(message: str) -> None:
+    """
+    输出进度信息到标准错误
+    :param message: 信息
+    """
+    print(message, file=sys.stderr, flush=True)
+
+
+def make_progress(label: str) -> Callable[..., None]:
+    """
+    创建进度回调，第一个参数为已完成数，第二个参数为总数
+    :param label: 进度说明
+    :return: 进度回调
+    """
+    def progress(done, total, *_):
+        log(f"{label}: {done}/{total}")
+    return progress
+
+
+def get_language_utils():
+    """
+    按系统设置中的语言创建语言工具，输出的状态等文本与图形界面一致
+    :return: 语言工具实例
+    """
+    from utils.language_utils import LanguageUtils
+    from utils.settings_utils import SettingsUtils
+
+    return LanguageUtils(SettingsUtils().get_setting('system', 'language', 'zh_CN'))
+
+
+# ---------- 命令 ----------
+
+def cmd_init_db(args) -> int:
+    """初始化数据库"""
+    from database.init_db import init_database
+
+    init_database()
+    log(f"数据库初始化完成: {os.path.abspath(DB_FILENAME)}")
+    return EXIT_OK
+
+
+def cmd_import_readings(args) -> int:
+    """从Excel或CSV文件导入抄表记录"""
+    from utils import reading_import
+
+    try:
+        headers, rows, datemode = reading_import.load_rows(args.file)
+    except (OSError, ValueError) as e:
+        log(f"读取文件失败: {e}")
+        return EXIT_FAILED
+
+    missing_headers = reading_import.get_missing_headers(headers)
+    if missing_headers:
+        log(f"文件格式不正确，缺少以下必填列：{', '.join(missing_headers)}")
+        return EXIT_FAILED
+
+    log(f"读取 {len(rows)} 行，开始校验")
+    records, failed_reasons = reading_import.parse_rows(headers, rows, datemode)
+
+    # 与界面导入相同，有重复记录时拒绝整个文件
+    duplicates = reading_import.find_duplicates(records)
+    if duplicates:
+        log("检测到重复数据，本次导入已取消：所属月份、租户名称和表编号组合已存在")
+        for dup in duplicates:
+            log(f"  第{dup['row_idx']}行 {dup['reading_month']} {dup['tenant_name']} {dup['meter_no']} {dup['meter_type']}")
+        return EXIT_FAILED
+
+    if args.dry_run:
+        success_count = 0
+        log(f"校验完成（未写入）: 可导入 {len(records)} 行")
+    else:
+        # save_records的进度参数为(已处理数, 成功数, 失败数)，转换为(已处理数, 总数)
+        progress = make_progress("写入抄表记录")
+        success_count, save_failed_reasons = reading_import.save_records(
+            records, lambda processed, *_: progress(processed, len(records)), args.batch_size)
+        failed_reasons.extend(save_failed_reasons)
+
+    for reason in failed_reasons:
+        log(reason)
+    print(f"总计: {len(rows)} 行，成功: {success_count} 行，失败: {len(failed_reasons)} 行")
+    return EXIT_FAILED if failed_reasons else EXIT_OK
+
+
+def cmd_import_intervals(args) -> int:
+    """从CSV文件导入智能表区间用量"""
+    from models.interval import MeterInterval
+    from models.meter import Meter
+
+    number_map = {(meter.meter_no, meter.meter_type): meter.id for meter in Meter.get_map().values()}
+    counts = {"rows": 0}
+
+    def iter_rows(reader):
+        # 文件可用meter_id或meter_no+meter_type指定水电表
+        for line, row in enumerate(reader, 2):
+            if row.get("meter_id"):
+                meter_id = row["meter_id"]
+            else:
+                meter_id = number_map.get((row.get("meter_no", "").strip(), row.get("meter_type", "").strip()))
+                if meter_id is None:
+                    raise ValueError(f"第{line}行：水电表 '{row.get('meter_no')} ({row.get('meter_type')})' 不存在")
+            counts["rows"] += 1
+            yield meter_id, row["ts"], row["value"]
+
+    try:
+        with open(args.file, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            missing = {"ts", "value"} - set(reader.fieldnames or [])
+            if missing:
+                log(f"文件缺少以下列：{', '.join(sorted(missing))}")
+                return EXIT_FAILED
+            saved = MeterInterval.append_many(iter_rows(reader))
+    except OSError as e:
+        log(f"读取文件失败: {e}")
+        return EXIT_FAILED
+
+    if not saved:
+        log("导入失败，已全部回滚")
+        return EXIT_FAILED
+    print(f"导入区间用量 {counts['rows']} 条")
+    return EXIT_OK
+
+
+def cmd_import_tariff(args) -> int:
+    """
+    从JSON文件导入电价方案，格式为:
+    {"name": "居民分时", "resource_type": "电", "tenant_type": "住宅", "default_band": "平",
+     "start_date": "2024-01-01", "end_date": null,
+     "bands": [{"band": "峰", "start": "08:00", "end": "22:00"}],
+     "rates": [{"band": "平", "tier_start": 0, "price": 0.5}, {"band": "峰", "tier_start": 0, "price": 0.6}]}
+    """
+    from models.tariff import Tariff
+
+    try:
+        with open(args.file, "r", encoding="utf-8-sig") as f:
+            data = json.load(f)
+        tariff = Tariff(
+            name=data["name"],
+            resource_type=data.get("resource_type", "电"),
+            tenant_type=data.get("tenant_type") or "全部",
+            default_band=data.get("default_band", "平"),
+            start_date=data["start_date"],
+            end_date=data.get("end_date"),
+            bands=[(band["band"], band["start"], band["end"]) for band in data.get("bands", [])],
+            rates=[(rate["band"], rate.get("tier_start", 0), rate["price"]) for rate in data["rates"]],
+        )
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        log(f"读取电价方案失败: {e}")
+        return EXIT_FAILED
+
+    if not tariff.save():
+        return EXIT_FAILED
+    print(tariff.id)
+    return EXIT_OK
+
+
+def cmd_calculate_charges(args) -> int:
+    """计算指定月份所有租户的费用"""
+    from models.charge import Charge
+
+    result = Charge.calculate_month(args.month, make_progress(f"写入{args.month}费用"), args.batch_size,
+                                    args.incremental)
+    print(f"{args.month} 费用计算完成: 新增 {result['added']} 户，更新 {result['updated']} 户，"
+          f"失败 {result['failed']} 户，无变化跳过 {result['skipped']} 户")
+    return EXIT_FAILED if result['failed'] else EXIT_OK
+
+
+def cmd_rebill(args) -> int:
+    """价格更正后重新计算一段月份内的已有费用并输出差异报告"""
+    from utils import rebilling
+
+    scopes = None
+    if args.scope:
+        scopes = []
+        for scope in args.scope:
+            resource_type, _, tenant_type = scope.partition(":")
+            if resource_type not in ("水", "电"):
+                log(f"范围格式不正确，应为 资源类型[:租户类型]: {scope}")
+                return EXIT_USAGE
+            scopes.append((resource_type, tenant_type or "全部"))
+
+    result = rebilling.rebill(args.from_month, args.to_month, scopes, args.report,
+                              lambda month, done, total: log(f"重新计算{month}费用: {done}/{total}"))
+    print(f"重新计算费用 {result['charges']} 条，有变化 {result['changed']} 条，差异报告: {result['report']}")
+    if result['failed_months']:
+        log(f"写入失败的月份: {', '.join(result['failed_months'])}")
+        return EXIT_FAILED
+    return EXIT_OK
+
+
+def cmd_export_report(args) -> int:
+    """导出报表"""
+    from utils.report_export import ReportExporter
+
+    output = args.output or os.path.join(args.original_cwd, f"{args.type}_{args.month}.{args.format}")
+    exporter = ReportExporter(get_language_utils())
+    log(f"导出{args.type}报表 {args.month} -> {output}")
+    try:
+        exporter.export(args.type, args.month, output, args.format, args.tenant or "", args.stat_type)
+    except Exception as e:
+        log(f"导出报表失败: {e}")
+        return EXIT_FAILED
+    print(output)
+    return EXIT_OK
+
+
+def cmd_export_raw(args) -> int:
+    """导出原始数据表"""
+    from utils import raw_export
+
+    output = args.output or os.path.join(args.original_cwd, f"raw_export_{datetime.now().strftime('%Y%m%d%H%M%S')}")
+    log(f"导出原始数据 -> {output}")
+    try:
+        manifest = raw_export.export_tables(output, args.from_month, args.to_month, args.table, args.format,
+                                            progress=lambda table, done: log(f"导出{table}: {done}"))
+    except (OSError, ValueError) as e:
+        log(f"导出原始数据失败: {e}")
+        return EXIT_FAILED
+    for item in manifest["tables"]:
+        print(f"{item['file']}  {item['rows']} 行  {item['sha256']}")
+    print(os.path.join(output, raw_export.MANIFEST_FILENAME))
+    return EXIT_OK
+
+
+def cmd_generate_bills(args) -> int:
+    """批量生成指定月份的账单PDF，按Ctrl+C取消"""
+    from utils import bill_generation
+
+    output = args.output or os.path.join(args.original_cwd, f"bills_{args.month}")
+    log(f"生成{args.month}账单 -> {output}")
+    try:
+        result = bill_generation.generate_bills(args.month, output, args.merged, workers=args.workers,
+                                                progress=make_progress("生成账单"))
+    except (OSError, ValueError) as e:
+        log(f"生成账单失败: {e}")
+        return EXIT_FAILED
+    for error in result['errors']:
+        log(f"生成账单失败: {error}")
+    if result['total'] == 0:
+        log(f"{args.month}没有费用记录")
+    for file_path in result['files']:
+        print(file_path)
+    log(f"总计: {result['total']} 张，已生成 {result['done']} 张" + ("（已取消）" if result['cancelled'] else ""))
+    return EXIT_FAILED if result['errors'] or result['cancelled'] else EXIT_OK
+
+
+def cmd_arrears(args) -> int:
+    """查询欠费"""
+    from models.payment import Payment
+
+    arrears_list = Payment.get_arrears(get_language_utils().get_text)
+    if args.month:
+        arrears_list = [item for item in arrears_list if item["month"] == args.month]
+
+    fields = ["charge_id", "tenant_id", "tenant_name", "month", "total_charge", "received", "arrears", "status"]
+    if args.format == "json":
+        print(json.dumps(arrears_list, ensure_ascii=False, indent=2))
+    elif args.format == "csv":
+        writer = csv.DictWriter(sys.stdout, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(arrears_list)
+    else:
+        for item in arrears_list:
+            print(f"{item['month']}  {item['tenant_name']:<20} 应收 {item['total_charge']:>10.2f}  "
+                  f"已收 {item['received']:>10.2f}  欠费 {item['arrears']:>10.2f}  {item['status']}")
+        print(f"合计: {len(arrears_list)} 条，欠费 {sum(item['arrears'] for item in arrears_list):.2f}")
+    return EXIT_OK
+
+
+def cmd_allocate_payments(args) -> int:
+    """按先到期先还的顺序分摊银行流水中的款项"""
+    from utils import payment_allocation
+
+    try:
+        result = payment_allocation.allocate_statement(args.file, args.dry_run)
+    except (OSError, ValueError) as e:
+        log(f"读取文件失败: {e}")
+        return EXIT_FAILED
+
+    for reason in result['failed_reasons']:
+        log(reason)
+    allocated = 0.0
+    for lump_sum, item in zip(result['lump_sums'], result['results']):
+        months = ", ".join(f"{a['month']} {a['amount']:.2f}" for a in item['allocations'])
+        print(f"第{lump_sum['line']}行 {lump_sum['tenant_name']} {item['amount']:.2f}: {months or '-'}"
+              + (f"（{item['message']}）" if item['message'] else ""))
+        allocated += item['allocated']
+    failed = len(result['failed_reasons']) + sum(1 for item in result['results'] if not item['success'])
+    print(f"总计: {result['rows']} 行，分摊 {allocated:.2f}，失败 {failed} 行" + ("（未写入）" if args.dry_run else ""))
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def cmd_repair_status(args) -> int:
+    """按已收金额修复状态不正确的费用"""
+    from models.charge import Charge
+
+    print(f"已修复费用状态 {Charge.repair_status()} 条")
+    return EXIT_OK
+
+
+def cmd_backup(args) -> int:
+    """创建数据库快照"""
+    from utils.backup_utils import BackupUtils
+
+    db_path = os.path.abspath(DB_FILENAME)
+    manifest = BackupUtils.create_snapshot(db_path, args.backup_dir, args.compact, make_progress("备份页数"))
+    if not manifest:
+        log("备份失败")
+        return EXIT_FAILED
+    log(f"数据库大小 {manifest['size'] / 1024 / 1024:.2f} MB，新增存储 {manifest['stored_bytes'] / 1024 / 1024:.2f} MB")
+    print(manifest["id"])
+    return EXIT_OK
+
+
+def cmd_restore(args) -> int:
+    """从快照或备份文件恢复数据库"""
+    from utils.backup_store import BackupStore
+    from utils.backup_utils import BackupUtils
+
+    db_path = os.path.abspath(DB_FILENAME)
+    backup_dir = args.backup_dir or os.path.join(os.path.dirname(db_path), "backup")
+
+    if args.list:
+        for manifest in BackupStore(backup_dir).list_snapshots():
+            print(f"{manifest['id']}  {manifest['created']}  {manifest['size'] / 1024 / 1024:.2f} MB  {manifest['source']}")
+        return EXIT_OK
+
+    if args.file:
+        log(f"从备份文件恢复: {args.file}")
+        restored = BackupUtils.restore_database(args.file, db_path)
+    elif args.snapshot:
+        log(f"从快照恢复: {args.snapshot}")
+        restored = BackupUtils.restore_snapshot(args.snapshot, db_path, backup_dir)
+    else:
+        log("请指定快照ID、--file或--list")
+        return EXIT_USAGE
+
+    if not restored:
+        log("恢复失败，数据库未改动")
+        return EXIT_FAILED
+    log("恢复完成")
+    return EXIT_OK
+
+
+def cmd_serve(args) -> int:
+    """运行抄表数据接收服务，直到按Ctrl+C"""
+    from utils.reading_server import ReadingIngestServer
+    from utils.settings_utils import SettingsUtils
+
+    settings = SettingsUtils()
+    server = ReadingIngestServer(
+        args.host or settings.get_setting('ingest', 'host', '127.0.0.1'),
+        args.port if args.port is not None else settings.get_int_setting('ingest', 'port', 8765),
+        args.token if args.token is not None else settings.get_setting('ingest', 'token', ''),
+        args.reader or settings.get_setting('ingest', 'reader', '自动抄表'),
+        args.batch_rows)
+    log(f"抄表数据接收服务监听 http://{server.host}:{server.port}/readings，按Ctrl+C停止")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log("服务已停止")
+    except OSError as e:
+        log(f"启动服务失败: {e}")
+        return EXIT_FAILED
+    return EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    创建命令行参数解析器
+    :return: 参数解析器
+    """
+    parser = argparse.ArgumentParser(prog="python -m sdcbsf", description="水电费抄收管理系统命令行工具")
+    parser.add_argument("--data-dir", default=None,
+                        help=f"数据目录，包含{DB_FILENAME}和配置文件，默认为当前目录")
+    subparsers = parser.add_subparsers(dest="command", metavar="命令")
+    subparsers.required = True
+
+    sub = subparsers.add_parser("init-db", help="创建数据库表结构和默认数据")
+    sub.set_defaults(func=cmd_init_db)
+
+    sub = subparsers.add_parser("import-readings", help="从Excel或CSV文件导入抄表记录")
+    sub.add_argument("file", help="抄表文件（.xlsx、.xls或.csv）")
+    sub.add_argument("--batch-size", type=int, default=500, help="每个事务写入的记录数")
+    sub.add_argument("--dry-run", action="store_true", help="只校验不写入")
+    sub.set_defaults(func=cmd_import_readings, paths=["file"])
+
+    sub = subparsers.add_parser("import-intervals", help="从CSV文件导入智能表区间用量")
+    sub.add_argument("file", help="CSV文件，列为meter_id（或meter_no和meter_type）、ts、value")
+    sub.set_defaults(func=cmd_import_intervals, paths=["file"])
+
+    sub = subparsers.add_parser("import-tariff", help="从JSON文件导入阶梯或分时电价方案")
+    sub.add_argument("file", help="电价方案JSON文件")
+    sub.set_defaults(func=cmd_import_tariff, paths=["file"])
+
+    sub = subparsers.add_parser("calculate-charges", help="计算指定月份所有租户的费用")
+    sub.add_argument("--month", required=True, help="费用月份，格式为YYYY-MM")
+    sub.add_argument("--batch-size", type=int, default=1000, help="每个事务写入的记录数")
+    sub.add_argument("--incremental", action="store_true", help="只重算抄表、水电表或价格有变化的租户")
+    sub.set_defaults(func=cmd_calculate_charges)
+
+    sub = subparsers.add_parser("rebill", help="价格更正后重新计算一段月份内的已有费用")
+    sub.add_argument("--from", dest="from_month", required=True, help="开始月份，格式为YYYY-MM")
+    sub.add_argument("--to", dest="to_month", required=True, help="结束月份，格式为YYYY-MM")
+    sub.add_argument("--scope", action="append",
+                     help="受影响的范围，格式为 资源类型[:租户类型]，如 电:门面，可重复；默认重新计算全部费用")
+    sub.add_argument("--report", help="差异报告文件，默认为数据目录下rebilling文件夹中")
+    sub.set_defaults(func=cmd_rebill, paths=["report"])
+
+    sub = subparsers.add_parser("export-report", help="导出报表")
+    sub.add_argument("--type", required=True, choices=REPORT_TYPES, help="报表类型")
+    sub.add_argument("--month", required=True, help="报表月份，格式为YYYY-MM")
+    sub.add_argument("--format", required=True, choices=("xlsx", "pdf", "csv"), help="导出格式")
+    sub.add_argument("--tenant", help="只导出指定租户")
+    sub.add_argument("--stat-type", help="收费统计报表的统计方式，默认按租户")
+    sub.add_argument("--output", help="输出文件，默认为当前目录下的 类型_月份.格式")
+    sub.set_defaults(func=cmd_export_report, paths=["output"])
+
+    sub = subparsers.add_parser("export-raw", help="按月份范围导出原始数据表供数据分析使用")
+    sub.add_argument("--from", dest="from_month", help="开始月份，格式为YYYY-MM，默认不限")
+    sub.add_argument("--to", dest="to_month", help="结束月份，格式为YYYY-MM，默认不限")
+    sub.add_argument("--table", action="append", choices=RAW_EXPORT_TABLES,
+                     help="只导出指定的表，可重复；默认导出全部表")
+    sub.add_argument("--format", choices=("auto", "csv", "parquet"), default="auto",
+                     help="导出格式，auto时已安装pyarrow则导出Parquet，否则导出gzip压缩的CSV")
+    sub.add_argument("--output", help="输出目录，默认为当前目录下的raw_export_时间")
+    sub.set_defaults(func=cmd_export_raw, paths=["output"])
+
+    sub = subparsers.add_parser("generate-bills", help="批量生成指定月份所有租户的账单PDF")
+    sub.add_argument("--month", required=True, help="月份，格式为YYYY-MM")
+    sub.add_argument("--output", help="输出目录，默认为当前目录下的bills_月份")
+    sub.add_argument("--merged", action="store_true", help="全部账单合并为一个PDF文件")
+    sub.add_argument("--workers", type=int, help="并行生成的进程数，默认为CPU核心数")
+    sub.set_defaults(func=cmd_generate_bills, paths=["output"])
+
+    sub = subparsers.add_parser("arrears", help="查询欠费")
+    sub.add_argument("--month", help="只输出指定月份")
+    sub.add_argument("--format", choices=("table", "csv", "json"), default="table", help="输出格式")
+    sub.set_defaults(func=cmd_arrears)
+
+    sub = subparsers.add_parser("allocate-payments", help="按月份从早到晚分摊银行流水中的款项")
+    sub.add_argument("file", help="流水文件（.xlsx、.xls或.csv），列为租户名称、金额、收费日期，可选支付方式、收款人、备注")
+    sub.add_argument("--dry-run", action="store_true", help="只计算分摊结果不写入")
+    sub.set_defaults(func=cmd_allocate_payments, paths=["file"])
+
+    sub = subparsers.add_parser("repair-status", help="按已收金额修复状态不正确的费用")
+    sub.set_defaults(func=cmd_repair_status)
+
+    sub = subparsers.add_parser("backup", help="创建数据库快照")
+    sub.add_argument("--backup-dir", help="备份目录，默认为数据目录下的backup")
+    sub.add_argument("--compact", action="store_true", help="备份前整理数据库")
+    sub.set_defaults(func=cmd_backup, paths=["backup_dir"])
+
+    sub = subparsers.add_parser("restore", help="从快照或备份文件恢复数据库")
+    sub.add_argument("snapshot", nargs="?", help="快照ID")
+    sub.add_argument("--file", help="旧版整库备份文件")
+    sub.add_argument("--list", action="store_true", help="列出全部快照")
+    sub.add_argument("--backup-dir", help="备份目录，默认为数据目录下的backup")
+    sub.set_defaults(func=cmd_restore, paths=["file", "backup_dir"])
+
+    sub = subparsers.add_parser("serve", help="运行抄表数据接收服务")
+    sub.add_argument("--host", help="监听地址，默认使用系统设置")
+    sub.add_argument("--port", type=int, help="监听端口，默认使用系统设置")
+    sub.add_argument("--token", help="访问令牌，默认使用系统设置")
+    sub.add_argument("--reader", help="数据未提供抄表人时使用的抄表人")
+    sub.add_argument("--batch-rows", type=int, default=5000, help="每个事务最多写入的数据条数")
+    sub.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口
+    :param argv: 命令行参数
+    :return: 退出码
+    """
+    args = build_parser().parse_args(argv)
+
+    # 文件参数按启动时的当前目录解析，再切换到数据目录
+    # 数据库、日志和配置文件都相对当前目录，模型模块须在切换之后导入
+    args.original_cwd = os.getcwd()
+    for name in getattr(args, "paths", []):
+        value = getattr(args, name, None)
+        if value:
+            setattr(args, name, os.path.abspath(value))
+    if args.data_dir:
+        try:
+            os.chdir(args.data_dir)
+        except OSError as e:
+            log(f"无法进入数据目录: {e}")
+            return EXIT_USAGE
+
+    # 与图形界面启动时一样补齐新版本增加的表，数据库不存在时不自动创建
+    if args.func is not cmd_init_db and os.path.exists(DB_FILENAME):
+        from database.init_db import init_database
+        init_database()
+
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        log("已中断")
+        return EXIT_FAILED
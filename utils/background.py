@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务工具
+在守护线程中执行耗时任务（备份、导出、重新计算费用、生成账单等），避免阻塞界面
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def run_in_background(task, on_complete=None, name="background-task"):
+    """
+    在后台线程中执行任务
+    回调函数在后台线程中调用，界面代码需通过after()回到主线程再更新控件；
+    任务抛出异常时记录日志，回调参数为None，等待回调的界面不会一直轮询
+    :param task: 无参数的任务函数
+    :param on_complete: 完成回调函数，参数为任务返回值，任务出错时为None
+    :param name: 线程名称
+    :return: 后台线程
+    """
+    def run():
+        try:
+            result = task()
+        except Exception:
+            logger.exception(f"后台任务{name}执行失败")
+            result = None
+        if on_complete:
+            on_complete(result)
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动备份调度器
+在界面空闲时检查是否到期，到期后在后台线程执行备份并清理过期的自动备份，
+上次备份时间由界面线程写入配置
+"""
+
+import os
+import time
+import datetime
+import logging
+from typing import Any, Dict, Optional
+
+from utils.background import run_in_background
+from utils.backup_store import BackupStore
+from utils.backup_utils import BackupUtils
+from utils.settings_utils import SettingsUtils
+
+# 自动备份日志
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    _handler = logging.FileHandler(os.path.join(os.getcwd(), 'backup.log'), encoding='utf-8')
+    _handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+
+class BackupScheduler:
+    """自动备份调度器"""
+
+    # 上次备份时间的保存格式
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+    # 等待后台备份完成的轮询间隔（毫秒）
+    POLL_INTERVAL_MS = 1000
+
+    def __init__(self, root, db_path: str, backup_dir: Optional[str] = None,
+                 check_interval_ms: int = 10 * 60 * 1000, first_check_ms: int = 60 * 1000):
+        """
+        初始化自动备份调度器
+        :param root: Tk根窗口，用于注册定时器
+        :param db_path: 数据库文件路径
+        :param backup_dir: 备份目录，默认为数据库所在目录下的backup文件夹
+        :param check_interval_ms: 检查间隔（毫秒）
+        :param first_check_ms: 启动后首次检查的延迟（毫秒）
+        """
+        self.root = root
+        self.db_path = db_path
+        self.backup_dir = backup_dir or os.path.join(os.path.dirname(db_path), "backup")
+        self.check_interval_ms = check_interval_ms
+        self.first_check_ms = first_check_ms
+        self.backup_thread = None
+        self.after_id = None
+
+    def start(self) -> None:
+        """
+        启动调度器
+        """
+        # 旧版本的整库备份文件在后台导入备份仓库
+        if BackupUtils.get_backup_list(self.backup_dir):
+            run_in_background(lambda: BackupStore(self.backup_dir).import_legacy_backups(),
+                              name="legacy-backup-import")
+        self._schedule(self.first_check_ms)
+
+    def stop(self) -> None:
+        """
+        停止调度器，正在执行的备份会继续完成
+        """
+        if self.after_id:
+            try:
+                self.root.after_cancel(self.after_id)
+            except Exception:
+                pass
+            self.after_id = None
+
+    def _schedule(self, delay_ms: int) -> None:
+        """
+        注册下一次检查，定时器到期后等界面空闲再执行检查
+        :param delay_ms: 延迟（毫秒）
+        """
+        self.after_id = self.root.after(delay_ms, lambda: self.root.after_idle(self._on_timer))
+
+    def _on_timer(self) -> None:
+        """
+        定时检查回调
+        """
+        try:
+            self.run_if_due()
+        except Exception as e:
+            logger.error(f"自动备份检查失败: {str(e)}")
+        finally:
+            self._schedule(self.check_interval_ms)
+
+    @classmethod
+    def parse_backup_date(cls, value: Optional[str]) -> Optional[datetime.datetime]:
+        """
+        解析配置中的上次备份时间，兼容只有日期的旧格式
+        :param value: 配置值
+        :return: 上次备份时间，无效时返回None
+        """
+        if not value:
+            return None
+        for date_format in (cls.DATE_FORMAT, "%Y-%m-%d"):
+            try:
+                return datetime.datetime.strptime(value.strip(), date_format)
+            except ValueError:
+                continue
+        return None
+
+    def is_due(self, settings: SettingsUtils, now: Optional[datetime.datetime] = None) -> bool:
+        """
+        判断是否需要执行自动备份
+        :param settings: 系统设置
+        :param now: 当前时间
+        :return: 是否到期
+        """
+        if not settings.get_boolean_setting('system', 'auto_backup', False):
+            return False
+
+        interval_days = max(settings.get_int_setting('system', 'backup_interval_days', 7), 1)
+        last_backup = self.parse_backup_date(settings.get_setting('system', 'last_backup_date', ''))
+        if last_backup is None:
+            return True
+
+        now = now or datetime.datetime.now()
+        return now - last_backup >= datetime.timedelta(days=interval_days)
+
+    def run_if_due(self) -> bool:
+        """
+        到期时在后台线程启动备份
+        :return: 是否启动了备份
+        """
+        # 上一次备份的线程结束后还要等界面线程写入上次备份时间，写入前不再启动新的备份
+        if self.backup_thread:
+            return False
+
+        # 每次重新读取配置，系统设置中的修改无需重启即可生效
+        settings = SettingsUtils()
+        if not self.is_due(settings):
+            return False
+
+        keep_daily = settings.get_int_setting('system', 'backup_keep_daily', 7)
+        keep_monthly = settings.get_int_setting('system', 'backup_keep_monthly', 12)
+        started = time.perf_counter()
+        backup_state = {'done': False, 'finished': None}
+
+        def on_complete(manifest):
+            try:
+                backup_state['finished'] = self._on_backup_complete(manifest, started, keep_daily, keep_monthly)
+            finally:
+                backup_state['done'] = True
+
+        logger.info(f"开始自动备份: {self.db_path}")
+        self.backup_thread = BackupUtils.create_snapshot_async(self.db_path, on_complete, self.backup_dir,
+                                                               origin=BackupStore.ORIGIN_AUTO)
+        self._poll_backup(backup_state)
+        return True
+
+    def _poll_backup(self, backup_state: Dict[str, Any]) -> None:
+        """
+        在界面线程中等待后台备份完成，成功后写入上次备份时间
+        配置文件只在界面线程中读写，避免与系统设置界面同时写入
+        :param backup_state: 后台备份线程写入的状态字典
+        """
+        if not backup_state['done'] and self.backup_thread.is_alive():
+            self.root.after(self.POLL_INTERVAL_MS, lambda: self._poll_backup(backup_state))
+            return
+
+        self.backup_thread = None
+        if not backup_state['finished']:
+            return
+        try:
+            settings = SettingsUtils()
+            settings.set_setting('system', 'last_backup_date', backup_state['finished'].strftime(self.DATE_FORMAT))
+        except IOError as e:
+            logger.error(f"更新上次备份时间失败: {str(e)}")
+
+    def _on_backup_complete(self, manifest: Optional[Dict[str, Any]], started: float,
+                            keep_daily: int, keep_monthly: int) -> Optional[datetime.datetime]:
+        """
+        备份完成回调，在备份线程中执行，不访问任何界面控件和配置文件
+        :param manifest: 快照清单，失败时为None
+        :param started: 开始时间
+        :param keep_daily: 按天保留的份数
+        :param keep_monthly: 按月保留的份数
+        :return: 备份完成时间，失败时返回None
+        """
+        finished = datetime.datetime.now()
+        elapsed = time.perf_counter() - started
+        if not manifest:
+            logger.error(f"自动备份失败，耗时 {elapsed:.2f} 秒")
+            return None
+
+        logger.info(f"自动备份完成: 快照 {manifest['id']}，数据库大小 {manifest['size'] / 1024 / 1024:.2f} MB，"
+                    f"新增存储 {manifest['stored_bytes'] / 1024 / 1024:.2f} MB（{manifest['new_chunks']} 个数据块），"
+                    f"耗时 {elapsed:.2f} 秒")
+
+        # 只清理自动备份的快照，手动备份和导入的旧版本备份不受保留策略影响
+        deleted = BackupUtils.apply_retention(self.backup_dir, keep_daily, keep_monthly)
+        if deleted:
+            logger.info(f"按保留策略删除 {len(deleted)} 个过期快照: {', '.join(deleted)}")
+        return finished
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容寻址备份仓库
+将数据库副本按固定大小分块，以块内容的SHA-256为键压缩存储，
+相同内容的块只保存一份，每个快照用一个清单文件记录块序列
+"""
+
+import os
+import json
+import lzma
+import zlib
+import hashlib
+import datetime
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# 支持的压缩方式：名称 -> (文件后缀, 压缩函数, 解压函数)
+CODECS = {
+    "zlib": (".zz", lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (".xz", lambda data: lzma.compress(data, preset=6), lzma.decompress),
+}
+
+
+class BackupStore:
+    """内容寻址备份仓库"""
+
+    # 默认分块大小，为SQLite页大小的整数倍，未修改的页所在块可在快照间复用
+    CHUNK_SIZE = 64 * 1024
+    # 快照ID和时间格式
+    ID_FORMAT = "%Y%m%d%H%M%S"
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+    # 快照的创建方式，记录在清单的origin中；保留策略只清理自动备份的快照
+    ORIGIN_AUTO = "auto"
+    ORIGIN_MANUAL = "manual"
+    ORIGIN_LEGACY = "legacy"
+    # 写入快照与清理块互斥，避免清理掉尚未写入清单的新块
+    _lock = threading.Lock()
+    # 旧备份导入互斥，避免同一文件被重复导入
+    _import_lock = threading.Lock()
+
+    def __init__(self, backup_dir: str, codec: str = "zlib", chunk_size: Optional[int] = None):
+        """
+        初始化备份仓库
+        :param backup_dir: 备份目录，仓库数据保存在其下的store文件夹
+        :param codec: 新写入块的压缩方式，zlib或lzma
+        :param chunk_size: 分块大小（字节）
+        """
+        if codec not in CODECS:
+            raise ValueError(f"不支持的压缩方式: {codec}")
+        self.backup_dir = backup_dir
+        self.store_dir = os.path.join(backup_dir, "store")
+        self.chunks_dir = os.path.join(self.store_dir, "chunks")
+        self.manifests_dir = os.path.join(self.store_dir, "manifests")
+        self.codec = codec
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+
+    def _chunk_path(self, digest: str, codec: str) -> str:
+        """
+        获取块文件路径，按哈希前两位分目录避免单个目录文件过多
+        :param digest: 块内容的SHA-256
+        :param codec: 压缩方式
+        :return: 块文件路径
+        """
+        return os.path.join(self.chunks_dir, digest[:2], digest + CODECS[codec][0])
+
+    def _find_chunk(self, digest: str) -> Optional[Tuple[str, str]]:
+        """
+        查找已存储的块，块可能以任一压缩方式保存
+        :param digest: 块内容的SHA-256
+        :return: 块文件路径和压缩方式，不存在时返回None
+        """
+        for codec in CODECS:
+            path = self._chunk_path(digest, codec)
+            if os.path.exists(path):
+                return path, codec
+        return None
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        """
+        先写临时文件再改名，避免中断时留下不完整的文件
+        :param path: 目标路径
+        :param data: 文件内容
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def add_snapshot(self, db_file: str, created: Optional[datetime.datetime] = None,
+                     source: Optional[str] = None, origin: str = ORIGIN_MANUAL) -> Dict[str, Any]:
+        """
+        将一个一致的数据库文件副本存入仓库
+        调用方需保证文件在读取期间不被修改（例如在线备份得到的临时副本）
+        :param db_file: 数据库文件路径
+        :param created: 快照时间，默认为当前时间
+        :param source: 来源数据库文件名
+        :param origin: 创建方式，ORIGIN_AUTO、ORIGIN_MANUAL或ORIGIN_LEGACY
+        :return: 快照清单
+        """
+        with self._lock:
+            return self._add_snapshot(db_file, created or datetime.datetime.now(), source, origin)
+
+    def _add_snapshot(self, db_file: str, created: datetime.datetime, source: Optional[str],
+                      origin: str) -> Dict[str, Any]:
+        """
+        写入快照的块和清单
+        :param db_file: 数据库文件路径
+        :param created: 快照时间
+        :param source: 来源数据库文件名
+        :param origin: 创建方式
+        :return: 快照清单
+        """
+        compress = CODECS[self.codec][1]
+
+        file_hash = hashlib.sha256()
+        chunks = []
+        new_chunks = 0
+        stored_bytes = 0
+        size = 0
+        with open(db_file, "rb") as f:
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    break
+                size += len(data)
+                file_hash.update(data)
+                digest = hashlib.sha256(data).hexdigest()
+                chunks.append(digest)
+
+                # 只写入仓库中还没有的块
+                if self._find_chunk(digest) is None:
+                    compressed = compress(data)
+                    self._write_atomic(self._chunk_path(digest, self.codec), compressed)
+                    new_chunks += 1
+                    stored_bytes += len(compressed)
+
+        snapshot_id = created.strftime(self.ID_FORMAT)
+        # 同一秒内多次备份时追加序号
+        suffix = 1
+        while os.path.exists(self._manifest_path(snapshot_id)):
+            snapshot_id = f"{created.strftime(self.ID_FORMAT)}_{suffix}"
+            suffix += 1
+
+        manifest = {
+            "id": snapshot_id,
+            "created": created.strftime(self.DATE_FORMAT),
+            "source": source or os.path.basename(db_file),
+            "origin": origin,
+            "size": size,
+            "sha256": file_hash.hexdigest(),
+            "chunk_size": self.chunk_size,
+            "chunks": chunks,
+            "new_chunks": new_chunks,
+            "stored_bytes": stored_bytes,
+        }
+        self._write_atomic(self._manifest_path(snapshot_id),
+                           json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))
+        return manifest
+
+    def _manifest_path(self, snapshot_id: str) -> str:
+        """
+        获取快照清单路径
+        :param snapshot_id: 快照ID
+        :return: 清单文件路径
+        """
+        return os.path.join(self.manifests_dir, snapshot_id + ".json")
+
+    def get_snapshot(self, snapshot_id: str) -> Optional[Dict[str, Any]]:
+        """
+        读取快照清单
+        :param snapshot_id: 快照ID
+        :return: 快照清单，不存在或损坏时返回None
+        """
+        try:
+            with open(self._manifest_path(snapshot_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"读取快照清单失败: {str(e)}")
+            return None
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        """
+        获取全部快照清单
+        :return: 快照清单列表，按时间倒序排列
+        """
+        if not os.path.exists(self.manifests_dir):
+            return []
+
+        snapshots = []
+        for filename in os.listdir(self.manifests_dir):
+            if not filename.endswith(".json"):
+                continue
+            manifest = self.get_snapshot(filename[:-len(".json")])
+            if manifest:
+                snapshots.append(manifest)
+
+        snapshots.sort(key=lambda m: (m.get("created", ""), m.get("id", "")), reverse=True)
+        return snapshots
+
+    def restore_to_file(self, snapshot_id: str, target_path: str) -> bool:
+        """
+        将快照还原为数据库文件，逐块校验哈希并校验整个文件的哈希
+        :param snapshot_id: 快照ID
+        :param target_path: 输出文件路径，校验失败时删除
+        :return: 是否还原成功
+        """
+        manifest = self.get_snapshot(snapshot_id)
+        if not manifest:
+            return False
+
+        try:
+            file_hash = hashlib.sha256()
+            with open(target_path, "wb") as out:
+                for digest in manifest["chunks"]:
+                    found = self._find_chunk(digest)
+                    if found is None:
+                        raise ValueError(f"缺少数据块 {digest}")
+                    path, codec = found
+                    with open(path, "rb") as f:
+                        data = CODECS[codec][2](f.read())
+                    if hashlib.sha256(data).hexdigest() != digest:
+                        raise ValueError(f"数据块校验失败 {digest}")
+                    file_hash.update(data)
+                    out.write(data)
+                out.flush()
+                os.fsync(out.fileno())
+
+            if file_hash.hexdigest() != manifest["sha256"]:
+                raise ValueError("快照文件校验失败")
+            return True
+        except Exception as e:
+            print(f"还原快照失败: {str(e)}")
+            if os.path.exists(target_path):
+                os.remove(target_path)
+            return False
+
+    def delete_snapshot(self, snapshot_id: str) -> bool:
+        """
+        删除快照清单，块文件由collect_garbage统一清理
+        :param snapshot_id: 快照ID
+        :return: 是否删除成功
+        """
+        try:
+            os.remove(self._manifest_path(snapshot_id))
+            return True
+        except OSError as e:
+            print(f"删除快照失败: {str(e)}")
+            return False
+
+    def collect_garbage(self) -> int:
+        """
+        删除不再被任何快照引用的块
+        :return: 删除的块数量
+        """
+        with self._lock:
+            return self._collect_garbage()
+
+    def _collect_garbage(self) -> int:
+        """
+        按当前全部清单引用情况删除块
+        :return: 删除的块数量
+        """
+        if not os.path.exists(self.chunks_dir):
+            return 0
+
+        referenced = set()
+        for manifest in self.list_snapshots():
+            referenced.update(manifest.get("chunks", []))
+
+        removed = 0
+        for prefix in os.listdir(self.chunks_dir):
+            prefix_dir = os.path.join(self.chunks_dir, prefix)
+            for filename in os.listdir(prefix_dir):
+                digest = filename.split(".", 1)[0]
+                # 中断写入留下的临时文件同样清理
+                if digest in referenced and not filename.endswith(".tmp"):
+                    continue
+                try:
+                    os.remove(os.path.join(prefix_dir, filename))
+                    removed += 1
+                except OSError as e:
+                    print(f"删除数据块失败: {str(e)}")
+        return removed
+
+    def import_legacy_backups(self) -> List[str]:
+        """
+        将旧版本的整库备份文件（water_electricity_YYYYmmddHHMMSS.db）导入仓库
+        原文件保留不删除，已导入过的文件（按清单中的来源文件名判断）不再重复导入
+        :return: 已导入的文件名列表
+        """
+        with self._import_lock:
+            return self._import_legacy_backups()
+
+    def _import_legacy_backups(self) -> List[str]:
+        """
+        逐个导入旧版本备份文件
+        :return: 已导入的文件名列表
+        """
+        from utils.backup_utils import BackupUtils
+
+        imported = []
+        existing = {manifest.get("source") for manifest in self.list_snapshots()
+                    if manifest.get("origin") == self.ORIGIN_LEGACY}
+        for backup_file in BackupUtils.get_backup_list(self.backup_dir):
+            if backup_file in existing:
+                continue
+            backup_path = os.path.join(self.backup_dir, backup_file)
+            created = BackupUtils.get_backup_info(backup_file)
+            if not created or not BackupUtils.verify_backup(backup_path):
+                continue
+            try:
+                manifest = self.add_snapshot(backup_path, created, source=backup_file, origin=self.ORIGIN_LEGACY)
+                check_path = backup_path + ".check"
+                if not self.restore_to_file(manifest["id"], check_path):
+                    self.delete_snapshot(manifest["id"])
+                    continue
+                os.remove(check_path)
+                imported.append(backup_file)
+            except Exception as e:
+                print(f"导入旧备份失败: {str(e)}")
+        return imported
@@ -7,17 +7,28 @@
 
 import os
 import shutil
+import sqlite3
 import datetime
+import threading
+
+from utils.backup_store import BackupStore
+from utils.background import run_in_background
 
 class BackupUtils:
     """数据备份与恢复工具类"""
     
+    # 每次增量复制的页数，页面间让出数据库锁和GIL，避免长时间阻塞界面及其他连接
+    BACKUP_PAGES_PER_STEP = 1024
+    
     @staticmethod
-    def backup_database(db_path, backup_dir=None):
+    def backup_database(db_path, backup_dir=None, compact=False, progress=None):
         """
         备份数据库
+        使用SQLite在线备份接口分步复制，备份期间应用仍可读写，且能包含WAL中已提交的数据
         :param db_path: 数据库文件路径
         :param backup_dir: 备份目录，默认为当前目录下的backup文件夹
+        :param compact: 是否使用VACUUM INTO生成压缩整理后的备份
+        :param progress: 进度回调函数，参数为(已复制页数, 总页数)，在执行备份的线程中调用
         :return: 备份文件路径或None
         """
         if not os.path.exists(db_path):
@@ -34,14 +45,160 @@ class BackupUtils:
         # 生成备份文件名
         backup_filename = f"water_electricity_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.db"
         backup_path = os.path.join(backup_dir, backup_filename)
+        # 先写入临时文件，校验通过后再改名，避免留下不完整的备份
+        temp_path = backup_path + ".tmp"
+        
+        if not BackupUtils.copy_database(db_path, temp_path, compact, progress):
+            return None
         
         try:
-            # 复制数据库文件到备份目录
-            shutil.copy2(db_path, backup_path)
+            os.replace(temp_path, backup_path)
             return backup_path
+        except OSError as e:
+            print(f"备份数据库失败: {str(e)}")
+            return None
+    
+    @staticmethod
+    def copy_database(db_path, target_path, compact=False, progress=None):
+        """
+        生成数据库的一致副本并校验
+        :param db_path: 数据库文件路径
+        :param target_path: 副本文件路径，失败时删除
+        :param compact: 是否使用VACUUM INTO生成压缩整理后的副本
+        :param progress: 进度回调函数，参数为(已复制页数, 总页数)
+        :return: 是否成功
+        """
+        source = None
+        try:
+            if os.path.exists(target_path):
+                os.remove(target_path)
+            
+            source = sqlite3.connect(db_path)
+            if compact:
+                # VACUUM INTO 在一个读事务内生成整理后的副本
+                source.execute("VACUUM INTO ?", (target_path,))
+                if progress:
+                    page_count = source.execute("PRAGMA page_count").fetchone()[0]
+                    progress(page_count, page_count)
+            else:
+                target = sqlite3.connect(target_path)
+                try:
+                    def on_progress(_status, remaining, total):
+                        if progress:
+                            progress(total - remaining, total)
+                    
+                    source.backup(target, pages=BackupUtils.BACKUP_PAGES_PER_STEP,
+                                  progress=on_progress, sleep=0.005)
+                finally:
+                    target.close()
+            
+            # 校验备份副本
+            if not BackupUtils.verify_backup(target_path):
+                print(f"备份数据库失败: 备份文件校验未通过 {target_path}")
+                os.remove(target_path)
+                return False
+            return True
         except Exception as e:
             print(f"备份数据库失败: {str(e)}")
+            if os.path.exists(target_path):
+                try:
+                    os.remove(target_path)
+                except OSError:
+                    pass
+            return False
+        finally:
+            if source:
+                source.close()
+    
+    @staticmethod
+    def create_snapshot(db_path, backup_dir=None, compact=False, progress=None, origin=BackupStore.ORIGIN_MANUAL):
+        """
+        备份数据库到内容寻址备份仓库，只保存与已有快照不同的数据块
+        :param db_path: 数据库文件路径
+        :param backup_dir: 备份目录，默认为数据库所在目录下的backup文件夹
+        :param compact: 是否使用VACUUM INTO生成压缩整理后的副本
+        :param progress: 进度回调函数，参数为(已复制页数, 总页数)
+        :param origin: 快照的创建方式，自动备份为BackupStore.ORIGIN_AUTO
+        :return: 快照清单或None
+        """
+        if not os.path.exists(db_path):
             return None
+        
+        if not backup_dir:
+            backup_dir = os.path.join(os.path.dirname(db_path), "backup")
+        os.makedirs(backup_dir, exist_ok=True)
+        
+        # 在线备份得到的一致副本作为分块来源，分块完成后删除
+        temp_path = os.path.join(backup_dir, f".snapshot_{threading.get_ident()}.tmp")
+        if not BackupUtils.copy_database(db_path, temp_path, compact, progress):
+            return None
+        
+        try:
+            store = BackupStore(backup_dir)
+            manifest = store.add_snapshot(temp_path, source=os.path.basename(db_path), origin=origin)
+            # 旧版本的整库备份文件顺带导入仓库，原文件保留；导入失败不影响已写入的快照
+            try:
+                store.import_legacy_backups()
+            except Exception as e:
+                print(f"导入旧备份失败: {str(e)}")
+        except Exception as e:
+            print(f"备份数据库失败: {str(e)}")
+            return None
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return manifest
+    
+    @staticmethod
+    def backup_database_async(db_path, on_complete=None, backup_dir=None, compact=False, progress=None):
+        """
+        在后台线程中备份数据库
+        :param db_path: 数据库文件路径
+        :param on_complete: 完成回调函数，参数为备份文件路径或None
+        :param backup_dir: 备份目录
+        :param compact: 是否使用VACUUM INTO生成压缩整理后的备份
+        :param progress: 进度回调函数，参数为(已复制页数, 总页数)
+        :return: 备份线程
+        """
+        return run_in_background(
+            lambda: BackupUtils.backup_database(db_path, backup_dir, compact, progress), on_complete,
+            name="database-backup")
+    
+    @staticmethod
+    def create_snapshot_async(db_path, on_complete=None, backup_dir=None, compact=False, progress=None,
+                              origin=BackupStore.ORIGIN_MANUAL):
+        """
+        在后台线程中备份数据库到备份仓库
+        :param db_path: 数据库文件路径
+        :param on_complete: 完成回调函数，参数为快照清单或None
+        :param backup_dir: 备份目录
+        :param compact: 是否使用VACUUM INTO生成压缩整理后的副本
+        :param progress: 进度回调函数，参数为(已复制页数, 总页数)
+        :param origin: 快照的创建方式
+        :return: 备份线程
+        """
+        return run_in_background(
+            lambda: BackupUtils.create_snapshot(db_path, backup_dir, compact, progress, origin), on_complete,
+            name="database-backup")
+    
+    @staticmethod
+    def verify_backup(backup_path):
+        """
+        校验备份文件的完整性
+        :param backup_path: 备份文件路径
+        :return: 是否校验通过
+        """
+        conn = None
+        try:
+            conn = sqlite3.connect(backup_path)
+            result = conn.execute("PRAGMA quick_check").fetchone()
+            return bool(result) and result[0] == "ok"
+        except Exception as e:
+            print(f"校验备份文件失败: {str(e)}")
+            return False
+        finally:
+            if conn:
+                conn.close()
     
     @staticmethod
     def restore_database(backup_path, target_db_path):
@@ -54,12 +211,66 @@ class BackupUtils:
         if not os.path.exists(backup_path):
             return False
         
+        temp_path = target_db_path + ".restore"
+        try:
+            shutil.copy2(backup_path, temp_path)
+        except Exception as e:
+            print(f"恢复数据库失败: {str(e)}")
+            return False
+        return BackupUtils.replace_database(temp_path, target_db_path)
+    
+    @staticmethod
+    def restore_snapshot(snapshot_id, target_db_path, backup_dir=None):
+        """
+        从备份仓库的快照恢复数据库
+        :param snapshot_id: 快照ID
+        :param target_db_path: 目标数据库路径
+        :param backup_dir: 备份目录，默认为数据库所在目录下的backup文件夹
+        :return: 是否恢复成功
+        """
+        if not backup_dir:
+            backup_dir = os.path.join(os.path.dirname(target_db_path), "backup")
+        
+        # 先还原到目标旁边的临时文件，逐块校验通过后再替换
+        temp_path = target_db_path + ".restore"
+        if not BackupStore(backup_dir).restore_to_file(snapshot_id, temp_path):
+            return False
+        return BackupUtils.replace_database(temp_path, target_db_path)
+    
+    @staticmethod
+    def replace_database(new_db_path, target_db_path):
+        """
+        用已准备好的数据库文件替换当前数据库
+        关闭所有连接后通过改名原子替换，再重新建立当前线程的连接
+        :param new_db_path: 新数据库文件路径，需与目标位于同一文件系统
+        :param target_db_path: 目标数据库路径
+        :return: 是否替换成功
+        """
+        from database.db_manager import get_db, close_all_connections
+        
         try:
-            # 复制备份文件到目标路径
-            shutil.copy2(backup_path, target_db_path)
+            if not BackupUtils.verify_backup(new_db_path):
+                print(f"恢复数据库失败: 备份文件校验未通过 {new_db_path}")
+                os.remove(new_db_path)
+                return False
+            
+            close_all_connections()
+            
+            # 旧数据库的WAL和共享内存文件不能应用到新数据库上
+            for suffix in ("-wal", "-shm", "-journal"):
+                if os.path.exists(target_db_path + suffix):
+                    os.remove(target_db_path + suffix)
+            
+            os.replace(new_db_path, target_db_path)
+            get_db()
             return True
         except Exception as e:
             print(f"恢复数据库失败: {str(e)}")
+            if os.path.exists(new_db_path):
+                try:
+                    os.remove(new_db_path)
+                except OSError:
+                    pass
             return False
     
     @staticmethod
@@ -80,6 +291,47 @@ class BackupUtils:
         
         return backup_files
     
+    @staticmethod
+    def apply_retention(backup_dir, keep_daily=7, keep_monthly=12):
+        """
+        按保留策略清理备份仓库中自动备份的旧快照
+        在自动备份的快照中保留最近keep_daily天每天最新的一份，以及最近keep_monthly个月每月最新的一份；
+        手动备份、导入的旧版本备份和没有记录创建方式的快照不会被删除
+        :param backup_dir: 备份目录
+        :param keep_daily: 按天保留的份数
+        :param keep_monthly: 按月保留的份数
+        :return: 已删除的快照ID列表
+        """
+        store = BackupStore(backup_dir)
+        daily_seen = set()
+        monthly_seen = set()
+        deleted = []
+        
+        # 快照列表已按时间倒序排列，每天/每月遇到的第一份即为最新的一份
+        for manifest in store.list_snapshots():
+            if manifest.get("origin") != BackupStore.ORIGIN_AUTO:
+                continue
+            created = manifest.get("created", "")
+            day, month = created[:10], created[:7]
+            keep = False
+            
+            if day not in daily_seen and len(daily_seen) < keep_daily:
+                daily_seen.add(day)
+                keep = True
+            
+            if month not in monthly_seen and len(monthly_seen) < keep_monthly:
+                monthly_seen.add(month)
+                keep = True
+            
+            if not keep and store.delete_snapshot(manifest["id"]):
+                deleted.append(manifest["id"])
+        
+        # 删除不再被引用的数据块
+        if deleted:
+            store.collect_garbage()
+        
+        return deleted
+    
     @staticmethod
     def get_backup_info(backup_file):
         """
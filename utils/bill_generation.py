@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+月末账单批量生成模块
+一次读取指定月份全部租户的费用和收费记录，为每个租户生成一页缴费通知单（含本月收费记录），
+每个租户一个PDF文件时使用进程池在多个CPU核心上并行生成，也可合并为一个PDF文件。
+不依赖界面，收费管理界面和命令行工具共用
+"""
+
+import os
+import re
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from models.charge import Charge
+from models.payment import Payment
+from utils import pdf_render
+from utils.background import run_in_background
+
+# 每页最多列出的收费记录条数，超出部分合并为一行说明
+MAX_PAYMENT_LINES = 12
+# 每个进程任务生成的账单数，任务过小时进程间传输开销占比高，过大时进度和取消不及时
+CHUNK_BILLS = 40
+
+# 账单页面布局
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 50
+BILL_TITLE = "水电费缴费通知单"
+BILL_FOOTER = "请于收到本通知后及时缴纳费用，如有疑问请与管理处联系。本通知单由系统生成，与纸质通知单具有同等效力。"
+# 租户信息标签：(x, y, 标签)，数据紧接在标签之后
+TENANT_LABELS = [
+    (MARGIN, PAGE_HEIGHT - 115, "租户名称: "),
+    (PAGE_WIDTH / 2, PAGE_HEIGHT - 115, "租户类型: "),
+    (MARGIN, PAGE_HEIGHT - 135, "联系人: "),
+    (PAGE_WIDTH / 2, PAGE_HEIGHT - 135, "电话: "),
+    (MARGIN, PAGE_HEIGHT - 155, "地址: "),
+]
+# 费用明细表头基线和各列位置
+TABLE_TOP = PAGE_HEIGHT - 190
+TABLE_COLUMNS = [MARGIN, MARGIN + 120, MARGIN + 240, MARGIN + 360]
+# 本月收费记录标题基线
+PAYMENTS_TOP = TABLE_TOP - 107
+
+
+def _safe_filename(name: str) -> str:
+    """
+    去掉文件名中不允许的字符
+    :param name: 原名称
+    :return: 可用作文件名的名称
+    """
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", name).strip("_") or "未命名"
+
+
+def load_month_bills(month: str, tenant_ids: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+    """
+    一次读取指定月份全部费用和收费记录，组装为账单数据
+    账单只包含基本类型，可直接传给工作进程
+    :param month: 月份（如2023-05）
+    :param tenant_ids: 只生成指定租户的账单，为None时生成全部租户
+    :return: 账单列表，按租户名称排序
+    """
+    charges = Charge.get_by_month(month)
+    if tenant_ids is not None:
+        wanted = set(tenant_ids)
+        charges = [charge for charge in charges if charge.tenant_id in wanted]
+
+    payments_by_charge: Dict[int, List[Dict[str, Any]]] = {}
+    for payment in Payment.get_by_month(month):
+        payments_by_charge.setdefault(payment.charge_id, []).append({
+            'payment_id': payment.id,
+            'payment_date': payment.payment_date,
+            'amount': payment.amount,
+            'payment_method': payment.payment_method,
+            'payer': payment.payer,
+        })
+
+    bills = []
+    for charge in charges:
+        tenant = charge.tenant
+        payments = sorted(payments_by_charge.get(charge.id, []), key=lambda p: (p['payment_date'], p['payment_id']))
+        received = round(sum(p['amount'] for p in payments), 2)
+        bills.append({
+            'charge_id': charge.id,
+            'tenant_id': charge.tenant_id,
+            'tenant_name': tenant.name if tenant else "未知租户",
+            'tenant_type': tenant.type if tenant else "",
+            'contact_person': tenant.contact_person if tenant else "",
+            'phone': tenant.phone if tenant else "",
+            'address': tenant.address if tenant else "",
+            'month': charge.month,
+            'water_usage': charge.water_usage,
+            'water_price': charge.water_price,
+            'water_charge': charge.water_charge,
+            'electricity_usage': charge.electricity_usage,
+            'electricity_price': charge.electricity_price,
+            'electricity_charge': charge.electricity_charge,
+            'total_charge': charge.total_charge,
+            'received': received,
+            'arrears': round(max(charge.total_charge - received, 0), 2),
+            'status': charge.status,
+            'payments': payments,
+        })
+    bills.sort(key=lambda bill: (bill['tenant_name'], bill['tenant_id']))
+    return bills
+
+
+def bill_filename(bill: Dict[str, Any]) -> str:
+    """
+    单个租户账单的文件名，包含租户ID避免同名租户互相覆盖
+    :param bill: 账单
+    :return: 文件名
+    """
+    return f"账单_{bill['month']}_{bill['tenant_id']}_{_safe_filename(bill['tenant_name'])}.pdf"
+
+
+def bill_template(font: str, printed_at: str, reuse: bool = True) -> pdf_render.PageTemplate:
+    """
+    账单页面模板：标题、标签、表头、分隔线和页脚等每张账单相同的内容，合并生成时整个文件只绘制一次
+    :param font: 中文字体名称
+    :param printed_at: 打印时间
+    :param reuse: 是否定义为表单对象，文件只有一张账单时直接绘制
+    :return: 页面模板
+    """
+    bold = pdf_render.bold_font(font)
+
+    def draw(c):
+        c.setFont(bold, 18)
+        c.drawString((PAGE_WIDTH - c.stringWidth(BILL_TITLE, bold, 18)) / 2, PAGE_HEIGHT - 60, BILL_TITLE)
+
+        c.setFont(font, 10)
+        c.drawString(MARGIN, PAGE_HEIGHT - 85, "费用月份: ")
+        c.drawRightString(PAGE_WIDTH - MARGIN, PAGE_HEIGHT - 85, f"打印时间: {printed_at}")
+        c.line(MARGIN, PAGE_HEIGHT - 92, PAGE_WIDTH - MARGIN, PAGE_HEIGHT - 92)
+
+        # 租户信息
+        c.setFont(font, 11)
+        for x, y, label in TENANT_LABELS:
+            c.drawString(x, y, label)
+
+        # 费用明细表头和项目
+        c.setFont(bold, 11)
+        for x, text in zip(TABLE_COLUMNS, ["项目", "用量", "单价(元)", "金额(元)"]):
+            c.drawString(x, TABLE_TOP, text)
+        c.line(MARGIN, TABLE_TOP - 6, PAGE_WIDTH - MARGIN, TABLE_TOP - 6)
+        c.setFont(font, 11)
+        c.drawString(TABLE_COLUMNS[0], TABLE_TOP - 22, "水费")
+        c.drawString(TABLE_COLUMNS[0], TABLE_TOP - 44, "电费")
+        c.line(MARGIN, TABLE_TOP - 54, PAGE_WIDTH - MARGIN, TABLE_TOP - 54)
+        c.setFont(bold, 11)
+        c.drawString(TABLE_COLUMNS[0], TABLE_TOP - 72, "合计")
+
+        # 本月收费记录
+        c.drawString(MARGIN, PAYMENTS_TOP, "本月收费记录")
+
+        c.setFont(font, 9)
+        c.drawString(MARGIN, MARGIN, BILL_FOOTER)
+
+    return pdf_render.PageTemplate("bill_page", draw, reuse=reuse)
+
+
+def draw_bill(c, bill: Dict[str, Any], font: str, template: pdf_render.PageTemplate) -> None:
+    """
+    在当前页绘制一张缴费通知单，不换页；固定内容引用页面模板，这里只绘制账单数据
+    :param c: reportlab Canvas对象
+    :param bill: 账单
+    :param font: 中文字体名称，粗体为 字体名-Bold
+    :param template: bill_template创建的页面模板
+    """
+    bold = pdf_render.bold_font(font)
+    template.draw_on(c)
+
+    c.setFont(font, 10)
+    c.drawString(MARGIN + c.stringWidth("费用月份: ", font, 10), PAGE_HEIGHT - 85, bill['month'])
+
+    # 租户信息
+    c.setFont(font, 11)
+    values = [bill['tenant_name'], bill['tenant_type'], bill['contact_person'], bill['phone'], bill['address']]
+    for (x, y, label), value in zip(TENANT_LABELS, values):
+        c.drawString(x + c.stringWidth(label, font, 11), y, value or "")
+
+    # 费用明细
+    for y, usage, price, amount in (
+        (TABLE_TOP - 22, bill['water_usage'], bill['water_price'], bill['water_charge']),
+        (TABLE_TOP - 44, bill['electricity_usage'], bill['electricity_price'], bill['electricity_charge']),
+    ):
+        c.drawString(TABLE_COLUMNS[1], y, f"{usage:.2f}")
+        c.drawString(TABLE_COLUMNS[2], y, f"{price:.2f}")
+        c.drawString(TABLE_COLUMNS[3], y, f"{amount:.2f}")
+    c.setFont(bold, 11)
+    c.drawString(TABLE_COLUMNS[3], TABLE_TOP - 72, f"{bill['total_charge']:.2f}")
+
+    # 本月收费记录
+    y = PAYMENTS_TOP - 20
+    c.setFont(font, 10)
+    payments = bill['payments']
+    if not payments:
+        c.drawString(MARGIN, y, "无")
+        y -= 18
+    for payment in payments[:MAX_PAYMENT_LINES]:
+        c.drawString(MARGIN, y, payment['payment_date'])
+        c.drawString(MARGIN + 100, y, f"{payment['amount']:.2f} 元")
+        c.drawString(MARGIN + 200, y, payment['payment_method'] or "")
+        c.drawString(MARGIN + 300, y, f"收款人: {payment['payer'] or ''}")
+        c.drawString(MARGIN + 420, y, f"凭证编号: {payment['payment_id']}")
+        y -= 18
+    if len(payments) > MAX_PAYMENT_LINES:
+        c.drawString(MARGIN, y, f"另有 {len(payments) - MAX_PAYMENT_LINES} 笔收费记录未列出")
+        y -= 18
+
+    # 结算，位置随收费记录条数变化，不放入模板
+    y -= 20
+    c.line(MARGIN, y, PAGE_WIDTH - MARGIN, y)
+    y -= 25
+    c.setFont(bold, 12)
+    c.drawString(MARGIN, y, f"应收: {bill['total_charge']:.2f} 元")
+    c.drawString(MARGIN + 160, y, f"已收: {bill['received']:.2f} 元")
+    c.drawString(MARGIN + 320, y, f"欠费: {bill['arrears']:.2f} 元")
+    y -= 22
+    c.setFont(font, 11)
+    c.drawString(MARGIN, y, f"状态: {bill['status']}")
+
+
+def write_bills_pdf(file_path: str, bills: Sequence[Dict[str, Any]], printed_at: str,
+                    on_page: Optional[Callable[[], bool]] = None) -> int:
+    """
+    将多张账单写入同一个PDF文件，每张一页
+    :param file_path: 输出文件路径
+    :param bills: 账单列表
+    :param printed_at: 打印时间
+    :param on_page: 每页完成后调用，返回False时停止生成
+    :return: 写入的页数
+    """
+    font = pdf_render.get_chinese_font()
+    template = bill_template(font, printed_at, reuse=len(bills) > 1)
+    c = canvas.Canvas(file_path, pagesize=A4)
+    pages = 0
+    for bill in bills:
+        draw_bill(c, bill, font, template)
+        c.showPage()
+        pages += 1
+        if on_page and on_page() is False:
+            break
+    c.save()
+    return pages
+
+
+def _init_worker() -> None:
+    """
+    工作进程初始化，注册一次中文字体，之后该进程生成的所有账单共用
+    命令行中按Ctrl+C时由主进程处理取消，工作进程忽略中断信号
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    pdf_render.get_chinese_font()
+
+
+def _render_chunk(output_dir: str, bills: Sequence[Dict[str, Any]], printed_at: str) -> List[str]:
+    """
+    工作进程任务：为每个租户生成一个PDF文件
+    :param output_dir: 输出目录
+    :param bills: 账单列表
+    :param printed_at: 打印时间
+    :return: 生成的文件路径列表
+    """
+    files = []
+    for bill in bills:
+        file_path = os.path.join(output_dir, bill_filename(bill))
+        write_bills_pdf(file_path, [bill], printed_at)
+        files.append(file_path)
+    return files
+
+
+def generate_bills(month: str, output_dir: str, merged: bool = False, tenant_ids: Optional[Sequence[int]] = None,
+                   workers: Optional[int] = None, progress: Optional[Callable[[int, int], None]] = None,
+                   cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """
+    批量生成指定月份的账单
+    :param month: 月份（如2023-05）
+    :param output_dir: 输出目录，不存在时自动创建
+    :param merged: 为True时全部账单写入一个PDF文件，否则每个租户一个文件并使用进程池并行生成
+    :param tenant_ids: 只生成指定租户的账单，为None时生成全部租户
+    :param workers: 进程数，默认为CPU核心数
+    :param progress: 进度回调，参数为(已生成数, 总数)
+    :param cancel_event: 取消事件，设置后不再开始新的任务，已开始的任务完成后返回
+    :return: 结果字典，键total为账单数，done为已生成数，files为生成的文件列表，cancelled为是否已取消，
+             errors为失败原因列表
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    bills = load_month_bills(month, tenant_ids)
+    total = len(bills)
+    printed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    result = {'total': total, 'done': 0, 'files': [], 'cancelled': False, 'errors': []}
+    if not bills:
+        return result
+
+    if merged:
+        # reportlab不能合并已生成的PDF，合并文件在当前进程逐页生成
+        file_path = os.path.join(output_dir, f"账单_{month}.pdf")
+
+        def on_page():
+            result['done'] += 1
+            # 与并行生成时相同，每完成一组报告一次进度
+            if progress and (result['done'] % CHUNK_BILLS == 0 or result['done'] == total):
+                progress(result['done'], total)
+            if cancel_event is not None and cancel_event.is_set():
+                result['cancelled'] = True
+                return False
+            return True
+
+        try:
+            write_bills_pdf(file_path, bills, printed_at, on_page)
+            result['files'].append(file_path)
+        except Exception as e:
+            result['errors'].append(str(e))
+        return result
+
+    chunks = [bills[start:start + CHUNK_BILLS] for start in range(0, total, CHUNK_BILLS)]
+    futures: Dict[Any, int] = {}
+    pending = set()
+
+    def collect(future):
+        pending.discard(future)
+        try:
+            result['files'].extend(future.result())
+            result['done'] += futures[future]
+        except Exception as e:
+            result['errors'].append(str(e))
+
+    executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init_worker)
+    try:
+        for chunk in chunks:
+            futures[executor.submit(_render_chunk, output_dir, chunk, printed_at)] = len(chunk)
+        pending.update(futures)
+        for future in as_completed(futures):
+            collect(future)
+            if progress:
+                progress(result['done'], total)
+            if cancel_event is not None and cancel_event.is_set():
+                result['cancelled'] = True
+                break
+    except KeyboardInterrupt:
+        result['cancelled'] = True
+    finally:
+        # 取消时丢弃尚未开始的任务，等待已开始的任务完成
+        executor.shutdown(wait=True, cancel_futures=result['cancelled'])
+    # 取消前已开始的任务生成的文件同样计入结果
+    for future in list(pending):
+        if future.done() and not future.cancelled():
+            collect(future)
+    result['files'].sort()
+    return result
+
+
+def generate_bills_async(month: str, output_dir: str, merged: bool = False, on_complete=None, progress=None,
+                         cancel_event: Optional[threading.Event] = None):
+    """
+    在后台线程中批量生成账单，界面通过after()轮询进度
+    :param month: 月份
+    :param output_dir: 输出目录
+    :param merged: 是否合并为一个PDF文件
+    :param on_complete: 完成回调函数，参数为generate_bills的结果，出错时为包含errors的结果
+    :param progress: 进度回调，参数为(已生成数, 总数)
+    :param cancel_event: 取消事件
+    :return: 后台线程
+    """
+    def task():
+        try:
+            return generate_bills(month, output_dir, merged, progress=progress, cancel_event=cancel_event)
+        except Exception as e:
+            return {'total': 0, 'done': 0, 'files': [], 'cancelled': False, 'errors': [str(e)]}
+
+    return run_in_background(task, on_complete, name="bill-generation")
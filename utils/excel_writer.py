@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel流式导出模块
+各界面导出Excel共用的写入器：使用只写模式的工作簿逐行写入，单元格样式使用工作簿内预先注册的命名样式，
+列宽根据表头和前若干行数据计算，导出大量数据时内存占用不随行数增长
+"""
+
+import unicodedata
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+_THIN_BORDER = Border(left=Side(style="thin"), right=Side(style="thin"),
+                      top=Side(style="thin"), bottom=Side(style="thin"))
+
+# 命名样式定义：样式名 -> NamedStyle参数，每个工作簿注册一次，单元格只引用样式名
+NAMED_STYLES: Dict[str, Dict[str, Any]] = {
+    # 报表大标题
+    "title": {"font": Font(bold=True, size=16), "alignment": Alignment(horizontal="center", vertical="center")},
+    # 带底色和边框的表格标题，如收费表
+    "boxed_title": {
+        "font": Font(bold=True, size=14),
+        "alignment": Alignment(horizontal="center", vertical="center"),
+        "fill": PatternFill(start_color="F0F0F0", end_color="F0F0F0", fill_type="solid"),
+        "border": _THIN_BORDER,
+    },
+    # 标题下方的说明文字，如生成时间
+    "note": {"font": Font(size=10, italic=True)},
+    # 表头
+    "header": {"font": Font(bold=True, size=12), "alignment": Alignment(horizontal="center")},
+    # 带底色和边框的表头
+    "boxed_header": {
+        "font": Font(bold=True, size=11),
+        "alignment": Alignment(horizontal="center", vertical="center"),
+        "fill": PatternFill(start_color="E0E0E0", end_color="E0E0E0", fill_type="solid"),
+        "border": _THIN_BORDER,
+    },
+    # 带边框的数据单元格
+    "boxed_cell": {
+        "font": Font(size=11),
+        "alignment": Alignment(horizontal="left", vertical="center"),
+        "border": _THIN_BORDER,
+    },
+    "boxed_center": {"alignment": Alignment(horizontal="center", vertical="center"), "border": _THIN_BORDER},
+    "boxed_amount": {
+        "font": Font(size=11),
+        "alignment": Alignment(horizontal="right", vertical="center"),
+        "border": _THIN_BORDER,
+    },
+    # 收费表的用水、用电信息列
+    "water_amount": {
+        "font": Font(size=11),
+        "alignment": Alignment(horizontal="right", vertical="center"),
+        "fill": PatternFill(start_color="E6F3FF", end_color="E6F3FF", fill_type="solid"),
+        "border": _THIN_BORDER,
+    },
+    "electricity_amount": {
+        "font": Font(size=11),
+        "alignment": Alignment(horizontal="right", vertical="center"),
+        "fill": PatternFill(start_color="FFF2E6", end_color="FFF2E6", fill_type="solid"),
+        "border": _THIN_BORDER,
+    },
+    # 合计行
+    "total": {"font": Font(bold=True)},
+    "boxed_bold": {"font": Font(bold=True), "border": _THIN_BORDER},
+    "boxed_total": {
+        "font": Font(bold=True, size=14),
+        "alignment": Alignment(horizontal="center", vertical="center"),
+        "fill": PatternFill(start_color="E0E0E0", end_color="E0E0E0", fill_type="solid"),
+        "border": _THIN_BORDER,
+    },
+    "boxed_total_amount": {
+        "font": Font(bold=True, size=14),
+        "alignment": Alignment(horizontal="right", vertical="center"),
+        "fill": PatternFill(start_color="E0E0E0", end_color="E0E0E0", fill_type="solid"),
+        "border": _THIN_BORDER,
+    },
+}
+
+# 计算列宽时读取的数据行数
+SAMPLE_ROWS = 200
+
+# 行样式：None表示不设样式，字符串表示整行使用同一样式，列表按列指定样式
+RowStyle = Optional[Union[str, Sequence[Optional[str]]]]
+
+
+def text_width(value: Any) -> int:
+    """
+    计算单元格内容的显示宽度，中文等全角字符按两个字符计算
+    :param value: 单元格值
+    :return: 显示宽度
+    """
+    if value is None:
+        return 0
+    text = str(value)
+    # 公式的显示内容与公式文本无关，不参与列宽计算
+    if text.startswith("="):
+        return 0
+    return sum(2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1 for ch in text)
+
+
+class StreamingSheet:
+    """
+    只写模式的工作表
+    只写模式下列宽必须在写入第一行之前设置，因此写入stream之前追加的行先缓存，
+    在stream取样计算列宽后（或保存时）一并写入
+    """
+
+    def __init__(self, worksheet, max_width: int = 50):
+        """
+        :param worksheet: 只写模式的工作表
+        :param max_width: 自动计算时的最大列宽
+        """
+        self.worksheet = worksheet
+        self.max_width = max_width
+        self.row_count = 0
+        self._pending: List[tuple] = []
+        self._widths: Optional[Dict[str, float]] = None
+
+    def set_column_widths(self, widths: Union[Dict[str, float], Sequence[float]]):
+        """
+        指定列宽，指定后不再自动计算，需在写入第一行之前调用
+        :param widths: 列字母到宽度的映射，或按列顺序排列的宽度列表
+        """
+        if not isinstance(widths, dict):
+            widths = {get_column_letter(col_idx): width for col_idx, width in enumerate(widths, 1)}
+        self._apply_widths(dict(widths))
+
+    def hide_columns(self, *letters: str):
+        """
+        隐藏列，需在写入数据之前调用
+        :param letters: 列字母
+        """
+        for letter in letters:
+            self.worksheet.column_dimensions[letter].hidden = True
+
+    def append(self, values: Sequence[Any], style: RowStyle = None, merge_to: Optional[int] = None,
+               fit: bool = True):
+        """
+        追加一行
+        :param values: 单元格值
+        :param style: 行样式
+        :param merge_to: 从第一列合并到的列号，如标题行
+        :param fit: 是否参与列宽计算，合并的标题行通常不参与
+        """
+        self._pending.append((list(values), style, merge_to, fit and merge_to is None))
+        if self._widths is not None:
+            self.flush()
+
+    def stream(self, rows: Iterable[Sequence[Any]], style: RowStyle = None,
+               sample_size: int = SAMPLE_ROWS) -> int:
+        """
+        逐行写入数据，先读取前sample_size行计算列宽，其余行读取后直接写入，不在内存中保留
+        :param rows: 行迭代器，如数据库游标
+        :param style: 行样式
+        :param sample_size: 计算列宽读取的行数
+        :return: 写入的行数
+        """
+        rows = iter(rows)
+        sample = [list(values) for values in islice(rows, sample_size)]
+        self._pending.extend((values, style, None, True) for values in sample)
+        self.flush()
+        count = len(sample)
+        for values in rows:
+            self._write(values, style)
+            count += 1
+        return count
+
+    def flush(self):
+        """
+        按已缓存的行计算列宽并写入缓存的行，保存工作簿前自动调用
+        """
+        if self._widths is None:
+            widths = {}
+            for values, _, _, fit in self._pending:
+                if not fit:
+                    continue
+                for col_idx, value in enumerate(values, 1):
+                    widths[col_idx] = max(widths.get(col_idx, 0), text_width(value))
+            self._apply_widths({get_column_letter(col_idx): min(width + 2, self.max_width)
+                                for col_idx, width in widths.items()})
+        pending, self._pending = self._pending, []
+        for values, style, merge_to, _ in pending:
+            self._write(values, style, merge_to)
+
+    def _apply_widths(self, widths: Dict[str, float]):
+        """
+        设置列宽
+        :param widths: 列字母到宽度的映射
+        """
+        for letter, width in widths.items():
+            self.worksheet.column_dimensions[letter].width = width
+        self._widths = widths
+
+    def _write(self, values: Sequence[Any], style: RowStyle = None, merge_to: Optional[int] = None):
+        """
+        写入一行，设置了样式的单元格使用命名样式
+        :param values: 单元格值
+        :param style: 行样式
+        :param merge_to: 从第一列合并到的列号
+        """
+        if style is None:
+            self.worksheet.append(list(values))
+        else:
+            cells = []
+            for col_idx, value in enumerate(values):
+                cell_style = style if isinstance(style, str) else (style[col_idx] if col_idx < len(style) else None)
+                if cell_style is None:
+                    cells.append(value)
+                    continue
+                cell = WriteOnlyCell(self.worksheet, value)
+                cell.style = cell_style
+                cells.append(cell)
+            self.worksheet.append(cells)
+        self.row_count += 1
+        if merge_to:
+            self.worksheet.merged_cells.add(f"A{self.row_count}:{get_column_letter(merge_to)}{self.row_count}")
+
+
+class ExcelExportWriter:
+    """Excel流式导出写入器"""
+
+    def __init__(self, max_width: int = 50):
+        """
+        创建只写模式的工作簿并注册全部命名样式
+        :param max_width: 自动计算时的最大列宽
+        """
+        self.workbook = Workbook(write_only=True)
+        self.max_width = max_width
+        self.sheets: List[StreamingSheet] = []
+        for name, options in NAMED_STYLES.items():
+            self.workbook.add_named_style(NamedStyle(name=name, **options))
+
+    def create_sheet(self, title: str, max_width: Optional[int] = None) -> StreamingSheet:
+        """
+        新建工作表
+        :param title: 工作表名称
+        :param max_width: 该表自动计算时的最大列宽，默认使用写入器的设置
+        :return: 工作表
+        """
+        sheet = StreamingSheet(self.workbook.create_sheet(title=title),
+                               self.max_width if max_width is None else max_width)
+        self.sheets.append(sheet)
+        return sheet
+
+    def save(self, file_path: str):
+        """
+        写入尚未写出的行并保存工作簿，只写模式的工作簿只能保存一次
+        :param file_path: 文件路径
+        """
+        for sheet in self.sheets:
+            sheet.flush()
+        self.workbook.save(file_path)
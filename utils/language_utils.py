@@ -5,7 +5,13 @@
 负责管理应用的多语言支持
 """
 
-from typing import Dict, List, Callable, Any
+import logging
+from typing import Dict, List, Callable, Any, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# 绑定文本来源：翻译键，或接收get_text返回文本的函数
+TextSource = Union[str, Callable[[Callable[[str], str]], str]]
 
 class LanguageUtils:
     """语言资源管理类"""
@@ -20,6 +26,9 @@ class LanguageUtils:
         self._init_language_resources()
         # 初始化语言变化事件订阅者列表
         self._subscribers: List[Callable[[str], None]] = []
+        # 控件翻译绑定表：(绑定类型, 控件路径, 槽位) -> (控件, 槽位, 文本来源或回调)
+        self._bindings: Dict[Tuple[str, str, str], Tuple[Any, Any, Any]] = {}
+        self._bindings_pruned_size: int = 0
     
     def _init_language_resources(self) -> None:
         """
@@ -173,6 +182,9 @@ class LanguageUtils:
                 # 系统设置相关
                 'system_backup_success': '数据库备份成功！\n备份文件路径：\n{0}',
                 'system_backup_fail': '数据库备份失败！',
+                'system_snapshot_success': '数据库备份成功！\n快照编号：{0}\n本次新增存储：{1:.2f} MB',
+                'system_backup_running': '正在备份数据库... {0}%',
+                'system_backup_in_progress': '数据库备份正在进行中，请稍候！',
                 'system_no_backup_dir': '没有找到备份目录！',
                 'system_no_backup_files': '没有找到备份文件！',
                 'system_select_backup_file': '请选择要恢复的备份文件！',
@@ -466,6 +478,32 @@ class LanguageUtils:
                 'price_cannot_be_negative': '单价不能为负数',
                 'price_cannot_be_zero': '单价不能为零',
                 'price_must_be_valid_number': '单价必须是有效的数字',
+                'menu_price_simulation': '价格模拟',
+                'form_title_price_simulation': '价格模拟',
+                'simulation_start_month': '开始月份',
+                'simulation_end_month': '结束月份',
+                'simulation_month_format_error': '月份格式不正确，应为YYYY-MM',
+                'simulation_scenarios': '候选价格方案',
+                'simulation_scenario': '方案',
+                'simulation_scenario_name': '方案名称',
+                'simulation_prices': '候选价格',
+                'simulation_add_scenario': '添加方案',
+                'simulation_remove_scenario': '删除方案',
+                'simulation_run': '开始模拟',
+                'simulation_price_hint': '格式：资源类型[:租户类型]=单价，多项用逗号分隔，如 水=4, 电:门面=1.1；未列出的按实际金额计。当前价格：{0}',
+                'simulation_price_format_error': '候选价格格式不正确，应为 资源类型[:租户类型]=单价，如 水=4, 电:门面=1.1',
+                'simulation_no_scenario': '请先添加候选价格方案',
+                'simulation_data_loaded': '已读取 {0} 个月、{1} 条费用记录',
+                'simulation_baseline': '实际收入',
+                'simulation_simulated': '模拟收入',
+                'simulation_delta': '差额',
+                'simulation_total': '合计',
+                'rebill_title': '重新计算费用',
+                'rebill_prompt': '价格已变更，{0}至{1}的已有费用可能受影响。\n是否在后台按更正后的价格重新计算这些费用？\n（收费记录不变，状态按已收金额重新确定）',
+                'rebill_in_progress': '费用重新计算正在进行中，请稍候',
+                'rebill_completed': '费用重新计算完成！\n重新计算：{0}条\n有变化：{1}条\n差异报告：{2}',
+                'rebill_failed_months': '以下月份写入失败，已回滚：{0}',
+                'rebill_fail': '重新计算费用失败',
                 'please_enter_effective_start_date': '请输入生效开始日期',
                 'effective_start_date_format_error': '生效开始日期格式不正确',
                 'correct_format': '正确格式',
@@ -526,6 +564,8 @@ class LanguageUtils:
                 'delete_completed': '删除完成',
                 'successfully_deleted': '成功删除',
                 'charge_calculation_completed': '费用计算完成',
+                'incremental_calculation': '仅重算有变化的租户',
+                'skipped_unchanged': '无变化跳过',
                 'new_added': '新增',
                 'updated': '更新',
                 'households': '户',
@@ -576,6 +616,15 @@ class LanguageUtils:
                 'menu_payment_entry': '收费录入',
                 'menu_settlement': '费用结算',
                 'menu_monthly_report': '报表中心',
+                'menu_raw_data_export': '原始数据导出',
+                'raw_export_from_month': '开始月份（YYYY-MM，留空不限）：',
+                'raw_export_to_month': '结束月份（YYYY-MM，留空不限）：',
+                'raw_export_format_hint': '已安装pyarrow时导出Parquet，否则导出gzip压缩的CSV，并生成记录行数和校验值的清单文件',
+                'raw_export_start': '选择目录并导出',
+                'raw_export_invalid_month': '月份格式不正确，应为YYYY-MM',
+                'raw_export_running': '正在导出{0}... 已导出 {1} 行',
+                'raw_export_success': '原始数据已导出到：\n{0}\n\n{1}',
+                'raw_export_fail': '原始数据导出失败：{0}',
                 'menu_data_backup': '数据备份',
                 'menu_data_restore': '数据恢复',
                 'menu_data_initialization': '数据初始化',
@@ -610,6 +659,9 @@ class LanguageUtils:
                 'querying': '查询中',
                 'filename': '文件名',
                 'unknown_date': '未知日期',
+                'snapshot_id': '快照编号',
+                'snapshot_source': '来源',
+                'snapshot_size': '大小 (MB)',
                 'button_restore': '恢复',
                 'unknown_tenant': '未知租户',
                 'menu_user_management': '用户管理',
@@ -617,6 +669,25 @@ class LanguageUtils:
                 'select_all': '全选',
                 'import_to_payment': '导入到收费',
                 'please_select_records_to_import': '请先选择要导入的记录',
+                'lump_sum_payment': '一次性收费',
+                'import_bank_statement': '导入银行流水',
+                'lump_sum_preview': '预览分摊',
+                'lump_sum_confirm': '确认收费',
+                'lump_sum_hint': '款项按月份从早到晚分摊到未结清的费用',
+                'lump_sum_no_open_charges': '该租户没有未结清的费用',
+                'lump_sum_unallocated': '余额{0:.2f}元没有可分摊的费用',
+                'lump_sum_completed': '已生成收费记录{0}条，分摊金额{1:.2f}元',
+                'lump_sum_fail': '分摊收费失败',
+                'bank_statement_completed': '流水{0}行，分摊{1}笔共{2:.2f}元，失败{3}行',
+                'generate_month_bills': '批量生成账单',
+                'bills_merge_into_one': '合并为一个PDF文件',
+                'bills_generate_start': '开始生成',
+                'bills_loading': '正在读取费用和收费记录...',
+                'bills_generating': '正在生成账单 {0}/{1}',
+                'bills_no_charges': '该月份没有费用记录',
+                'bills_generate_success': '已生成账单{0}张，保存在: {1}',
+                'bills_generate_cancelled': '已取消，共{1}张，已生成{0}张',
+                'bills_generate_fail': '生成账单失败: {0}',
                 'payment_records': '欠费记录数',
                 'records': '条记录',
                 'refreshed': '已刷新',
@@ -924,6 +995,9 @@ class LanguageUtils:
                 'system_configuration': 'System Configuration',
                 'system_backup_success': 'Database backup successful!\nBackup file path:\n{0}',
                 'system_backup_fail': 'Database backup failed!',
+                'system_snapshot_success': 'Database backup successful!\nSnapshot ID: {0}\nNew storage used: {1:.2f} MB',
+                'system_backup_running': 'Backing up database... {0}%',
+                'system_backup_in_progress': 'A database backup is already in progress, please wait!',
                 'system_no_backup_dir': 'No backup directory found!',
                 'system_no_backup_files': 'No backup files found!',
                 'system_select_backup_file': 'Please select a backup file to restore!',
@@ -1202,6 +1276,32 @@ class LanguageUtils:
                 'price_cannot_be_negative': 'Price cannot be negative',
                 'price_cannot_be_zero': 'Price cannot be zero',
                 'price_must_be_valid_number': 'Price must be a valid number',
+                'menu_price_simulation': 'Price Simulation',
+                'form_title_price_simulation': 'Price Simulation',
+                'simulation_start_month': 'Start Month',
+                'simulation_end_month': 'End Month',
+                'simulation_month_format_error': 'Invalid month format, expected YYYY-MM',
+                'simulation_scenarios': 'Candidate Price Scenarios',
+                'simulation_scenario': 'Scenario ',
+                'simulation_scenario_name': 'Scenario',
+                'simulation_prices': 'Candidate Prices',
+                'simulation_add_scenario': 'Add Scenario',
+                'simulation_remove_scenario': 'Remove Scenario',
+                'simulation_run': 'Run Simulation',
+                'simulation_price_hint': 'Format: resource[:tenant type]=price, comma separated, e.g. 水=4, 电:门面=1.1; anything not listed keeps the billed amount. Current prices: {0}',
+                'simulation_price_format_error': 'Invalid candidate prices, expected resource[:tenant type]=price, e.g. 水=4, 电:门面=1.1',
+                'simulation_no_scenario': 'Please add a candidate price scenario first',
+                'simulation_data_loaded': 'Loaded {0} months, {1} charge records',
+                'simulation_baseline': 'Actual Revenue',
+                'simulation_simulated': 'Simulated Revenue',
+                'simulation_delta': 'Difference',
+                'simulation_total': 'Total',
+                'rebill_title': 'Recalculate Charges',
+                'rebill_prompt': 'The price has changed and existing charges from {0} to {1} may be affected.\nRecalculate these charges in the background with the corrected price?\n(Payments are kept and statuses are redetermined from the amounts paid)',
+                'rebill_in_progress': 'Charge recalculation is in progress, please wait',
+                'rebill_completed': 'Charge recalculation completed!\nRecalculated: {0}\nChanged: {1}\nDifference report: {2}',
+                'rebill_failed_months': 'Writing failed and was rolled back for these months: {0}',
+                'rebill_fail': 'Failed to recalculate charges',
                 'please_enter_effective_start_date': 'Please enter effective start date',
                 'effective_start_date_format_error': 'Invalid effective start date format',
                 'correct_format': 'Correct format',
@@ -1260,6 +1360,8 @@ class LanguageUtils:
                 'delete_completed': 'Delete Completed',
                 'successfully_deleted': 'Successfully deleted',
                 'charge_calculation_completed': 'Charge calculation completed',
+                'incremental_calculation': 'Only recalculate changed tenants',
+                'skipped_unchanged': 'Skipped (unchanged)',
                 'new_added': 'New Added',
                 'updated': 'Updated',
                 'households': 'Households',
@@ -1310,6 +1412,15 @@ class LanguageUtils:
                 'menu_payment_entry': 'Payment Entry',
                 'menu_settlement': 'Settlement',
                 'menu_monthly_report': 'Report Center',
+                'menu_raw_data_export': 'Raw Data Export',
+                'raw_export_from_month': 'From month (YYYY-MM, blank for no limit):',
+                'raw_export_to_month': 'To month (YYYY-MM, blank for no limit):',
+                'raw_export_format_hint': 'Writes Parquet when pyarrow is installed, otherwise gzip CSV, plus a manifest with row counts and checksums',
+                'raw_export_start': 'Choose Folder and Export',
+                'raw_export_invalid_month': 'Invalid month format, expected YYYY-MM',
+                'raw_export_running': 'Exporting {0}... {1} rows',
+                'raw_export_success': 'Raw data exported to:\n{0}\n\n{1}',
+                'raw_export_fail': 'Raw data export failed: {0}',
                 'menu_data_backup': 'Data Backup',
                 'menu_data_restore': 'Data Restore',
                 'menu_data_initialization': 'Data Initialization',
@@ -1344,6 +1455,9 @@ class LanguageUtils:
                 'querying': 'Querying',
                 'filename': 'Filename',
                 'unknown_date': 'Unknown Date',
+                'snapshot_id': 'Snapshot ID',
+                'snapshot_source': 'Source',
+                'snapshot_size': 'Size (MB)',
                 'button_restore': 'Restore',
                 'unknown_tenant': 'Unknown Tenant',
                 'menu_user_management': 'User Management',
@@ -1351,6 +1465,25 @@ class LanguageUtils:
                 'select_all': 'Select All',
                 'import_to_payment': 'Import to Payment',
                 'please_select_records_to_import': 'Please select records to import',
+                'lump_sum_payment': 'Lump-sum Payment',
+                'import_bank_statement': 'Import Bank Statement',
+                'lump_sum_preview': 'Preview Allocation',
+                'lump_sum_confirm': 'Confirm Payment',
+                'lump_sum_hint': 'The amount is applied to open charges, oldest month first',
+                'lump_sum_no_open_charges': 'The tenant has no open charges',
+                'lump_sum_unallocated': 'Balance of {0:.2f} could not be allocated',
+                'lump_sum_completed': '{0} payment records created, {1:.2f} allocated',
+                'lump_sum_fail': 'Failed to allocate payment',
+                'bank_statement_completed': '{0} statement rows, {1} sums allocated totalling {2:.2f}, {3} rows failed',
+                'generate_month_bills': 'Generate Bills',
+                'bills_merge_into_one': 'Merge into one PDF file',
+                'bills_generate_start': 'Start',
+                'bills_loading': 'Loading charges and payments...',
+                'bills_generating': 'Generating bills {0}/{1}',
+                'bills_no_charges': 'No charges for this month',
+                'bills_generate_success': '{0} bills generated, saved in: {1}',
+                'bills_generate_cancelled': 'Cancelled, {0} of {1} bills generated',
+                'bills_generate_fail': 'Failed to generate bills: {0}',
                 'payment_records': 'Arrears Record Count',
                 'records': 'records',
                 'refreshed': 'Refreshed',
@@ -1507,6 +1640,132 @@ class LanguageUtils:
             return self.language_resources[self.current_language][key]
         return key
     
+    def _resolve(self, source: TextSource) -> str:
+        """
+        将文本来源解析为当前语言的文本
+        :param source: 翻译键或接收get_text的函数
+        :return: 文本
+        """
+        if callable(source):
+            return source(self.get_text)
+        return self.get_text(source)
+    
+    def _register(self, kind: str, widget: Any, slot: Any, source: Any) -> None:
+        """
+        登记一条绑定，同一控件的同一槽位重复登记时覆盖旧绑定
+        :param kind: 绑定类型（widget/menu/tab/callback）
+        :param widget: 绑定的控件，控件销毁后绑定自动失效
+        :param slot: 控件内的槽位（属性名、菜单项索引或标签页）
+        :param source: 文本来源或回调函数
+        """
+        self._bindings[(kind, str(widget), str(slot))] = (widget, slot, source)
+        # 绑定数量翻倍时清理一次已销毁控件的绑定，避免反复重建的界面使绑定表无限增长
+        if len(self._bindings) > max(64, self._bindings_pruned_size * 2):
+            self._prune_bindings()
+    
+    def _prune_bindings(self) -> None:
+        """
+        清理已销毁控件的绑定
+        """
+        for binding_key, (widget, _slot, _source) in list(self._bindings.items()):
+            if not self._widget_exists(widget):
+                del self._bindings[binding_key]
+        self._bindings_pruned_size = len(self._bindings)
+    
+    @staticmethod
+    def _widget_exists(widget: Any) -> bool:
+        """
+        判断控件是否仍然存在
+        :param widget: Tk/ttk控件
+        :return: 控件未销毁时返回True
+        """
+        # 命令行工具也使用本模块，tkinter只在已有控件绑定时才导入
+        from tkinter import TclError
+
+        try:
+            return bool(widget.winfo_exists())
+        except TclError:
+            return False
+    
+    def bind_text(self, widget: Any, source: TextSource, option: str = 'text') -> Any:
+        """
+        将控件属性绑定到翻译文本，并立即设置为当前语言的文本
+        :param widget: Tk/ttk控件
+        :param source: 翻译键或接收get_text返回文本的函数
+        :param option: 控件属性名，默认text
+        :return: 传入的控件，便于链式创建
+        """
+        widget.config(**{option: self._resolve(source)})
+        self._register('widget', widget, option, source)
+        return widget
+    
+    def bind_menu_entry(self, menu: Any, index: int, source: TextSource) -> None:
+        """
+        将菜单项标签绑定到翻译文本
+        :param menu: tk.Menu实例
+        :param index: 菜单项索引
+        :param source: 翻译键或接收get_text返回文本的函数
+        """
+        menu.entryconfigure(index, label=self._resolve(source))
+        self._register('menu', menu, index, source)
+    
+    def bind_tab(self, notebook: Any, tab: Any, source: TextSource) -> None:
+        """
+        将Notebook标签页标题绑定到翻译文本
+        :param notebook: ttk.Notebook实例
+        :param tab: 标签页对应的Frame或标签页ID
+        :param source: 翻译键或接收get_text返回文本的函数
+        """
+        notebook.tab(tab, text=self._resolve(source))
+        self._register('tab', notebook, tab, source)
+    
+    def bind_callback(self, owner: Any, callback: Callable[[Callable[[str], str]], None], name: str = '') -> None:
+        """
+        登记语言切换时执行的回调，用于无法直接通过config设置的文本（如图表、下拉框选项）
+        回调在owner销毁后自动失效
+        :param owner: 决定回调生命周期的控件
+        :param callback: 接收get_text的回调函数
+        :param name: 同一控件下区分多个回调的名称
+        """
+        self._register('callback', owner, name, callback)
+    
+    def apply_bindings(self) -> None:
+        """
+        按当前语言刷新所有已绑定控件的文本
+        单次遍历绑定表，不遍历控件树，也不重新加载数据；
+        只有控件已销毁或标签页已移除时删除绑定，其他错误记录日志后保留绑定
+        """
+        if not self._bindings:
+            return
+        from tkinter import TclError
+
+        stale = []
+        for binding_key, (widget, slot, source) in list(self._bindings.items()):
+            kind = binding_key[0]
+            try:
+                if kind == 'widget':
+                    widget.config(**{slot: self._resolve(source)})
+                elif kind == 'menu':
+                    widget.entryconfigure(slot, label=self._resolve(source))
+                elif kind == 'tab':
+                    widget.tab(slot, text=self._resolve(source))
+                elif self._widget_exists(widget):
+                    source(self.get_text)
+                else:
+                    stale.append(binding_key)
+            except TclError:
+                # 控件已销毁或标签页已移除时绑定失效，控件仍存在时按其他错误处理
+                if kind == 'tab' or not self._widget_exists(widget):
+                    stale.append(binding_key)
+                else:
+                    logger.exception(f"刷新{kind}绑定失败: {binding_key[1]} {binding_key[2]}")
+            except Exception:
+                # 文本来源或回调本身出错，绑定保留，下次切换语言时仍会刷新
+                logger.exception(f"刷新{kind}绑定失败: {binding_key[1]} {binding_key[2]}")
+        for binding_key in stale:
+            del self._bindings[binding_key]
+        self._bindings_pruned_size = len(self._bindings)
+    
     def subscribe(self, callback: Callable[[str, str], None]) -> None:
         """
         订阅语言变化事件
@@ -1531,6 +1790,8 @@ class LanguageUtils:
         if language_code in self.language_resources and language_code != self.current_language:
             old_language = self.current_language
             self.current_language = language_code
+            # 先刷新已绑定的控件，再通知订阅者处理其余界面
+            self.apply_bindings()
             # 通知所有订阅者语言已变化
             self._notify_subscribers(old_language, self.current_language)
         elif language_code not in self.language_resources:
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+收费分摊模块
+读取银行流水等一次交款文件，按先到期先还的顺序把每笔款项分摊到租户未结清的费用上，不依赖界面，
+收费管理界面和批处理工具共用
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from models.payment import Payment
+from models.tenant import Tenant
+from utils.reading_import import load_rows
+
+# 流水文件必须包含的表头
+STATEMENT_HEADERS = ["租户名称", "金额", "收费日期"]
+# 可选表头，缺少时使用默认值
+OPTIONAL_HEADERS = ["支付方式", "收款人", "备注"]
+# 流水文件未写支付方式时使用的支付方式
+DEFAULT_PAYMENT_METHOD = "银行转账"
+
+
+def get_missing_headers(headers: Sequence[Any]) -> List[str]:
+    """
+    检查缺少的必填表头
+    :param headers: 文件表头
+    :return: 缺少的表头列表
+    """
+    return [header for header in STATEMENT_HEADERS if header not in headers]
+
+
+def _format_date(value: Any, datemode: int) -> Optional[str]:
+    """
+    将单元格中的收费日期转换为YYYY-MM-DD字符串
+    :param value: 单元格值
+    :param datemode: xls文件的日期模式
+    :return: 日期字符串，无法转换时返回None
+    """
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, float) and datemode is not None:
+        # xls文件中的日期为序列号
+        try:
+            import xlrd
+            return datetime(*xlrd.xldate_as_tuple(value, datemode)).strftime("%Y-%m-%d")
+        except Exception:
+            return None
+    text = str(value).strip()[:10] if value is not None else ""
+    try:
+        return datetime.strptime(text.replace("/", "-"), "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def parse_statement(headers: Sequence[Any], rows: Sequence[Sequence[Any]], datemode: int = 0,
+                    tenant_map: Optional[Dict[str, int]] = None) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    解析并校验流水行
+    :param headers: 文件表头
+    :param rows: 数据行
+    :param datemode: xls文件的日期模式
+    :param tenant_map: 租户名称到租户ID的映射，为None时从数据库读取
+    :return: 款项列表（每项另加line为文件行号）和失败原因列表
+    """
+    if tenant_map is None:
+        tenant_map = {t.name: t.id for t in Tenant.get_all()}
+
+    columns = {header: list(headers).index(header) for header in STATEMENT_HEADERS + OPTIONAL_HEADERS
+               if header in headers}
+
+    def cell(row, header):
+        index = columns.get(header)
+        if index is None or index >= len(row) or row[index] is None:
+            return ""
+        return row[index]
+
+    lump_sums = []
+    failed_reasons = []
+    for row_idx, row in enumerate(rows):
+        line = row_idx + 2
+        tenant_name = str(cell(row, "租户名称")).strip()
+        if not tenant_name:
+            failed_reasons.append(f"第{line}行：租户名称不能为空")
+            continue
+        tenant_id = tenant_map.get(tenant_name)
+        if tenant_id is None:
+            failed_reasons.append(f"第{line}行：租户 '{tenant_name}' 不存在")
+            continue
+
+        try:
+            amount = round(float(str(cell(row, "金额")).replace(",", "")), 2)
+        except ValueError:
+            failed_reasons.append(f"第{line}行：金额必须是数字")
+            continue
+        if amount <= 0:
+            failed_reasons.append(f"第{line}行：金额必须大于0")
+            continue
+
+        payment_date = _format_date(cell(row, "收费日期"), datemode)
+        if not payment_date:
+            failed_reasons.append(f"第{line}行：收费日期格式不正确，应为YYYY-MM-DD")
+            continue
+
+        lump_sums.append({
+            'line': line,
+            'tenant_id': tenant_id,
+            'tenant_name': tenant_name,
+            'amount': amount,
+            'payment_date': payment_date,
+            'payment_method': str(cell(row, "支付方式")).strip() or DEFAULT_PAYMENT_METHOD,
+            'payer': str(cell(row, "收款人")).strip(),
+            'notes': str(cell(row, "备注")).strip(),
+        })
+    return lump_sums, failed_reasons
+
+
+def allocate_statement(file_path: str, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    读取流水文件并一次分摊全部款项，所有收费记录在一个事务内写入
+    :param file_path: 文件路径，支持.xlsx、.xls和.csv
+    :param dry_run: 为True时只计算分摊结果，不写入
+    :return: 结果字典，键rows为数据行数，lump_sums为通过校验的款项，results为对应的Payment.allocate_many结果，
+             failed_reasons为校验失败原因列表
+    :raises ValueError: 文件格式不支持或缺少必填表头
+    """
+    headers, rows, datemode = load_rows(file_path)
+    missing_headers = get_missing_headers(headers)
+    if missing_headers:
+        raise ValueError(f"文件格式不正确，缺少以下必填列：{', '.join(missing_headers)}")
+
+    lump_sums, failed_reasons = parse_statement(headers, rows, datemode)
+    results = Payment.allocate_many(lump_sums, dry_run) if lump_sums else []
+    return {
+        'rows': len(rows),
+        'lump_sums': lump_sums,
+        'results': results,
+        'failed_reasons': failed_reasons,
+    }
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF绘制公共模块
+报表、收费凭证和批量账单共用：中文字体在第一次生成PDF时才查找和注册，每个进程只解析一次字体文件；
+标题、表头、分隔线等每页相同的内容定义为页面模板，每个文档只绘制一次，之后各页直接引用
+"""
+
+import os
+import copy
+import threading
+from weakref import WeakKeyDictionary
+from typing import Callable, Dict, Optional, Tuple
+
+from reportlab.lib.fonts import addMapping
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+# 字体目录，按Windows、Linux、macOS的顺序查找，Linux和macOS目录包含子目录
+FONT_DIRS = [
+    "C:\\Windows\\Fonts",
+    "C:\\Windows\\SysWOW64\\Fonts",
+    "D:\\Windows\\Fonts",
+    "D:\\Windows\\SysWOW64\\Fonts",
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    os.path.expanduser("~/.local/share/fonts"),
+    os.path.expanduser("~/.fonts"),
+    "/Library/Fonts",
+    "/System/Library/Fonts",
+]
+
+# 候选中文字体：(字体名称, 文件名, 字体集合中的序号)，使用找到的第一个可注册的字体
+# reportlab只支持TrueType轮廓，Noto Sans CJK的OpenType版本注册失败时继续尝试下一个
+FONT_FILES = [
+    ("SimHei", "simhei.ttf", 0),  # 黑体
+    ("SimSun", "simsun.ttc", 0),  # 宋体
+    ("Microsoft YaHei", "msyh.ttf", 0),  # 微软雅黑
+    ("Microsoft YaHei", "msyh.ttc", 0),
+    ("Noto Sans SC", "NotoSansSC-Regular.ttf", 0),
+    ("Noto Sans CJK SC", "NotoSansCJK-Regular.ttc", 2),  # 集合中第3个为简体中文
+    ("Noto Sans CJK SC", "NotoSansCJKsc-Regular.otf", 0),
+    ("WenQuanYi Micro Hei", "wqy-microhei.ttc", 0),
+    ("WenQuanYi Zen Hei", "wqy-zenhei.ttc", 0),
+    ("Droid Sans Fallback", "DroidSansFallbackFull.ttf", 0),
+    ("AR PL UMing", "uming.ttc", 0),
+    ("Arial Unicode MS", "Arial Unicode.ttf", 0),
+]
+
+# 找不到字体文件时使用reportlab内置的中文字体，不嵌入文件，由阅读器提供字形
+CID_FALLBACK_FONT = "STSong-Light"
+
+# 已解析的字体文件：(路径, 序号) -> TTFont，同一文件只解析一次
+_ttfont_cache: Dict[Tuple[str, int], TTFont] = {}
+# 已注册的中文字体名称，首次调用get_chinese_font时确定
+_chinese_font: Optional[str] = None
+_font_lock = threading.Lock()
+
+
+def _find_font_files() -> Dict[str, str]:
+    """
+    在字体目录中查找候选字体文件
+    :return: 小写文件名 -> 路径，同名文件使用先找到的
+    """
+    wanted = {file_name.lower() for _, file_name, _ in FONT_FILES}
+    found: Dict[str, str] = {}
+    for font_dir in FONT_DIRS:
+        if not os.path.isdir(font_dir):
+            continue
+        for root, _, files in os.walk(font_dir):
+            for file_name in files:
+                key = file_name.lower()
+                if key in wanted and key not in found:
+                    found[key] = os.path.join(root, file_name)
+    return found
+
+
+def load_ttfont(font_name: str, font_path: str, subfont_index: int = 0) -> TTFont:
+    """
+    解析字体文件，结果按文件缓存
+    :param font_name: 字体名称
+    :param font_path: 字体文件路径
+    :param subfont_index: 字体集合（.ttc）中的序号
+    :return: TTFont对象
+    """
+    key = (font_path, subfont_index)
+    font = _ttfont_cache.get(key)
+    if font is None:
+        font = TTFont(font_name, font_path, subfontIndex=subfont_index)
+        _ttfont_cache[key] = font
+    return font
+
+
+def _register_ttfont(font_name: str, font: TTFont):
+    """
+    注册字体，粗体共用同一份解析结果
+    :param font_name: 字体名称
+    :param font: 已解析的TTFont对象
+    """
+    if font.fontName != font_name:
+        font = copy.copy(font)
+        font.fontName = font_name
+        font.state = WeakKeyDictionary()
+    bold = copy.copy(font)
+    bold.fontName = f"{font_name}-Bold"
+    # 子集状态按文档记录，两个字体名各自独立
+    bold.state = WeakKeyDictionary()
+    pdfmetrics.registerFont(font)
+    pdfmetrics.registerFont(bold)
+    addMapping(font_name, 0, 0, font_name)  # 常规
+    addMapping(font_name, 1, 0, f"{font_name}-Bold")  # 粗体
+
+
+def _register_chinese_font() -> str:
+    """
+    查找并注册中文字体
+    :return: 字体名称，粗体为 字体名称-Bold
+    """
+    found = _find_font_files()
+    for font_name, file_name, subfont_index in FONT_FILES:
+        font_path = found.get(file_name.lower())
+        if not font_path:
+            continue
+        try:
+            _register_ttfont(font_name, load_ttfont(font_name, font_path, subfont_index))
+            return font_name
+        except Exception as e:
+            print(f"注册字体{font_path}失败: {str(e)}")
+
+    try:
+        from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+        font = UnicodeCIDFont(CID_FALLBACK_FONT)
+        bold = copy.copy(font)
+        bold.name = bold.fontName = f"{CID_FALLBACK_FONT}-Bold"
+        pdfmetrics.registerFont(font)
+        pdfmetrics.registerFont(bold)
+        return CID_FALLBACK_FONT
+    except Exception as e:
+        print(f"注册内置中文字体失败: {str(e)}")
+    # Helvetica-Bold为reportlab内置字体，无需注册
+    return "Helvetica"
+
+
+def get_chinese_font() -> str:
+    """
+    获取中文字体名称，第一次调用时查找并注册，之后直接返回
+    :return: 字体名称，粗体为 字体名称-Bold
+    """
+    global _chinese_font
+    if _chinese_font is None:
+        with _font_lock:
+            if _chinese_font is None:
+                _chinese_font = _register_chinese_font()
+    return _chinese_font
+
+
+def bold_font(font_name: str) -> str:
+    """
+    获取字体对应的粗体名称
+    :param font_name: 字体名称
+    :return: 粗体名称
+    """
+    return f"{font_name}-Bold"
+
+
+class PageTemplate:
+    """
+    页面模板
+    每页相同的内容（标题、标签、表头、分隔线等）在文档中定义为表单对象，只绘制一次，
+    各页通过draw_on引用，可平移到不同位置；模板内只应绘制固定内容，数据由调用方在引用后绘制
+    """
+
+    def __init__(self, name: str, draw: Callable, bbox: Optional[Tuple[float, float, float, float]] = None,
+                 reuse: bool = True):
+        """
+        :param name: 模板名称，同一文档内唯一
+        :param draw: 绘制函数，参数为Canvas对象，坐标相对于引用位置
+        :param bbox: 模板范围(左, 下, 右, 上)，默认为整个A4页面
+        :param reuse: 为False时直接绘制不定义表单对象，用于只有一页的文档，省去表单的开销
+        """
+        self.name = name
+        self.draw = draw
+        self.bbox = bbox or (0, 0) + tuple(A4)
+        self.reuse = reuse
+
+    def draw_on(self, c, x: float = 0, y: float = 0):
+        """
+        在当前页引用模板，文档中第一次引用时先定义模板
+        :param c: Canvas对象
+        :param x: 水平偏移
+        :param y: 垂直偏移
+        """
+        if self.reuse and not c.hasForm(self.name):
+            c.beginForm(self.name, *self.bbox)
+            self.draw(c)
+            c.endForm()
+        c.saveState()
+        if x or y:
+            c.translate(x, y)
+        if self.reuse:
+            c.doForm(self.name)
+        else:
+            self.draw(c)
+        c.restoreState()
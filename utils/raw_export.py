@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原始数据导出模块
+将租户、水电表、抄表、费用、收费和结算表按月份范围原样导出，供数据分析使用，
+数据从数据库游标分批读取并逐批写出，内存占用与行数无关；安装了pandas和pyarrow时导出Parquet，
+否则导出gzip压缩的CSV，同时生成记录行数和SHA-256的清单文件。不依赖界面，系统菜单和命令行工具共用
+"""
+
+import os
+import csv
+import gzip
+import json
+import hashlib
+import importlib.util
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from database.db_manager import get_db
+
+# 可导出的表 -> (按月份过滤的列, 列是否为日期)，None表示不按月份过滤（基础信息表始终全量导出）
+EXPORT_TABLES: Dict[str, Optional[Tuple[str, bool]]] = {
+    "tenants": None,
+    "meters": None,
+    "meter_readings": ("reading_date", True),
+    "charges": ("month", False),
+    "payments": ("payment_date", True),
+    "settlements": ("settle_month", False),
+}
+
+# 导出格式
+EXPORT_FORMATS = ("auto", "csv", "parquet")
+# 每批从游标读取的行数
+CHUNK_ROWS = 50000
+# 清单文件名
+MANIFEST_FILENAME = "manifest.json"
+
+
+def parquet_available() -> bool:
+    """
+    检查是否可以导出Parquet
+    :return: 已安装pandas和pyarrow时为True
+    """
+    # 只查找模块，不导入，避免检查时加载pandas
+    return all(importlib.util.find_spec(name) is not None for name in ("pandas", "pyarrow"))
+
+
+def _table_columns(db, table: str) -> List[Tuple[str, str]]:
+    """
+    获取表的列名和声明类型
+    :param db: 数据库实例
+    :param table: 表名
+    :return: (列名, 声明类型)列表
+    """
+    return [(row[1], (row[2] or "").upper()) for row in db.fetch_all(f"PRAGMA table_info({table});")]
+
+
+def _month_filter(table: str, from_month: Optional[str], to_month: Optional[str]) -> Tuple[str, Tuple[str, ...]]:
+    """
+    生成月份范围过滤条件
+    :param table: 表名
+    :param from_month: 开始月份（含），为空时不限
+    :param to_month: 结束月份（含），为空时不限
+    :return: WHERE子句（无条件时为空字符串）和参数元组
+    """
+    month_column = EXPORT_TABLES[table]
+    where_clauses = []
+    params = []
+    if month_column:
+        column, is_date = month_column
+        # 直接比较列值以便使用索引，YYYY-MM小于该月的任何YYYY-MM-DD
+        if from_month:
+            where_clauses.append(f"{column} >= ?")
+            params.append(from_month)
+        if to_month:
+            if is_date:
+                year, month = map(int, to_month.split("-"))
+                where_clauses.append(f"{column} < ?")
+                params.append(f"{year + month // 12:04d}-{month % 12 + 1:02d}")
+            else:
+                where_clauses.append(f"{column} <= ?")
+                params.append(to_month)
+    where = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    return where, tuple(params)
+
+
+def _file_sha256(file_path: str) -> str:
+    """
+    计算文件的SHA-256
+    :param file_path: 文件路径
+    :return: 十六进制摘要
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def _write_csv(file_path: str, columns: Sequence[str], batches) -> int:
+    """
+    分批写入gzip压缩的CSV文件
+    :param file_path: 文件路径
+    :param columns: 列名
+    :param batches: 行批次迭代器
+    :return: 写入的行数
+    """
+    row_count = 0
+    with gzip.open(file_path, "wt", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for batch in batches:
+            writer.writerows(batch)
+            row_count += len(batch)
+    return row_count
+
+
+def _write_parquet(file_path: str, columns: Sequence[Tuple[str, str]], batches) -> int:
+    """
+    分批写入Parquet文件，列类型按表的声明类型确定，各批次结构一致
+    :param file_path: 文件路径
+    :param columns: (列名, 声明类型)列表
+    :param batches: 行批次迭代器
+    :return: 写入的行数
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def arrow_type(declared):
+        if "INT" in declared:
+            return pa.int64()
+        if "REAL" in declared or "FLOA" in declared or "DOUB" in declared:
+            return pa.float64()
+        if "BLOB" in declared:
+            return pa.binary()
+        return pa.string()
+
+    schema = pa.schema([(name, arrow_type(declared)) for name, declared in columns])
+    names = [name for name, _ in columns]
+    row_count = 0
+    with pq.ParquetWriter(file_path, schema, compression="snappy") as writer:
+        for batch in batches:
+            frame = pd.DataFrame.from_records(batch, columns=names)
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+            row_count += len(batch)
+        if row_count == 0:
+            # 没有数据时也写出只有表结构的文件
+            writer.write_table(schema.empty_table())
+    return row_count
+
+
+def export_tables(output_dir: str, from_month: Optional[str] = None, to_month: Optional[str] = None,
+                  tables: Optional[Sequence[str]] = None, file_format: str = "auto",
+                  chunk_rows: int = CHUNK_ROWS,
+                  progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, Any]:
+    """
+    导出原始数据表并写入清单文件
+    :param output_dir: 输出目录，不存在时自动创建
+    :param from_month: 开始月份（含），格式为YYYY-MM，为空时不限
+    :param to_month: 结束月份（含），格式为YYYY-MM，为空时不限
+    :param tables: 要导出的表，默认为EXPORT_TABLES中的全部表
+    :param file_format: 导出格式，auto时已安装pyarrow则导出Parquet，否则导出gzip压缩的CSV
+    :param chunk_rows: 每批读取和写入的行数
+    :param progress: 进度回调，参数为(表名, 该表已导出行数)
+    :return: 清单字典，另写入输出目录下的manifest.json
+    :raises ValueError: 表名或导出格式不支持，或未安装pyarrow时指定了parquet
+    """
+    tables = list(tables or EXPORT_TABLES)
+    unknown = [table for table in tables if table not in EXPORT_TABLES]
+    if unknown:
+        raise ValueError(f"不支持导出的表: {', '.join(unknown)}")
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {file_format}")
+    if file_format == "auto":
+        file_format = "parquet" if parquet_available() else "csv"
+    elif file_format == "parquet" and not parquet_available():
+        raise ValueError("导出Parquet需要安装pandas和pyarrow")
+
+    os.makedirs(output_dir, exist_ok=True)
+    db = get_db()
+    manifest = {
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "from_month": from_month or None,
+        "to_month": to_month or None,
+        "format": file_format,
+        "tables": [],
+    }
+
+    for table in tables:
+        columns = _table_columns(db, table)
+        names = [name for name, _ in columns]
+        where, params = _month_filter(table, from_month, to_month)
+        sql = f"SELECT {', '.join(names)} FROM {table}{where} ORDER BY rowid"
+        file_name = f"{table}.parquet" if file_format == "parquet" else f"{table}.csv.gz"
+        file_path = os.path.join(output_dir, file_name)
+
+        # 从独立游标分批读取，每批写出后即释放
+        rows = db.iter_rows(sql, params, chunk_rows)
+
+        def batches(rows=rows, table=table):
+            done = 0
+            while True:
+                batch = list(islice(rows, chunk_rows))
+                if not batch:
+                    break
+                done += len(batch)
+                yield batch
+                if progress:
+                    progress(table, done)
+
+        if file_format == "parquet":
+            row_count = _write_parquet(file_path, columns, batches())
+        else:
+            row_count = _write_csv(file_path, names, batches())
+
+        manifest["tables"].append({
+            "table": table,
+            "file": file_name,
+            "rows": row_count,
+            "columns": names,
+            "month_filtered": EXPORT_TABLES[table] is not None and bool(from_month or to_month),
+            "bytes": os.path.getsize(file_path),
+            "sha256": _file_sha256(file_path),
+        })
+
+    with open(os.path.join(output_dir, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
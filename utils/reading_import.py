@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+抄表数据导入模块
+负责读取抄表Excel或CSV文件、校验数据、检查重复并保存抄表记录，不依赖界面，
+抄表管理界面和批处理工具共用
+"""
+
+import csv
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from database.db_manager import get_db
+from models.meter import Meter
+from models.reading import MeterReading
+
+# 导入文件必须包含的表头
+EXPECTED_HEADERS = ["租户名称", "表编号", "表类型", "上次读数", "当前读数", "调整值", "用量", "抄表日期", "抄表人"]
+
+
+def load_rows(file_path: str) -> Tuple[List[Any], List[Sequence[Any]], int]:
+    """
+    读取抄表文件的表头和数据行，忽略全部为空的行
+    :param file_path: 文件路径，支持.xlsx、.xls和.csv
+    :return: 表头、数据行和日期模式（仅.xls使用）
+    """
+    if file_path.endswith('.csv'):
+        # 兼容Excel另存的带BOM的UTF-8文件
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            headers = [header.strip() for header in next(reader, [])]
+            all_rows = [row for row in reader if any(cell.strip() for cell in row)]
+        return headers, all_rows, 0
+
+    if file_path.endswith('.xlsx'):
+        from openpyxl import load_workbook
+        wb = load_workbook(file_path)
+        ws = wb.active
+        headers = [cell.value for cell in ws[1]]
+        all_rows = [row for row in ws.iter_rows(min_row=2, values_only=True)
+                    if any(cell is not None for cell in row)]
+        return headers, all_rows, 0
+
+    if file_path.endswith('.xls'):
+        import xlrd
+        wb = xlrd.open_workbook(file_path)
+        ws = wb.sheet_by_index(0)
+        headers = ws.row_values(0)
+        all_rows = []
+        for row_idx in range(1, ws.nrows):
+            row = ws.row_values(row_idx)
+            if any(cell is not None and cell != '' for cell in row):
+                all_rows.append(row)
+        return headers, all_rows, wb.datemode
+
+    raise ValueError("不支持的文件格式，请选择.xlsx、.xls或.csv文件")
+
+
+def get_missing_headers(headers: Sequence[Any]) -> List[str]:
+    """
+    检查缺少的必填表头
+    :param headers: 文件表头
+    :return: 缺少的表头列表
+    """
+    return [header for header in EXPECTED_HEADERS if header not in headers]
+
+
+def _format_date(reading_date: Any, datemode: int) -> Optional[str]:
+    """
+    将单元格中的抄表日期转换为YYYY-MM-DD字符串
+    :param reading_date: 单元格值
+    :param datemode: xls文件的日期模式
+    :return: 日期字符串，无法转换时返回None
+    """
+    if isinstance(reading_date, datetime):
+        return reading_date.strftime("%Y-%m-%d")
+    if isinstance(reading_date, str):
+        return reading_date
+    if hasattr(reading_date, 'value'):
+        # 处理xlrd的日期类型
+        import xlrd
+        return datetime(*xlrd.xldate_as_tuple(reading_date.value, datemode)).strftime("%Y-%m-%d")
+    try:
+        return str(reading_date)
+    except Exception:
+        return None
+
+
+def parse_rows(headers: Sequence[Any], rows: Sequence[Sequence[Any]], datemode: int = 0,
+               meter_map: Optional[Dict[str, Meter]] = None) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    解析并校验数据行
+    :param headers: 文件表头
+    :param rows: 数据行
+    :param datemode: xls文件的日期模式
+    :param meter_map: “表编号 (表类型)”到水电表的映射，为None时从数据库读取
+    :return: 待导入记录列表和失败原因列表
+    """
+    if meter_map is None:
+        meter_map = {f"{m.meter_no} ({m.meter_type})": m for m in Meter.get_all()}
+
+    columns = {header: headers.index(header) for header in EXPECTED_HEADERS}
+    records = []
+    failed_reasons = []
+    for row_idx, row in enumerate(rows):
+        line = row_idx + 2
+        try:
+            tenant_name = str(row[columns["租户名称"]]).strip() if row[columns["租户名称"]] is not None else ""
+            meter_no = str(row[columns["表编号"]]).strip() if row[columns["表编号"]] is not None else ""
+            meter_type = row[columns["表类型"]]
+            previous_reading = row[columns["上次读数"]]
+            current_reading = row[columns["当前读数"]]
+            adjustment_value = row[columns["调整值"]]
+            reading_date = row[columns["抄表日期"]]
+            reader = row[columns["抄表人"]]
+
+            if not tenant_name:
+                failed_reasons.append(f"第{line}行：租户名称不能为空")
+                continue
+
+            if not meter_no:
+                failed_reasons.append(f"第{line}行：表编号不能为空")
+                continue
+
+            if not meter_type or meter_type not in ["水", "电"]:
+                failed_reasons.append(f"第{line}行：表类型必须是'水'或'电'")
+                continue
+
+            meter_key = f"{meter_no} ({meter_type})"
+            meter = meter_map.get(meter_key)
+            if meter is None:
+                failed_reasons.append(f"第{line}行：水电表 '{meter_key}' 不存在")
+                continue
+
+            try:
+                previous_reading = float(previous_reading)
+                current_reading = float(current_reading)
+                adjustment_value = float(adjustment_value) if adjustment_value else 0
+            except (TypeError, ValueError):
+                failed_reasons.append(f"第{line}行：读数或调整值必须是数字")
+                continue
+
+            # 允许负的调整值，只检查当前读数是否小于上次读数
+            if current_reading < previous_reading:
+                failed_reasons.append(f"第{line}行：当前读数不能小于上次读数")
+                continue
+
+            if not reading_date:
+                failed_reasons.append(f"第{line}行：抄表日期不能为空")
+                continue
+
+            reading_date_str = _format_date(reading_date, datemode)
+            if reading_date_str is None:
+                failed_reasons.append(f"第{line}行：无效的日期格式")
+                continue
+
+            if not reader:
+                failed_reasons.append(f"第{line}行：抄表人不能为空")
+                continue
+
+            records.append({
+                'row_idx': row_idx,
+                'tenant_name': tenant_name,
+                'meter_no': meter_no,
+                'meter_type': meter_type,
+                'reading_month': reading_date_str[:7],
+                'reading_date_str': reading_date_str,
+                'previous_reading': previous_reading,
+                'current_reading': current_reading,
+                'adjustment_value': adjustment_value,
+                'usage': current_reading - previous_reading + adjustment_value,
+                'reader': reader,
+                'meter': meter
+            })
+        except Exception as e:
+            failed_reasons.append(f"第{line}行：{str(e)}")
+
+    return records, failed_reasons
+
+
+def find_duplicates(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    查找与已有抄表记录重复的待导入记录
+    所属月份、租户名称和表编号的组合已存在即视为重复
+    :param records: 待导入记录列表
+    :return: 重复记录信息列表，行号为Excel行号
+    """
+    if not records:
+        return []
+
+    # 只查询待导入月份内已有记录的组合
+    months = sorted({record['reading_month'] for record in records})
+    placeholders = ", ".join("?" for _ in months)
+    sql = f"""
+    SELECT DISTINCT substr(r.reading_date, 1, 7), t.name, m.meter_no
+    FROM meter_readings r
+    JOIN meters m ON r.meter_id = m.id
+    LEFT JOIN tenants t ON m.tenant_id = t.id
+    WHERE substr(r.reading_date, 1, 7) IN ({placeholders})
+    """
+    existing = {
+        (month, str(tenant_name if tenant_name is not None else "未知租户").strip(), str(meter_no).strip())
+        for month, tenant_name, meter_no in get_db().fetch_all(sql, months)
+    }
+
+    duplicates = []
+    for record in records:
+        if (record['reading_month'], record['tenant_name'], record['meter_no']) in existing:
+            duplicates.append({
+                'row_idx': record['row_idx'] + 2,
+                'tenant_name': record['tenant_name'],
+                'meter_no': record['meter_no'],
+                'meter_type': record['meter_type'],
+                'reading_month': record['reading_month']
+            })
+    return duplicates
+
+
+def save_records(records: List[Dict[str, Any]],
+                 progress: Optional[Callable[[int, int, int], None]] = None,
+                 batch_size: int = 500) -> Tuple[int, List[str]]:
+    """
+    保存待导入记录，每批记录在一个事务内写入，某批写入失败时整批记为失败
+    :param records: 待导入记录列表
+    :param progress: 进度回调，每批写入后调用，参数为已处理数、成功数、失败数
+    :param batch_size: 每个事务写入的记录数
+    :return: 成功数量和失败原因列表
+    """
+    success_count = 0
+    failed_reasons = []
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        readings = [
+            MeterReading(
+                meter_id=record['meter'].id,
+                reading_date=record['reading_date_str'],
+                previous_reading=record['previous_reading'],
+                current_reading=record['current_reading'],
+                adjustment=record['adjustment_value'],
+                usage=record['usage'],
+                reader=record['reader']
+            )
+            for record in batch
+        ]
+        if MeterReading.insert_many(readings):
+            success_count += len(batch)
+        else:
+            failed_reasons.extend(f"第{record['row_idx'] + 2}行：保存失败" for record in batch)
+
+        if progress:
+            progress(start + len(batch), success_count, len(failed_reasons))
+
+    return success_count, failed_reasons
@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+抄表数据接收服务
+基于标准库http.server，接收手持抄表设备和集中器提交的JSON或NDJSON抄表数据，
+批量校验后放入写入队列，由单独的写入线程合并多个请求在一个事务内写入，并逐行返回结果
+
+接口:
+    POST /readings  请求体为JSON数组、{"readings": [...]}或每行一条JSON的NDJSON
+    GET  /health    服务状态
+
+每条抄表数据的字段:
+    meter_id 或 meter_no + meter_type（水/电）  必填，指定水电表
+    current_reading                             必填，当前读数
+    reading_date                                抄表日期YYYY-MM-DD，默认当天
+    adjustment                                  调整值，默认0
+    reader                                      抄表人，默认使用服务配置
+    remark                                      备注
+上次读数和用量由服务按数据库中的最近一次抄表记录计算
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from database.db_manager import get_db
+from models.meter import Meter
+from models.reading import MeterReading
+
+# 接收服务日志
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    _handler = logging.FileHandler(os.path.join(os.getcwd(), 'reading_server.log'), encoding='utf-8')
+    _handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+# 单个请求体的最大字节数
+MAX_BODY_BYTES = 16 * 1024 * 1024
+# 表类型别名，设备可使用英文
+METER_TYPE_ALIASES = {"水": "水", "电": "电", "water": "水", "electricity": "电"}
+
+# 逐行结果状态
+STATUS_SAVED = "saved"
+STATUS_REJECTED = "rejected"
+STATUS_DUPLICATE = "duplicate"
+STATUS_ERROR = "error"
+
+
+class PayloadError(ValueError):
+    """请求体格式错误"""
+
+
+def parse_payload(body: bytes, content_type: str = "") -> List[Any]:
+    """
+    解析请求体
+    :param body: 请求体
+    :param content_type: Content-Type请求头
+    :return: 抄表数据列表
+    """
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise PayloadError("请求体必须是UTF-8编码")
+
+    if "ndjson" in content_type or "jsonl" in content_type:
+        items = []
+        for line_no, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                raise PayloadError(f"第{line_no}行不是有效的JSON: {e}")
+        return items
+
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise PayloadError(f"请求体不是有效的JSON: {e}")
+    if isinstance(data, dict):
+        data = data.get("readings")
+    if not isinstance(data, list):
+        raise PayloadError("请求体必须是抄表数据数组或包含readings数组的对象")
+    return data
+
+
+def _row_result(index: int, status: str, message: str = "", **values) -> Dict[str, Any]:
+    """
+    生成单行结果
+    :param index: 在请求中的序号，从0开始
+    :param status: 状态
+    :param message: 说明
+    :return: 结果字典
+    """
+    result = {"index": index, "status": status}
+    if message:
+        result["message"] = message
+    result.update(values)
+    return result
+
+
+def _parse_item(item: Any, default_reader: str, today: str) -> Dict[str, Any]:
+    """
+    检查单条数据的格式，不访问数据库
+    :param item: 抄表数据
+    :param default_reader: 默认抄表人
+    :param today: 当天日期
+    :return: 规范化后的数据
+    :raises ValueError: 数据不合法
+    """
+    if not isinstance(item, dict):
+        raise ValueError("抄表数据必须是对象")
+
+    meter_id = item.get("meter_id")
+    meter_no = str(item.get("meter_no") or "").strip()
+    meter_type = METER_TYPE_ALIASES.get(str(item.get("meter_type") or "").strip())
+    if meter_id is None:
+        if not meter_no:
+            raise ValueError("缺少meter_id或meter_no")
+        if meter_type is None:
+            raise ValueError("表类型必须是'水'或'电'")
+    else:
+        try:
+            meter_id = int(meter_id)
+        except (TypeError, ValueError):
+            raise ValueError("meter_id必须是整数")
+
+    try:
+        current_reading = float(item["current_reading"])
+        adjustment = float(item.get("adjustment") or 0)
+    except KeyError:
+        raise ValueError("缺少当前读数")
+    except (TypeError, ValueError):
+        raise ValueError("读数或调整值必须是数字")
+    if current_reading < 0:
+        raise ValueError("当前读数不能为负数")
+
+    reading_date = str(item.get("reading_date") or today).strip()
+    try:
+        datetime.strptime(reading_date, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError("抄表日期格式不正确，应为YYYY-MM-DD")
+    if reading_date > today:
+        raise ValueError("抄表日期不能晚于当前日期")
+
+    return {
+        "meter_id": meter_id,
+        "meter_no": meter_no,
+        "meter_type": meter_type,
+        "current_reading": current_reading,
+        "adjustment": adjustment,
+        "reading_date": reading_date,
+        "reader": str(item.get("reader") or default_reader).strip(),
+        "remark": str(item.get("remark") or ""),
+    }
+
+
+def validate_readings(items: List[Any], default_reader: str) -> Tuple[List[Tuple[int, MeterReading]], Dict[int, Dict[str, Any]]]:
+    """
+    批量校验抄表数据
+    水电表、最近一次抄表记录和当月已有记录各用一次查询取得，
+    同一块表的多条数据按抄表日期依次衔接，后一条的上次读数为前一条的当前读数；
+    查询使用当前线程的连接，在该连接的BEGIN IMMEDIATE事务内调用时，校验结果在写入前不会被其他连接改变
+    :param items: 抄表数据列表
+    :param default_reader: 默认抄表人
+    :return: 可写入的(序号, 抄表记录)列表，以及序号到结果的字典（可写入的结果在写入后确定）
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+    results = {}
+    parsed = {}
+    for index, item in enumerate(items):
+        try:
+            parsed[index] = _parse_item(item, default_reader, today)
+        except ValueError as e:
+            results[index] = _row_result(index, STATUS_REJECTED, str(e))
+
+    # 只有按表编号指定水电表时才需要读取全部水电表
+    by_number = any(data["meter_id"] is None for data in parsed.values())
+    meter_map = Meter.get_map(None if by_number else [data["meter_id"] for data in parsed.values()])
+    number_map = {(meter.meter_no, meter.meter_type): meter for meter in meter_map.values()} if by_number else {}
+
+    for index, data in list(parsed.items()):
+        if data["meter_id"] is None:
+            meter = number_map.get((data["meter_no"], data["meter_type"]))
+        else:
+            meter = meter_map.get(data["meter_id"])
+        if meter is None:
+            del parsed[index]
+            meter_key = data["meter_id"] if data["meter_id"] is not None else f"{data['meter_no']} ({data['meter_type']})"
+            results[index] = _row_result(index, STATUS_REJECTED, f"水电表 '{meter_key}' 不存在")
+            continue
+        data["meter"] = meter
+
+    meter_ids = {data["meter"].id for data in parsed.values()}
+    last_readings = MeterReading.get_last_readings(meter_ids)
+    existing_months = MeterReading.get_existing_months(meter_ids, {data["reading_date"][:7] for data in parsed.values()})
+
+    valid = []
+    # 按表和抄表日期排序，使同一块表的数据依次衔接；稳定排序保留同日数据的提交顺序
+    for index in sorted(parsed, key=lambda i: (parsed[i]["meter"].id, parsed[i]["reading_date"])):
+        data = parsed[index]
+        meter = data["meter"]
+        month = data["reading_date"][:7]
+        last_date, previous_reading = last_readings.get(meter.id, (None, meter.initial_reading))
+
+        if (meter.id, month) in existing_months:
+            results[index] = _row_result(index, STATUS_DUPLICATE, f"水电表 {meter.meter_no} 在 {month} 已有抄表记录",
+                                         meter_id=meter.id)
+            continue
+        if last_date and data["reading_date"] < last_date:
+            results[index] = _row_result(index, STATUS_REJECTED, f"抄表日期不能早于上次抄表日期({last_date})",
+                                         meter_id=meter.id)
+            continue
+        # 与抄表导入一致，允许负的调整值，只检查当前读数是否小于上次读数
+        if data["current_reading"] < previous_reading:
+            results[index] = _row_result(index, STATUS_REJECTED, f"当前读数不能小于上次读数({previous_reading})",
+                                         meter_id=meter.id)
+            continue
+        if not data["reader"]:
+            results[index] = _row_result(index, STATUS_REJECTED, "抄表人不能为空", meter_id=meter.id)
+            continue
+
+        usage = round(data["current_reading"] - previous_reading + data["adjustment"], 2)
+        valid.append((index, MeterReading(
+            meter_id=meter.id,
+            reading_date=data["reading_date"],
+            current_reading=data["current_reading"],
+            previous_reading=previous_reading,
+            usage=usage,
+            adjustment=data["adjustment"],
+            reader=data["reader"],
+            remark=data["remark"]
+        )))
+        # 后续同表数据以本条为上次抄表
+        last_readings[meter.id] = (data["reading_date"], data["current_reading"])
+        existing_months.add((meter.id, month))
+
+    return valid, results
+
+
+class ReadingIngestQueue:
+    """
+    抄表数据写入队列
+    所有数据库操作都在写入线程中进行；写入线程取出一个请求后，
+    把已在排队的请求一并取出，合并校验并在一个事务内写入
+    """
+
+    def __init__(self, default_reader: str = "自动抄表", max_batch_rows: int = 5000, linger: float = 0.05):
+        """
+        初始化写入队列
+        :param default_reader: 数据未提供抄表人时使用的抄表人
+        :param max_batch_rows: 一个事务最多写入的数据条数
+        :param linger: 取到第一个请求后等待后续请求的时间（秒），用于合并并发请求
+        """
+        self.default_reader = default_reader
+        self.max_batch_rows = max(max_batch_rows, 1)
+        self.linger = linger
+        self._queue = queue.Queue()
+        self._thread = None
+
+    @property
+    def pending(self) -> int:
+        """排队中的请求数"""
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """启动写入线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="reading-ingest-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 10) -> None:
+        """
+        停止写入线程，已排队的请求会先写入
+        :param timeout: 等待时间（秒）
+        """
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, items: List[Any]) -> Future:
+        """
+        提交一个请求的抄表数据
+        :param items: 抄表数据列表
+        :return: Future，结果为逐行结果列表
+        """
+        future = Future()
+        if not self._thread or not self._thread.is_alive():
+            future.set_exception(RuntimeError("写入队列未启动"))
+        else:
+            self._queue.put((items, future))
+        return future
+
+    def _run(self) -> None:
+        """写入线程主循环"""
+        # 写入线程单独使用一个连接，开启WAL后界面读取不会被写入阻塞
+        get_db().enable_wal()
+        stopping = False
+        while not stopping:
+            request = self._queue.get()
+            if request is None:
+                break
+            pending = [request]
+            rows = len(request[0])
+            deadline = time.monotonic() + self.linger
+            while rows < self.max_batch_rows:
+                try:
+                    request = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                pending.append(request)
+                rows += len(request[0])
+            self._flush(pending)
+
+    def _flush(self, pending: List[Tuple[List[Any], Future]]) -> None:
+        """
+        合并校验并写入一组请求，再把逐行结果分发给各请求
+        :param pending: (抄表数据列表, Future)列表
+        """
+        started = time.perf_counter()
+        items = []
+        owners = []
+        for request_no, (request_items, _) in enumerate(pending):
+            for index, item in enumerate(request_items):
+                items.append(item)
+                owners.append((request_no, index))
+
+        valid, results, saved = [], {}, False
+        try:
+            try:
+                # 校验和写入在同一个BEGIN IMMEDIATE事务中，校验之后界面和命令行不能再写入同一块表的抄表记录，
+                # 重复和读数衔接的检查对写入时的数据仍然成立
+                with get_db().transaction(immediate=True) as tx:
+                    valid, results = validate_readings(items, self.default_reader)
+                    MeterReading.insert_many([reading for _, reading in valid], tx)
+                saved = True
+            except sqlite3.Error:
+                logger.exception("写入抄表数据失败，已回滚")
+            for position, reading in valid:
+                if saved:
+                    results[position] = _row_result(position, STATUS_SAVED, meter_id=reading.meter_id,
+                                                    reading_date=reading.reading_date,
+                                                    previous_reading=reading.previous_reading,
+                                                    usage=reading.usage)
+                else:
+                    results[position] = _row_result(position, STATUS_ERROR, "保存失败，请重新提交",
+                                                    meter_id=reading.meter_id)
+            # 开始事务失败（如数据库被长时间锁定）时没有校验结果
+            for position in range(len(items)):
+                if position not in results:
+                    results[position] = _row_result(position, STATUS_ERROR, "保存失败，请重新提交")
+        except Exception as e:
+            logger.exception("写入抄表数据失败")
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        per_request = [[] for _ in pending]
+        for position, (request_no, index) in enumerate(owners):
+            result = results[position]
+            result["index"] = index
+            per_request[request_no].append(result)
+        for (_, future), request_results in zip(pending, per_request):
+            future.set_result(request_results)
+
+        logger.info(f"写入抄表数据: {len(pending)} 个请求，共 {len(items)} 条，"
+                    f"成功 {len(valid) if saved else 0} 条，耗时 {time.perf_counter() - started:.3f} 秒")
+
+
+class ReadingRequestHandler(BaseHTTPRequestHandler):
+    """抄表数据接收请求处理"""
+
+    server_version = "sdcbsf-ingest/1.0"
+
+    def _send_json(self, status: int, data: Any) -> None:
+        """
+        发送JSON响应
+        :param status: HTTP状态码
+        :param data: 响应数据
+        """
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        """检查访问令牌，未配置令牌时不校验"""
+        token = self.server.token
+        if not token:
+            return True
+        return self.headers.get("Authorization", "") == f"Bearer {token}"
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/health":
+            self._send_json(404, {"error": "接口不存在"})
+            return
+        self._send_json(200, {"status": "ok", "pending_requests": self.server.ingest_queue.pending})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/readings":
+            self._send_json(404, {"error": "接口不存在"})
+            return
+        if not self._authorized():
+            self._send_json(401, {"error": "访问令牌无效"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._send_json(411, {"error": "缺少Content-Length"})
+            return
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": f"请求体超过 {MAX_BODY_BYTES} 字节，请分批提交"})
+            return
+
+        try:
+            items = parse_payload(self.rfile.read(length), self.headers.get("Content-Type", ""))
+        except PayloadError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        if not items:
+            self._send_json(200, {"total": 0, "saved": 0, "failed": 0, "results": []})
+            return
+
+        try:
+            results = self.server.ingest_queue.submit(items).result(self.server.request_timeout)
+        except FutureTimeoutError:
+            # 数据仍在队列中，之后会正常写入，客户端不应立即重发
+            self._send_json(504, {"error": "写入超时，请稍后查询抄表记录确认结果"})
+            return
+        except Exception as e:
+            self._send_json(503, {"error": f"写入失败: {e}"})
+            return
+
+        saved = sum(1 for result in results if result["status"] == STATUS_SAVED)
+        self._send_json(200, {"total": len(results), "saved": saved, "failed": len(results) - saved,
+                              "results": results})
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} - {format % args}")
+
+
+class ReadingIngestServer:
+    """抄表数据接收服务，可随界面在后台运行，也可由命令行单独运行"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, token: str = "",
+                 default_reader: str = "自动抄表", max_batch_rows: int = 5000, request_timeout: float = 60):
+        """
+        初始化接收服务
+        :param host: 监听地址
+        :param port: 监听端口，为0时由系统分配
+        :param token: 访问令牌，为空时不校验
+        :param default_reader: 数据未提供抄表人时使用的抄表人
+        :param max_batch_rows: 一个事务最多写入的数据条数
+        :param request_timeout: 请求等待写入结果的最长时间（秒）
+        """
+        self.host = host
+        self.port = port
+        self.token = token
+        self.request_timeout = request_timeout
+        self.ingest_queue = ReadingIngestQueue(default_reader, max_batch_rows)
+        self.httpd = None
+        self._thread = None
+
+    @classmethod
+    def from_settings(cls, settings) -> 'ReadingIngestServer':
+        """
+        按系统设置创建接收服务
+        :param settings: 系统设置
+        :return: 接收服务
+        """
+        return cls(settings.get_setting('ingest', 'host', '127.0.0.1'),
+                   settings.get_int_setting('ingest', 'port', 8765),
+                   settings.get_setting('ingest', 'token', ''),
+                   settings.get_setting('ingest', 'reader', '自动抄表'))
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """实际监听的地址和端口"""
+        return self.httpd.server_address[:2] if self.httpd else (self.host, self.port)
+
+    def _bind(self) -> None:
+        """创建HTTP服务并启动写入线程"""
+        self.httpd = ThreadingHTTPServer((self.host, self.port), ReadingRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.token = self.token
+        self.httpd.request_timeout = self.request_timeout
+        self.httpd.ingest_queue = self.ingest_queue
+        self.ingest_queue.start()
+        logger.info(f"抄表数据接收服务启动: http://{self.address[0]}:{self.address[1]}")
+
+    def start(self) -> Tuple[str, int]:
+        """
+        在后台线程启动服务
+        :return: 实际监听的地址和端口
+        """
+        self._bind()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="reading-ingest-http", daemon=True)
+        self._thread.start()
+        return self.address
+
+    def serve_forever(self) -> None:
+        """在当前线程运行服务，直到中断"""
+        self._bind()
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+            self.ingest_queue.stop()
+            logger.info("抄表数据接收服务已停止")
+
+    def stop(self) -> None:
+        """停止服务，已排队的数据会先写入"""
+        if not self.httpd or not self._thread:
+            return
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join(5)
+        self._thread = None
+        self.ingest_queue.stop()
+        logger.info("抄表数据接收服务已停止")
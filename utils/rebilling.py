@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+费用重新计算工具
+价格更正后确定受影响的月份和范围，在后台重新计算已有费用，并把新旧金额的差异写成报告
+"""
+
+import csv
+import os
+from datetime import datetime
+
+from models.charge import Charge
+from utils.background import run_in_background
+
+# 差异报告的列，与Charge.rebill返回的差异字典的键对应
+REPORT_COLUMNS = [
+    ('tenant_id', '租户ID'),
+    ('tenant_name', '租户名称'),
+    ('month', '月份'),
+    ('old_total', '原总费用'),
+    ('new_total', '新总费用'),
+    ('difference', '差额'),
+    ('paid', '已收金额'),
+    ('old_status', '原状态'),
+    ('new_status', '新状态'),
+]
+
+def affected_scope(*prices):
+    """
+    根据修改前后的价格确定需要重新计算的月份范围和(资源类型, 租户类型)
+    长期有效的价格计算到本月为止，尚未生效的价格不影响已有费用
+    :param prices: 价格对象，修改价格时传入修改前和修改后的价格，新增或删除时传入一个
+    :return: (开始月份, 结束月份, 范围列表)，没有受影响的月份时返回None
+    """
+    current_month = datetime.now().strftime('%Y-%m')
+    prices = [price for price in prices if price is not None and price.start_date]
+    if not prices:
+        return None
+
+    start_month = min(str(price.start_date)[:7] for price in prices)
+    end_month = max(str(price.end_date)[:7] if price.end_date else current_month for price in prices)
+    end_month = min(end_month, current_month)
+    if start_month > end_month:
+        return None
+
+    scopes = sorted({(price.resource_type, price.tenant_type or '全部') for price in prices})
+    return start_month, end_month, scopes
+
+def write_report(result, file_path):
+    """
+    把重新计算的结果写成CSV差异报告，每行一条金额或状态有变化的费用，末尾附各租户差额合计
+    :param result: Charge.rebill的返回值
+    :param file_path: 报告文件路径
+    :return: 报告文件路径
+    """
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tenant_totals = {}
+    with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow([title for _, title in REPORT_COLUMNS])
+        for diff in result['diffs']:
+            writer.writerow([diff[key] for key, _ in REPORT_COLUMNS])
+            old_total, new_total = tenant_totals.get(diff['tenant_id'], (0.0, 0.0))
+            tenant_totals[diff['tenant_id']] = (old_total + diff['old_total'], new_total + diff['new_total'])
+
+        writer.writerow([])
+        writer.writerow(['租户ID', '原总费用合计', '新总费用合计', '差额合计'])
+        for tenant_id, (old_total, new_total) in sorted(tenant_totals.items()):
+            writer.writerow([tenant_id, round(old_total, 2), round(new_total, 2), round(new_total - old_total, 2)])
+
+        writer.writerow([])
+        writer.writerow(['重新计算费用数', result['charges']])
+        writer.writerow(['有变化的费用数', result['changed']])
+        if result['failed_months']:
+            writer.writerow(['失败月份'] + result['failed_months'])
+    return file_path
+
+def default_report_path(start_month, end_month):
+    """
+    获取默认的差异报告路径
+    :param start_month: 开始月份
+    :param end_month: 结束月份
+    :return: 当前目录下rebilling文件夹中的报告路径
+    """
+    filename = f"rebill_{start_month}_{end_month}_{datetime.now().strftime('%Y%m%d%H%M%S')}.csv"
+    return os.path.join(os.getcwd(), "rebilling", filename)
+
+def rebill(start_month, end_month, scopes=None, report_path=None, progress=None):
+    """
+    重新计算费用并写出差异报告
+    :param start_month: 开始月份YYYY-MM
+    :param end_month: 结束月份YYYY-MM
+    :param scopes: 受影响的(资源类型, 租户类型)列表，为None时重新计算全部费用
+    :param report_path: 报告文件路径，为None时使用默认路径
+    :param progress: 进度回调，参数为月份、已完成月数和总月数
+    :return: Charge.rebill的返回值，另加键report为报告文件路径
+    """
+    result = Charge.rebill(start_month, end_month, scopes, progress)
+    result['report'] = write_report(result, report_path or default_report_path(start_month, end_month))
+    return result
+
+def rebill_async(start_month, end_month, scopes=None, on_complete=None, report_path=None, progress=None):
+    """
+    在后台线程中重新计算费用
+    回调在后台线程中调用，界面代码需通过after()回到主线程再更新控件
+    :param start_month: 开始月份YYYY-MM
+    :param end_month: 结束月份YYYY-MM
+    :param scopes: 受影响的(资源类型, 租户类型)列表
+    :param on_complete: 完成回调函数，参数为rebill的返回值，出错时为None
+    :param report_path: 报告文件路径
+    :param progress: 进度回调，参数为月份、已完成月数和总月数
+    :return: 后台线程
+    """
+    def task():
+        try:
+            return rebill(start_month, end_month, scopes, report_path, progress)
+        except Exception as e:
+            print(f"重新计算费用失败: {str(e)}")
+            return None
+
+    return run_in_background(task, on_complete, name="charge-rebilling")
@@ -0,0 +1,905 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+报表导出模块
+将月度报表、租户明细报表、收费统计报表和结算报表导出为Excel、PDF或CSV文件，
+不依赖界面，报表管理界面和命令行工具共用
+"""
+
+import csv
+from datetime import datetime
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from models.tenant import Tenant
+from models.charge import Charge
+from models.payment import Payment
+from models.settlement import Settlement
+from utils.excel_writer import ExcelExportWriter
+from utils import pdf_render
+
+
+# 报表类型 -> 工作表标题的翻译键
+REPORT_SHEET_TITLES = {
+    "monthly": "monthly_report",
+    "tenant_detail": "tenant_detail_report",
+    "payment_stat": "payment_stat_report_title",
+    "settlement": "water_electricity_settlement_report",
+}
+
+# 支持的导出格式
+EXPORT_FORMATS = ("xlsx", "pdf", "csv")
+
+
+class _CsvSheet:
+    """与StreamingSheet接口相同的CSV输出，导出CSV时复用Excel报表的行内容，样式和列宽设置被忽略"""
+    
+    def __init__(self, csv_writer):
+        """
+        :param csv_writer: csv.writer对象
+        """
+        self.csv_writer = csv_writer
+        self.row_count = 0
+    
+    def set_column_widths(self, widths):
+        """CSV没有列宽"""
+    
+    def hide_columns(self, *letters):
+        """CSV不能隐藏列"""
+    
+    def append(self, values, style=None, merge_to=None, fit=True):
+        """
+        写入一行
+        :param values: 单元格值
+        """
+        self.csv_writer.writerow(["" if value is None else value for value in values])
+        self.row_count += 1
+    
+    def stream(self, rows, style=None, sample_size=None):
+        """
+        逐行写入
+        :param rows: 行迭代器
+        :return: 写入的行数
+        """
+        count = 0
+        for values in rows:
+            self.append(values)
+            count += 1
+        return count
+
+
+class _CsvWriter:
+    """与ExcelExportWriter接口相同的CSV写入器，报表只有一个工作表"""
+    
+    def __init__(self, file):
+        """
+        :param file: 已打开的文本文件
+        """
+        self.file = file
+    
+    def create_sheet(self, title, max_width=None):
+        """
+        新建工作表，CSV文件没有工作表名称
+        :param title: 工作表名称
+        :return: CSV工作表
+        """
+        return _CsvSheet(csv.writer(self.file))
+
+
+class ReportExporter:
+    """报表导出类"""
+    
+    def __init__(self, language_utils=None):
+        """
+        初始化报表导出
+        :param language_utils: 语言工具类实例
+        """
+        self.language_utils = language_utils
+    
+    def get_text(self, key):
+        """
+        获取翻译文本
+        :param key: 文本键名
+        :return: 翻译后的文本
+        """
+        return self.language_utils.get_text(key) if self.language_utils else key
+    
+    def build_workbook(self, report_type, month, tenant_name, stat_type=None, writer=None):
+        """
+        生成报表工作簿，数据行流式写入
+        :param report_type: 报表类型（monthly/tenant_detail/payment_stat/settlement）
+        :param month: 月份
+        :param tenant_name: 租户名称（可选）
+        :param stat_type: 统计方式，收费统计报表使用
+        :param writer: 写入器，默认新建ExcelExportWriter
+        :return: 写入器，调用save保存
+        """
+        if report_type not in REPORT_SHEET_TITLES:
+            raise ValueError(f"不支持的报表类型: {report_type}")
+        
+        if writer is None:
+            writer = ExcelExportWriter()
+        
+        if report_type == "monthly":
+            self.export_monthly_excel(writer, month, tenant_name)
+        elif report_type == "tenant_detail":
+            self.export_tenant_detail_excel(writer, month, tenant_name)
+        elif report_type == "payment_stat":
+            self.export_payment_stat_excel(writer, month, tenant_name, stat_type or self.get_text('by_tenant'))
+        elif report_type == "settlement":
+            self.export_settlement_excel(writer, month, tenant_name)
+        return writer
+    
+    def write_pdf(self, file_path, report_type, month, tenant_name, stat_type=None):
+        """
+        生成报表PDF文件
+        :param file_path: 输出文件路径
+        :param report_type: 报表类型（monthly/tenant_detail/payment_stat/settlement）
+        :param month: 月份
+        :param tenant_name: 租户名称（可选）
+        :param stat_type: 统计方式，收费统计报表使用
+        """
+        if report_type not in REPORT_SHEET_TITLES:
+            raise ValueError(f"不支持的报表类型: {report_type}")
+        
+        c = canvas.Canvas(file_path, pagesize=A4)
+        if report_type == "monthly":
+            self.export_monthly_pdf(c, month, tenant_name)
+        elif report_type == "tenant_detail":
+            self.export_tenant_detail_pdf(c, month, tenant_name)
+        elif report_type == "payment_stat":
+            self.export_payment_stat_pdf(c, month, tenant_name, stat_type or self.get_text('by_tenant'))
+        elif report_type == "settlement":
+            self.export_settlement_pdf(c, month, tenant_name)
+        c.save()
+    
+    def write_csv(self, file_path, report_type, month, tenant_name, stat_type=None):
+        """
+        生成报表CSV文件，内容与Excel报表的工作表一致
+        :param file_path: 输出文件路径
+        :param report_type: 报表类型（monthly/tenant_detail/payment_stat/settlement）
+        :param month: 月份
+        :param tenant_name: 租户名称（可选）
+        :param stat_type: 统计方式，收费统计报表使用
+        """
+        # 带BOM的UTF-8，Excel打开时中文不会乱码
+        with open(file_path, "w", encoding="utf-8-sig", newline="") as f:
+            self.build_workbook(report_type, month, tenant_name, stat_type, writer=_CsvWriter(f))
+    
+    def export(self, report_type, month, file_path, file_format, tenant_name="", stat_type=None):
+        """
+        按格式导出报表
+        :param report_type: 报表类型（monthly/tenant_detail/payment_stat/settlement）
+        :param month: 月份
+        :param file_path: 输出文件路径
+        :param file_format: 导出格式（xlsx/pdf/csv）
+        :param tenant_name: 租户名称（可选）
+        :param stat_type: 统计方式，收费统计报表使用
+        :return: 输出文件路径
+        """
+        if file_format == "xlsx":
+            self.build_workbook(report_type, month, tenant_name, stat_type).save(file_path)
+        elif file_format == "pdf":
+            self.write_pdf(file_path, report_type, month, tenant_name, stat_type)
+        elif file_format == "csv":
+            self.write_csv(file_path, report_type, month, tenant_name, stat_type)
+        else:
+            raise ValueError(f"不支持的导出格式: {file_format}")
+        return file_path
+    
+    def _find_tenant_id(self, tenant_name):
+        """
+        按名称查找租户ID
+        :param tenant_name: 租户名称
+        :return: 租户ID，未指定或不存在时为None
+        """
+        if not tenant_name:
+            return None
+        tenant = next((t for t in Tenant.get_all({'name': tenant_name}) if t.name == tenant_name), None)
+        return tenant.id if tenant else None
+    
+    def export_monthly_excel(self, writer, month, tenant_name):
+        """
+        导出月度报表到Excel
+        :param writer: ExcelExportWriter对象
+        :param month: 月份
+        :param tenant_name: 租户名称（可选）
+        """
+        sheet = writer.create_sheet(f"月度报表_{month}")
+        sheet.set_column_widths([25, 12, 12, 15, 12])
+        
+        # 表头
+        header = [self.get_text('tenant_name'), f"{self.get_text('water_fee')}({self.get_text('yuan')})", f"{self.get_text('electricity_fee')}({self.get_text('yuan')})", f"{self.get_text('total_charge')}({self.get_text('yuan')})", self.get_text('status')]
+        sheet.append(header, "boxed_header")
+        
+        # 填充数据，状态由数据库按已收金额维护
+        rows = Charge.iter_month_rows(month, self._find_tenant_id(tenant_name))
+        count = sheet.stream(((row[0], row[4], row[7], row[8], row[9]) for row in rows), "boxed_center")
+        
+        # 添加总计行
+        sheet.append([None] * 5, "boxed_center")
+        sheet.append([
+            self.get_text('total'),
+            f"=SUM(B2:B{count + 1})",
+            f"=SUM(C2:C{count + 1})",
+            f"=SUM(D2:D{count + 1})",
+            None
+        ], ["boxed_bold", "boxed_center", "boxed_center", "boxed_center", "boxed_center"])
+    
+    def export_tenant_detail_excel(self, writer, month, tenant_name):
+        """
+        导出租户明细报表到Excel
+        :param writer: ExcelExportWriter对象
+        :param month: 月份
+        :param tenant_name: 租户名称（可选）
+        """
+        sheet = writer.create_sheet(f"租户明细报表_{month}")
+        sheet.set_column_widths([25, 10, 12, 10, 12, 12, 10, 12, 15, 12])
+        
+        # 表头
+        header = ["租户名称", "月份", "水用量", "水单价", "水费", "电用量", "电单价", "电费", "总费用", "状态"]
+        sheet.append(header, "boxed_header")
+        
+        # 填充数据，状态由数据库按已收金额维护
+        sheet.stream(Charge.iter_month_rows(month, self._find_tenant_id(tenant_name)), "boxed_center")
+    
+    def export_payment_stat_excel(self, writer, month, tenant_name, stat_type):
+        """
+        导出收费统计报表到Excel
+        :param writer: ExcelExportWriter对象
+        :param month: 月份
+        :param tenant_name: 租户名称（可选）
+        :param stat_type: 统计方式
+        """
+        sheet = writer.create_sheet(f"收费统计报表_{month}")
+        
+        # 表头
+        sheet.append(["统计项", "金额(元)", "占比"], "header")
+        
+        # 获取收费数据
+        payments = Payment.get_by_month(month)
+        
+        # 租户ID到名称的映射
+        tenants = Tenant.get_all()
+        tenant_map = {t.id: t.name for t in tenants}
+        
+        # 费用ID到租户ID的映射
+        charges = Charge.get_by_month(month)
+        charge_tenant_map = {c.id: c.tenant_id for c in charges}
+        
+        # 租户ID到类型的映射
+        tenant_type_map = {t.id: t.type for t in tenants}
+        
+        # 统计数据
+        stat_data = {}
+        total_amount = 0
+        
+        for payment in payments:
+            tenant_id = charge_tenant_map.get(payment.charge_id, 0)
+            current_tenant_name = tenant_map.get(tenant_id, "未知租户")
+            
+            # 如果指定了租户，过滤数据
+            if tenant_name and current_tenant_name != tenant_name:
+                continue
+            
+            # 按统计方式分组
+            if stat_type == "按租户":
+                key = current_tenant_name
+            elif stat_type == "按类型":
+                key = tenant_type_map.get(tenant_id, "未知类型")
+            else:
+                key = current_tenant_name
+            
+            stat_data[key] = stat_data.get(key, 0) + payment.amount
+            total_amount += payment.amount
+        
+        # 填充数据
+        sheet.stream(
+            [key, amount, f"{(amount / total_amount * 100) if total_amount > 0 else 0:.2f}%"]
+            for key, amount in stat_data.items()
+        )
+        
+        # 添加总计行
+        sheet.append([])
+        sheet.append(["总计", total_amount, "100.00%"])
+    
+    def export_settlement_excel(self, writer, month, tenant_name=None):
+        """
+        导出结算报表到Excel
+        :param writer: ExcelExportWriter对象
+        :param month: 月份
+        :param tenant_name: 租户名称（可选）
+        """
+        sheet = writer.create_sheet(f"结算报表_{month}")
+        
+        # 获取结算数据
+        settlement = Settlement.get_by_month(month)
+        
+        # 获取收费数据
+        payment_count = Payment.count_by_month(month)
+        total_payment = Payment.get_total_by_month(month)
+        
+        # 填充结算信息
+        sheet.append(["结算报表"])
+        sheet.append(["报表月份", month])
+        sheet.append(["生成时间", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
+        sheet.append([])
+        
+        sheet.append(["收费统计"])
+        sheet.append(["当月收费总金额", f"{total_payment:.2f} {self.get_text('yuan')}"])
+        sheet.append(["收费记录条数", f"{payment_count} 条"])
+        sheet.append([])
+        
+        sheet.append(["结算信息"])
+        if settlement:
+            sheet.append(["结算日期", settlement.settle_date])
+            sheet.append(["结算金额", f"{settlement.total_amount:.2f} {self.get_text('yuan')}"])
+            sheet.append(["出纳姓名", settlement.cashier])
+            sheet.append(["备注", settlement.notes if settlement.notes else "无"])
+        else:
+            sheet.append(["本月尚未结算"])
+            sheet.append(["建议结算金额", f"{total_payment:.2f} {self.get_text('yuan')}"])
+    
+    def _table_header(self, headers, x_positions, col_widths, line_start, line_end, font_name):
+        """
+        创建表头模板：列标题在各列居中，下方15磅处画分隔线，换页时直接引用
+        :param headers: 列标题
+        :param x_positions: 各列左边位置
+        :param col_widths: 列宽
+        :param line_start: 分隔线起点
+        :param line_end: 分隔线终点
+        :param font_name: 列标题字体
+        :return: 页面模板，引用位置为列标题基线
+        """
+        def draw(c):
+            c.setFont(font_name, 10)
+            for i, header in enumerate(headers):
+                # 计算列标题居中位置
+                header_width = c.stringWidth(header, font_name, 10)
+                c.drawString(x_positions[i] + (col_widths[i] - header_width) / 2, 0, header)
+            # 画分隔线
+            c.line(line_start, -15, line_end, -15)
+        
+        right = max(line_end, x_positions[-1] + col_widths[-1])
+        return pdf_render.PageTemplate("table_header", draw, (0, -20, right, 15))
+    
+    def export_monthly_pdf(self, c, month, tenant_name):
+        """
+        导出月度报表到PDF
+        :param c: Canvas对象
+        :param month: 月份
+        :param tenant_name: 租户名称（可选）
+        """
+        # 页面设置
+        page_width, page_height = A4
+        margin = 50
+        font = pdf_render.get_chinese_font()
+        bold = pdf_render.bold_font(font)
+        
+        # 设置标题
+        c.setFont(bold, 16)
+        title = self.get_text('monthly_water_electricity_report')
+        title_width = c.stringWidth(title, bold, 16)
+        c.drawString((page_width - title_width) / 2, page_height - margin - 20, title)
+        
+        # 设置基本信息
+        c.setFont(font, 12)
+        y = page_height - margin - 40
+        c.drawString(margin, y, f"{self.get_text('report_month')}: {month}")
+        
+        y -= 15
+        c.drawString(margin, y, f"{self.get_text('generate_time')}: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        if tenant_name:
+            y -= 15
+            c.drawString(margin, y, f"{self.get_text('tenant')}: {tenant_name}")
+        
+        # 画分隔线
+        y -= 15
+        c.line(margin, y, page_width - margin, y)
+        
+        # 设置表头
+        headers = [self.get_text('tenant_name'), f"{self.get_text('water_fee')}({self.get_text('yuan')})", f"{self.get_text('electricity_fee')}({self.get_text('yuan')})", f"{self.get_text('total_charge')}({self.get_text('yuan')})", self.get_text('status')]
+        # 调整列宽，使布局更合理
+        col_widths = [150, 80, 80, 80, 80]
+        x_positions = [margin]
+        for i in range(1, len(col_widths)):
+            x_positions.append(x_positions[i-1] + col_widths[i-1])
+        
+        header_template = self._table_header(headers, x_positions, col_widths, margin, page_width - margin, bold)
+        y -= 20
+        header_template.draw_on(c, 0, y)
+        y -= 15
+        
+        # 获取费用数据
+        charges = Charge.get_by_month(month)
+        
+        # 如果指定了租户，过滤数据
+        if tenant_name:
+            tenant = next((t for t in Tenant.get_all() if t.name == tenant_name), None)
+            if tenant:
+                charges = [c for c in charges if c.tenant_id == tenant.id]
+        
+        # 租户ID到名称的映射
+        tenants = Tenant.get_all()
+        tenant_map = {t.id: t.name for t in tenants}
+        
+        # 设置数据字体
+        c.setFont(font, 10)
+        
+        # 填充数据
+        for charge in charges:
+            y -= 15
+            # 确保不超过页边距
+            if y < margin + 50:
+                # 新建页面
+                c.showPage()
+                # 引用表头模板
+                header_template.draw_on(c, 0, page_height - margin - 40)
+                y = page_height - margin - 70
+                c.setFont(font, 10)
+            
+            tenant_name = tenant_map.get(charge.tenant_id, "未知租户")
+            
+            # 状态由数据库按已收金额维护
+            status = charge.status
+            
+            # 租户名称（左对齐）
+            c.drawString(x_positions[0], y, tenant_name[:20] + "..." if len(tenant_name) > 20 else tenant_name)
+            
+            # 水费（右对齐）
+            water_str = f"{charge.water_charge:.2f}"
+            water_width = c.stringWidth(water_str, font, 10)
+            c.drawString(x_positions[1] + col_widths[1] - water_width - 5, y, water_str)
+            
+            # 电费（右对齐）
+            electricity_str = f"{charge.electricity_charge:.2f}"
+            electricity_width = c.stringWidth(electricity_str, font, 10)
+            c.drawString(x_positions[2] + col_widths[2] - electricity_width - 5, y, electricity_str)
+            
+            # 总费用（右对齐）
+            total_str = f"{charge.total_charge:.2f}"
+            total_width = c.stringWidth(total_str, font, 10)
+            c.drawString(x_positions[3] + col_widths[3] - total_width - 5, y, total_str)
+            
+            # 状态（居中）
+            status_width = c.stringWidth(status, font, 10)
+            c.drawString(x_positions[4] + (col_widths[4] - status_width) / 2, y, status)
+        
+        # 画分隔线
+        y -= 15
+        c.line(margin, y, page_width - margin, y)
+        
+        # 计算总计
+        total_water = sum([c.water_charge for c in charges])
+        total_electricity = sum([c.electricity_charge for c in charges])
+        total_charge = sum([c.total_charge for c in charges])
+        
+        # 绘制总计行
+        y -= 15
+        c.setFont(bold, 10)
+        
+        c.drawString(x_positions[0], y, "合计")
+        
+        total_water_str = f"{total_water:.2f}"
+        total_water_width = c.stringWidth(total_water_str, bold, 10)
+        c.drawString(x_positions[1] + col_widths[1] - total_water_width - 5, y, total_water_str)
+        
+        total_electricity_str = f"{total_electricity:.2f}"
+        total_electricity_width = c.stringWidth(total_electricity_str, bold, 10)
+        c.drawString(x_positions[2] + col_widths[2] - total_electricity_width - 5, y, total_electricity_str)
+        
+        total_charge_str = f"{total_charge:.2f}"
+        total_charge_width = c.stringWidth(total_charge_str, bold, 10)
+        c.drawString(x_positions[3] + col_widths[3] - total_charge_width - 5, y, total_charge_str)
+    
+    def export_tenant_detail_pdf(self, c, month, tenant_name):
+        """
+        导出租户明细报表到PDF
+        :param c: Canvas对象
+        :param month: 月份
+        :param tenant_name: 租户名称（可选）
+        """
+        # 页面设置
+        page_width, page_height = A4
+        margin = 50
+        font = pdf_render.get_chinese_font()
+        bold = pdf_render.bold_font(font)
+        
+        # 设置标题
+        c.setFont(bold, 16)
+        title = self.get_text('tenant_water_electricity_detail_report')
+        title_width = c.stringWidth(title, bold, 16)
+        c.drawString((page_width - title_width) / 2, page_height - margin - 20, title)
+        
+        # 设置基本信息
+        c.setFont(font, 12)
+        y = page_height - margin - 40
+        c.drawString(margin, y, f"{self.get_text('report_month')}: {month}")
+        
+        y -= 15
+        c.drawString(margin, y, f"{self.get_text('generate_time')}: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        if tenant_name:
+            y -= 15
+            c.drawString(margin, y, f"{self.get_text('tenant')}: {tenant_name}")
+        
+        # 画分隔线
+        y -= 15
+        c.line(margin, y, page_width - margin, y)
+        
+        # 设置表头
+        headers = [self.get_text('tenant_name'), self.get_text('month'), self.get_text('water_usage'), self.get_text('water_unit_price'), self.get_text('water_fee'), self.get_text('electricity_usage'), self.get_text('electricity_unit_price'), self.get_text('electricity_fee'), self.get_text('total_charge'), self.get_text('status')]
+        # 调整列宽，使布局更合理
+        col_widths = [120, 60, 60, 60, 60, 60, 60, 60, 80, 60]
+        x_positions = [margin]
+        for i in range(1, len(col_widths)):
+            x_positions.append(x_positions[i-1] + col_widths[i-1])
+        
+        header_template = self._table_header(headers, x_positions, col_widths, margin, page_width - margin, bold)
+        y -= 20
+        header_template.draw_on(c, 0, y)
+        y -= 15
+        
+        # 获取费用数据
+        charges = Charge.get_by_month(month)
+        
+        # 如果指定了租户，过滤数据
+        if tenant_name:
+            tenant = next((t for t in Tenant.get_all() if t.name == tenant_name), None)
+            if tenant:
+                charges = [c for c in charges if c.tenant_id == tenant.id]
+        
+        # 租户ID到名称的映射
+        tenants = Tenant.get_all()
+        tenant_map = {t.id: t.name for t in tenants}
+        
+        # 设置数据字体
+        c.setFont(font, 10)
+        
+        # 填充数据
+        for charge in charges:
+            y -= 15
+            # 确保不超过页边距
+            if y < margin + 50:
+                # 新建页面
+                c.showPage()
+                # 引用表头模板
+                header_template.draw_on(c, 0, page_height - margin - 40)
+                y = page_height - margin - 70
+                c.setFont(font, 10)
+            
+            tenant_name = tenant_map.get(charge.tenant_id, "未知租户")
+            
+            # 状态由数据库按已收金额维护
+            status = charge.status
+            
+            # 租户名称（左对齐）
+            c.drawString(x_positions[0], y, tenant_name[:15] + "..." if len(tenant_name) > 15 else tenant_name)
+            
+            # 月份（居中）
+            month_width = c.stringWidth(charge.month, font, 10)
+            c.drawString(x_positions[1] + (col_widths[1] - month_width) / 2, y, charge.month)
+            
+            # 水用量（右对齐）
+            water_usage_str = f"{charge.water_usage:.2f}"
+            water_usage_width = c.stringWidth(water_usage_str, font, 10)
+            c.drawString(x_positions[2] + col_widths[2] - water_usage_width - 5, y, water_usage_str)
+            
+            # 水单价（右对齐）
+            water_price_str = f"{charge.water_price:.2f}"
+            water_price_width = c.stringWidth(water_price_str, font, 10)
+            c.drawString(x_positions[3] + col_widths[3] - water_price_width - 5, y, water_price_str)
+            
+            # 水费（右对齐）
+            water_charge_str = f"{charge.water_charge:.2f}"
+            water_charge_width = c.stringWidth(water_charge_str, font, 10)
+            c.drawString(x_positions[4] + col_widths[4] - water_charge_width - 5, y, water_charge_str)
+            
+            # 电用量（右对齐）
+            electricity_usage_str = f"{charge.electricity_usage:.2f}"
+            electricity_usage_width = c.stringWidth(electricity_usage_str, font, 10)
+            c.drawString(x_positions[5] + col_widths[5] - electricity_usage_width - 5, y, electricity_usage_str)
+            
+            # 电单价（右对齐）
+            electricity_price_str = f"{charge.electricity_price:.2f}"
+            electricity_price_width = c.stringWidth(electricity_price_str, font, 10)
+            c.drawString(x_positions[6] + col_widths[6] - electricity_price_width - 5, y, electricity_price_str)
+            
+            # 电费（右对齐）
+            electricity_charge_str = f"{charge.electricity_charge:.2f}"
+            electricity_charge_width = c.stringWidth(electricity_charge_str, font, 10)
+            c.drawString(x_positions[7] + col_widths[7] - electricity_charge_width - 5, y, electricity_charge_str)
+            
+            # 总费用（右对齐）
+            total_charge_str = f"{charge.total_charge:.2f}"
+            total_charge_width = c.stringWidth(total_charge_str, font, 10)
+            c.drawString(x_positions[8] + col_widths[8] - total_charge_width - 5, y, total_charge_str)
+            
+            # 状态（居中）
+            status_width = c.stringWidth(status, font, 10)
+            c.drawString(x_positions[9] + (col_widths[9] - status_width) / 2, y, status)
+    
+    def export_payment_stat_pdf(self, c, month, tenant_name, stat_type):
+        """
+        导出收费统计报表到PDF
+        :param c: Canvas对象
+        :param month: 月份
+        :param tenant_name: 租户名称（可选）
+        :param stat_type: 统计方式
+        """
+        # 页面设置
+        page_width, page_height = A4
+        margin = 50
+        font = pdf_render.get_chinese_font()
+        bold = pdf_render.bold_font(font)
+        
+        # 设置标题
+        c.setFont(bold, 16)
+        title = self.get_text('payment_stat_report')
+        title_width = c.stringWidth(title, bold, 16)
+        c.drawString((page_width - title_width) / 2, page_height - margin - 20, title)
+        
+        # 设置基本信息
+        c.setFont(font, 12)
+        y = page_height - margin - 40
+        c.drawString(margin, y, f"{self.get_text('report_month')}: {month}")
+        
+        y -= 15
+        c.drawString(margin, y, f"{self.get_text('stat_type')}: {stat_type}")
+        
+        y -= 15
+        c.drawString(margin, y, f"{self.get_text('generate_time')}: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        if tenant_name:
+            y -= 15
+            c.drawString(margin, y, f"{self.get_text('tenant')}: {tenant_name}")
+        
+        # 画分隔线
+        y -= 15
+        c.line(margin, y, page_width - margin, y)
+        
+        # 获取收费数据
+        payments = Payment.get_by_month(month)
+        
+        # 租户ID到名称的映射
+        tenants = Tenant.get_all()
+        tenant_map = {t.id: t.name for t in tenants}
+        
+        # 费用ID到租户ID的映射
+        charges = Charge.get_by_month(month)
+        charge_tenant_map = {c.id: c.tenant_id for c in charges}
+        
+        # 租户ID到类型的映射
+        tenant_type_map = {t.id: t.type for t in tenants}
+        
+        # 统计数据
+        stat_data = {}
+        total_amount = 0
+        
+        for payment in payments:
+            tenant_id = charge_tenant_map.get(payment.charge_id, 0)
+            current_tenant_name = tenant_map.get(tenant_id, "未知租户")
+            
+            # 如果指定了租户，过滤数据
+            if tenant_name and current_tenant_name != tenant_name:
+                continue
+            
+            # 按统计方式分组
+            if stat_type == "按租户":
+                key = current_tenant_name
+            elif stat_type == "按类型":
+                key = tenant_type_map.get(tenant_id, "未知类型")
+            else:
+                key = current_tenant_name
+            
+            stat_data[key] = stat_data.get(key, 0) + payment.amount
+            total_amount += payment.amount
+        
+        # 设置表头
+        headers = [self.get_text('stat_item'), f"{self.get_text('amount')}({self.get_text('yuan')})"]
+        # 调整列宽，使布局更合理
+        col_widths = [200, 100, 80]
+        x_positions = [margin]
+        for i in range(1, len(col_widths)):
+            x_positions.append(x_positions[i-1] + col_widths[i-1])
+        
+        header_template = self._table_header(headers, x_positions, col_widths, margin, page_width - margin, bold)
+        y -= 20
+        header_template.draw_on(c, 0, y)
+        y -= 15
+        
+        # 设置数据字体
+        c.setFont(font, 10)
+        
+        # 填充数据
+        for key, amount in stat_data.items():
+            y -= 15
+            # 确保不超过页边距
+            if y < margin + 50:
+                # 新建页面
+                c.showPage()
+                # 引用表头模板
+                header_template.draw_on(c, 0, page_height - margin - 40)
+                y = page_height - margin - 70
+                c.setFont(font, 10)
+            
+            percentage = (amount / total_amount * 100) if total_amount > 0 else 0
+            
+            # 统计项（左对齐）
+            c.drawString(x_positions[0], y, key[:30] + "..." if len(key) > 30 else key)
+            
+            # 金额（右对齐）
+            amount_str = f"{amount:.2f}"
+            amount_width = c.stringWidth(amount_str, font, 10)
+            c.drawString(x_positions[1] + col_widths[1] - amount_width - 5, y, amount_str)
+            
+            # 占比（右对齐）
+            percentage_str = f"{percentage:.2f}%"
+            percentage_width = c.stringWidth(percentage_str, font, 10)
+            c.drawString(x_positions[2] + col_widths[2] - percentage_width - 5, y, percentage_str)
+        
+        # 画分隔线
+        y -= 15
+        c.line(margin, y, page_width - margin, y)
+        
+        # 绘制总计行
+        y -= 15
+        c.setFont(bold, 10)
+        
+        c.drawString(x_positions[0], y, "合计")
+        
+        # 总计金额（右对齐）
+        total_str = f"{total_amount:.2f}"
+        total_width = c.stringWidth(total_str, bold, 10)
+        c.drawString(x_positions[1] + col_widths[1] - total_width - 5, y, total_str)
+        
+        # 总计占比（右对齐）
+        c.drawString(x_positions[2] + col_widths[2] - c.stringWidth("100.00%", bold, 10) - 5, y, "100.00%")
+    
+    def export_settlement_pdf(self, c, month, tenant_name):
+        """
+        导出结算报表到PDF
+        :param c: Canvas对象
+        :param month: 月份
+        :param tenant_name: 租户名称（可选）
+        """
+        # 页面设置
+        page_width, page_height = A4
+        margin = 50
+        font = pdf_render.get_chinese_font()
+        bold = pdf_render.bold_font(font)
+        
+        # 设置标题
+        c.setFont(bold, 16)
+        title = self.get_text('water_electricity_settlement_report')
+        title_width = c.stringWidth(title, bold, 16)
+        c.drawString((page_width - title_width) / 2, page_height - margin - 20, title)
+        
+        # 设置基本信息
+        c.setFont(font, 12)
+        y = page_height - margin - 40
+        c.drawString(margin, y, f"{self.get_text('report_month')}: {month}")
+        
+        y -= 15
+        c.drawString(margin, y, f"{self.get_text('generate_time')}: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        # 画分隔线
+        y -= 15
+        c.line(margin, y, page_width - margin, y)
+        
+        # 获取结算数据
+        settlement = Settlement.get_by_month(month)
+        
+        # 获取收费数据
+        payments = Payment.get_by_month(month)
+        total_payment = Payment.get_total_by_month(month)
+        
+        # 收费统计
+        y -= 20
+        c.setFont(bold, 12)
+        c.drawString(margin, y, self.get_text('payment_statistics'))
+        
+        y -= 15
+        c.setFont(font, 10)
+        c.drawString(margin + 10, y, f"{self.get_text('total_monthly_payment')}: {total_payment:.2f} {self.get_text('yuan')}")
+        
+        y -= 15
+        c.drawString(margin + 10, y, f"{self.get_text('payment_records')}: {len(payments)} {self.get_text('items')}")
+        
+        # 按统计方式显示详细收费情况
+        # 获取收费数据
+        payments = Payment.get_by_month(month)
+        
+        tenants = Tenant.get_all()
+        
+        # 费用ID到租户ID的映射
+        charges = Charge.get_by_month(month)
+        charge_tenant_map = {c.id: c.tenant_id for c in charges}
+        
+        # 租户ID到类型的映射
+        tenant_type_map = {t.id: t.type for t in tenants}
+        
+        # 统计数据
+        stat_data = {}
+        for payment in payments:
+            tenant_id = charge_tenant_map.get(payment.charge_id, 0)
+            current_tenant_type = tenant_type_map.get(tenant_id, self.get_text('unknown_type'))
+            
+            # 按租户类型统计
+            key = current_tenant_type
+            if key not in stat_data:
+                stat_data[key] = 0
+            stat_data[key] += payment.amount
+        
+        if stat_data:
+            y -= 20
+            c.setFont(bold, 12)
+            c.drawString(margin, y, f"{self.get_text('stat_by_tenant_type')}:")
+            
+            # 设置表头
+            y -= 15
+            headers = [self.get_text('tenant_type'), f"{self.get_text('amount')}({self.get_text('yuan')})"]
+            # 调整列宽，使布局更合理
+            col_widths = [120, 100, 80]
+            x_positions = [margin + 10]
+            for i in range(1, len(col_widths)):
+                x_positions.append(x_positions[i-1] + col_widths[i-1])
+            
+            self._table_header(headers, x_positions, col_widths, margin + 10, page_width - margin, bold).draw_on(c, 0, y)
+            y -= 15
+            
+            # 设置数据字体
+            c.setFont(font, 10)
+            
+            # 填充数据
+            for key, amount in stat_data.items():
+                y -= 15
+                
+                # 租户类型（左对齐）
+                c.drawString(x_positions[0], y, key)
+                
+                # 金额（右对齐）
+                amount_str = f"{amount:.2f}"
+                amount_width = c.stringWidth(amount_str, font, 10)
+                c.drawString(x_positions[1] + col_widths[1] - amount_width - 5, y, amount_str)
+            
+            # 画分隔线
+            y -= 15
+            c.line(margin + 10, y, page_width - margin, y)
+            
+            # 绘制总计行
+            y -= 15
+            c.setFont(bold, 10)
+            
+            c.drawString(x_positions[0], y, self.get_text('total'))
+            
+            # 总计金额（右对齐）
+            total_str = f"{total_payment:.2f}"
+            total_width = c.stringWidth(total_str, bold, 10)
+            c.drawString(x_positions[1] + col_widths[1] - total_width - 5, y, total_str)
+        
+        # 结算信息
+        y -= 30
+        c.setFont(bold, 12)
+        c.drawString(margin, y, self.get_text('settlement_info'))
+        
+        y -= 15
+        c.setFont(font, 10)
+        if settlement:
+            c.drawString(margin + 10, y, f"{self.get_text('settlement_date')}: {settlement.settle_date}")
+            
+            y -= 15
+            c.drawString(margin + 10, y, f"{self.get_text('settlement_amount')}: {settlement.total_amount:.2f} {self.get_text('yuan')}")
+            
+            y -= 15
+            c.drawString(margin + 10, y, f"{self.get_text('cashier_name')}: {settlement.cashier}")
+            
+            y -= 15
+            c.drawString(margin + 10, y, f"{self.get_text('remarks')}: {settlement.notes if settlement.notes else self.get_text('none')}")
+        else:
+            c.drawString(margin + 10, y, self.get_text('no_settlement_this_month'))
+            
+            y -= 15
+            c.drawString(margin + 10, y, f"{self.get_text('suggested_settlement_amount')}: {total_payment:.2f} {self.get_text('yuan')}")
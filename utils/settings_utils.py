@@ -49,7 +49,16 @@ class SettingsUtils:
                 "auto_backup": "false",  # 是否自动备份
                 "backup_interval_days": "7",  # 自动备份间隔（天）
                 "last_backup_date": "",  # 上次备份日期
+                "backup_keep_daily": "7",  # 自动备份按天保留份数
+                "backup_keep_monthly": "12",  # 自动备份按月保留份数
                 "language": "zh_CN"  # 语言设置
+            },
+            "ingest": {
+                "enabled": "false",  # 是否随程序启动抄表数据接收服务
+                "host": "127.0.0.1",  # 监听地址，局域网设备接入时改为0.0.0.0
+                "port": "8765",  # 监听端口
+                "token": "",  # 访问令牌，为空时不校验
+                "reader": "自动抄表"  # 数据未提供抄表人时使用的抄表人
             }
         }
         
@@ -88,7 +97,7 @@ class SettingsUtils:
         """
         try:
             return self.config.getint(section, option)
-        except (KeyError, ValueError):
+        except (KeyError, ValueError, configparser.Error):
             return default
     
     def get_float_setting(self, section: str, option: str, default: float = 0.0) -> float:
@@ -101,7 +110,7 @@ class SettingsUtils:
         """
         try:
             return self.config.getfloat(section, option)
-        except (KeyError, ValueError):
+        except (KeyError, ValueError, configparser.Error):
             return default
     
     def get_boolean_setting(self, section: str, option: str, default: bool = False) -> bool:
@@ -114,7 +123,7 @@ class SettingsUtils:
         """
         try:
             return self.config.getboolean(section, option)
-        except (KeyError, ValueError):
+        except (KeyError, ValueError, configparser.Error):
             return default
     
     def set_setting(self, section: str, option: str, value: Union[str, int, float, bool]) -> None:
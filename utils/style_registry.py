@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ttk命名样式注册表
+集中定义各界面组件使用的命名样式，每个Tk解释器只配置一次
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Dict, Optional, Tuple
+
+
+# 命名样式定义：样式名 -> {"configure": {...}, "map": {...}}
+NAMED_STYLES: Dict[str, Dict[str, Dict[str, Any]]] = {
+    # 仪表盘数据卡片
+    "DataCards.TFrame": {"configure": {"background": "white"}},
+    "Card.TFrame": {"configure": {"background": "white", "relief": "solid", "borderwidth": 1, "bordercolor": "#e0e0e0"}},
+    "CardTitle.TLabel": {"configure": {"font": ("", 10)}},
+    "CardValue.TLabel": {"configure": {"font": ("", 11, "bold")}},
+    "CardChange.TLabel": {"configure": {"font": ("", 9)}},
+    "PositiveChange.TLabel": {"configure": {"foreground": "green"}},
+    "NegativeChange.TLabel": {"configure": {"foreground": "red"}},
+    "NeutralChange.TLabel": {"configure": {"foreground": "gray"}},
+    # 仪表盘图表
+    "Charts.TFrame": {"configure": {"background": "white"}},
+    "ChartContainer.TFrame": {"configure": {"background": "white", "relief": "solid", "borderwidth": 1, "bordercolor": "#e0e0e0"}},
+    "ChartTitle.TLabel": {"configure": {"font": ("Arial", 10, "bold")}},
+    # 仪表盘导航栏
+    "NavBar.TFrame": {"configure": {"background": "#f0f0f0"}},
+    # 仪表盘侧边菜单
+    "SideMenu.TFrame": {"configure": {"background": "#f8f9fa"}},
+    "Menu.TButton": {
+        "configure": {"width": 15, "anchor": tk.W, "padding": (10, 8)},
+        # 按钮在不同状态下的背景色
+        "map": {"background": [("active", "#e9ecef"), ("!active", "#f8f9fa")]},
+    },
+    "SubMenu.TButton": {"configure": {"width": 13, "anchor": tk.W, "padding": (25, 5)}},
+    # 注册窗口
+    "Register.TLabel": {"configure": {"font": (".AppleSystemUIFont", 12)}},
+    "RegisterTitle.TLabel": {"configure": {"font": (".AppleSystemUIFont", 16, "bold")}},
+    "RegisterStatus.TLabel": {"configure": {"font": (".AppleSystemUIFont", 10)}},
+    "Register.TButton": {"configure": {"font": (".AppleSystemUIFont", 11)}},
+}
+
+# 随主窗口宽度调整的按钮样式及宽度：窗口宽度小于阈值时使用较窄的按钮
+RESIZE_BUTTON_STYLE = ".TButton"
+NARROW_WINDOW_WIDTH = 800
+NARROW_BUTTON_WIDTH = 10
+NORMAL_BUTTON_WIDTH = 12
+
+
+class StyleRegistry:
+    """ttk命名样式注册表"""
+
+    _instance: Optional['StyleRegistry'] = None
+
+    def __init__(self):
+        """初始化样式注册表"""
+        # 已配置过的Tk解释器，登录窗口和主窗口使用不同的根窗口，样式需分别配置
+        self._configured_tks: Dict[int, Any] = {}
+        # 各Tk解释器当前的按钮宽度：id -> (Tk解释器, 宽度)
+        self._button_widths: Dict[int, Tuple[Any, int]] = {}
+
+    @classmethod
+    def get_instance(cls) -> 'StyleRegistry':
+        """
+        获取进程内唯一的样式注册表
+        :return: 样式注册表实例
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def ensure_initialized(self, master: Optional[tk.Misc] = None) -> ttk.Style:
+        """
+        确保当前Tk解释器已配置全部命名样式，已配置时直接返回
+        :param master: 任意控件，用于确定所属Tk解释器
+        :return: ttk样式对象
+        """
+        style = ttk.Style(master)
+        key = id(style.tk)
+        if self._configured_tks.get(key) is style.tk:
+            return style
+
+        for style_name, options in NAMED_STYLES.items():
+            if options.get("configure"):
+                style.configure(style_name, **options["configure"])
+            if options.get("map"):
+                style.map(style_name, **options["map"])
+
+        self._configured_tks[key] = style.tk
+        return style
+
+    def apply_window_width(self, window_width: int, master: Optional[tk.Misc] = None) -> None:
+        """
+        按主窗口宽度调整按钮宽度，只在宽度档位变化时重新配置样式，窗口连续缩放时不重复修改全局样式
+        :param window_width: 窗口宽度（像素）
+        :param master: 任意控件，用于确定所属Tk解释器
+        """
+        width = NARROW_BUTTON_WIDTH if window_width < NARROW_WINDOW_WIDTH else NORMAL_BUTTON_WIDTH
+        style = ttk.Style(master)
+        key = id(style.tk)
+        current = self._button_widths.get(key)
+        if current and current[0] is style.tk and current[1] == width:
+            return
+        style.configure(RESIZE_BUTTON_STYLE, width=width)
+        self._button_widths[key] = (style.tk, width)
+
+
+def get_style_registry() -> StyleRegistry:
+    """
+    获取全局样式注册表
+    :return: 样式注册表实例
+    """
+    return StyleRegistry.get_instance()
@@ -9,15 +9,13 @@ import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 from datetime import datetime
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
 from models.tenant import Tenant
 from models.charge import Charge
 from models.reading import MeterReading
-from models.meter import Meter
 from models.payment import Payment
 from utils.language_utils import LanguageUtils
+from utils.excel_writer import ExcelExportWriter
+from database import query_stats
 
 class ChargeView:
     """费用管理视图类"""
@@ -31,6 +29,8 @@ class ChargeView:
         self.parent = parent
         self.language_utils = language_utils
         self.charge_list = []
+        # 当前列表中各费用的已收金额，列表加载时一次性汇总
+        self.paid_totals = {}
         self.selected_charge = None
         self.create_widgets()
         self.load_charge_list()
@@ -59,6 +59,7 @@ class ChargeView:
         
         # 更新操作按钮文本
         self.action_buttons['calculate_btn']['text'] = self.get_text('calculate_charges')
+        self.action_buttons['incremental_check']['text'] = self.get_text('incremental_calculation')
         self.action_buttons['export_btn']['text'] = self.get_text('export_charge_sheet')
         self.action_buttons['delete_btn']['text'] = self.get_text('delete_records')
         
@@ -197,6 +198,11 @@ class ChargeView:
         self.action_buttons['calculate_btn'] = ttk.Button(action_frame, text=self.get_text('calculate_charges'), command=self.calculate_charges)
         self.action_buttons['calculate_btn'].pack(side=tk.LEFT, padx=5)
         
+        # 增量计算选项，只重算抄表、水电表或价格有变化的租户
+        self.incremental_var = tk.BooleanVar(value=False)
+        self.action_buttons['incremental_check'] = ttk.Checkbutton(action_frame, text=self.get_text('incremental_calculation'), variable=self.incremental_var)
+        self.action_buttons['incremental_check'].pack(side=tk.LEFT, padx=5)
+        
         # 导出收费表按钮
         self.action_buttons['export_btn'] = ttk.Button(action_frame, text=self.get_text('export_charge_sheet'), command=self.export_charge_sheet)
         self.action_buttons['export_btn'].pack(side=tk.LEFT, padx=5)
@@ -391,7 +397,7 @@ class ChargeView:
             total_electricity_charge += charge.electricity_charge
             total_charge += charge.total_charge
             # 计算已收费用
-            paid_amount = self.calculate_paid_amount(charge.id)
+            paid_amount = self.paid_totals.get(charge.id, 0)
             total_paid += paid_amount
             # 计算应收费用
             due_amount = charge.total_charge - paid_amount
@@ -472,6 +478,20 @@ class ChargeView:
         payments = Payment.get_by_charge(charge_id)
         return sum(payment.amount for payment in payments)
     
+    @staticmethod
+    def fetch_charge_list(month):
+        """
+        加载费用列表所需的数据，不涉及界面控件
+        查询次数与费用条数无关
+        :param month: 月份
+        :return: (费用列表, 租户列表, 费用ID到已收金额的字典)
+        """
+        charges = Charge.get_by_month(month)
+        tenants = Tenant.get_all()
+        paid_totals = Payment.get_paid_totals(month)
+        return charges, tenants, paid_totals
+    
+    @query_stats.scoped('ChargeView.load_charge_list')
     def load_charge_list(self):
         """
         加载费用列表
@@ -484,11 +504,10 @@ class ChargeView:
         self.selected_items.clear()
         self.select_all_var.set(False)
         
-        # 获取费用列表
-        self.charge_list = Charge.get_by_month(self.month_var.get())
+        # 获取费用列表、租户和已收金额
+        self.charge_list, tenants, self.paid_totals = self.fetch_charge_list(self.month_var.get())
         
         # 创建租户ID到名称和类型的映射
-        tenants = Tenant.get_all()
         tenant_map = {t.id: t.name for t in tenants}
         tenant_type_map = {t.id: t.type for t in tenants}
         
@@ -508,20 +527,12 @@ class ChargeView:
             translated_tenant_type = self.get_text(type_key)
             
             # 计算已收费用
-            paid_amount = self.calculate_paid_amount(charge.id)
+            paid_amount = self.paid_totals.get(charge.id, 0)
             # 计算应收费用
             due_amount = round(charge.total_charge - paid_amount, 2)
             
-            # 动态计算状态
-            if due_amount == 0:
-                status = self.get_text('paid')
-            elif due_amount > 0 and due_amount < charge.total_charge:
-                status = self.get_text('partially_paid')
-            elif due_amount == charge.total_charge and paid_amount == 0:
-                status = self.get_text('unpaid')
-            else:
-                # 默认状态，处理其他情况 - 确保翻译
-                status = self.get_text(charge.status) if charge.status else self.get_text('unpaid')
+            # 状态由数据库按已收金额维护，直接翻译显示
+            status = Charge.status_text(charge.status, self.get_text)
             
             # 初始复选框状态为空，根据索引应用奇偶行标签，同时使用tags存储charge.id
             row_tag = 'odd' if idx % 2 != 0 else 'even'
@@ -540,9 +551,6 @@ class ChargeView:
         
         # 更新统计标签
         self.update_stats_labels()
-        
-        # 更新统计标签
-        self.update_stats_labels()
     
     def on_tree_click(self, event):
         """
@@ -634,83 +642,61 @@ class ChargeView:
             messagebox.showinfo(self.get_text('info'), self.get_text('please_select_records_to_delete'))
             return
         
-        # 建立业务规则判定机制，识别不同的不可删除场景
-        error_messages = []
-        for charge_id in selected_ids:
-            charge = Charge.get_by_id(charge_id)
-            if not charge:
-                continue
-            
-            # 1. 状态限制检查
-            if charge.status == self.get_text('paid'):
-                error_messages.append(f"{self.get_text('record')}{charge.id}{self.get_text('status_is_paid_cannot_delete')}")
-                continue
-            
-            if charge.status == self.get_text('partially_paid'):
-                error_messages.append(f"{self.get_text('record')}{charge.id}{self.get_text('status_is_partially_paid_cannot_delete')}")
-                continue
-            
-            # 2. 关联交易限制检查：检查是否存在关联的收费记录
-            payments = Payment.get_by_charge(charge_id)
-            if payments:
-                error_messages.append(f"{self.get_text('record')}{charge.id}{self.get_text('has_related_payment_records_cannot_delete')}")
-                continue
-        
-        # 设计动态提示文本映射系统，确保每种不可删除场景对应唯一且明确的提示内容
-        if error_messages:
-            # 构建动态提示内容，清晰、准确且具有针对性
-            # 将相同类型的错误合并显示
-            error_type_map = {}
-            for msg in error_messages:
-                # 提取错误类型关键字
-                if self.get_text('paid') in msg:
-                    error_type = "paid_status"
-                elif self.get_text('partially_paid') in msg:
-                    error_type = "partially_paid_status"
-                elif self.get_text('related_payment_records') in msg:
-                    error_type = "related_transaction"
-                else:
-                    error_type = "other_reason"
-                
-                if error_type not in error_type_map:
-                    error_type_map[error_type] = []
-                error_type_map[error_type].append(msg)
-            
-            # 实现场景识别与提示文本的自动适配功能
-            dynamic_messages = []
-            if "paid_status" in error_type_map:
-                dynamic_messages.append(self.get_text('charge_record_status_is_paid_cannot_delete'))
-            if "partially_paid_status" in error_type_map:
-                dynamic_messages.append(self.get_text('charge_record_status_is_partially_paid_cannot_delete'))
-            if "related_transaction" in error_type_map:
-                dynamic_messages.append(self.get_text('record_has_related_payment_records_not_allowed_delete'))
-            
-            # 合并所有动态提示内容
-            final_message = "\n".join(dynamic_messages)
-            
-            # 保证动态提示内容清晰、准确且具有针对性，帮助用户直观理解具体限制原因
-            messagebox.showwarning(self.get_text('operation_tip'), final_message)
-            return
+        # 一次查询检查全部选中记录，按原因合并提示
+        blocked = Charge.get_delete_blockers(selected_ids)
+        if blocked:
+            reason_messages = {
+                'paid': 'charge_record_status_is_paid_cannot_delete',
+                'partially_paid': 'charge_record_status_is_partially_paid_cannot_delete',
+                'has_payments': 'record_has_related_payment_records_not_allowed_delete',
+            }
+            reasons = set(blocked.values())
+            dynamic_messages = [self.get_text(key) for reason, key in reason_messages.items() if reason in reasons]
+            if dynamic_messages:
+                messagebox.showwarning(self.get_text('operation_tip'), "\n".join(dynamic_messages))
+                return
         
         # 确认删除
         confirmed = messagebox.askyesno(self.get_text('confirm_delete'), f"{self.get_text('confirm_delete_selected_records')} {len(selected_ids)} {self.get_text('records')}?\n{self.get_text('this_operation_cannot_be_undone')}")
         if not confirmed:
             return
         
-        # 执行删除操作
-        deleted_count = 0
-        for charge_id in selected_ids:
-            # 直接通过ID获取费用对象，不依赖self.charge_list
-            charge = Charge.get_by_id(charge_id)
-            if charge and charge.delete():
-                deleted_count += 1
+        # 执行删除操作，删除前在同一事务内再次检查
+        result = Charge.delete_many(selected_ids)
+        deleted_count = len(result['deleted'])
         
         # 显示删除结果
         messagebox.showinfo(self.get_text('delete_result'), f"{self.get_text('delete_completed')}!\n{self.get_text('successfully_deleted')}: {deleted_count} {self.get_text('records')}\n{self.get_text('failed')}: {len(selected_ids) - deleted_count} {self.get_text('records')}")
         
-        # 刷新费用列表
-        self.load_charge_list()
-        # 刷新列表后，统计标签会在load_charge_list中更新
+        # 只移除已删除的行，不重新加载列表
+        self.remove_charge_rows(result['deleted'])
+    
+    def remove_charge_rows(self, charge_ids):
+        """
+        从列表中移除指定费用的行，剩余行重新编号并更新统计
+        :param charge_ids: 费用ID列表
+        """
+        removed = set(charge_ids)
+        if not removed:
+            return
+        for charge_id in removed:
+            self.selected_items.pop(charge_id, None)
+        self.charge_list = [charge for charge in self.charge_list if charge.id not in removed]
+        
+        idx = 0
+        for item in self.charge_tree.get_children():
+            tags = self.charge_tree.item(item, "tags")
+            if len(tags) > 1 and int(tags[1]) in removed:
+                self.charge_tree.delete(item)
+                continue
+            idx += 1
+            values = list(self.charge_tree.item(item, "values"))
+            values[1] = idx
+            row_tag = 'odd' if idx % 2 != 0 else 'even'
+            self.charge_tree.item(item, values=values, tags=(row_tag,) + tuple(tags[1:]))
+        
+        self.update_select_all_status()
+        self.update_stats_labels()
     
     def search_charges(self):
         """
@@ -731,8 +717,9 @@ class ChargeView:
         tenant_name = self.tenant_var.get()
         status_filter = self.status_var.get()
         
-        # 获取所有费用记录
+        # 获取所有费用记录及已收金额
         all_charges = Charge.get_all()
+        self.paid_totals = Payment.get_paid_totals()
         
         # 创建租户ID到名称和类型的映射
         tenants = Tenant.get_all()
@@ -784,22 +771,8 @@ class ChargeView:
                 if charge.tenant_id != tenant_id:
                     continue
             
-            # 计算已收费用和应收费用，用于状态筛选
-            paid_amount = self.calculate_paid_amount(charge.id)
-            due_amount = round(charge.total_charge - paid_amount, 2)
-            
-            # 动态计算状态
-            if due_amount == 0:
-                dynamic_status = self.get_text('paid')
-            elif due_amount > 0 and due_amount < charge.total_charge:
-                dynamic_status = self.get_text('partially_paid')
-            elif due_amount == charge.total_charge and paid_amount == 0:
-                dynamic_status = self.get_text('unpaid')
-            else:
-                dynamic_status = charge.status
-            
-            # 按状态筛选（使用动态计算的状态）
-            if status_filter and dynamic_status != status_filter:
+            # 按状态筛选，下拉框中为翻译后的状态文本
+            if status_filter and Charge.status_text(charge.status, self.get_text) != status_filter:
                 continue
             
             filtered_charges.append(charge)
@@ -823,20 +796,12 @@ class ChargeView:
             translated_tenant_type = self.get_text(type_key)
             
             # 计算已收费用
-            paid_amount = self.calculate_paid_amount(charge.id)
+            paid_amount = self.paid_totals.get(charge.id, 0)
             # 计算应收费用
             due_amount = round(charge.total_charge - paid_amount, 2)
             
-            # 动态计算状态
-            if due_amount == 0:
-                status = self.get_text('paid')
-            elif due_amount > 0 and due_amount < charge.total_charge:
-                status = self.get_text('partially_paid')
-            elif due_amount == charge.total_charge and paid_amount == 0:
-                status = self.get_text('unpaid')
-            else:
-                # 默认状态，处理其他情况
-                status = charge.status
+            # 状态由数据库按已收金额维护，直接翻译显示
+            status = Charge.status_text(charge.status, self.get_text)
             
             # 初始复选框状态为空，根据索引应用奇偶行标签，同时使用tags存储charge.id
             row_tag = 'odd' if idx % 2 != 0 else 'even'
@@ -985,7 +950,7 @@ class ChargeView:
             detail_parts.append("\n")
             detail_parts.append("=" * 30+ "\n")
             detail_parts.append(f"{self.get_text('total_charge')}: {round(self.selected_charge.total_charge, 2)} {self.get_text('yuan')}\n")
-            detail_parts.append(f"{self.get_text('charge_status')}: {self.selected_charge.status}\n")
+            detail_parts.append(f"{self.get_text('charge_status')}: {Charge.status_text(self.selected_charge.status, self.get_text)}\n")
             
             # 计算已收费用和应收费用，显示在明细中
             paid_amount = self.calculate_paid_amount(self.selected_charge.id)
@@ -1009,25 +974,12 @@ class ChargeView:
         # 获取当前月份
         month = self.month_var.get()
         
-        # 获取所有租户
-        tenants = Tenant.get_all()
-        
-        # 计算每个租户的费用
-        success_count = 0
-        update_count = 0
-        fail_count = 0
-        
-        for tenant in tenants:
-            # 检查该租户是否已存在该月份的费用记录
-            existing_charge = Charge.get_by_tenant_and_month(tenant.id, month)
-            
-            if self.calculate_tenant_charge(tenant, month):
-                if existing_charge:
-                    update_count += 1
-                else:
-                    success_count += 1
-            else:
-                fail_count += 1
+        # 批量计算所有租户的费用，增量模式只计算登记过变化的租户
+        result = Charge.calculate_month(month, incremental=self.incremental_var.get())
+        success_count = result['added']
+        update_count = result['updated']
+        fail_count = result['failed']
+        skipped_count = result['skipped']
         
         # 构建结果消息
         result_message = f"{self.get_text('charge_calculation_completed')}!\n"
@@ -1037,6 +989,8 @@ class ChargeView:
             result_message += f"{self.get_text('updated')}: {update_count} {self.get_text('households')}\n"
         if fail_count > 0:
             result_message += f"{self.get_text('failed')}: {fail_count} {self.get_text('households')}\n"
+        if skipped_count > 0:
+            result_message += f"{self.get_text('skipped_unchanged')}: {skipped_count} {self.get_text('households')}\n"
         
         # 显示计算结果
         messagebox.showinfo(self.get_text('calculation_result'), result_message)
@@ -1044,72 +998,6 @@ class ChargeView:
         # 刷新费用列表
         self.load_charge_list()
     
-    def calculate_tenant_charge(self, tenant, month):
-        """
-        计算单个租户的费用
-        :param tenant: 租户对象
-        :param month: 费用月份
-        :return: 是否计算成功
-        """
-        try:
-            print(f"开始计算租户 {tenant.name} 的{month}月份费用")
-            
-            # 获取租户的水电表
-            meters = Meter.get_by_tenant(tenant.id)
-            
-            # 按类型分组水电表
-            water_meters = [m for m in meters if m.meter_type == "水"]
-            electricity_meters = [m for m in meters if m.meter_type == "电"]
-            
-            print(f"租户 {tenant.name} 有 {len(water_meters)} 个水表，{len(electricity_meters)} 个电表")
-            
-            # 计算水费用量（所有水表用量之和）
-            water_usage = 0
-            for meter in water_meters:
-                # 获取该水表当月的抄表记录
-                readings = MeterReading.get_by_month(month)
-                meter_readings = [r for r in readings if r.meter_id == meter.id]
-                if meter_readings:
-                    water_usage += meter_readings[0].usage
-                    print(f"水表 {meter.id} 的当月用量: {meter_readings[0].usage} 吨")
-                else:
-                    print(f"水表 {meter.id} 没有当月的抄表记录")
-            
-            # 计算电费用量（所有电表用量之和）
-            electricity_usage = 0
-            for meter in electricity_meters:
-                # 获取该电表当月的抄表记录
-                readings = MeterReading.get_by_month(month)
-                meter_readings = [r for r in readings if r.meter_id == meter.id]
-                if meter_readings:
-                    electricity_usage += meter_readings[0].usage
-                    print(f"电表 {meter.id} 的当月用量: {meter_readings[0].usage} 度")
-                else:
-                    print(f"电表 {meter.id} 没有当月的抄表记录")
-            
-            print(f"租户 {tenant.name} 的总用量: 水 {water_usage} 吨, 电 {electricity_usage} 度")
-            
-            # 使用Charge类的calculate_charge方法计算费用
-            # 该方法会自动获取最新的水价和电价，基于租户类型
-            charge = Charge.calculate_charge(tenant.id, month, water_usage, electricity_usage)
-            
-            if charge:
-                # 保存费用记录
-                if charge.save():
-                    print(f"成功保存租户 {tenant.name} 的费用记录")
-                    return True
-                else:
-                    print(f"保存租户 {tenant.name} 的费用记录失败")
-                    return False
-            else:
-                print(f"计算租户 {tenant.name} 的费用失败")
-                return False
-        except Exception as e:
-            print(f"计算租户 {tenant.name} 费用失败: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
-    
     def export_charge_sheet(self):
         """
         导出收费表到Excel文件
@@ -1132,235 +1020,109 @@ class ChargeView:
             tenants = Tenant.get_all()
             tenant_map = {t.id: t for t in tenants}
             
-            # 获取当前月份的抄表记录
-            readings = MeterReading.get_by_month(current_month)
-            # 按租户和类型分组抄表记录
-            reading_map = {}
-            for reading in readings:
-                meter = Meter.get_by_id(reading.meter_id)
-                if meter:
-                    key = (meter.tenant_id, meter.meter_type)
-                    if key not in reading_map:
-                        reading_map[key] = []
-                    reading_map[key].append(reading)
+            # 按租户和类型汇总当前月份的抄表读数
+            reading_totals = MeterReading.get_month_totals(current_month)
             
-            # 4. 创建Excel工作簿和工作表
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "收费表"
+            # 4. 创建流式写入的工作表，单元格样式使用预先注册的命名样式
+            writer = ExcelExportWriter()
+            sheet = writer.create_sheet("收费表")
             
             # 5. 设置列宽
-            column_widths = {
-                'A': 8,    # 序号
-                'B': 12,   # 租户类型
-                'C': 20,   # 租户名称
-                'D': 10,   # 月份
-                'E': 12,   # 上次读数（水）
-                'F': 12,   # 当前读数（水）
-                'G': 15,   # 用水量(m³)
-                'H': 12,   # 用水单价(元)
-                'I': 15,   # 水费金额(元)
-                'J': 12,   # 上次读数（电）
-                'K': 12,   # 当前读数（电）
-                'L': 15,   # 用电量(kWh)
-                'M': 12,   # 用电单价(元)
-                'N': 15,   # 电费金额(元)
-                'O': 15    # 总金额(元)
-            }
-            
-            for col, width in column_widths.items():
-                ws.column_dimensions[col].width = width
-            
-            # 6. 设置样式
-            # 标题样式
-            title_font = Font(bold=True, size=12)
-            title_alignment = Alignment(horizontal="center", vertical="center")
-            # 使用简单的RGB颜色格式，不带井号和alpha通道
-            title_fill = PatternFill(start_color="E0E0E0", end_color="E0E0E0", fill_type="solid")
-            
-            # 数据样式
-            data_font = Font(size=11)
-            data_alignment = Alignment(horizontal="left", vertical="center")
-            amount_alignment = Alignment(horizontal="right", vertical="center")
-            
-            # 用水信息背景色 - 使用简单的RGB颜色格式
-            water_fill = PatternFill(start_color="E6F3FF", end_color="E6F3FF", fill_type="solid")
-            # 用电信息背景色 - 使用简单的RGB颜色格式
-            electricity_fill = PatternFill(start_color="FFF2E6", end_color="FFF2E6", fill_type="solid")
+            sheet.set_column_widths([
+                8,    # 序号
+                12,   # 租户类型
+                20,   # 租户名称
+                10,   # 月份
+                12,   # 上次读数（水）
+                12,   # 当前读数（水）
+                15,   # 用水量(m³)
+                12,   # 用水单价(元)
+                15,   # 水费金额(元)
+                12,   # 上次读数（电）
+                12,   # 当前读数（电）
+                15,   # 用电量(kWh)
+                12,   # 用电单价(元)
+                15,   # 电费金额(元)
+                15    # 总金额(元)
+            ])
             
-            # 边框样式
-            border = Border(
-                left=Side(style="thin"),
-                right=Side(style="thin"),
-                top=Side(style="thin"),
-                bottom=Side(style="thin")
-            )
+            # 隐藏D列、E列和F列
+            sheet.hide_columns('D', 'E', 'F')
             
-            # 7. 添加标题行
-            # 生成标题：YYYY年MM月份水电费收费表
-            current_month = self.month_var.get()
+            # 6. 添加标题行
+            # 生成标题：YYYY年MM月份水电费收费表，合并A1:O1
             year, month = current_month.split('-')
-            title_text = f"{year}年{month}月份水电费收费表"
+            sheet.append([f"{year}年{month}月份水电费收费表"] + [None] * 14, "boxed_title", merge_to=15)
             
-            # 合并单元格作为标题
-            ws.merge_cells(f'A1:O1')
-            title_cell = ws['A1']
-            title_cell.value = title_text
-            
-            # 设置标题样式
-            title_font_large = Font(bold=True, size=14)  # 比数据大3号
-            title_cell.font = title_font_large
-            title_cell.alignment = Alignment(horizontal="center", vertical="center")
-            title_cell.fill = PatternFill(start_color="F0F0F0", end_color="F0F0F0", fill_type="solid")
-            title_cell.border = border
-            
-            # 隐藏D列、E列和F列
-            ws.column_dimensions['D'].hidden = True
-            ws.column_dimensions['E'].hidden = True
-            ws.column_dimensions['F'].hidden = True
-            
-            # 8. 写入表头
+            # 7. 写入表头
             headers = [
                 "序号", "租户类型", "租户名称", "月份",
                 "上次读数", "当前读数", "用水量(m³)", "用水单价(元)", "水费金额(元)",
                 "上次读数", "当前读数", "用电量(kWh)", "用电单价(元)", "电费金额(元)",
                 "总金额(元)"
             ]
-            
-            ws.append(headers)
-            
-            # 设置表头样式
-            for cell in ws[2]:
-                cell.font = title_font
-                cell.alignment = title_alignment
-                cell.fill = title_fill
-                cell.border = border
-            
-            # 9. 写入数据行并计算合计
-            total_water_charge = 0
-            total_electricity_charge = 0
-            total_charge = 0
-            
-            for idx, charge in enumerate(self.charge_list, 1):
-                tenant = tenant_map.get(charge.tenant_id)
-                if not tenant:
-                    continue
-                
-                # 获取用水抄表记录
-                water_readings = reading_map.get((tenant.id, "水"), [])
-                water_last_reading = sum(r.previous_reading for r in water_readings) if water_readings else 0
-                water_current_reading = sum(r.current_reading for r in water_readings) if water_readings else 0
-                
-                # 获取用电抄表记录
-                electricity_readings = reading_map.get((tenant.id, "电"), [])
-                electricity_last_reading = sum(r.previous_reading for r in electricity_readings) if electricity_readings else 0
-                electricity_current_reading = sum(r.current_reading for r in electricity_readings) if electricity_readings else 0
-                
-                # 构造数据行
-                water_charge = round(charge.water_charge, 2)
-                electricity_charge = round(charge.electricity_charge, 2)
-                total_charge_item = round(charge.total_charge, 2)
-                
-                # 累加合计值
-                total_water_charge += water_charge
-                total_electricity_charge += electricity_charge
-                total_charge += total_charge_item
-                
-                data_row = [
-                    idx,
-                    tenant.type,
-                    tenant.name,
-                    charge.month,
-                    round(water_last_reading, 2),
-                    round(water_current_reading, 2),
-                    round(charge.water_usage, 2),
-                    round(charge.water_price, 2),
-                    water_charge,
-                    round(electricity_last_reading, 2),
-                    round(electricity_current_reading, 2),
-                    round(charge.electricity_usage, 2),
-                    round(charge.electricity_price, 2),
-                    electricity_charge,
-                    total_charge_item
-                ]
-                
-                ws.append(data_row)
-                
-                # 设置数据行样式
-                row = idx + 2  # 标题行占了一行，所以从3行开始
-                for col_idx, cell in enumerate(ws[row], 1):
-                    cell.font = data_font
-                    cell.border = border
+            sheet.append(headers, "boxed_header")
+            
+            # 8. 逐行写入数据并计算合计
+            # 序号至月份左对齐，用水信息和用电信息列分别使用不同背景色
+            row_style = ["boxed_cell"] * 4 + ["water_amount"] * 5 + ["electricity_amount"] * 5 + ["boxed_amount"]
+            totals = {'water': 0, 'electricity': 0, 'total': 0}
+            
+            def charge_rows():
+                for idx, charge in enumerate(self.charge_list, 1):
+                    tenant = tenant_map.get(charge.tenant_id)
+                    if not tenant:
+                        continue
                     
-                    # 设置对齐方式
-                    if col_idx in [5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]:
-                        cell.alignment = amount_alignment
-                    else:
-                        cell.alignment = data_alignment
+                    water_last_reading, water_current_reading = reading_totals.get((tenant.id, "水"), (0, 0))
+                    electricity_last_reading, electricity_current_reading = reading_totals.get((tenant.id, "电"), (0, 0))
                     
-                    # 设置背景色
-                    col_letter = get_column_letter(col_idx)
-                    if col_letter in ['E', 'F', 'G', 'H', 'I']:
-                        cell.fill = water_fill
-                    elif col_letter in ['J', 'K', 'L', 'M', 'N']:
-                        cell.fill = electricity_fill
-            
-            # 10. 添加合计行
-            # 计算合计行的行号
-            total_row_num = len(self.charge_list) + 3  # 标题行+表头行+数据行数
-            
-            # 构造合计行数据：首列显示"合计"，其他列留空或填写合计金额
+                    # 构造数据行
+                    water_charge = round(charge.water_charge, 2)
+                    electricity_charge = round(charge.electricity_charge, 2)
+                    total_charge_item = round(charge.total_charge, 2)
+                    
+                    # 累加合计值
+                    totals['water'] += water_charge
+                    totals['electricity'] += electricity_charge
+                    totals['total'] += total_charge_item
+                    
+                    yield [
+                        idx,
+                        tenant.type,
+                        tenant.name,
+                        charge.month,
+                        round(water_last_reading, 2),
+                        round(water_current_reading, 2),
+                        round(charge.water_usage, 2),
+                        round(charge.water_price, 2),
+                        water_charge,
+                        round(electricity_last_reading, 2),
+                        round(electricity_current_reading, 2),
+                        round(charge.electricity_usage, 2),
+                        round(charge.electricity_price, 2),
+                        electricity_charge,
+                        total_charge_item
+                    ]
+            
+            sheet.stream(charge_rows(), row_style)
+            
+            # 9. 添加合计行，首列至第3列（A-C列）合并显示"合计"，金额列右对齐
             total_row = [
-                "合计", "", "", "",  # 只在首列显示"合计"
-                "", "", "", "", total_water_charge,  # 用水合计
-                "", "", "", "", total_electricity_charge,  # 用电合计
-                total_charge  # 总金额合计
+                "合计", "", "", "",
+                "", "", "", "", totals['water'],  # 用水合计
+                "", "", "", "", totals['electricity'],  # 用电合计
+                totals['total']  # 总金额合计
             ]
+            total_style = ["boxed_total"] * 15
+            for col_idx in (8, 13, 14):
+                total_style[col_idx] = "boxed_total_amount"
+            sheet.append(total_row, total_style, merge_to=3)
             
-            ws.append(total_row)
-            
-            # 11. 合并合计行的首列至第3列（A-C列）
-            ws.merge_cells(f'A{total_row_num}:C{total_row_num}')
-            
-            # 12. 设置合计行样式
-            # 设置合并后的单元格样式
-            merged_cell = ws.cell(row=total_row_num, column=1)
-            merged_cell.value = "合计"
-            merged_cell.font = title_font_large
-            merged_cell.alignment = Alignment(horizontal="center", vertical="center")
-            merged_cell.fill = PatternFill(start_color="E0E0E0", end_color="E0E0E0", fill_type="solid")
-            merged_cell.border = border
-            
-            # 为合计行的所有列设置样式，确保边框完整
-            for col_idx in range(1, 16):  # 1-15列
-                # 跳过合并的列（1-3列已在merged_cell中处理）
-                if col_idx == 1:
-                    continue
-                
-                cell = ws.cell(row=total_row_num, column=col_idx)
-                
-                # 设置单元格样式
-                cell.font = title_font_large
-                cell.fill = PatternFill(start_color="E0E0E0", end_color="E0E0E0", fill_type="solid")
-                cell.border = border
-                
-                # 根据列类型设置对齐方式
-                if col_idx == 4:  # D列
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
-                elif col_idx in [9, 14, 15]:  # 金额列
-                    cell.alignment = Alignment(horizontal="right", vertical="center")
-                else:  # 其他列
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
-            
-            # 13. 隐藏D列、E列和F列
-            ws.column_dimensions['D'].hidden = True
-            ws.column_dimensions['E'].hidden = True
-            ws.column_dimensions['F'].hidden = True
-            
-            # 14. 设置打印区域
-            ws.page_setup.print_area = f'A1:{get_column_letter(15)}{total_row_num}'
-            ws.page_setup.orientation = 'landscape'
-            ws.page_setup.paper_size = 9  # A4纸张大小
+            # 设置打印区域和纸张
+            sheet.worksheet.print_area = f'A1:O{sheet.row_count}'
+            sheet.worksheet.page_setup.orientation = 'landscape'
+            sheet.worksheet.page_setup.paperSize = 9  # A4纸张大小
             
             # 10. 保存文件
             import os
@@ -1382,7 +1144,7 @@ class ChargeView:
                 return  # 用户取消了保存
             
             # 保存文件
-            wb.save(file_path)
+            writer.save(file_path)
             
             # 11. 显示成功提示
             messagebox.showinfo(self.get_text('success'), f"{self.get_text('charge_sheet_exported_successfully')}\n{file_path}")
@@ -10,11 +10,13 @@
 
 import tkinter as tk
 from tkinter import ttk
+from utils.style_registry import get_style_registry
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from database.db_manager import get_db
 from models.tenant import Tenant
 from models.charge import Charge
+from database import query_stats
 
 
 class Charts:
@@ -85,20 +87,34 @@ class Charts:
         # 默认返回键名
         return key
     
-    def update_language(self):
+    def _bind_text(self, widget, source):
         """
-        更新图表的语言
-        重新创建整个图表以确保所有文本都使用新的语言
+        设置控件文本并登记到语言绑定表，切换语言时由绑定表直接刷新
+        :param widget: 标签控件
+        :param source: 翻译键或接收get_text返回文本的函数
         """
-        # 清除数据缓存，确保获取最新的翻译数据
-        self.data_cache = {
-            'tenant_pie_data': None,
-            'revenue_pie_data': {},  # 按月份缓存
-            'line_chart_data': None,
-            'cache_time': 0
-        }
-        # 重新创建图表以更新所有文本
-        self.recreate_charts(getattr(self, 'selected_month', None))
+        language_utils = getattr(getattr(self.dashboard_view, 'main_window', None), 'language_utils', None)
+        if language_utils:
+            language_utils.bind_text(widget, source)
+        else:
+            widget.config(text=source(self.get_text) if callable(source) else self.get_text(source))
+    
+    def _bind_chart_texts(self, canvas, apply_texts):
+        """
+        登记图表文本的语言切换回调
+        切换语言时只替换图表中的文字并延迟重绘，不重新查询数据、不重建图表
+        :param canvas: FigureCanvasTkAgg实例
+        :param apply_texts: 接收get_text并设置图表文字的函数
+        """
+        language_utils = getattr(getattr(self.dashboard_view, 'main_window', None), 'language_utils', None)
+        if not language_utils:
+            return
+        
+        def on_language_changed(get_text):
+            apply_texts(get_text)
+            canvas.draw_idle()
+        
+        language_utils.bind_callback(canvas.get_tk_widget(), on_language_changed)
     
     def _is_cache_valid(self):
         """
@@ -148,10 +164,8 @@ class Charts:
         """
         初始化样式
         """
-        style = ttk.Style()
-        style.configure("Charts.TFrame", background="white")
-        style.configure("ChartContainer.TFrame", background="white", relief="solid", borderwidth=1, bordercolor="#e0e0e0")
-        style.configure("ChartTitle.TLabel", font=('Arial', 10, 'bold'))
+        # 图表容器样式由样式注册表统一配置
+        get_style_registry().ensure_initialized(self.parent)
         
     def get_tenant_type_data(self):
         """
@@ -173,14 +187,9 @@ class Charts:
             else:
                 type_counts[tenant.type] = 1
         
-        # 转换为列表格式并翻译租户类型
-        tenant_types = []
-        tenant_counts = []
-        for tenant_type, count in type_counts.items():
-            # 处理数据库中存储的英文租户类型键
-            translated_type = self.get_text(tenant_type)
-            tenant_types.append(translated_type)
-            tenant_counts.append(count)
+        # 转换为列表格式，租户类型保留为翻译键，绘图时再翻译
+        tenant_types = list(type_counts.keys())
+        tenant_counts = list(type_counts.values())
         
         result = (tenant_types, tenant_counts)
         
@@ -225,14 +234,9 @@ class Charts:
             else:
                 revenue_by_type[tenant_type_key] = charge.total_charge
         
-        # 转换为列表格式并翻译租户类型
-        tenant_types = []
-        revenue_values = []
-        for tenant_type_key, value in revenue_by_type.items():
-            # 翻译租户类型
-            translated_type = self.get_text(tenant_type_key)
-            tenant_types.append(translated_type)
-            revenue_values.append(value)
+        # 转换为列表格式，租户类型保留为翻译键，绘图时再翻译
+        tenant_types = list(revenue_by_type.keys())
+        revenue_values = list(revenue_by_type.values())
         
         result = (tenant_types, revenue_values)
         
@@ -313,7 +317,8 @@ class Charts:
         创建折线图：展示关键指标的时间序列变化趋势
         """
         # 图表标题
-        chart_title = ttk.Label(self.chart1_frame, text=self.get_text('monthly_income_trend'), style="ChartTitle.TLabel")
+        chart_title = ttk.Label(self.chart1_frame, style="ChartTitle.TLabel")
+        self._bind_text(chart_title, 'monthly_income_trend')
         chart_title.pack(side=tk.TOP, anchor=tk.W, padx=15, pady=8)
         
         # 创建matplotlib图表 - 使用自适应尺寸，确保所有元素都能显示
@@ -330,7 +335,7 @@ class Charts:
         
         # 使用数值索引绘制折线图，避免将字符串解析为日期，消除警告
         x_values = range(len(months))
-        ax.plot(x_values, revenue_values, label=self.get_text('total_income'), marker='o', linewidth=1.5, color='#3498db',
+        ax.plot(x_values, revenue_values, marker='o', linewidth=1.5, color='#3498db',
                 linestyle='-')
         
         # 设置x轴标签，使用自定义的月份字符串
@@ -339,11 +344,18 @@ class Charts:
         
         # 设置图表属性 - 移除内部重复标题
         ax.set_title('')
-        ax.set_xlabel(self.get_text('month'), fontsize=8, labelpad=12, fontweight='bold')
-        ax.set_ylabel(self.get_text('revenue_amount'), fontsize=8, labelpad=12, fontweight='bold')
+        ax.set_xlabel('', fontsize=8, labelpad=12, fontweight='bold')
+        ax.set_ylabel('', fontsize=8, labelpad=12, fontweight='bold')
         
         # 调整图例，将其放置在图表内部的左下角，确保不遮挡图表数据
-        ax.legend(loc='lower left', fontsize=8, frameon=True, framealpha=0.9, borderpad=1.2)
+        legend = ax.legend([''], loc='lower left', fontsize=8, frameon=True, framealpha=0.9, borderpad=1.2)
+        
+        def apply_texts(get_text):
+            ax.set_xlabel(get_text('month'))
+            ax.set_ylabel(get_text('revenue_amount'))
+            legend.get_texts()[0].set_text(get_text('total_income'))
+        
+        apply_texts(self.get_text)
         
         # 添加网格线，提高可读性
         ax.grid(True, linestyle='--', alpha=0.7, color='#e0e0e0')
@@ -386,13 +398,15 @@ class Charts:
         canvas = FigureCanvasTkAgg(fig, master=self.chart1_frame)
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=15, pady=8)
+        self._bind_chart_texts(canvas, apply_texts)
     
     def create_tenant_pie_chart(self):
         """
         创建饼图：展示租户类型分布
         """
         # 图表标题
-        chart_title = ttk.Label(self.chart2_frame, text=self.get_text('tenant_type_distribution'), style="ChartTitle.TLabel")
+        chart_title = ttk.Label(self.chart2_frame, style="ChartTitle.TLabel")
+        self._bind_text(chart_title, 'tenant_type_distribution')
         chart_title.pack(side=tk.TOP, anchor=tk.W, padx=15, pady=8)
         
         # 创建matplotlib图表 - 使用自适应尺寸，确保所有元素都能显示
@@ -415,12 +429,8 @@ class Charts:
         # 只突出显示数量最多的租户类型
         explode = tuple(0.05 if i == tenant_counts.index(max(tenant_counts)) else 0 for i in range(len(tenant_types)))
         
-        # 计算百分比并准备包含具体数值的标签
+        # 计算百分比，图例标签在apply_texts中按当前语言生成
         total = sum(tenant_counts)
-        legend_labels = []
-        for tenant_type, count in zip(tenant_types, tenant_counts):
-            percentage = count / total * 100
-            legend_labels.append(f'{tenant_type} - {count}{self.get_text("households")} ({percentage:.1f}%)')
         
         # 绘制饼图
         wedges, texts, autotexts = ax.pie(
@@ -445,10 +455,10 @@ class Charts:
         ax.axis('equal')  # 确保饼图是圆形
         
         # 设置图例样式，调整到图表右侧
-        ax.legend(
+        legend = ax.legend(
             wedges, 
-            legend_labels, 
-            title=self.get_text('tenant_type'), 
+            tenant_types, 
+            title='', 
             loc='center right', 
             bbox_to_anchor=(1.3, 0.5),  # 将图例定位到图表右侧
             fontsize=8,  # 图例名称字体大小，确保清晰易读
@@ -483,17 +493,29 @@ class Charts:
         # 优化布局，为右侧图例和标题留出足够空间
         fig.subplots_adjust(left=0.05, right=0.75, top=0.85, bottom=0.05)
         
+        def apply_texts(get_text):
+            legend.set_title(get_text('tenant_type'), prop={'size': 8})
+            for text, legend_text, tenant_type, count in zip(texts, legend.get_texts(), tenant_types, tenant_counts):
+                translated_type = get_text(tenant_type)
+                text.set_text(translated_type)
+                percentage = count / total * 100
+                legend_text.set_text(f'{translated_type} - {count}{get_text("households")} ({percentage:.1f}%)')
+        
+        apply_texts(self.get_text)
+        
         # 嵌入到Tkinter窗口
         canvas = FigureCanvasTkAgg(fig, master=self.chart2_frame)
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=15, pady=8)
+        self._bind_chart_texts(canvas, apply_texts)
     
     def create_pie_chart(self):
         """
         创建饼图：展示数据构成比例与占比关系
         """
         # 图表标题
-        chart_title = ttk.Label(self.chart3_frame, text=self.get_text('revenue_composition'), style="ChartTitle.TLabel")
+        chart_title = ttk.Label(self.chart3_frame, style="ChartTitle.TLabel")
+        self._bind_text(chart_title, 'revenue_composition')
         chart_title.pack(side=tk.TOP, anchor=tk.W, padx=15, pady=8)
         
         # 创建matplotlib图表 - 使用自适应尺寸，确保所有元素都能显示
@@ -516,12 +538,8 @@ class Charts:
         # 只突出显示收入最高的租户类型
         explode = tuple(0.05 if i == revenue_values.index(max(revenue_values)) else 0 for i in range(len(revenue_sources)))
         
-        # 计算百分比并准备包含具体数值的标签
+        # 计算百分比，图例标签在apply_texts中按当前语言生成
         total = sum(revenue_values)
-        legend_labels = []
-        for source, value in zip(revenue_sources, revenue_values):
-            percentage = value / total * 100
-            legend_labels.append(f'{source} - {value:,.2f}元 ({percentage:.1f}%)')
         
         # 绘制饼图，优化布局和样式
         wedges, texts, autotexts = ax.pie(
@@ -546,10 +564,10 @@ class Charts:
         ax.axis('equal')  # 确保饼图是圆形
         
         # 设置图例样式，调整到图表右侧
-        ax.legend(
+        legend = ax.legend(
             wedges, 
-            legend_labels, 
-            title=self.get_text('tenant_type'), 
+            revenue_sources, 
+            title='', 
             loc='center right', 
             bbox_to_anchor=(1.3, 0.5),  # 将图例定位到图表右侧
             fontsize=8,  # 图例名称字体大小，确保清晰易读
@@ -584,10 +602,21 @@ class Charts:
         # 优化布局，为右侧图例和标题留出足够空间
         fig.subplots_adjust(left=0.05, right=0.75, top=0.85, bottom=0.05)
         
+        def apply_texts(get_text):
+            legend.set_title(get_text('tenant_type'), prop={'size': 8})
+            for text, legend_text, source, value in zip(texts, legend.get_texts(), revenue_sources, revenue_values):
+                translated_source = get_text(source)
+                text.set_text(translated_source)
+                percentage = value / total * 100
+                legend_text.set_text(f'{translated_source} - {value:,.2f}元 ({percentage:.1f}%)')
+        
+        apply_texts(self.get_text)
+        
         # 嵌入到Tkinter窗口
         canvas = FigureCanvasTkAgg(fig, master=self.chart3_frame)
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=15, pady=8)
+        self._bind_chart_texts(canvas, apply_texts)
     
     def on_resize(self, _event=None):
         """
@@ -654,6 +683,7 @@ class Charts:
         for widget in self.chart3_frame.winfo_children():
             widget.destroy()
     
+    @query_stats.scoped('Charts.refresh_charts')
     def refresh_charts(self, selected_month=None):
         """
         刷新所有图表
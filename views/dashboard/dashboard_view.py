@@ -180,23 +180,3 @@ class DashboardView:
         """
         if hasattr(self, 'nav_bar'):
             self.nav_bar.update_user_info()
-    
-    def update_language(self):
-        """
-        更新仪表盘所有组件的语言
-        """
-        # 更新侧边菜单语言
-        if hasattr(self, 'side_menu') and hasattr(self.side_menu, 'update_language'):
-            self.side_menu.update_language()
-        
-        # 更新导航栏语言
-        if hasattr(self, 'nav_bar') and hasattr(self.nav_bar, 'update_language'):
-            self.nav_bar.update_language()
-        
-        # 更新数据卡片语言
-        if hasattr(self, 'data_cards') and hasattr(self.data_cards, 'update_language'):
-            self.data_cards.update_language()
-        
-        # 更新图表语言
-        if hasattr(self, 'charts') and hasattr(self.charts, 'update_language'):
-            self.charts.update_language()
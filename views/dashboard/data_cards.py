@@ -8,8 +8,10 @@
 
 import tkinter as tk
 from tkinter import ttk
+from utils.style_registry import get_style_registry
 from datetime import datetime
 from models.tenant import Tenant
+from database import query_stats
 
 
 class DataCards:
@@ -65,74 +67,24 @@ class DataCards:
         # 默认返回键名
         return key
     
-    def update_language(self):
-        """
-        更新数据卡片的语言
-        只更新现有卡片的文本内容，不重新创建卡片
-        """
-        # 更新所有数据卡片的文本
-        for card_frame in self.main_frame.winfo_children():
-            if isinstance(card_frame, ttk.Frame) and card_frame['style'] == 'Card.TFrame':
-                card_children = card_frame.winfo_children()
-                if len(card_children) >= 4:
-                    # 更新标题
-                    title_label = card_children[0]
-                    if isinstance(title_label, ttk.Label):
-                        current_text = title_label.cget('text')
-                        # 根据当前文本更新为对应语言
-                        if current_text in ['租户总数', 'Total Tenants']:
-                            title_label.config(text=self.get_text('total_tenants'))
-                        elif current_text in ['仪表总数', 'Total Meters']:
-                            title_label.config(text='仪表总数') if self.dashboard_view.main_window.current_language == 'zh_CN' else title_label.config(text='Total Meters')
-                        elif current_text in ['总收入', 'Total Income']:
-                            title_label.config(text='总收入') if self.dashboard_view.main_window.current_language == 'zh_CN' else title_label.config(text='Total Income')
-                        elif current_text in ['未收金额', 'Unpaid Amount']:
-                            title_label.config(text='未收金额') if self.dashboard_view.main_window.current_language == 'zh_CN' else title_label.config(text='Unpaid Amount')
-                        elif current_text in ['总用水量', 'Total Water Consumption']:
-                            title_label.config(text='总用水量') if self.dashboard_view.main_window.current_language == 'zh_CN' else title_label.config(text='Total Water Consumption')
-                        elif current_text in ['总用电量', 'Total Electricity Consumption']:
-                            title_label.config(text='总用电量') if self.dashboard_view.main_window.current_language == 'zh_CN' else title_label.config(text='Total Electricity Consumption')
-                    
-                    # 更新单位
-                    unit_label = card_children[2]
-                    if isinstance(unit_label, ttk.Label):
-                        current_text = unit_label.cget('text')
-                        if current_text in ['户', 'Households']:
-                            unit_label.config(text=self.get_text('households'))
-                        elif current_text in ['元', 'Yuan']:
-                            unit_label.config(text='元') if self.dashboard_view.main_window.current_language == 'zh_CN' else unit_label.config(text='Yuan')
-                        elif current_text in ['吨', 'Tons']:
-                            unit_label.config(text='吨') if self.dashboard_view.main_window.current_language == 'zh_CN' else unit_label.config(text='Tons')
-                        elif current_text in ['度', 'KWh']:
-                            unit_label.config(text='度') if self.dashboard_view.main_window.current_language == 'zh_CN' else unit_label.config(text='KWh')
-                    
-                    # 更新变化率标签
-                    change_label = card_children[3]
-                    if isinstance(change_label, ttk.Label):
-                        current_text = change_label.cget('text')
-                        if '%' in current_text:
-                            # 保留百分比数值，只更新前缀
-                            if current_text.startswith('环比') or current_text.startswith('MoM'):
-                                if self.dashboard_view.main_window.current_language == 'zh_CN':
-                                    change_label.config(text=f"环比{current_text[3:]}")
-                                else:
-                                    change_label.config(text=f"MoM{current_text[2:]}")
+    def _bind_text(self, widget, source):
+        """
+        设置控件文本并登记到语言绑定表，切换语言时由绑定表直接刷新
+        :param widget: 标签控件
+        :param source: 翻译键或接收get_text返回文本的函数
+        """
+        language_utils = getattr(getattr(self.dashboard_view, 'main_window', None), 'language_utils', None)
+        if language_utils:
+            language_utils.bind_text(widget, source)
+        else:
+            widget.config(text=source(self.get_text) if callable(source) else self.get_text(source))
     
     def _init_style(self):
         """
         初始化样式
         """
-        style = ttk.Style()
-        style.configure("DataCards.TFrame", background="white")
-        style.configure("Card.TFrame", background="white", relief="solid", borderwidth=1, bordercolor="#e0e0e0")
-        style.configure("CardTitle.TLabel", font=("", 10))
-        style.configure("CardValue.TLabel", font=("", 11, "bold"))
-        # 创建基础样式
-        style.configure("CardChange.TLabel", font=("", 9))
-        # 使用map方法定义不同状态下的样式（这里我们直接使用前景色）
-        style.configure("PositiveChange.TLabel", foreground="green")
-        style.configure("NegativeChange.TLabel", foreground="red")
-        style.configure("NeutralChange.TLabel", foreground="gray")
+        # 卡片样式在注册表中定义，仪表盘重建时不会重复配置
+        get_style_registry().ensure_initialized(self.parent)
     
     def _is_cache_valid(self):
         """
@@ -153,6 +105,77 @@ class DataCards:
         if self._is_cache_valid() and self.data_cache['tenant_stats']:
             return self.data_cache['tenant_stats']
         
+        result = self.compute_tenant_stats()
+        
+        # 更新缓存
+        self.data_cache['tenant_stats'] = result
+        return result
+    
+    def _get_meter_stats(self):
+        """
+        获取仪表统计数据
+        1. 从数据库获取所有水电表
+        2. 按表类型（水/电）分别统计数量
+        :return: 包含水表数量和电表数量的字典
+        """
+        # 检查缓存是否有效
+        if self._is_cache_valid() and self.data_cache['meter_stats']:
+            return self.data_cache['meter_stats']
+        
+        result = self.compute_meter_stats()
+        
+        # 更新缓存
+        self.data_cache['meter_stats'] = result
+        return result
+    
+    def _get_monthly_charge_stats(self, selected_month=None):
+        """
+        获取费用统计数据
+        1. 从费用管理列表获取指定月份的所有费用记录
+        2. 统计水费、电费收入和用量
+        :param selected_month: 选中的月份，格式为YYYY-MM，None表示全部月份
+        :return: 包含费用统计数据的字典
+        """
+        # 使用None作为默认月份的键
+        cache_key = selected_month or 'all'
+        
+        # 检查缓存是否有效
+        if self._is_cache_valid() and cache_key in self.data_cache['charge_stats']:
+            return self.data_cache['charge_stats'][cache_key]
+        
+        result = self.compute_charge_stats(selected_month)
+        
+        # 更新缓存
+        self.data_cache['charge_stats'][cache_key] = result
+        return result
+    
+    def _get_unpaid_amount(self, selected_month=None):
+        """
+        获取未收金额数据
+        1. 从所有费用记录中获取未缴纳或部分缴纳的费用
+        2. 计算实际未收金额（总费用减去已收金额）
+        :param selected_month: 选中的月份，格式为YYYY-MM，None表示全部月份
+        :return: 未收金额总和
+        """
+        # 使用None作为默认月份的键
+        cache_key = selected_month or 'all'
+        
+        # 检查缓存是否有效
+        if self._is_cache_valid() and cache_key in self.data_cache['unpaid_amount']:
+            return self.data_cache['unpaid_amount'][cache_key]
+        
+        result = self.compute_unpaid_amount(selected_month)
+        
+        # 更新缓存
+        self.data_cache['unpaid_amount'][cache_key] = result
+        return result
+    
+    @staticmethod
+    def compute_tenant_stats():
+        """
+        获取租户统计数据，不涉及界面控件和缓存
+        :return: 包含租户总数和停用租户数量的字典
+        """
         # 获取所有租户
         tenants = Tenant.get_all()
         
@@ -170,21 +193,14 @@ class DataCards:
             "deactivated": deactivated_count
         }
         
-        # 更新缓存
-        self.data_cache['tenant_stats'] = result
         return result
     
-    def _get_meter_stats(self):
+    @staticmethod
+    def compute_meter_stats():
         """
-        获取仪表统计数据
-        1. 从数据库获取所有水电表
-        2. 按表类型（水/电）分别统计数量
+        获取仪表统计数据，不涉及界面控件和缓存
         :return: 包含水表数量和电表数量的字典
         """
-        # 检查缓存是否有效
-        if self._is_cache_valid() and self.data_cache['meter_stats']:
-            return self.data_cache['meter_stats']
-        
         from models.meter import Meter
         
         # 获取所有水电表
@@ -206,25 +222,15 @@ class DataCards:
             "total": water_count + electricity_count
         }
         
-        # 更新缓存
-        self.data_cache['meter_stats'] = result
         return result
     
-    def _get_monthly_charge_stats(self, selected_month=None):
+    @staticmethod
+    def compute_charge_stats(selected_month=None):
         """
-        获取费用统计数据
-        1. 从费用管理列表获取指定月份的所有费用记录
-        2. 统计水费、电费收入和用量
+        获取费用统计数据，不涉及界面控件和缓存
         :param selected_month: 选中的月份，格式为YYYY-MM，None表示全部月份
         :return: 包含费用统计数据的字典
         """
-        # 使用None作为默认月份的键
-        cache_key = selected_month or 'all'
-        
-        # 检查缓存是否有效
-        if self._is_cache_valid() and cache_key in self.data_cache['charge_stats']:
-            return self.data_cache['charge_stats'][cache_key]
-        
         from models.charge import Charge
         from datetime import datetime
         
@@ -262,25 +268,15 @@ class DataCards:
             "electricity_usage": round(electricity_usage, 2)
         }
         
-        # 更新缓存
-        self.data_cache['charge_stats'][cache_key] = result
         return result
     
-    def _get_unpaid_amount(self, selected_month=None):
+    @staticmethod
+    def compute_unpaid_amount(selected_month=None):
         """
-        获取未收金额数据
-        1. 从所有费用记录中获取未缴纳或部分缴纳的费用
-        2. 计算实际未收金额（总费用减去已收金额）
+        获取未收金额数据，不涉及界面控件和缓存
         :param selected_month: 选中的月份，格式为YYYY-MM，None表示全部月份
         :return: 未收金额总和
         """
-        # 使用None作为默认月份的键
-        cache_key = selected_month or 'all'
-        
-        # 检查缓存是否有效
-        if self._is_cache_valid() and cache_key in self.data_cache['unpaid_amount']:
-            return self.data_cache['unpaid_amount'][cache_key]
-        
         from models.charge import Charge
         from models.payment import Payment
         
@@ -290,6 +286,9 @@ class DataCards:
         else:
             charges = Charge.get_all()
         
+        # 一次查询取出各费用的已收金额
+        paid_totals = Payment.get_paid_totals(selected_month)
+        
         # 初始化未收金额
         unpaid_amount = 0.0
         
@@ -298,8 +297,7 @@ class DataCards:
             # 只统计未缴纳或部分缴纳的费用
             if charge.status in ("未缴", "部分缴纳"):
                 # 获取已收金额
-                payments = Payment.get_by_charge(charge.id)
-                paid_amount = sum(payment.amount for payment in payments)
+                paid_amount = paid_totals.get(charge.id, 0)
                 # 计算未收金额
                 actual_unpaid = charge.total_charge - paid_amount
                 # 确保未收金额为正数
@@ -308,8 +306,6 @@ class DataCards:
         
         result = round(unpaid_amount, 2)
         
-        # 更新缓存
-        self.data_cache['unpaid_amount'][cache_key] = result
         return result
     
     def _update_cache_time(self):
@@ -339,22 +335,19 @@ class DataCards:
         unpaid_amount = self._get_unpaid_amount(selected_month)
         
         # 根据是否选择了月份，调整卡片标题
-        if selected_month:
-            month_title = f"{selected_month}{self.get_text('monthly_revenue')}"
-            water_title = f"{selected_month}{self.get_text('total_water_consumption')}"
-            electricity_title = f"{selected_month}{self.get_text('total_electricity_consumption')}"
-        else:
-            month_title = self.get_text('monthly_revenue')
-            water_title = self.get_text('total_water_consumption')
-            electricity_title = self.get_text('total_electricity_consumption')
+        # 标题和单位保存为翻译键或取文本函数，由语言绑定表在切换语言时重新求值
+        month_prefix = selected_month or ''
+        month_title = lambda get_text: f"{month_prefix}{get_text('monthly_revenue')}"
+        water_title = lambda get_text: f"{month_prefix}{get_text('total_water_consumption')}"
+        electricity_title = lambda get_text: f"{month_prefix}{get_text('total_electricity_consumption')}"
         
         self.cards_data = [
             {
                 "id": "total_tenants",
-                "title": self.get_text('total_tenants'),
+                "title": 'total_tenants',
                 "value": tenant_stats["total"],
                 "deactivated": tenant_stats["deactivated"],
-                "unit": self.get_text('households'),
+                "unit": 'households',
                 "change_type": "month",  # month=环比, year=同比
                 "change_value": 5.4,
                 "change_trend": "up",  # up=上升, down=下降, flat=持平
@@ -362,7 +355,7 @@ class DataCards:
             },
             {
                 "id": "total_meters",
-                "title": self.get_text('total_meters'),
+                "title": 'total_meters',
                 "value": meter_stats["total"],
                 "water_count": meter_stats["water"],
                 "electricity_count": meter_stats["electricity"],
@@ -386,7 +379,7 @@ class DataCards:
             },
             {
                 "id": "unpaid_amount",
-                "title": self.get_text('unpaid_amount'),
+                "title": 'unpaid_amount',
                 "value": unpaid_amount,
                 "unit": "",
                 "change_type": "month",
@@ -398,7 +391,7 @@ class DataCards:
                 "id": "water_consumption",
                 "title": water_title,
                 "value": charge_stats["water_usage"],
-                "unit": self.get_text('ton'),
+                "unit": 'ton',
                 "change_type": "month",
                 "change_value": 3.2,
                 "change_trend": "up",
@@ -408,7 +401,7 @@ class DataCards:
                 "id": "electricity_consumption",
                 "title": electricity_title,
                 "value": charge_stats["electricity_usage"],
-                "unit": self.get_text('kwh'),
+                "unit": 'kwh',
                 "change_type": "month",
                 "change_value": -5.6,
                 "change_trend": "down",
@@ -460,19 +453,22 @@ class DataCards:
                 widget.destroy()
             
             # 卡片标题
-            title_label = ttk.Label(card_frame, text=card_data["title"], style="CardTitle.TLabel")
+            title_label = ttk.Label(card_frame, style="CardTitle.TLabel")
+            self._bind_text(title_label, card_data["title"])
             title_label.grid(row=0, column=0, columnspan=2, sticky=tk.W, padx=15, pady=8)
             
             # 卡片数值
             if card_data['id'] == 'total_tenants':
                 # 租户总数卡片特殊格式："5 (其中：停用: 2)"
-                value_text = f"{card_data['value']:,} ({self.get_text('deactivated')}: {card_data['deactivated']}){card_data['unit']}"
-                value_label = ttk.Label(card_frame, text=value_text, style="CardValue.TLabel")
+                value_text = lambda get_text, d=card_data: f"{d['value']:,} ({get_text('deactivated')}: {d['deactivated']}){get_text(d['unit'])}"
+                value_label = ttk.Label(card_frame, style="CardValue.TLabel")
+                self._bind_text(value_label, value_text)
                 value_label.grid(row=1, column=0, sticky=tk.W, padx=15, pady=5)
             elif card_data['id'] == 'total_meters':
                 # 仪表总数卡片特殊格式："水表：X个，电表：X个"
-                value_text = f"{self.get_text('water_meter')}：{card_data['water_count']:,}，{self.get_text('electric_meter')}：{card_data['electricity_count']:,}"
-                value_label = ttk.Label(card_frame, text=value_text, style="CardValue.TLabel")
+                value_text = lambda get_text, d=card_data: f"{get_text('water_meter')}：{d['water_count']:,}，{get_text('electric_meter')}：{d['electricity_count']:,}"
+                value_label = ttk.Label(card_frame, style="CardValue.TLabel")
+                self._bind_text(value_label, value_text)
                 value_label.grid(row=1, column=0, sticky=tk.W, padx=15, pady=5)
             elif card_data['id'] == 'monthly_revenue':
                 # 本月收入卡片特殊格式：使用Frame容器来放置总收入和明细部分
@@ -483,19 +479,23 @@ class DataCards:
                 value_container.grid_columnconfigure(1, weight=1)
                 
                 # 1. 创建总收入部分标签
-                main_value_text = f" {card_data['value']:,.2f}  {self.get_text('yuan')}"
-                main_value_label = ttk.Label(value_container, text=main_value_text, style="CardValue.TLabel")
+                main_value_text = lambda get_text, d=card_data: f" {d['value']:,.2f}  {get_text('yuan')}"
+                main_value_label = ttk.Label(value_container, style="CardValue.TLabel")
+                self._bind_text(main_value_label, main_value_text)
                 main_value_label.grid(row=0, column=0, sticky=tk.W)
                 
                 # 2. 创建明细部分标签（使用固定字体大小，避免频繁动态调整）
-                detail_text = f"（{self.get_text('water_fee')}： {card_data['water_fee']:,.2f}   {self.get_text('electricity_fee')}： {card_data['electricity_fee']:,.2f} ）"
+                detail_text = lambda get_text, d=card_data: f"（{get_text('water_fee')}： {d['water_fee']:,.2f}   {get_text('electricity_fee')}： {d['electricity_fee']:,.2f} ）"
                 # 使用固定字体大小，减少性能开销
-                detail_label = ttk.Label(value_container, text=detail_text, font=('', 9))
+                detail_label = ttk.Label(value_container, font=('', 9))
+                self._bind_text(detail_label, detail_text)
                 detail_label.grid(row=0, column=1, sticky=tk.W, padx=(5, 0))
             else:
                 # 普通卡片格式
-                value_text = f"{card_data['value']:,}{card_data['unit']}" if isinstance(card_data['value'], int) else f"{card_data['value']:,.2f}{card_data['unit']}"
-                value_label = ttk.Label(card_frame, text=value_text, style="CardValue.TLabel")
+                number_text = f"{card_data['value']:,}" if isinstance(card_data['value'], int) else f"{card_data['value']:,.2f}"
+                value_text = lambda get_text, n=number_text, unit=card_data['unit']: f"{n}{get_text(unit) if unit else ''}"
+                value_label = ttk.Label(card_frame, style="CardValue.TLabel")
+                self._bind_text(value_label, value_text)
                 value_label.grid(row=1, column=0, sticky=tk.W, padx=15, pady=5)
             
             # 变化趋势图标
@@ -510,9 +510,9 @@ class DataCards:
             bottom_frame.grid_columnconfigure(1, weight=1)
             
             # 变化百分比（左对齐）
-            change_type_text = self.get_text('month_on_month') if card_data["change_type"] == "month" else self.get_text('year_on_year')
+            change_type_key = 'month_on_month' if card_data["change_type"] == "month" else 'year_on_year'
             change_value = abs(card_data["change_value"])
-            change_text = f"{change_type_text} {trend_icon} {change_value}%"
+            change_text = lambda get_text, k=change_type_key, icon=trend_icon, v=change_value: f"{get_text(k)} {icon} {v}%"
             
             if card_data["change_trend"] == "up":
                 change_style = "PositiveChange.TLabel"
@@ -521,12 +521,14 @@ class DataCards:
             else:
                 change_style = "NeutralChange.TLabel"
             
-            change_label = ttk.Label(bottom_frame, text=change_text, style=change_style)
+            change_label = ttk.Label(bottom_frame, style=change_style)
+            self._bind_text(change_label, change_text)
             change_label.grid(row=0, column=0, sticky=tk.W)
             
             # 更新时间（右对齐）
             update_time_text = card_data["update_time"].strftime("%Y-%m-%d %H:%M")
-            update_label = ttk.Label(bottom_frame, text=f"{self.get_text('update_time')}: {update_time_text}", font=("", 8))
+            update_label = ttk.Label(bottom_frame, font=("", 8))
+            self._bind_text(update_label, lambda get_text, t=update_time_text: f"{get_text('update_time')}: {t}")
             update_label.grid(row=0, column=1, sticky=tk.E)
             
             # 为卡片添加点击事件
@@ -602,6 +604,7 @@ class DataCards:
         except (ValueError, TypeError):
             return 0
     
+    @query_stats.scoped('DataCards.refresh_data')
     def refresh_data(self, selected_month=None):
         """
         刷新数据卡片
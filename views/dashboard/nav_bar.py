@@ -7,6 +7,7 @@
 
 import tkinter as tk
 from tkinter import ttk
+from utils.style_registry import get_style_registry
 from datetime import datetime
 
 
@@ -66,7 +67,8 @@ class NavBar:
         self.server_status_indicator = ttk.Label(self.server_status_frame, text="●", foreground="green", font=('', 14))
         self.server_status_indicator.pack(side=tk.LEFT, padx=2)
         
-        self.server_status_label = ttk.Label(self.server_status_frame, text=self.dashboard_view.get_text('server_online'))
+        self.server_status_label = ttk.Label(self.server_status_frame)
+        self._bind_text(self.server_status_label, 'server_online')
         self.server_status_label.pack(side=tk.LEFT)
         
         # 数据同步状态
@@ -76,7 +78,8 @@ class NavBar:
         self.sync_status_indicator = ttk.Label(self.sync_status_frame, text="●", foreground="green", font=('', 14))
         self.sync_status_indicator.pack(side=tk.LEFT, padx=2)
         
-        self.sync_status_label = ttk.Label(self.sync_status_frame, text=self.dashboard_view.get_text('data_synchronized'))
+        self.sync_status_label = ttk.Label(self.sync_status_frame)
+        self._bind_text(self.sync_status_label, 'data_synchronized')
         self.sync_status_label.pack(side=tk.LEFT)
         
         # 右侧：操作按钮区
@@ -84,7 +87,8 @@ class NavBar:
         self.actions_frame.grid(row=0, column=2, sticky=tk.E, padx=10, pady=5)
         
         # 月份选择组件
-        self.month_label = ttk.Label(self.actions_frame, text=self.dashboard_view.get_text('select_month') + ':')
+        self.month_label = ttk.Label(self.actions_frame)
+        self._bind_text(self.month_label, lambda get_text: get_text('select_month') + ':')
         self.month_label.pack(side=tk.LEFT, padx=(0, 5))
         
         self.month_var = tk.StringVar()
@@ -94,21 +98,48 @@ class NavBar:
         self.month_combobox.pack(side=tk.LEFT, padx=(0, 10))
         
         # 刷新按钮
-        self.refresh_btn = ttk.Button(self.actions_frame, text="🔄 " + self.dashboard_view.get_text('refresh'), command=self.on_refresh)
+        self.refresh_btn = ttk.Button(self.actions_frame, command=self.on_refresh)
+        self._bind_text(self.refresh_btn, lambda get_text: "🔄 " + get_text('refresh'))
         self.refresh_btn.pack(side=tk.LEFT, padx=5)
         
         # 初始化样式
         self._init_style()
         
+        # 登记需要在语言切换时处理的月份下拉框和角色名称
+        language_utils = self._language_utils()
+        if language_utils:
+            language_utils.bind_callback(self.month_combobox, self._update_month_all_option)
+            language_utils.bind_callback(self.role_label, lambda _get_text: self.update_user_info())
+        
         # 初始化时间显示
         self.update_time()
     
+    def _language_utils(self):
+        """
+        获取主窗口的语言工具
+        :return: LanguageUtils实例或None
+        """
+        return getattr(getattr(self.dashboard_view, 'main_window', None), 'language_utils', None)
+    
+    def _bind_text(self, widget, source):
+        """
+        设置控件文本并登记到语言绑定表，切换语言时由绑定表直接刷新
+        :param widget: 控件
+        :param source: 翻译键或接收get_text返回文本的函数
+        """
+        language_utils = self._language_utils()
+        if language_utils:
+            language_utils.bind_text(widget, source)
+        else:
+            get_text = self.dashboard_view.get_text
+            widget.config(text=source(get_text) if callable(source) else get_text(source))
+    
     def _init_style(self):
         """
         初始化样式
         """
-        style = ttk.Style()
-        style.configure("NavBar.TFrame", background="#f0f0f0")
+        # 导航栏样式由样式注册表统一配置
+        get_style_registry().ensure_initialized(self.parent)
     
     def load_month_list(self):
         """
@@ -192,44 +223,23 @@ class NavBar:
                     role_key = role_mapping.get(current_user.role, current_user.role)
                     self.role_label.config(text=get_text(role_key))
     
-    def update_language(self):
+    def _update_month_all_option(self, get_text):
         """
-        更新导航栏的语言
+        将月份下拉框中的"全部"选项更新为当前语言
+        :param get_text: 取文本函数
         """
-        # 获取语言工具
-        if hasattr(self.dashboard_view, 'main_window') and hasattr(self.dashboard_view.main_window, 'get_text'):
-            get_text = self.dashboard_view.main_window.get_text
+        current_values = list(self.month_combobox['values'])
+        if current_values:
+            # 保存当前选中的值
+            current_selected = self.month_var.get()
+            old_all_option = current_values[0]
+            # 获取当前语言的"全部"选项
+            all_option = get_text('all')
             
-            # 更新服务器状态标签
-            self.server_status_label.config(text=get_text('server_online'))
+            # 更新第一个选项为当前语言的"全部"
+            current_values[0] = all_option
+            self.month_combobox['values'] = tuple(current_values)
             
-            # 更新数据同步状态标签
-            self.sync_status_label.config(text=get_text('data_synchronized'))
-            
-            # 更新月份选择标签
-            self.month_label.config(text=get_text('select_month') + ':')
-            
-            # 更新月份选择下拉框
-            current_values = list(self.month_combobox['values'])
-            if current_values:
-                # 保存当前选中的值
-                current_selected = self.month_var.get()
-                # 获取当前语言的"全部"选项
-                all_option = get_text('all')
-                
-                # 更新第一个选项为当前语言的"全部"
-                current_values[0] = all_option
-                self.month_combobox['values'] = tuple(current_values)
-                
-                # 如果当前选中的是任何语言的"全部"，则更新为当前语言的"全部"
-                all_options_in_all_languages = ["全部", "All", all_option]
-                if current_selected in all_options_in_all_languages:
-                    self.month_var.set(all_option)
-            
-            # 更新刷新按钮文本
-            self.refresh_btn.config(text="🔄 " + get_text('refresh'))
-            
-            # 更新用户信息，确保角色名称也被翻译
-            self.update_user_info()
-    
-
+            # 如果当前选中的是"全部"，则更新为当前语言的"全部"
+            if current_selected == old_all_option:
+                self.month_var.set(all_option)
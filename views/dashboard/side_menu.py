@@ -8,6 +8,7 @@
 
 import tkinter as tk
 from tkinter import ttk
+from utils.style_registry import get_style_registry
 
 
 class SideMenu:
@@ -44,111 +45,111 @@ class SideMenu:
         # 默认返回键名
         return key
     
-    def update_language(self):
+    def _bind_text(self, widget, source):
         """
-        更新菜单的语言
+        设置控件文本并登记到语言绑定表，切换语言时由绑定表直接刷新，无需重建菜单
+        :param widget: 菜单控件
+        :param source: 翻译键或接收get_text返回文本的函数
         """
-        # 保存当前选中的菜单项
-        current_selected = self.selected_menu
-        
-        # 销毁当前菜单并重新创建
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
-        
-        # 创建新菜单项
-        self.create_menu_items()
-        
-        # 恢复之前选中的菜单项，避免不必要的页面刷新
-        if current_selected and hasattr(self, 'overview_btn'):
-            # 只更新菜单文本，不触发菜单点击事件
-            pass
+        language_utils = getattr(getattr(self.dashboard_view, 'main_window', None), 'language_utils', None)
+        if language_utils:
+            language_utils.bind_text(widget, source)
+        else:
+            widget.config(text=source(self.get_text) if callable(source) else self.get_text(source))
     
     def _init_style(self):
         """
         初始化样式
         """
-        style = ttk.Style()
-        style.configure("SideMenu.TFrame", background="#f8f9fa")
-        style.configure("Menu.TButton", width=15, anchor=tk.W, padding=(10, 8))
-        # 使用map方法定义按钮在不同状态下的样式
-        style.map("Menu.TButton", background=[("active", "#e9ecef"), ("!active", "#f8f9fa")])
-        style.configure("SubMenu.TButton", width=13, anchor=tk.W, padding=(25, 5))
+        # 菜单按钮样式在注册表中定义，每个Tk解释器只配置一次
+        get_style_registry().ensure_initialized(self.parent)
     
     def create_menu_items(self):
         """
         创建菜单项
         """
         # 菜单标题
-        menu_title = ttk.Label(self.main_frame, text=self.get_text('menu_title'), font=("", 12, "bold"), background="#f8f9fa")
+        menu_title = ttk.Label(self.main_frame, font=("", 12, "bold"), background="#f8f9fa")
+        self._bind_text(menu_title, 'menu_title')
         menu_title.pack(side=tk.TOP, anchor=tk.W, padx=10, pady=10)
         
         # 仪表盘菜单组
-        self.dashboard_menu_frame = ttk.LabelFrame(self.main_frame, text=self.get_text('menu_group_dashboard'), style="MenuGroup.TLabelframe")
+        self.dashboard_menu_frame = ttk.LabelFrame(self.main_frame, style="MenuGroup.TLabelframe")
+        self._bind_text(self.dashboard_menu_frame, 'menu_group_dashboard')
         self.dashboard_menu_frame.pack(fill=tk.X, padx=5, pady=5)
         
         # 概览菜单项
-        self.overview_btn = ttk.Button(self.dashboard_menu_frame, text="📊 " + self.get_text('menu_overview'), style="Menu.TButton", 
+        self.overview_btn = ttk.Button(self.dashboard_menu_frame, style="Menu.TButton", 
                                       command=lambda: self.on_menu_click('overview'))
+        self._bind_text(self.overview_btn, lambda get_text: "📊 " + get_text('menu_overview'))
         self.overview_btn.pack(fill=tk.X, padx=5, pady=2)
         
         # 数据管理菜单组
-        self.data_menu_frame = ttk.LabelFrame(self.main_frame, text=self.get_text('menu_group_data_management'), style="MenuGroup.TLabelframe")
+        self.data_menu_frame = ttk.LabelFrame(self.main_frame, style="MenuGroup.TLabelframe")
+        self._bind_text(self.data_menu_frame, 'menu_group_data_management')
         self.data_menu_frame.pack(fill=tk.X, padx=5, pady=5)
         
         # 租户管理菜单项
-        self.tenant_btn = ttk.Button(self.data_menu_frame, text="👥 " + self.get_text('menu_tenant'), style="Menu.TButton", 
+        self.tenant_btn = ttk.Button(self.data_menu_frame, style="Menu.TButton", 
                                     command=lambda: self.on_menu_click('tenant'))
+        self._bind_text(self.tenant_btn, lambda get_text: "👥 " + get_text('menu_tenant'))
         self.tenant_btn.pack(fill=tk.X, padx=5, pady=2)
         
         # 水电表管理菜单项
-        self.meter_btn = ttk.Button(self.data_menu_frame, text="⚡ " + self.get_text('menu_meter'), style="Menu.TButton", 
+        self.meter_btn = ttk.Button(self.data_menu_frame, style="Menu.TButton", 
                                    command=lambda: self.on_menu_click('meter'))
+        self._bind_text(self.meter_btn, lambda get_text: "⚡ " + get_text('menu_meter'))
         self.meter_btn.pack(fill=tk.X, padx=5, pady=2)
         
         # 抄表管理菜单项
-        self.reading_btn = ttk.Button(self.data_menu_frame, text="📋 " + self.get_text('menu_reading_entry'), style="Menu.TButton", 
+        self.reading_btn = ttk.Button(self.data_menu_frame, style="Menu.TButton", 
                                      command=lambda: self.on_menu_click('reading_entry'))
+        self._bind_text(self.reading_btn, lambda get_text: "📋 " + get_text('menu_reading_entry'))
         self.reading_btn.pack(fill=tk.X, padx=5, pady=2)
         
         # 费用管理菜单项
-        self.charge_btn = ttk.Button(self.data_menu_frame, text="💰 " + self.get_text('menu_charge_calculation'), style="Menu.TButton", 
+        self.charge_btn = ttk.Button(self.data_menu_frame, style="Menu.TButton", 
                                     command=lambda: self.on_menu_click('charge_calculation'))
+        self._bind_text(self.charge_btn, lambda get_text: "💰 " + get_text('menu_charge_calculation'))
         self.charge_btn.pack(fill=tk.X, padx=5, pady=2)
         
         # 收费管理菜单项
-        self.payment_btn = ttk.Button(self.data_menu_frame, text="💳 " + self.get_text('menu_payment_entry'), style="Menu.TButton", 
+        self.payment_btn = ttk.Button(self.data_menu_frame, style="Menu.TButton", 
                                      command=lambda: self.on_menu_click('payment_entry'))
+        self._bind_text(self.payment_btn, lambda get_text: "💳 " + get_text('menu_payment_entry'))
         self.payment_btn.pack(fill=tk.X, padx=5, pady=2)
         
         # 费用结算菜单项
-        self.settlement_btn = ttk.Button(self.data_menu_frame, text="📝 " + self.get_text('menu_settlement_management'), style="Menu.TButton", 
+        self.settlement_btn = ttk.Button(self.data_menu_frame, style="Menu.TButton", 
                                      command=lambda: self.on_menu_click('settlement_management'))
+        self._bind_text(self.settlement_btn, lambda get_text: "📝 " + get_text('menu_settlement_management'))
         self.settlement_btn.pack(fill=tk.X, padx=5, pady=2)
         
         # 系统配置菜单组
-        self.system_menu_frame = ttk.LabelFrame(self.main_frame, text=self.get_text('menu_group_system_config'), style="MenuGroup.TLabelframe")
+        self.system_menu_frame = ttk.LabelFrame(self.main_frame, style="MenuGroup.TLabelframe")
+        self._bind_text(self.system_menu_frame, 'menu_group_system_config')
         self.system_menu_frame.pack(fill=tk.X, padx=5, pady=5)
         
         # 价格管理菜单项
-        self.price_btn = ttk.Button(self.system_menu_frame, text="📊 " + self.get_text('menu_price'), style="Menu.TButton", 
+        self.price_btn = ttk.Button(self.system_menu_frame, style="Menu.TButton", 
                                    command=lambda: self.on_menu_click('price_management'))
+        self._bind_text(self.price_btn, lambda get_text: "📊 " + get_text('menu_price'))
         self.price_btn.pack(fill=tk.X, padx=5, pady=2)
         
         # 用户管理菜单项
-        self.user_btn = ttk.Button(self.system_menu_frame, text="👤 " + self.get_text('menu_user_management'), style="Menu.TButton", 
+        self.user_btn = ttk.Button(self.system_menu_frame, style="Menu.TButton", 
                                   command=lambda: self.on_menu_click('user_management'))
+        self._bind_text(self.user_btn, lambda get_text: "👤 " + get_text('menu_user_management'))
         self.user_btn.pack(fill=tk.X, padx=5, pady=2)
         
         # 系统设置菜单项
-        self.settings_btn = ttk.Button(self.system_menu_frame, text="⚙️ " + self.get_text('menu_system_config'), style="Menu.TButton", 
+        self.settings_btn = ttk.Button(self.system_menu_frame, style="Menu.TButton", 
                                      command=lambda: self.on_menu_click('system_settings'))
+        self._bind_text(self.settings_btn, lambda get_text: "⚙️ " + get_text('menu_system_config'))
         self.settings_btn.pack(fill=tk.X, padx=5, pady=2)
         
-        # 只有在第一次创建菜单时才默认选中概览菜单
-        # 避免在语言切换时导致不必要的页面刷新
-        if not hasattr(self, 'menu_initialized'):
-            self.on_menu_click('overview')
-            self.menu_initialized = True
+        # 默认选中概览菜单
+        self.on_menu_click('overview')
     
     def on_menu_click(self, menu_item):
         """
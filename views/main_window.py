@@ -8,6 +8,7 @@
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
+from tkinter import filedialog
 from datetime import datetime
 from .tenant_view import TenantView
 from .meter_view import MeterView
@@ -18,12 +19,18 @@ from .payment_view import PaymentView
 from .report_view import ReportView
 from .user_view import UserView
 from .settlement_view import SettlementView
+from .simulation_view import SimulationView
 from .dashboard.dashboard_view import DashboardView
 from .login_view import LoginWindow
 from .register_view import RegisterView
+from utils.background import run_in_background
 from utils.backup_utils import BackupUtils
+from utils.backup_store import BackupStore
+from utils.backup_scheduler import BackupScheduler
+from utils import raw_export
 from utils.settings_utils import SettingsUtils
 from utils.language_utils import LanguageUtils
+from utils.style_registry import get_style_registry
 import os
 
 class MainWindow:
@@ -71,6 +78,12 @@ class MainWindow:
         # 存储已创建的视图实例，用于视图间通信
         self.view_instances = {}
         
+        # 后台数据库备份线程
+        self.backup_thread = None
+        # 原始数据导出线程及其进度
+        self.raw_export_thread = None
+        self.raw_export_state = None
+        
         # 设置主窗口的grid布局，确保各组件正确排列
         # 第0行：工具栏，不可伸缩
         # 第1行：工作区，可伸缩
@@ -123,6 +136,14 @@ class MainWindow:
         # 更新状态栏时间
         self.update_status_time()
         
+        # 启动自动备份调度器
+        self.backup_scheduler = BackupScheduler(self.root, os.path.join(os.getcwd(), "water_electricity.db"))
+        self.backup_scheduler.start()
+        
+        # 按系统设置启动抄表数据接收服务
+        self.ingest_server = None
+        self.start_ingest_server()
+        
     def get_text(self, key):
         """
         获取当前语言的文本
@@ -142,15 +163,9 @@ class MainWindow:
             self.settings.set_setting('system', 'language', new_language)
             # 更新主窗口标题
             self.root.title(self.get_dynamic_system_title())
-            # 更新菜单栏和工具栏语言（不重新创建）
-            self.update_menu_language()
-            self.update_toolbar_language()
-            # 更新Notebook标签页标题
-            self.update_notebook_tabs_language()
-            # 更新当前显示视图的语言
+            # 菜单栏、工具栏、标签页、状态栏和仪表盘的文本已通过language_utils的绑定表刷新
+            # 这里只需通知尚未使用绑定表的业务视图
             self.update_current_view_language()
-            # 更新状态栏语言
-            self.update_status_bar_language()
     
     def update_language(self, new_language):
         """
@@ -162,61 +177,10 @@ class MainWindow:
     
     def update_current_view_language(self):
         """
-        更新所有视图的语言
+        更新所有已创建业务视图的语言
         """
-        # 更新仪表盘侧边栏菜单的语言
-        if hasattr(self, 'dashboard_view') and self.dashboard_view:
-            self.dashboard_view.update_language()
-        
-        # 更新所有已创建的视图语言
         for view_name, view_instance in self.view_instances.items():
             self.update_view_language(view_instance)
-        
-        # 更新状态栏语言
-        self.update_status_bar_language()
-        
-        # 更新帮助文档窗口语言
-        self.update_help_window_language()
-    
-    def update_help_window_language(self):
-        """
-        更新帮助文档窗口的语言
-        """
-        try:
-            if hasattr(self, 'help_window') and self.help_window:
-                # 检查窗口是否已被销毁
-                if self.help_window.winfo_exists():
-                    # 更新窗口标题
-                    self.help_window.title(self.get_text('menu_help'))
-                    
-                    # 更新选项卡标题
-                    if hasattr(self, 'help_notebook') and self.help_notebook:
-                        # 检查notebook是否已被销毁
-                        if self.help_notebook.winfo_exists():
-                            # 获取所有选项卡
-                            tabs = self.help_notebook.tabs()
-                            if len(tabs) >= 3:
-                                self.help_notebook.tab(tabs[0], text=self.get_text('menu_help'))
-                                self.help_notebook.tab(tabs[1], text=self.get_text('technical_support'))
-                                self.help_notebook.tab(tabs[2], text=self.get_text('system_about_title'))
-                            
-                            # 重新创建帮助文档内容
-                            for i, tab_id in enumerate(tabs):
-                                # 获取选项卡的frame
-                                tab_frame = self.help_notebook.nametowidget(tab_id)
-                                # 清空frame内容
-                                for widget in tab_frame.winfo_children():
-                                    widget.destroy()
-                                # 重新创建内容
-                                if i == 0:
-                                    self.create_help_documentation(tab_frame)
-                                elif i == 1:
-                                    self.create_technical_support(tab_frame)
-                                elif i == 2:
-                                    self.create_about_system(tab_frame)
-        except tk.TclError as e:
-            # 忽略已销毁窗口的错误
-            print(f"更新帮助窗口语言时发生错误: {str(e)}")
     
     def update_view_language(self, view_instance):
         """
@@ -229,148 +193,38 @@ class MainWindow:
             except Exception as e:
                 print(f"更新视图语言失败: {str(e)}")
     
-    def update_notebook_tabs_language(self):
-        """
-        更新Notebook标签页标题的语言
-        确保所有标签页都能被正确更新，包括组合标签和动态创建的标签页
-        """
-        # 获取所有标签页
-        tabs = self.notebook.tabs()
-        
-        # 定义标签文本映射，包含中文和英文的所有可能值
-        label_mapping = {
-            # 欢迎页面
-            'welcome': ['Welcome', '欢迎', 'Welcome', '欢迎'],
-            # 租户管理
-            'form_title_tenant_management': ['Tenant Management', '租户管理', 'Tenant Management', '租户管理'],
-            # 水电表管理
-            'form_title_meter_management': ['Meter Management', '水电表管理', 'Meter Management', '水电表管理'],
-            # 价格管理
-            'form_title_price_management': ['Price Management', '价格管理', 'Price Management', '价格管理'],
-            # 抄表录入
-            'form_title_reading_entry': ['Reading Entry', '抄表录入', 'Reading Entry', '抄表录入'],
-            # 费用计算
-            'form_title_charge_calculation': ['Charge Calculation', '费用计算', 'Charge Calculation', '费用计算'],
-            # 收费录入
-            'form_title_payment_entry': ['Payment Entry', '收费录入', 'Payment Entry', '收费录入'],
-            # 费用结算
-            'form_title_settlement_management': ['Settlement Management', '费用结算', 'Settlement Management', '费用结算'],
-            # 报表中心
-            'form_title_report_management': ['Report Center', '报表中心', 'Report Center', '报表中心'],
-            # 用户管理
-            'form_title_user_management': ['User Management', '用户管理', 'User Management', '用户管理'],
-            # 欠费查询
-            'arrears_query': ['Arrears Query', '欠费查询', 'Arrears Query', '欠费查询'],
-            # 抄表历史
-            'reading_management': ['Reading History', '抄表历史', 'Reading History', '抄表历史'],
-            # 费用查询
-            'charge_query': ['Charge Query', '费用查询', 'Charge Query', '费用查询'],
-            # 收费查询
-            'payment_query': ['Payment Query', '收费查询', 'Payment Query', '收费查询'],
-        }
-        
-        for tab_id in tabs:
-            current_text = self.notebook.tab(tab_id, "text")
-            updated = False
-            
-            # 检查当前文本是否匹配任何映射值
-            for key, values in label_mapping.items():
-                if current_text in values or any(v in current_text for v in values):
-                    self.notebook.tab(tab_id, text=self.get_text(key))
-                    updated = True
-                    break
-            
-            # 特殊处理组合标签
-            if not updated and ('report' in current_text.lower() or '报表' in current_text):
-                # 检查是否是租户明细报表
-                if any(term in current_text.lower() for term in ['tenant', '租户', 'detail']):
-                    self.notebook.tab(tab_id, text=f"{self.get_text('tenant_management')} {self.get_text('menu_report')}")
-                    updated = True
-                # 检查是否是收费统计报表
-                elif any(term in current_text.lower() for term in ['payment', '收费', 'stat', '统计']):
-                    self.notebook.tab(tab_id, text=f"{self.get_text('payment_management')} {self.get_text('menu_report')}")
-                    updated = True
-                # 检查是否是结算报表
-                elif any(term in current_text.lower() for term in ['settlement', '结算']):
-                    self.notebook.tab(tab_id, text=self.get_text('settlement_report'))
-                    updated = True
-            
-            # 处理动态创建的标签页，直接根据当前语言重新生成标题
-            if not updated:
-                # 遍历所有可能的标签页类型，尝试匹配
-                for key in ['form_title_tenant_management', 'form_title_meter_management', 'form_title_price_management',
-                           'form_title_reading_entry', 'form_title_charge_calculation', 'form_title_payment_entry',
-                           'form_title_settlement_management', 'form_title_report_management', 'form_title_user_management',
-                           'arrears_query', 'reading_management', 'charge_query', 'payment_query', 'welcome']:
-                    try:
-                        tab_text = self.get_text(key)
-                        # 检查当前标签页是否与该类型匹配
-                        if tab_text.lower() in current_text.lower() or current_text.lower() in tab_text.lower() or 'welcome' in current_text.lower():
-                            self.notebook.tab(tab_id, text=tab_text)
-                            updated = True
-                            break
-                    except Exception as e:
-                        print(f"Error updating tab text: {e}")
-                
-                # 如果仍然没有更新，尝试根据标签页内容猜测类型
-                if not updated:
-                    if 'tenant' in current_text.lower() or '租户' in current_text:
-                        self.notebook.tab(tab_id, text=f"{self.get_text('tenant_management')} {self.get_text('menu_report')}")
-                    elif 'payment' in current_text.lower() or '收费' in current_text:
-                        self.notebook.tab(tab_id, text=f"{self.get_text('payment_management')} {self.get_text('menu_report')}")
-                    elif 'settlement' in current_text.lower() or '结算' in current_text:
-                        self.notebook.tab(tab_id, text=self.get_text('settlement_report'))
-                    elif 'welcome' in current_text.lower() or '欢迎' in current_text:
-                        self.notebook.tab(tab_id, text=self.get_text('welcome'))
-                    else:
-                        # 最后的兜底方案：尝试根据标签页ID或其他属性更新
-                        for key in label_mapping:
-                            try:
-                                self.notebook.tab(tab_id, text=self.get_text(key))
-                                updated = True
-                                break
-                            except:
-                                pass
-            
-        # 确保所有未来可能被添加的标签页也使用正确的语言
-        # 我们需要在各个open_xxx_management方法中确保使用当前语言
-        # 这里我们可以通过更新标签文本映射
+    def add_tab(self, frame, source):
+        """
+        添加Notebook标签页，并将标题登记到语言绑定表
+        :param frame: 标签页对应的Frame
+        :param source: 翻译键或接收get_text返回标题的函数
+        """
+        self.notebook.add(frame)
+        self.language_utils.bind_tab(self.notebook, frame, source)
     
-    def update_status_bar_language(self):
+    def get_user_info_text(self, get_text):
         """
-        更新状态栏语言
+        生成状态栏的用户信息文本
+        :param get_text: 取文本函数
+        :return: 用户信息文本
         """
-        if hasattr(self, 'user_label') and hasattr(self, 'db_info_label'):
-            # 中文到英文翻译键的映射
-            role_mapping = {
-                '管理员': 'admin',
-                '抄表员': 'reader'
-            }
-            status_mapping = {
-                '启用': 'enabled',
-                '禁用': 'disabled'
-            }
-            
-            # 获取翻译键
-            role_key = role_mapping.get(self.current_user.role, self.current_user.role)
-            status_key = status_mapping.get(self.current_user.status, self.current_user.status)
-            
-            # 更新状态栏用户信息，对角色和状态进行翻译
-            translated_role = self.get_text(role_key) if role_key else ''
-            translated_status = self.get_text(status_key) if status_key else ''
-            user_info = f"{self.get_text('current_user')}: {self.current_user.username} | {self.get_text('role')}: {translated_role} | {self.get_text('status')}: {translated_status}"
-            self.user_label.config(text=user_info)
-            
-            # 更新数据库连接信息
-            import os
-            db_path = os.path.abspath("water_electricity.db")
-            db_name = os.path.basename(db_path)
-            db_dir = os.path.dirname(db_path)
-            self.db_info_label.config(text=f"{self.get_text('database')}: {db_name} ({db_dir})")
-            
-            # 更新数据状态
-            if hasattr(self, 'data_status_label'):
-                self.data_status_label.config(text=f"{self.get_text('data_status')}: {self.get_text('normal')}")
+        # 中文到英文翻译键的映射
+        role_mapping = {
+            '管理员': 'admin',
+            '抄表员': 'reader'
+        }
+        status_mapping = {
+            '启用': 'enabled',
+            '禁用': 'disabled'
+        }
+        
+        # 获取翻译键
+        role_key = role_mapping.get(self.current_user.role, self.current_user.role)
+        status_key = status_mapping.get(self.current_user.status, self.current_user.status)
+        
+        translated_role = get_text(role_key) if role_key else ''
+        translated_status = get_text(status_key) if status_key else ''
+        return f"{get_text('current_user')}: {self.current_user.username} | {get_text('role')}: {translated_role} | {get_text('status')}: {translated_status}"
     
     def refresh_view(self, view_name):
         """
@@ -402,84 +256,77 @@ class MainWindow:
     def create_menu(self):
         """
         创建菜单栏
+        菜单文本登记到语言绑定表，切换语言时无需重建菜单
         """
+        bind_menu_entry = self.language_utils.bind_menu_entry
+        
+        def add_command(menu, key, command):
+            menu.add_command(command=command)
+            bind_menu_entry(menu, menu.index(tk.END), key)
+        
+        def add_cascade(menu, key):
+            self.menubar.add_cascade(menu=menu)
+            bind_menu_entry(self.menubar, self.menubar.index(tk.END), key)
+        
         self.menubar = tk.Menu(self.root)
         
         # 文件菜单
         self.file_menu = tk.Menu(self.menubar, tearoff=0)
-        self.file_menu.add_command(label=self.get_text('menu_logout'), command=self.quit_app)
-        self.menubar.add_cascade(label=self.get_text('menu_file'), menu=self.file_menu)
+        add_command(self.file_menu, 'menu_logout', self.quit_app)
+        add_cascade(self.file_menu, 'menu_file')
         
         # 基础信息菜单
         self.base_info_menu = tk.Menu(self.menubar, tearoff=0)
-        self.base_info_menu.add_command(label=self.get_text('menu_tenant'), command=self.open_tenant_management)
-        self.base_info_menu.add_command(label=self.get_text('menu_meter'), command=self.open_meter_management)
-        self.base_info_menu.add_command(label=self.get_text('menu_price'), command=self.open_price_management)
-        self.menubar.add_cascade(label=self.get_text('menu_base_info'), menu=self.base_info_menu)
+        add_command(self.base_info_menu, 'menu_tenant', self.open_tenant_management)
+        add_command(self.base_info_menu, 'menu_meter', self.open_meter_management)
+        add_command(self.base_info_menu, 'menu_price', self.open_price_management)
+        add_cascade(self.base_info_menu, 'menu_base_info')
         
         # 抄表管理菜单
         self.reading_menu = tk.Menu(self.menubar, tearoff=0)
-        self.reading_menu.add_command(label=self.get_text('menu_meter_reading'), command=self.open_meter_reading)
-        self.menubar.add_cascade(label=self.get_text('menu_reading'), menu=self.reading_menu)
+        add_command(self.reading_menu, 'menu_meter_reading', self.open_meter_reading)
+        add_cascade(self.reading_menu, 'menu_reading')
         
         # 费用管理菜单
         self.charge_menu = tk.Menu(self.menubar, tearoff=0)
-        self.charge_menu.add_command(label=self.get_text('menu_charge_calculation'), command=self.open_charge_calculation)
-        self.menubar.add_cascade(label=self.get_text('menu_charge'), menu=self.charge_menu)
+        add_command(self.charge_menu, 'menu_charge_calculation', self.open_charge_calculation)
+        add_command(self.charge_menu, 'menu_price_simulation', self.open_price_simulation)
+        add_cascade(self.charge_menu, 'menu_charge')
         
         # 收费管理菜单
         self.payment_menu = tk.Menu(self.menubar, tearoff=0)
-        self.payment_menu.add_command(label=self.get_text('menu_payment_entry'), command=self.open_payment_entry)
-        self.payment_menu.add_command(label=self.get_text('menu_settlement'), command=self.open_settlement_management)
-        self.menubar.add_cascade(label=self.get_text('menu_payment'), menu=self.payment_menu)
+        add_command(self.payment_menu, 'menu_payment_entry', self.open_payment_entry)
+        add_command(self.payment_menu, 'menu_settlement', self.open_settlement_management)
+        add_cascade(self.payment_menu, 'menu_payment')
         
         # 报表中心菜单
         self.report_menu = tk.Menu(self.menubar, tearoff=0)
-        self.report_menu.add_command(label=self.get_text('menu_monthly_report'), command=self.open_monthly_report)
-        self.menubar.add_cascade(label=self.get_text('menu_report'), menu=self.report_menu)
+        add_command(self.report_menu, 'menu_monthly_report', self.open_monthly_report)
+        add_command(self.report_menu, 'menu_raw_data_export', self.open_raw_data_export)
+        add_cascade(self.report_menu, 'menu_report')
         
         # 系统设置菜单
         self.system_menu = tk.Menu(self.menubar, tearoff=0)
-        self.system_menu.add_command(label=self.get_text('menu_user_management'), command=self.open_user_management)
-        self.system_menu.add_command(label=self.get_text('menu_data_backup'), command=self.open_data_backup)
-        self.system_menu.add_command(label=self.get_text('menu_data_restore'), command=self.open_data_restore)
-        self.system_menu.add_command(label=self.get_text('menu_data_initialization'), command=self.open_data_initialization)
-        self.system_menu.add_command(label=self.get_text('menu_system_settings'), command=self.open_system_settings)
+        add_command(self.system_menu, 'menu_user_management', self.open_user_management)
+        add_command(self.system_menu, 'menu_data_backup', self.open_data_backup)
+        add_command(self.system_menu, 'menu_data_restore', self.open_data_restore)
+        add_command(self.system_menu, 'menu_data_initialization', self.open_data_initialization)
+        add_command(self.system_menu, 'menu_system_settings', self.open_system_settings)
         # 添加注册菜单项
         self.system_menu.add_separator()
         self.system_menu.add_command(label="软件注册", command=self.open_register)
         self.system_menu.add_command(label="注册信息", command=self.show_license_info)
-        self.menubar.add_cascade(label=self.get_text('menu_system_settings'), menu=self.system_menu)
+        add_cascade(self.system_menu, 'menu_system_settings')
         
         # 帮助菜单
         self.help_menu = tk.Menu(self.menubar, tearoff=0)
-        self.help_menu.add_command(label=self.get_text('menu_help'), command=self.open_help)
-        self.help_menu.add_command(label=self.get_text('menu_about'), command=self.open_about)
-        self.menubar.add_cascade(label=self.get_text('menu_help'), menu=self.help_menu)
+        add_command(self.help_menu, 'menu_help', self.open_help)
+        add_command(self.help_menu, 'menu_about', self.open_about)
+        add_cascade(self.help_menu, 'menu_help')
         
         # 设置菜单栏
         self.root.config(menu=self.menubar)
         
-    def update_menu_language(self):
-        """
-        更新菜单栏语言
-        重新创建整个菜单栏，确保所有菜单文本都正确更新
-        """
-        # 保存当前选中的菜单项（如果有）
-        current_selected_tab = None
-        if hasattr(self, 'notebook'):
-            current_selected_tab = self.notebook.select()
-        
-        # 重新创建菜单栏
-        self.create_menu()
-        
-        # 恢复之前选中的标签页（如果有）
-        if current_selected_tab and hasattr(self, 'notebook'):
-            try:
-                self.notebook.select(current_selected_tab)
-            except:
-                pass
-    
     def create_toolbar(self):
         """
         创建工具栏
@@ -492,27 +339,33 @@ class MainWindow:
         self.toolbar = ttk.Frame(self.root, height=40, relief=tk.RAISED)
         
         # 租户管理按钮
-        self.tenant_btn = ttk.Button(self.toolbar, text=self.get_text('menu_tenant'), width=10, command=self.open_tenant_management)
+        self.tenant_btn = ttk.Button(self.toolbar, width=10, command=self.open_tenant_management)
+        self.language_utils.bind_text(self.tenant_btn, 'menu_tenant')
         self.tenant_btn.pack(side=tk.LEFT, padx=2, pady=5)
         
         # 抄表录入按钮
-        self.reading_btn = ttk.Button(self.toolbar, text=self.get_text('menu_meter_reading'), width=10, command=self.open_meter_reading)
+        self.reading_btn = ttk.Button(self.toolbar, width=10, command=self.open_meter_reading)
+        self.language_utils.bind_text(self.reading_btn, 'menu_meter_reading')
         self.reading_btn.pack(side=tk.LEFT, padx=2, pady=5)
         
         # 费用计算按钮
-        self.calc_btn = ttk.Button(self.toolbar, text=self.get_text('menu_charge_calculation'), width=10, command=self.open_charge_calculation)
+        self.calc_btn = ttk.Button(self.toolbar, width=10, command=self.open_charge_calculation)
+        self.language_utils.bind_text(self.calc_btn, 'menu_charge_calculation')
         self.calc_btn.pack(side=tk.LEFT, padx=2, pady=5)
         
         # 收费录入按钮
-        self.payment_btn = ttk.Button(self.toolbar, text=self.get_text('menu_payment_entry'), width=10, command=self.open_payment_entry)
+        self.payment_btn = ttk.Button(self.toolbar, width=10, command=self.open_payment_entry)
+        self.language_utils.bind_text(self.payment_btn, 'menu_payment_entry')
         self.payment_btn.pack(side=tk.LEFT, padx=2, pady=5)
         
         # 费用结算按钮
-        self.settlement_btn = ttk.Button(self.toolbar, text=self.get_text('menu_settlement'), width=10, command=self.open_settlement_management)
+        self.settlement_btn = ttk.Button(self.toolbar, width=10, command=self.open_settlement_management)
+        self.language_utils.bind_text(self.settlement_btn, 'menu_settlement')
         self.settlement_btn.pack(side=tk.LEFT, padx=2, pady=5)
         
         # 报表生成按钮
-        self.report_btn = ttk.Button(self.toolbar, text=self.get_text('menu_monthly_report'), width=10, command=self.open_monthly_report)
+        self.report_btn = ttk.Button(self.toolbar, width=10, command=self.open_monthly_report)
+        self.language_utils.bind_text(self.report_btn, 'menu_monthly_report')
         self.report_btn.pack(side=tk.LEFT, padx=2, pady=5)
         
         # 分隔线
@@ -520,39 +373,18 @@ class MainWindow:
         separator.pack(side=tk.LEFT, fill=tk.Y, padx=5, pady=5)
         
         # 退出按钮
-        self.quit_btn = ttk.Button(self.toolbar, text=self.get_text('menu_logout'), width=10, command=self.quit_app)
+        self.quit_btn = ttk.Button(self.toolbar, width=10, command=self.quit_app)
+        self.language_utils.bind_text(self.quit_btn, 'menu_logout')
         self.quit_btn.pack(side=tk.RIGHT, padx=2, pady=5)
         
         # 重新登录按钮
-        self.relogin_btn = ttk.Button(self.toolbar, text=self.get_text('menu_relogin'), width=10, command=self.relogin)
+        self.relogin_btn = ttk.Button(self.toolbar, width=10, command=self.relogin)
+        self.language_utils.bind_text(self.relogin_btn, 'menu_relogin')
         self.relogin_btn.pack(side=tk.RIGHT, padx=2, pady=5)
         
         # 重新使用grid布局放置工具栏
         self.toolbar.grid(row=0, column=0, sticky=tk.EW, padx=5, pady=2)
         
-    def update_toolbar_language(self):
-        """
-        更新工具栏语言
-        只更新现有按钮的文本，不重新创建整个工具栏
-        """
-        # 更新按钮文本
-        if hasattr(self, 'tenant_btn'):
-            self.tenant_btn.config(text=self.get_text('menu_tenant'))
-        if hasattr(self, 'reading_btn'):
-            self.reading_btn.config(text=self.get_text('menu_meter_reading'))
-        if hasattr(self, 'calc_btn'):
-            self.calc_btn.config(text=self.get_text('menu_charge_calculation'))
-        if hasattr(self, 'payment_btn'):
-            self.payment_btn.config(text=self.get_text('menu_payment_entry'))
-        if hasattr(self, 'settlement_btn'):
-            self.settlement_btn.config(text=self.get_text('menu_settlement'))
-        if hasattr(self, 'report_btn'):
-            self.report_btn.config(text=self.get_text('menu_monthly_report'))
-        if hasattr(self, 'quit_btn'):
-            self.quit_btn.config(text=self.get_text('menu_logout'))
-        if hasattr(self, 'relogin_btn'):
-            self.relogin_btn.config(text=self.get_text('menu_relogin'))
-    
     def create_workspace(self):
         """
         创建主工作区
@@ -566,7 +398,7 @@ class MainWindow:
         
         # 添加欢迎页面（仪表盘）
         welcome_frame = ttk.Frame(self.notebook)
-        self.notebook.add(welcome_frame, text=self.get_text('welcome'))
+        self.add_tab(welcome_frame, 'welcome')
         
         # 创建仪表盘视图，并传递MainWindow实例
         self.dashboard_view = DashboardView(welcome_frame, self)
@@ -577,6 +409,7 @@ class MainWindow:
         self.price_frame = ttk.Frame(self.notebook)
         self.reading_frame = ttk.Frame(self.notebook)
         self.charge_frame = ttk.Frame(self.notebook)
+        self.simulation_frame = ttk.Frame(self.notebook)
         self.payment_frame = ttk.Frame(self.notebook)
         self.settlement_frame = ttk.Frame(self.notebook)
         self.report_frame = ttk.Frame(self.notebook)
@@ -593,25 +426,9 @@ class MainWindow:
         self.statusbar.grid_columnconfigure(2, weight=1)  # 中间列（数据库信息）可伸缩
         self.statusbar.grid_rowconfigure(0, weight=1)  # 第一行可伸缩
         
-        # 中文到英文翻译键的映射
-        role_mapping = {
-            '管理员': 'admin',
-            '抄表员': 'reader'
-        }
-        status_mapping = {
-            '启用': 'enabled',
-            '禁用': 'disabled'
-        }
-        
-        # 获取翻译键
-        role_key = role_mapping.get(self.current_user.role, self.current_user.role)
-        status_key = status_mapping.get(self.current_user.status, self.current_user.status)
-        
         # 当前用户信息，显示用户名、角色和状态
-        translated_role = self.get_text(role_key) if role_key else ''
-        translated_status = self.get_text(status_key) if status_key else ''
-        user_info = f"{self.get_text('current_user')}: {self.current_user.username} | {self.get_text('role')}: {translated_role} | {self.get_text('status')}: {translated_status}"
-        self.user_label = ttk.Label(self.statusbar, text=user_info)
+        self.user_label = ttk.Label(self.statusbar)
+        self.language_utils.bind_text(self.user_label, self.get_user_info_text)
         self.user_label.grid(row=0, column=0, sticky=tk.W, padx=(10, 5), pady=(3, 3))
         
         # 分隔线
@@ -623,7 +440,8 @@ class MainWindow:
         db_path = os.path.abspath("water_electricity.db")
         db_name = os.path.basename(db_path)
         db_dir = os.path.dirname(db_path)
-        self.db_info_label = ttk.Label(self.statusbar, text=f"{self.get_text('database')}: {db_name} ({db_dir})")
+        self.db_info_label = ttk.Label(self.statusbar)
+        self.language_utils.bind_text(self.db_info_label, lambda get_text: f"{get_text('database')}: {db_name} ({db_dir})")
         self.db_info_label.grid(row=0, column=2, sticky=tk.W, padx=10, pady=(3, 3))  # 只左对齐，不填充整个列
         
         # 分隔线
@@ -631,7 +449,8 @@ class MainWindow:
         separator2.grid(row=0, column=3, sticky=tk.NS, padx=5, pady=(3, 3))
         
         # 数据状态
-        self.data_status_label = ttk.Label(self.statusbar, text=f"{self.get_text('data_status')}: {self.get_text('normal')}")
+        self.data_status_label = ttk.Label(self.statusbar)
+        self.language_utils.bind_text(self.data_status_label, lambda get_text: f"{get_text('data_status')}: {get_text('normal')}")
         self.data_status_label.grid(row=0, column=4, sticky=tk.E, padx=(5, 10), pady=(3, 3))
         
         # 系统时间
@@ -645,25 +464,8 @@ class MainWindow:
         """
         self.current_user = user
         
-        # 中文到英文翻译键的映射
-        role_mapping = {
-            '管理员': 'admin',
-            '抄表员': 'reader'
-        }
-        status_mapping = {
-            '启用': 'enabled',
-            '禁用': 'disabled'
-        }
-        
-        # 获取翻译键
-        role_key = role_mapping.get(self.current_user.role, self.current_user.role)
-        status_key = status_mapping.get(self.current_user.status, self.current_user.status)
-        
         # 更新状态栏用户信息
-        translated_role = self.get_text(role_key) if role_key else ''
-        translated_status = self.get_text(status_key) if status_key else ''
-        user_info = f"{self.get_text('current_user')}: {self.current_user.username} | {self.get_text('role')}: {translated_role} | {self.get_text('status')}: {translated_status}"
-        self.user_label.config(text=user_info)
+        self.user_label.config(text=self.get_user_info_text(self.get_text))
         
         # 更新仪表盘导航栏用户信息
         if hasattr(self, 'dashboard_view'):
@@ -690,7 +492,7 @@ class MainWindow:
                 return
         
         # 先将frame添加到notebook中，然后再创建视图实例
-        self.notebook.add(self.tenant_frame, text=self.get_text('form_title_tenant_management'))
+        self.add_tab(self.tenant_frame, 'form_title_tenant_management')
         self.notebook.select(self.tenant_frame)
         
         # 创建租户管理视图
@@ -717,7 +519,7 @@ class MainWindow:
                 return
         
         # 先将frame添加到notebook中，然后再创建视图实例
-        self.notebook.add(self.meter_frame, text=self.get_text('form_title_meter_management'))
+        self.add_tab(self.meter_frame, 'form_title_meter_management')
         self.notebook.select(self.meter_frame)
         
         # 创建水电表管理视图
@@ -737,7 +539,7 @@ class MainWindow:
         
         # 先将frame添加到notebook中，然后再创建视图实例
         # 这样可以确保视图中的组件在创建时已经完全集成到Tkinter的事件循环中
-        self.notebook.add(self.price_frame, text=self.get_text('form_title_price_management'))
+        self.add_tab(self.price_frame, 'form_title_price_management')
         self.notebook.select(self.price_frame)
         
         # 创建价格管理视图并存储实例
@@ -755,7 +557,7 @@ class MainWindow:
                 return
         
         # 先将frame添加到notebook中，然后再创建视图实例
-        self.notebook.add(self.reading_frame, text=self.get_text('form_title_reading_entry'))
+        self.add_tab(self.reading_frame, 'form_title_reading_entry')
         self.notebook.select(self.reading_frame)
         
         # 创建抄表管理视图并存储实例
@@ -777,7 +579,7 @@ class MainWindow:
         self.reading_history_frame = ttk.Frame(self.notebook)
         reading_view = ReadingView(self.reading_history_frame, self.language_utils)
         self.view_instances["reading_history"] = reading_view
-        self.notebook.add(self.reading_history_frame, text=self.get_text('reading_management'))
+        self.add_tab(self.reading_history_frame, 'reading_management')
         self.notebook.select(self.reading_history_frame)
     
     def open_charge_calculation(self):
@@ -791,7 +593,7 @@ class MainWindow:
                 return
         
         # 先将frame添加到notebook中，然后再创建视图实例
-        self.notebook.add(self.charge_frame, text=self.get_text('form_title_charge_calculation'))
+        self.add_tab(self.charge_frame, 'form_title_charge_calculation')
         self.notebook.select(self.charge_frame)
         
         # 创建费用管理视图
@@ -799,6 +601,21 @@ class MainWindow:
         # 存储视图实例
         self.view_instances["charge"] = charge_view
     
+    def open_price_simulation(self):
+        """
+        打开价格模拟界面
+        """
+        for tab_id in self.notebook.tabs():
+            if self.notebook.tab(tab_id, "text") == self.get_text('form_title_price_simulation'):
+                self.notebook.select(tab_id)
+                return
+        
+        self.add_tab(self.simulation_frame, 'form_title_price_simulation')
+        self.notebook.select(self.simulation_frame)
+        
+        simulation_view = SimulationView(self.simulation_frame, self.language_utils)
+        self.view_instances["simulation"] = simulation_view
+    
     def open_charge_query(self):
         """
         打开费用查询界面
@@ -814,7 +631,7 @@ class MainWindow:
         charge_view = ChargeView(self.charge_frame, self.language_utils)
         # 存储视图实例
         self.view_instances["charge"] = charge_view
-        self.notebook.add(self.charge_frame, text=self.get_text('charge_query'))
+        self.add_tab(self.charge_frame, 'charge_query')
         self.notebook.select(self.charge_frame)
     
     def open_payment_entry(self):
@@ -828,7 +645,7 @@ class MainWindow:
                 return
         
         # 先将frame添加到notebook中，然后再创建视图实例
-        self.notebook.add(self.payment_frame, text=self.get_text('form_title_payment_entry'))
+        self.add_tab(self.payment_frame, 'form_title_payment_entry')
         self.notebook.select(self.payment_frame)
         
         # 创建收费管理视图
@@ -851,7 +668,7 @@ class MainWindow:
         payment_view = PaymentView(self.payment_frame, self, self.language_utils)
         # 存储视图实例
         self.view_instances["payment"] = payment_view
-        self.notebook.add(self.payment_frame, text=self.get_text('payment_query'))
+        self.add_tab(self.payment_frame, 'payment_query')
         self.notebook.select(self.payment_frame)
     
     def open_arrears_management(self):
@@ -868,7 +685,7 @@ class MainWindow:
         payment_view = PaymentView(self.payment_frame, self, self.language_utils)
         # 存储视图实例
         self.view_instances["payment"] = payment_view
-        self.notebook.add(self.payment_frame, text=self.get_text('arrears_query'))
+        self.add_tab(self.payment_frame, 'arrears_query')
         self.notebook.select(self.payment_frame)
     
     def open_settlement_management(self):
@@ -882,7 +699,7 @@ class MainWindow:
                 return
         
         # 先将frame添加到notebook中，然后再创建视图实例
-        self.notebook.add(self.settlement_frame, text=self.get_text('form_title_settlement_management'))
+        self.add_tab(self.settlement_frame, 'form_title_settlement_management')
         self.notebook.select(self.settlement_frame)
         
         # 创建结算管理视图并存储实例
@@ -900,7 +717,7 @@ class MainWindow:
                 return
         
         # 先将frame添加到notebook中，然后再创建视图实例
-        self.notebook.add(self.report_frame, text=self.get_text('form_title_report_management'))
+        self.add_tab(self.report_frame, 'form_title_report_management')
         self.notebook.select(self.report_frame)
         
         # 创建报表管理视图并存储实例
@@ -922,7 +739,7 @@ class MainWindow:
         self.tenant_detail_report_frame = ttk.Frame(self.notebook)
         report_view = ReportView(self.tenant_detail_report_frame, self.language_utils)
         self.view_instances["tenant_detail_report"] = report_view
-        self.notebook.add(self.tenant_detail_report_frame, text=f"{self.get_text('tenant_management')} {self.get_text('menu_report')}")
+        self.add_tab(self.tenant_detail_report_frame, lambda get_text: f"{get_text('tenant_management')} {get_text('menu_report')}")
         self.notebook.select(self.tenant_detail_report_frame)
     
     def open_payment_stat_report(self):
@@ -940,7 +757,7 @@ class MainWindow:
         self.payment_stat_report_frame = ttk.Frame(self.notebook)
         report_view = ReportView(self.payment_stat_report_frame, self.language_utils)
         self.view_instances["payment_stat_report"] = report_view
-        self.notebook.add(self.payment_stat_report_frame, text=f"{self.get_text('payment_management')} {self.get_text('menu_report')}")
+        self.add_tab(self.payment_stat_report_frame, lambda get_text: f"{get_text('payment_management')} {get_text('menu_report')}")
         self.notebook.select(self.payment_stat_report_frame)
     
     def open_user_management(self):
@@ -956,24 +773,154 @@ class MainWindow:
         # 创建用户管理视图并存储实例
         user_view = UserView(self.user_frame, self.current_user, self.language_utils)
         self.view_instances["user"] = user_view
-        self.notebook.add(self.user_frame, text=self.get_text('form_title_user_management'))
+        self.add_tab(self.user_frame, 'form_title_user_management')
         self.notebook.select(self.user_frame)
     
     def open_data_backup(self):
         """
         打开数据备份界面
         """
+        # 同一时间只允许一个备份任务
+        if self.backup_thread and self.backup_thread.is_alive():
+            messagebox.showinfo(self.get_text('info'), self.get_text('system_backup_in_progress'))
+            return
+        
         # 获取数据库路径
         db_path = os.path.join(os.getcwd(), "water_electricity.db")
         
-        # 执行备份
-        backup_path = BackupUtils.backup_database(db_path)
+        # 在后台线程执行备份，回调只记录结果，界面由主线程轮询更新
+        backup_state = {'done': False, 'manifest': None, 'copied': 0, 'total': 0}
+        
+        def on_progress(copied, total):
+            backup_state['copied'] = copied
+            backup_state['total'] = total
+        
+        def on_complete(manifest):
+            backup_state['manifest'] = manifest
+            backup_state['done'] = True
+        
+        self.backup_thread = BackupUtils.create_snapshot_async(db_path, on_complete, progress=on_progress)
+        self.poll_data_backup(backup_state)
+    
+    def poll_data_backup(self, backup_state):
+        """
+        轮询后台备份进度，在状态栏显示进度并在完成后提示结果
+        备份线程意外结束而没有写入完成状态时同样停止轮询，按备份失败提示
+        :param backup_state: 后台备份线程写入的状态字典
+        """
+        if not backup_state['done'] and self.backup_thread and self.backup_thread.is_alive():
+            percent = backup_state['copied'] * 100 // backup_state['total'] if backup_state['total'] else 0
+            self.data_status_label.config(text=self.get_text('system_backup_running').format(percent))
+            self.root.after(200, lambda: self.poll_data_backup(backup_state))
+            return
+        
+        # 恢复状态栏文本
+        self.data_status_label.config(text=f"{self.get_text('data_status')}: {self.get_text('normal')}")
         
-        if backup_path:
-            messagebox.showinfo(self.get_text('success'), self.get_text('system_backup_success').format(backup_path))
+        manifest = backup_state['manifest']
+        if manifest:
+            messagebox.showinfo(self.get_text('success'), self.get_text('system_snapshot_success').format(
+                manifest['id'], manifest['stored_bytes'] / 1024 / 1024))
         else:
             messagebox.showerror(self.get_text('error'), self.get_text('system_backup_fail'))
     
+    def open_raw_data_export(self):
+        """
+        打开原始数据导出窗口，按月份范围导出原始数据表供数据分析使用
+        """
+        # 同一时间只允许一个导出任务
+        if self.raw_export_thread and self.raw_export_thread.is_alive():
+            messagebox.showinfo(self.get_text('info'), self.get_text('raw_export_running').format(
+                self.raw_export_state['table'], self.raw_export_state['rows']))
+            return
+        
+        export_window = tk.Toplevel(self.root)
+        export_window.title(self.get_text('menu_raw_data_export'))
+        export_window.transient(self.root)
+        export_window.resizable(False, False)
+        
+        form_frame = ttk.Frame(export_window, padding=15)
+        form_frame.pack(fill=tk.BOTH, expand=True)
+        
+        from_var = tk.StringVar()
+        to_var = tk.StringVar(value=datetime.now().strftime("%Y-%m"))
+        ttk.Label(form_frame, text=self.get_text('raw_export_from_month')).grid(row=0, column=0, sticky=tk.W, pady=5)
+        ttk.Entry(form_frame, textvariable=from_var, width=12).grid(row=0, column=1, sticky=tk.W, pady=5)
+        ttk.Label(form_frame, text=self.get_text('raw_export_to_month')).grid(row=1, column=0, sticky=tk.W, pady=5)
+        ttk.Entry(form_frame, textvariable=to_var, width=12).grid(row=1, column=1, sticky=tk.W, pady=5)
+        ttk.Label(form_frame, text=self.get_text('raw_export_format_hint'), wraplength=360,
+                  foreground="gray").grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=(5, 10))
+        
+        def on_export():
+            """
+            校验月份后选择输出目录，在后台线程执行导出
+            """
+            from_month = from_var.get().strip()
+            to_month = to_var.get().strip()
+            for month in (from_month, to_month):
+                if month:
+                    try:
+                        datetime.strptime(month, "%Y-%m")
+                    except ValueError:
+                        messagebox.showerror(self.get_text('error'), self.get_text('raw_export_invalid_month'),
+                                             parent=export_window)
+                        return
+            
+            output_dir = filedialog.askdirectory(parent=export_window, title=self.get_text('menu_raw_data_export'))
+            if not output_dir:
+                return
+            output_dir = os.path.join(output_dir, f"raw_export_{datetime.now().strftime('%Y%m%d%H%M%S')}")
+            export_window.destroy()
+            
+            # 回调只记录结果，界面由主线程轮询更新
+            export_state = {'done': False, 'table': '', 'rows': 0, 'manifest': None, 'error': None}
+            self.raw_export_state = export_state
+            
+            def on_progress(table, done):
+                export_state['table'] = table
+                export_state['rows'] = done
+            
+            def task():
+                try:
+                    export_state['manifest'] = raw_export.export_tables(output_dir, from_month or None,
+                                                                        to_month or None, progress=on_progress)
+                except Exception as e:
+                    export_state['error'] = str(e)
+                export_state['output_dir'] = output_dir
+            
+            def on_complete(_):
+                export_state['done'] = True
+            
+            self.raw_export_thread = run_in_background(task, on_complete, name="raw-data-export")
+            self.poll_raw_data_export(export_state)
+        
+        button_frame = ttk.Frame(form_frame)
+        button_frame.grid(row=3, column=0, columnspan=2, sticky=tk.E)
+        ttk.Button(button_frame, text=self.get_text('cancel'), command=export_window.destroy).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text=self.get_text('raw_export_start'), command=on_export).pack(side=tk.RIGHT, padx=5)
+    
+    def poll_raw_data_export(self, export_state):
+        """
+        轮询后台原始数据导出进度，在状态栏显示进度并在完成后提示结果
+        :param export_state: 后台导出线程写入的状态字典
+        """
+        if not export_state['done']:
+            self.data_status_label.config(text=self.get_text('raw_export_running').format(
+                export_state['table'], export_state['rows']))
+            self.root.after(200, lambda: self.poll_raw_data_export(export_state))
+            return
+        
+        # 恢复状态栏文本
+        self.data_status_label.config(text=f"{self.get_text('data_status')}: {self.get_text('normal')}")
+        
+        manifest = export_state['manifest']
+        if manifest:
+            summary = "\n".join(f"{item['file']}: {item['rows']}" for item in manifest['tables'])
+            messagebox.showinfo(self.get_text('success'),
+                                self.get_text('raw_export_success').format(export_state['output_dir'], summary))
+        else:
+            messagebox.showerror(self.get_text('error'), self.get_text('raw_export_fail').format(export_state['error']))
+    
     def open_data_restore(self):
         """
         打开数据恢复界面
@@ -986,10 +933,10 @@ class MainWindow:
             messagebox.showwarning(self.get_text('warning'), self.get_text('system_no_backup_dir'))
             return
         
-        # 获取备份文件列表
-        backup_files = BackupUtils.get_backup_list(backup_dir)
+        # 从备份仓库的清单获取快照列表
+        snapshots = BackupStore(backup_dir).list_snapshots()
         
-        if not backup_files:
+        if not snapshots:
             messagebox.showwarning(self.get_text('warning'), self.get_text('system_no_backup_files'))
             return
         
@@ -1000,11 +947,11 @@ class MainWindow:
         # 动态计算窗口高度：根据备份文件数量调整
         # 基础高度 + 列表高度（每行22像素） + 分隔线高度 + 按钮区域高度
         base_height = 150  # 基础高度（标题、标签、边距等）
-        list_height = min(len(backup_files), 15) * 22  # 列表高度，最多15行
+        list_height = min(len(snapshots), 15) * 22  # 列表高度，最多15行
         separator_height = 10  # 分隔线高度
         button_height = 50  # 按钮区域高度（包含边距）
         window_height = base_height + list_height + separator_height + button_height
-        restore_window.geometry(f"500x{window_height}")
+        restore_window.geometry(f"600x{window_height}")
         
         # 允许窗口调整大小
         restore_window.resizable(True, True)
@@ -1017,16 +964,22 @@ class MainWindow:
         list_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
         
         # 创建列表控件：根据文件数量动态调整高度，最多显示15行
-        columns = ("filename", "date")
-        tree_height = min(len(backup_files), 15)
+        columns = ("snapshot_id", "date", "source", "size")
+        tree_height = min(len(snapshots), 15)
         tree = ttk.Treeview(list_frame, columns=columns, show="headings", height=tree_height)
         
         # 设置列标题和宽度
-        tree.heading("filename", text=self.get_text('filename'))
-        tree.column("filename", width=200, anchor="w")
+        tree.heading("snapshot_id", text=self.get_text('snapshot_id'))
+        tree.column("snapshot_id", width=140, anchor="w")
         
         tree.heading("date", text=self.get_text('backup_date'))
-        tree.column("date", width=200, anchor="w")
+        tree.column("date", width=150, anchor="w")
+        
+        tree.heading("source", text=self.get_text('snapshot_source'))
+        tree.column("source", width=180, anchor="w")
+        
+        tree.heading("size", text=self.get_text('snapshot_size'))
+        tree.column("size", width=80, anchor="e")
         
         # 添加滚动条
         scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=tree.yview)
@@ -1035,16 +988,11 @@ class MainWindow:
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # 填充备份文件列表
-        for backup_file in backup_files:
-            # 获取备份日期
-            backup_datetime = BackupUtils.get_backup_info(backup_file)
-            if backup_datetime:
-                backup_date_str = backup_datetime.strftime("%Y-%m-%d %H:%M:%S")
-            else:
-                backup_date_str = self.get_text('unknown_date')
-            
-            tree.insert("", tk.END, values=(backup_file, backup_date_str))
+        # 填充快照列表
+        for manifest in snapshots:
+            backup_date_str = manifest.get('created') or self.get_text('unknown_date')
+            size_str = f"{manifest.get('size', 0) / 1024 / 1024:.2f}"
+            tree.insert("", tk.END, values=(manifest['id'], backup_date_str, manifest.get('source', ''), size_str))
         
         # 恢复按钮
         def on_restore():
@@ -1056,18 +1004,17 @@ class MainWindow:
                 messagebox.showwarning(self.get_text('warning'), self.get_text('system_select_backup_file'))
                 return
             
-            # 获取选中的备份文件名
+            # 获取选中的快照ID
             item_id = selected_items[0]
             values = tree.item(item_id, "values")
-            backup_filename = values[0]
+            snapshot_id = values[0]
             
             # 确认恢复
-            if messagebox.askyesno(self.get_text('system_confirm_delete'), self.get_text('system_confirm_restore').format(backup_filename)):
-                # 执行恢复
-                backup_path = os.path.join(backup_dir, backup_filename)
+            if messagebox.askyesno(self.get_text('system_confirm_delete'), self.get_text('system_confirm_restore').format(snapshot_id)):
+                # 执行恢复：校验快照数据块，关闭数据库连接后原子替换数据库文件
                 db_path = os.path.join(os.getcwd(), "water_electricity.db")
                 
-                if BackupUtils.restore_database(backup_path, db_path):
+                if BackupUtils.restore_snapshot(snapshot_id, db_path, backup_dir):
                     messagebox.showinfo(self.get_text('success'), self.get_text('system_restore_success'))
                     restore_window.destroy()
                 else:
@@ -1271,6 +1218,7 @@ class MainWindow:
         # 创建帮助文档窗口
         help_window = tk.Toplevel(self.root)
         help_window.title(self.get_text('menu_help'))
+        self.language_utils.bind_callback(help_window, lambda get_text: help_window.title(get_text('menu_help')), 'title')
         help_window.geometry("850x600")
         help_window.minsize(650, 500)
         
@@ -1283,28 +1231,41 @@ class MainWindow:
         
         # 帮助文档选项卡
         doc_frame = ttk.Frame(notebook)
-        notebook.add(doc_frame, text=self.get_text('menu_help'))
-        
-        # 添加帮助文档内容
-        self.create_help_documentation(doc_frame)
+        notebook.add(doc_frame)
         
         # 技术支持选项卡
         support_frame = ttk.Frame(notebook)
-        notebook.add(support_frame, text=self.get_text('technical_support'))
-        
-        # 添加技术支持内容
-        self.create_technical_support(support_frame)
+        notebook.add(support_frame)
         
         # 关于系统选项卡
         about_frame = ttk.Frame(notebook)
-        notebook.add(about_frame, text=self.get_text('system_about_title'))
-        
-        # 添加关于系统内容
-        self.create_about_system(about_frame)
+        notebook.add(about_frame)
         
-        # 存储帮助窗口引用，以便语言切换时更新
-        self.help_window = help_window
-        self.help_notebook = notebook
+        # 标签页标题和内容登记到语言绑定表，帮助窗口关闭后绑定自动失效
+        tab_contents = [
+            (doc_frame, 'menu_help', self.create_help_documentation),
+            (support_frame, 'technical_support', self.create_technical_support),
+            (about_frame, 'system_about_title', self.create_about_system),
+        ]
+        for tab_frame, title_key, create_content in tab_contents:
+            self.language_utils.bind_tab(notebook, tab_frame, title_key)
+            create_content(tab_frame)
+            self.language_utils.bind_callback(
+                tab_frame,
+                lambda _get_text, frame=tab_frame, create=create_content: self._rebuild_help_tab(frame, create),
+                'content'
+            )
+    
+    def _rebuild_help_tab(self, tab_frame, create_content):
+        """
+        按当前语言重建帮助窗口选项卡的内容
+        帮助文档为大段静态文本，直接重建比逐个绑定控件更简单
+        :param tab_frame: 选项卡Frame
+        :param create_content: 内容创建方法
+        """
+        for widget in tab_frame.winfo_children():
+            widget.destroy()
+        create_content(tab_frame)
     
     def get_dynamic_system_title(self):
         """
@@ -1613,9 +1574,9 @@ class MainWindow:
             import sqlite3
             
             db_path = os.path.join(os.getcwd(), "water_electricity.db")
-            backup_path = BackupUtils.backup_database(db_path)
+            snapshot = BackupUtils.create_snapshot(db_path)
             
-            if not backup_path:
+            if not snapshot:
                 if not messagebox.askyesno(self.get_text('warning'), self.get_text('system_backup_fail_continue')):
                     return
             
@@ -1682,11 +1643,30 @@ class MainWindow:
         except Exception as e:
             messagebox.showerror(self.get_text('error'), self.get_text('system_init_fail').format(str(e)))
     
+    def start_ingest_server(self):
+        """
+        系统设置中启用时，在后台启动抄表数据接收服务
+        """
+        settings = SettingsUtils()
+        if not settings.get_boolean_setting('ingest', 'enabled', False):
+            return
+        
+        from utils.reading_server import ReadingIngestServer
+        try:
+            self.ingest_server = ReadingIngestServer.from_settings(settings)
+            host, port = self.ingest_server.start()
+            print(f"抄表数据接收服务已启动: http://{host}:{port}/readings")
+        except OSError as e:
+            self.ingest_server = None
+            print(f"抄表数据接收服务启动失败: {str(e)}")
+    
     def quit_app(self):
         """
         退出应用程序
         """
         if messagebox.askyesno(self.get_text('system_confirm_delete'), self.get_text('system_confirm_exit')):
+            if self.ingest_server:
+                self.ingest_server.stop()
             self.root.quit()
     
     def relogin(self):
@@ -1799,18 +1779,8 @@ class MainWindow:
         窗口大小改变事件处理
         :param _event: 事件对象（未使用）
         """
-        # 获取窗口宽度
-        window_width = self.root.winfo_width()
-        
-        # 根据窗口宽度调整按钮大小
-        if window_width < 800:
-            # 小屏幕设备，缩小按钮宽度
-            style = ttk.Style()
-            style.configure(".TButton", width=10)
-        else:
-            # 大屏幕设备，恢复正常按钮宽度
-            style = ttk.Style()
-            style.configure(".TButton", width=12)
+        # 根据窗口宽度调整按钮大小，宽度档位不变时不重新配置样式
+        get_style_registry().apply_window_width(self.root.winfo_width(), self.root)
     
     def load_tenant_prices(self):
         """
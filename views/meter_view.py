@@ -11,10 +11,10 @@ from tkinter import messagebox
 from tkinter import filedialog
 from models.tenant import Tenant
 from models.meter import Meter
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, Alignment
+from openpyxl import load_workbook
 import datetime
 from utils.language_utils import LanguageUtils
+from utils.excel_writer import ExcelExportWriter
 
 class MeterView:
     """水电表管理视图类"""
@@ -761,60 +761,18 @@ class MeterView:
             self.parent.config(cursor="wait")
             self.parent.update()
             
-            # 创建Excel工作簿
-            wb = Workbook()
-            ws = wb.active
-            ws.title = f"{self.get_text('meter_information')}"
+            # 获取当前筛选条件
+            filters = {
+                'meter_type': self.search_meter_type.get(),
+                'meter_no': self.search_meter_no.get(),
+            }
             
-            # 设置表头
+            # 流式写入Excel，数据行直接从数据库游标读取
+            writer = ExcelExportWriter()
+            sheet = writer.create_sheet(f"{self.get_text('meter_information')}")
             headers = [f"{self.get_text('meter_id')}", f"{self.get_text('meter_no')}", f"{self.get_text('meter_type')}", f"{self.get_text('tenant_name')}", f"{self.get_text('location')}", f"{self.get_text('initial_reading')}", f"{self.get_text('status')}", f"{self.get_text('create_time')}"]
-            ws.append(headers)
-            
-            # 设置表头样式
-            for col in ws.columns:
-                max_length = 0
-                column = col[0].column_letter  # 获取列字母
-                # 设置表头字体和对齐方式
-                ws[column + "1"].font = Font(bold=True, size=12)
-                ws[column + "1"].alignment = Alignment(horizontal="center")
-                # 计算列宽
-                for cell in col:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(cell.value)
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)  # 限制最大宽度为50
-                ws.column_dimensions[column].width = adjusted_width
-            
-            # 获取当前筛选条件下的水电表列表
-            meter_no = self.search_meter_no.get()
-            meter_type = self.search_meter_type.get()
-            filters = {}
-            if meter_type:
-                filters['meter_type'] = meter_type
-            meter_list = Meter.get_all(filters)
-            
-            # 创建租户ID到名称的映射
-            tenants = Tenant.get_all()
-            tenant_map = {t.id: t.name for t in tenants}
-            
-            # 写入数据
-            for meter in meter_list:
-                # 如果指定了表编号，进行过滤
-                if meter_no and meter_no not in meter.meter_no:
-                    continue
-                    
-                ws.append([
-                    meter.id,
-                    meter.meter_no,
-                    meter.meter_type,
-                    tenant_map.get(meter.tenant_id, "未知租户"),
-                    meter.location,
-                    meter.initial_reading,
-                    meter.status,
-                    meter.create_time if meter.create_time else ""
-                ])
+            sheet.append(headers, "header")
+            sheet.stream(Meter.iter_export_rows(filters))
             
             # 保存文件
             default_filename = f"水电表信息_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.xlsx"
@@ -825,7 +783,7 @@ class MeterView:
             )
             
             if file_path:
-                wb.save(file_path)
+                writer.save(file_path)
                 messagebox.showinfo(self.get_text('success'), f"{self.get_text('export_meter_success').format(file_path)}")
         except Exception as e:
             messagebox.showerror(self.get_text('error'), f"{self.get_text('export_meter_fail').format(str(e))}")
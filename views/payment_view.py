@@ -19,6 +19,8 @@ from models.payment import Payment
 from models.meter import Meter
 from models.reading import MeterReading
 from models.settlement import Settlement
+from database import query_stats
+from utils import pdf_render
 
 class PaymentView:
     """收费管理视图类"""
@@ -65,6 +67,9 @@ class PaymentView:
         self.action_buttons['query_arrears_btn']['text'] = self.get_text('query_arrears')
         self.action_buttons['delete_payment_btn']['text'] = self.get_text('delete_payment')
         self.action_buttons['generate_receipt_btn']['text'] = self.get_text('generate_payment_receipt')
+        self.action_buttons['lump_sum_btn']['text'] = self.get_text('lump_sum_payment')
+        self.action_buttons['import_statement_btn']['text'] = self.get_text('import_bank_statement')
+        self.action_buttons['generate_bills_btn']['text'] = self.get_text('generate_month_bills')
         
         # 更新列表列标题
         self.payment_tree.heading("serial", text=self.get_text('serial'))
@@ -179,6 +184,18 @@ class PaymentView:
         self.action_buttons['generate_receipt_btn'] = ttk.Button(action_frame, text=self.get_text('generate_payment_receipt'), command=self.generate_payment_receipt)
         self.action_buttons['generate_receipt_btn'].pack(side=tk.LEFT, padx=5)
         
+        # 一次性收费按钮
+        self.action_buttons['lump_sum_btn'] = ttk.Button(action_frame, text=self.get_text('lump_sum_payment'), command=self.open_lump_sum_dialog)
+        self.action_buttons['lump_sum_btn'].pack(side=tk.LEFT, padx=5)
+        
+        # 导入银行流水按钮
+        self.action_buttons['import_statement_btn'] = ttk.Button(action_frame, text=self.get_text('import_bank_statement'), command=self.import_bank_statement)
+        self.action_buttons['import_statement_btn'].pack(side=tk.LEFT, padx=5)
+        
+        # 批量生成账单按钮
+        self.action_buttons['generate_bills_btn'] = ttk.Button(action_frame, text=self.get_text('generate_month_bills'), command=self.open_bill_generation_dialog)
+        self.action_buttons['generate_bills_btn'].pack(side=tk.LEFT, padx=5)
+        
         # 中部：收费记录列表
         list_frame = ttk.Frame(main_frame)
         list_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -683,14 +700,8 @@ class PaymentView:
         
         if messagebox.askyesno(self.get_text('confirm_delete'), f"{self.get_text('confirm_delete_this_payment_record')}?\n{self.get_text('this_operation_cannot_be_undone')}"):
             try:
-                # 获取要删除的收费记录的费用ID
-                charge_id = self.selected_payment.charge_id
-                
-                # 删除收费记录
+                # 删除收费记录，费用状态由数据库在同一事务内更新
                 if self.selected_payment.delete():
-                    # 删除成功后，更新相关费用记录的状态
-                    self.update_charge_status(charge_id=charge_id)
-                    
                     messagebox.showinfo(self.get_text('success'), self.get_text('payment_record_deleted_successfully_status_updated'))
                     self.load_payment_list()
                     self.clear_form()
@@ -773,10 +784,8 @@ class PaymentView:
             self.selected_payment.payer = payer
             self.selected_payment.notes = notes
             
+            # 费用状态由数据库在保存收费记录的同一事务内更新
             if self.selected_payment.save():
-                # 保存成功后，更新费用记录状态
-                self.update_charge_status(tenant, month, amount)
-                
                 messagebox.showinfo(self.get_text('success'), self.get_text('payment_record_updated_successfully'))
                 self.load_payment_list()
                 
@@ -796,10 +805,8 @@ class PaymentView:
                 notes=notes
             )
             
+            # 费用状态由数据库在保存收费记录的同一事务内更新
             if payment.save():
-                # 保存成功后，更新费用记录状态
-                self.update_charge_status(tenant, month, amount)
-                
                 messagebox.showinfo(self.get_text('success'), self.get_text('payment_record_added_successfully'))
                 self.load_payment_list()
                 self.clear_form()
@@ -963,72 +970,6 @@ class PaymentView:
             except:
                 pass
 
-    def calculate_total_paid(self, charge_id):
-        """
-        计算指定费用记录的总缴费金额
-        :param charge_id: 费用记录ID
-        :return: 总缴费金额
-        """
-        try:
-            # 获取该费用记录的所有缴费记录
-            payments = Payment.get_by_charge(charge_id)
-            # 计算总缴费金额
-            total_paid = sum(payment.amount for payment in payments)
-            return total_paid
-        except Exception as e:
-            messagebox.showerror("错误", f"计算总缴费金额失败: {str(e)}")
-            return 0
-
-    def update_charge_status(self, tenant=None, month=None, amount=None, charge_id=None):
-        """
-        根据收费金额或总缴费金额更新费用记录状态
-        :param tenant: 租户对象（用于保存收费时）
-        :param month: 费用月份（用于保存收费时）
-        :param amount: 收费金额（用于保存收费时）
-        :param charge_id: 费用记录ID（用于删除收费时）
-        """
-        try:
-            charges = []
-            
-            if charge_id:
-                # 通过费用ID获取特定费用记录
-                charge = Charge.get_by_id(charge_id)
-                if charge:
-                    charges = [charge]
-            elif tenant and month:
-                # 查询该租户该月份的费用记录
-                tenant_charges = Charge.get_by_tenant(tenant.id)
-                charges = [c for c in tenant_charges if c.month == month]
-            else:
-                return
-            
-            for charge in charges:
-                if amount is not None:
-                    # 保存收费时，根据当前收费金额更新状态
-                    if amount >= charge.total_charge:
-                        # 全额缴纳或超额缴纳，状态更新为"已缴"
-                        charge.status = self.get_text('paid')
-                    else:
-                        # 部分缴纳，状态更新为"部分缴纳"
-                        charge.status = self.get_text('partially_paid')
-                else:
-                    # 删除收费时，根据总缴费金额更新状态
-                    total_paid = self.calculate_total_paid(charge.id)
-                    if total_paid == 0:
-                        # 未缴纳，状态更新为"未缴"
-                        charge.status = self.get_text('unpaid')
-                    elif total_paid >= charge.total_charge:
-                        # 全额缴纳或超额缴纳，状态更新为"已缴"
-                        charge.status = self.get_text('paid')
-                    else:
-                        # 部分缴纳，状态更新为"部分缴纳"
-                        charge.status = self.get_text('partially_paid')
-                
-                # 保存费用记录状态更新
-                charge.save()
-        except Exception as e:
-            messagebox.showerror("错误", f"更新费用状态失败: {str(e)}")
-    
     def load_charge_months(self, tenant_id):
         """
         加载指定租户的费用月份
@@ -1073,61 +1014,14 @@ class PaymentView:
             self.form_month['values'] = []
             self.form_month.set("")
     
+    @query_stats.scoped('PaymentView.query_arrears')
     def query_arrears(self):
         """
         查询欠费信息
         显示所有欠费租户的信息，包括欠费金额和欠费月份
         """
-        # 获取所有费用记录
-        all_charges = Charge.get_all()
-        
-        # 创建租户ID到名称的映射
-        tenants = Tenant.get_all()
-        tenant_map = {t.id: t.name for t in tenants}
-        
-        # 创建费用ID到已收金额的映射
-        payments = Payment.get_all()
-        payment_map = {}
-        for payment in payments:
-            if payment.charge_id not in payment_map:
-                payment_map[payment.charge_id] = 0
-            payment_map[payment.charge_id] += payment.amount
-        
-        # 计算欠费信息并更新状态
-        arrears_list = []
-        for charge in all_charges:
-            # 计算已收金额
-            received = payment_map.get(charge.id, 0)
-            
-            # 计算欠费金额
-            arrears = charge.total_charge - received
-            
-            # 更新费用记录状态，确保状态与实际欠费情况一致
-            new_status = charge.status
-            if arrears == 0:
-                new_status = self.get_text('paid')
-            elif received > 0:
-                new_status = self.get_text('partially_paid')
-            else:
-                new_status = self.get_text('unpaid')
-            
-            # 如果状态发生变化，更新数据库
-            if charge.status != new_status:
-                charge.status = new_status
-                charge.save()
-            
-            # 只有欠费金额大于0的记录才会显示在欠费列表中
-            if arrears > 0:
-                # 添加到欠费列表
-                arrears_list.append({
-                    "tenant_id": charge.tenant_id,
-                    "tenant_name": tenant_map.get(charge.tenant_id, "未知租户"),
-                    "month": charge.month,
-                    "total_charge": charge.total_charge,
-                    "received": received,
-                    "arrears": arrears,
-                    "status": charge.status
-                })
+        # 查询欠费信息，状态已由数据库维护
+        arrears_list = Payment.get_arrears(self.get_text)
         
         # 创建欠费查询结果窗口
         arrears_window = tk.Toplevel(self.parent)
@@ -1256,8 +1150,9 @@ class PaymentView:
             messagebox.showwarning(self.get_text('warning'), self.get_text('please_select_records_to_import'))
             return
         
-        # 导入选中的记录
-        imported_count = 0
+        # 按欠费金额生成收费记录，一次提交
+        payment_date = datetime.now().strftime("%Y-%m-%d")
+        payments = []
         for item_id in selected_items:
             # 获取选中行的索引
             index = tree.index(item_id)
@@ -1265,33 +1160,18 @@ class PaymentView:
             if index >= len(arrears_list):
                 continue
             
-            # 获取对应的欠费记录
             arrears = arrears_list[index]
-            
-            # 获取租户对象
-            tenant = next((t for t in Tenant.get_all() if t.name == arrears["tenant_name"]), None)
-            if not tenant:
-                continue
-            
-            # 获取费用对象
-            charge = next((c for c in Charge.get_by_tenant(tenant.id) if c.month == arrears["month"]), None)
-            if not charge:
-                continue
-            
-            # 创建Payment对象并保存到数据库
-            payment = Payment(
-                charge_id=charge.id,
-                payment_date=datetime.now().strftime("%Y-%m-%d"),
+            payments.append(Payment(
+                charge_id=arrears["charge_id"],
+                payment_date=payment_date,
                 amount=arrears["arrears"],
                 payment_method="现金",
                 payer="admin",
                 notes=""
-            )
-            
-            if payment.save():
-                # 更新费用记录状态
-                self.update_charge_status(tenant=tenant, month=arrears["month"], amount=arrears["arrears"])
-                imported_count += 1
+            ))
+        
+        results = Payment.post_batch(payments)
+        imported_count = sum(1 for result in results if result['success'])
         
         # 显示导入结果
         if imported_count > 0:
@@ -1308,6 +1188,242 @@ class PaymentView:
         else:
             messagebox.showwarning("警告", "未导入任何记录")
     
+    def open_lump_sum_dialog(self):
+        """
+        打开一次性收费窗口
+        租户一次交来多个月的费用时，按月份从早到晚分摊到未结清的费用上，可先预览分摊结果再确认
+        """
+        dialog = tk.Toplevel(self.parent)
+        dialog.title(self.get_text('lump_sum_payment'))
+        dialog.geometry("520x420")
+        
+        form_frame = ttk.Frame(dialog)
+        form_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=10)
+        
+        tenants = Tenant.get_all()
+        tenant_id_map = {t.name: t.id for t in tenants}
+        tenant_var = tk.StringVar()
+        amount_var = tk.StringVar()
+        date_var = tk.StringVar(value=datetime.now().strftime("%Y-%m-%d"))
+        method_var = tk.StringVar(value="银行转账")
+        payer_var = tk.StringVar()
+        
+        fields = [
+            ('tenant', ttk.Combobox(form_frame, textvariable=tenant_var, values=list(tenant_id_map), state="readonly", width=25)),
+            ('amount', ttk.Entry(form_frame, textvariable=amount_var, width=27)),
+            ('payment_date', ttk.Entry(form_frame, textvariable=date_var, width=27)),
+            ('payment_method', ttk.Combobox(form_frame, textvariable=method_var, values=["现金", "银行转账", "微信", "支付宝"], width=25)),
+            ('payer', ttk.Entry(form_frame, textvariable=payer_var, width=27)),
+        ]
+        for row, (key, widget) in enumerate(fields):
+            ttk.Label(form_frame, text=self.get_text(key) + ':').grid(row=row, column=0, sticky=tk.W, padx=5, pady=3)
+            widget.grid(row=row, column=1, sticky=tk.W, padx=5, pady=3)
+        ttk.Label(form_frame, text=self.get_text('lump_sum_hint'), foreground="gray").grid(
+            row=len(fields), column=0, columnspan=2, sticky=tk.W, padx=5, pady=3)
+        
+        # 分摊结果
+        columns = ("month", "amount")
+        tree = ttk.Treeview(dialog, columns=columns, show="headings", height=8)
+        tree.heading("month", text=self.get_text('month'))
+        tree.column("month", width=150, anchor="center")
+        tree.heading("amount", text=self.get_text('amount'))
+        tree.column("amount", width=150, anchor="e")
+        tree.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        message_label = ttk.Label(dialog, foreground="blue")
+        message_label.pack(side=tk.TOP, fill=tk.X, padx=10)
+        
+        def run(dry_run):
+            tenant_id = tenant_id_map.get(tenant_var.get())
+            if not tenant_id:
+                messagebox.showwarning(self.get_text('warning'), self.get_text('please_select_tenant'), parent=dialog)
+                return
+            try:
+                amount = float(amount_var.get())
+            except ValueError:
+                messagebox.showwarning(self.get_text('warning'), self.get_text('amount_must_be_number'), parent=dialog)
+                return
+            if amount <= 0:
+                messagebox.showwarning(self.get_text('warning'), self.get_text('amount_must_be_greater_than_zero'), parent=dialog)
+                return
+            if not payer_var.get().strip() and not dry_run:
+                messagebox.showwarning(self.get_text('warning'), self.get_text('please_enter_payer'), parent=dialog)
+                return
+            
+            result = Payment.allocate(tenant_id, amount, date_var.get().strip(), method_var.get().strip(),
+                                      payer_var.get().strip(), self.get_text('lump_sum_payment'), dry_run)
+            tree.delete(*tree.get_children())
+            for allocation in result['allocations']:
+                tree.insert("", tk.END, values=(allocation['month'], f"{allocation['amount']:.2f}"))
+            
+            if not result['allocations']:
+                message_label.config(text=self.get_text('lump_sum_no_open_charges'))
+                return
+            message = self.get_text('lump_sum_unallocated').format(result['unallocated']) if result['unallocated'] > 0 else ""
+            message_label.config(text=message)
+            if dry_run:
+                return
+            if not result['success']:
+                messagebox.showerror(self.get_text('error'), f"{self.get_text('lump_sum_fail')}: {result['message']}", parent=dialog)
+                return
+            
+            messagebox.showinfo(self.get_text('success'), self.get_text('lump_sum_completed').format(
+                len(result['allocations']), result['allocated']) + (f"\n{message}" if message else ""), parent=dialog)
+            self.load_payment_list()
+            if self.main_window:
+                self.main_window.refresh_view("charge")
+            dialog.destroy()
+        
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=10)
+        ttk.Button(button_frame, text=self.get_text('button_cancel'), command=dialog.destroy).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text=self.get_text('lump_sum_confirm'), command=lambda: run(False)).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text=self.get_text('lump_sum_preview'), command=lambda: run(True)).pack(side=tk.RIGHT, padx=5)
+    
+    def import_bank_statement(self):
+        """
+        导入银行流水文件，每行一笔款项，按月份从早到晚分摊到对应租户未结清的费用上，全部收费记录一次写入
+        """
+        from utils import payment_allocation
+        
+        file_path = filedialog.askopenfilename(
+            title=self.get_text('import_bank_statement'),
+            filetypes=[("Excel/CSV", "*.xlsx *.xls *.csv")]
+        )
+        if not file_path:
+            return
+        
+        try:
+            result = payment_allocation.allocate_statement(file_path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror(self.get_text('error'), f"{self.get_text('lump_sum_fail')}: {str(e)}")
+            return
+        
+        reasons = list(result['failed_reasons'])
+        allocated_count = 0
+        allocated_amount = 0.0
+        for lump_sum, item in zip(result['lump_sums'], result['results']):
+            if item['success']:
+                allocated_count += 1
+                allocated_amount += item['allocated']
+            if item['message']:
+                reasons.append(f"第{lump_sum['line']}行 {lump_sum['tenant_name']}: {item['message']}")
+        failed_count = len(result['failed_reasons']) + len(result['results']) - allocated_count
+        
+        message = self.get_text('bank_statement_completed').format(
+            result['rows'], allocated_count, allocated_amount, failed_count)
+        if reasons:
+            message += "\n\n" + "\n".join(reasons[:20])
+            if len(reasons) > 20:
+                message += "\n..."
+        messagebox.showinfo(self.get_text('import_bank_statement'), message)
+        
+        if allocated_count:
+            self.load_payment_list()
+            if self.main_window:
+                self.main_window.refresh_view("charge")
+    
+    def open_bill_generation_dialog(self):
+        """
+        打开批量生成账单窗口
+        为指定月份所有租户生成缴费通知单，在后台执行并显示进度，可随时取消
+        """
+        import threading
+        from utils import bill_generation
+        
+        dialog = tk.Toplevel(self.parent)
+        dialog.title(self.get_text('generate_month_bills'))
+        dialog.resizable(False, False)
+        
+        form_frame = ttk.Frame(dialog, padding=15)
+        form_frame.pack(fill=tk.BOTH, expand=True)
+        
+        month_var = tk.StringVar(value=self.month_var.get())
+        merged_var = tk.BooleanVar(value=False)
+        ttk.Label(form_frame, text=self.get_text('month') + ':').grid(row=0, column=0, sticky=tk.W, pady=5)
+        month_entry = ttk.Entry(form_frame, textvariable=month_var, width=12)
+        month_entry.grid(row=0, column=1, sticky=tk.W, pady=5)
+        merged_check = ttk.Checkbutton(form_frame, text=self.get_text('bills_merge_into_one'), variable=merged_var)
+        merged_check.grid(row=1, column=0, columnspan=2, sticky=tk.W, pady=5)
+        
+        progress_bar = ttk.Progressbar(form_frame, orient=tk.HORIZONTAL, length=320, mode="determinate")
+        progress_bar.grid(row=2, column=0, columnspan=2, sticky=tk.EW, pady=5)
+        status_label = ttk.Label(form_frame, text="")
+        status_label.grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=5)
+        
+        button_frame = ttk.Frame(form_frame)
+        button_frame.grid(row=4, column=0, columnspan=2, sticky=tk.E)
+        
+        # 后台线程只写入状态，界面由主线程轮询更新
+        state = {'done': 0, 'total': 0, 'result': None, 'finished': False}
+        cancel_event = threading.Event()
+        
+        def on_close():
+            # 生成中关闭窗口视为取消，已开始的任务完成后结束
+            cancel_event.set()
+            dialog.destroy()
+        
+        def poll():
+            if not dialog.winfo_exists():
+                return
+            if state['total']:
+                progress_bar['maximum'] = state['total']
+                progress_bar['value'] = state['done']
+                status_label.config(text=self.get_text('bills_generating').format(state['done'], state['total']))
+            if not state['finished']:
+                dialog.after(200, poll)
+                return
+            
+            result = state['result']
+            cancel_button.config(text=self.get_text('close'), command=dialog.destroy)
+            if result['errors']:
+                messagebox.showerror(self.get_text('error'), self.get_text('bills_generate_fail').format(
+                    "\n".join(result['errors'][:5])), parent=dialog)
+            elif result['total'] == 0:
+                messagebox.showwarning(self.get_text('warning'), self.get_text('bills_no_charges'), parent=dialog)
+            elif result['cancelled']:
+                messagebox.showinfo(self.get_text('info'), self.get_text('bills_generate_cancelled').format(
+                    result['done'], result['total']), parent=dialog)
+            else:
+                messagebox.showinfo(self.get_text('success'), self.get_text('bills_generate_success').format(
+                    result['done'], state['output_dir']), parent=dialog)
+        
+        def on_start():
+            month = month_var.get().strip()
+            try:
+                datetime.strptime(month, "%Y-%m")
+            except ValueError:
+                messagebox.showerror(self.get_text('error'), self.get_text('month_format_yyyy_mm'), parent=dialog)
+                return
+            output_dir = filedialog.askdirectory(parent=dialog, title=self.get_text('generate_month_bills'))
+            if not output_dir:
+                return
+            state['output_dir'] = output_dir = os.path.join(output_dir, f"账单_{month}")
+            
+            month_entry.config(state=tk.DISABLED)
+            merged_check.config(state=tk.DISABLED)
+            start_button.config(state=tk.DISABLED)
+            cancel_button.config(command=lambda: (cancel_event.set(), cancel_button.config(state=tk.DISABLED)))
+            dialog.protocol("WM_DELETE_WINDOW", on_close)
+            status_label.config(text=self.get_text('bills_loading'))
+            
+            def on_progress(done, total):
+                state['done'] = done
+                state['total'] = total
+            
+            def on_complete(result):
+                state['result'] = result
+                state['finished'] = True
+            
+            bill_generation.generate_bills_async(month, output_dir, merged_var.get(), on_complete, on_progress,
+                                                 cancel_event)
+            poll()
+        
+        cancel_button = ttk.Button(button_frame, text=self.get_text('button_cancel'), command=dialog.destroy)
+        cancel_button.pack(side=tk.RIGHT, padx=5)
+        start_button = ttk.Button(button_frame, text=self.get_text('bills_generate_start'), command=on_start)
+        start_button.pack(side=tk.RIGHT, padx=5)
+    
     def generate_payment_receipt(self):
         """
         生成收费凭证
@@ -1348,13 +1464,7 @@ class PaymentView:
             messagebox.showerror("错误", "未找到关联的租户信息")
             return
         
-        # 1. 解决中文乱码问题：设置支持中文的字体
-        # 导入reportlab的字体注册模块
-        from reportlab.lib.units import mm
-        from reportlab.pdfbase import pdfmetrics
-        from reportlab.pdfbase.ttfonts import TTFont
-        import os
-        
+        # 1. 中文字体由pdf_render模块统一查找和注册
         # 2. 自动生成文件名：租户名称+月份+时间戳
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         filename = f"收费凭证_{tenant.name}_{charge.month.replace('-', '')}_{timestamp}.pdf"
@@ -1366,54 +1476,65 @@ class PaymentView:
         file_path = os.path.join(export_dir, filename)
         
         try:
-            # 注册中文黑体字体
-            pdfmetrics.registerFont(TTFont('SimHei', 'simhei.ttf'))
-            pdfmetrics.registerFont(TTFont('SimHei-Bold', 'simhei.ttf'))
+            # 中文字体在第一次生成PDF时注册，之后直接使用
+            font = pdf_render.get_chinese_font()
+            bold = pdf_render.bold_font(font)
             
             # 创建PDF文件
             c = canvas.Canvas(file_path, pagesize=A4)
             width, height = A4
             
-            # 4. 优化PDF文件的格式和样式
-            # 设置标题
-            c.setFont("SimHei-Bold", 16)
-            c.drawString(100, height - 50, "收费凭证")
+            # 收费凭证内容，标签在页面模板中绘制，这里只填写数据
+            now = datetime.now()
+            fields = [
+                ("租户名称", tenant.name),
+                ("租户类型", tenant.type),
+                ("费用月份", charge.month),
+                ("收费日期", payment.payment_date),
+                ("总费用", f"{charge.total_charge:.2f} 元"),
+                ("本次收费", f"{payment.amount:.2f} 元"),
+                ("支付方式", payment.payment_method),
+                ("收款人", payment.payer),
+                ("备注", payment.notes if payment.notes else '无'),
+            ]
+            footer_y = height - 100 - 25 * (len(fields) - 1) - 50
+            footer = [
+                ("生成时间", now.strftime('%Y-%m-%d %H:%M:%S')),
+                ("凭证编号", f"{payment.id}-{now.strftime('%Y%m%d%H%M%S')}"),
+            ]
             
-            # 画分隔线
-            c.line(50, height - 60, width - 50, height - 60)
+            def draw_furniture(c):
+                # 4. 优化PDF文件的格式和样式
+                # 设置标题
+                c.setFont(bold, 16)
+                c.drawString(100, height - 50, "收费凭证")
+                
+                # 画分隔线
+                c.line(50, height - 60, width - 50, height - 60)
+                
+                c.setFont(font, 12)
+                for i, (label, _) in enumerate(fields):
+                    c.drawString(100, height - 100 - 25 * i, f"{label}: ")
+                
+                # 画分隔线
+                c.line(50, footer_y, width - 50, footer_y)
+                
+                # 底部信息
+                c.setFont(font, 10)
+                c.drawString(100, footer_y - 25, "本凭证为电子凭证，与纸质凭证具有同等效力")
+                for i, (label, _) in enumerate(footer):
+                    c.drawString(100, footer_y - 45 - 20 * i, f"{label}: ")
             
-            # 设置内容字体
-            c.setFont("SimHei", 12)
+            # 凭证只有一页，模板直接绘制
+            pdf_render.PageTemplate("payment_receipt", draw_furniture, reuse=False).draw_on(c)
             
             # 填写收费凭证内容
-            y = height - 100
-            c.drawString(100, y, f"租户名称: {tenant.name}")
-            y -= 25
-            c.drawString(100, y, f"租户类型: {tenant.type}")
-            y -= 25
-            c.drawString(100, y, f"费用月份: {charge.month}")
-            y -= 25
-            c.drawString(100, y, f"收费日期: {payment.payment_date}")
-            y -= 25
-            c.drawString(100, y, f"总费用: {charge.total_charge:.2f} 元")
-            y -= 25
-            c.drawString(100, y, f"本次收费: {payment.amount:.2f} 元")
-            y -= 25
-            c.drawString(100, y, f"支付方式: {payment.payment_method}")
-            y -= 25
-            c.drawString(100, y, f"收款人: {payment.payer}")
-            y -= 25
-            c.drawString(100, y, f"备注: {payment.notes if payment.notes else '无'}")
-            
-            # 画分隔线
-            y -= 50
-            c.line(50, y, width - 50, y)
-            
-            # 填写底部信息
-            c.setFont("SimHei", 10)
-            c.drawString(100, y - 25, "本凭证为电子凭证，与纸质凭证具有同等效力")
-            c.drawString(100, y - 45, f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            c.drawString(100, y - 65, f"凭证编号: {payment.id}-{datetime.now().strftime('%Y%m%d%H%M%S')}")
+            c.setFont(font, 12)
+            for i, (label, value) in enumerate(fields):
+                c.drawString(100 + c.stringWidth(f"{label}: ", font, 12), height - 100 - 25 * i, str(value))
+            c.setFont(font, 10)
+            for i, (label, value) in enumerate(footer):
+                c.drawString(100 + c.stringWidth(f"{label}: ", font, 10), footer_y - 45 - 20 * i, value)
             
             # 保存PDF文件
             c.save()
@@ -1606,47 +1727,26 @@ class BatchPaymentDialog:
         self.loading_label.config(text="正在处理批量收费，请稍候...")
         self.top.update()
         
-        # 执行批量收费
-        success_count = 0
-        fail_count = 0
-        failed_records = []
-        
+        # 执行批量收费，全部收费记录在一个事务内写入
+        # 选中记录列表只包含有值的记录，与这些记录一一对应
+        rows = list(self.selected_tree.get_children())
+        payments = []
         try:
             for item_id in self.selected_items:
                 # 获取记录的值
                 values = self.parent.payment_tree.item(item_id, "values")
                 if values:
                     # 获取费用ID（从values中获取，假设ID在最后一列）
-                    charge_id = int(values[-1])
-                    
-                    # 创建新的收费记录
-                    payment = Payment(
-                        charge_id=charge_id,
+                    payments.append(Payment(
+                        charge_id=int(values[-1]),
                         payment_date=self.payment_date_var.get(),
                         amount=float(values[4]),
                         payment_method=self.payment_method_var.get(),
                         payer=self.payer_var.get(),
                         notes=self.notes_var.get()
-                    )
-                    
-                    # 保存收费记录
-                    if payment.save():
-                        success_count += 1
-                        # 更新费用状态
-                        charge = Charge.get_by_id(charge_id)
-                        if charge:
-                            # 计算总缴费金额
-                            total_paid = sum(p.amount for p in Payment.get_by_charge(charge_id))
-                            if total_paid >= charge.total_charge:
-                                charge.status = "已缴"
-                            elif total_paid > 0:
-                                charge.status = "部分缴纳"
-                            else:
-                                charge.status = "未缴"
-                            charge.save()
-                    else:
-                        fail_count += 1
-                        failed_records.append(values[1])  # 记录失败的租户名称
+                    ))
+            
+            results = Payment.post_batch(payments)
         except Exception as e:
             messagebox.showerror("错误", f"批量收费失败：{str(e)}")
             self.success = False
@@ -1657,8 +1757,18 @@ class BatchPaymentDialog:
             self.loading_label.config(text="")
             self.top.update()
         
+        # 在选中记录列表中显示每条记录的结果
+        failed_records = []
+        for row, result in zip(rows, results):
+            values = self.selected_tree.item(row, "values")
+            self.selected_tree.item(row, values=(values[0], values[1], values[2],
+                                                 "已收费" if result['success'] else result['message']))
+            if not result['success']:
+                failed_records.append(f"{values[0]} {values[1]}: {result['message']}")
+        success_count = len(results) - len(failed_records)
+        
         # 显示操作结果
-        result_message = f"批量收费完成！\n\n成功: {success_count} 条\n失败: {fail_count} 条"
+        result_message = f"批量收费完成！\n\n成功: {success_count} 条\n失败: {len(failed_records)} 条"
         if failed_records:
             result_message += f"\n\n失败的记录：\n" + "\n".join(failed_records)
         
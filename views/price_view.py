@@ -9,6 +9,7 @@ import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 from models.price import Price
+from utils import rebilling
 from utils.language_utils import LanguageUtils
 
 class PriceView:
@@ -24,6 +25,8 @@ class PriceView:
         self.language_utils = language_utils
         self.price_list = []
         self.selected_price = None
+        # 后台重新计算费用的线程
+        self.rebill_thread = None
         self.create_widgets()
         self.load_price_list()
         
@@ -536,12 +539,14 @@ class PriceView:
         if messagebox.askyesno(self.get_text('confirm_delete'), confirm_message):
             try:
                 # 执行删除操作
-                if self.selected_price.delete():
+                deleted_price = self.selected_price
+                if deleted_price.delete():
                     messagebox.showinfo(self.get_text('success'), f"{self.get_text('price')} {self.get_text('delete_success')}")
                     # 刷新列表
                     self.load_price_list()
                     # 清空表单
                     self.clear_form()
+                    self.offer_rebill(deleted_price)
                 else:
                     messagebox.showerror(self.get_text('error'), f"{self.get_text('price')} {self.get_text('delete_fail')} {self.get_text('database_error')}")
             except Exception as e:
@@ -610,6 +615,11 @@ class PriceView:
         try:
             # 保存价格信息
             if self.selected_price:
+                # 保留修改前的价格，用于确定需要重新计算的费用范围
+                old_price = Price(self.selected_price.id, self.selected_price.resource_type,
+                                  self.selected_price.tenant_type, self.selected_price.price,
+                                  self.selected_price.start_date, self.selected_price.end_date)
+                saved_price = self.selected_price
                 # 更新现有价格
                 self.selected_price.resource_type = resource_type
                 self.selected_price.tenant_type = tenant_type
@@ -621,6 +631,7 @@ class PriceView:
                     messagebox.showinfo(self.get_text('success'), f"{self.get_text('price')} {self.get_text('update_success')}")
                     self.load_price_list()
                     self.clear_form()
+                    self.offer_rebill(old_price, saved_price)
                 else:
                     messagebox.showerror(self.get_text('error'), f"{self.get_text('price')} {self.get_text('update_fail')} {self.get_text('database_error')}")
             else:
@@ -637,8 +648,55 @@ class PriceView:
                     messagebox.showinfo(self.get_text('success'), f"{self.get_text('price')} {self.get_text('add_success')}")
                     self.load_price_list()
                     self.clear_form()
+                    self.offer_rebill(new_price)
                 else:
                     messagebox.showerror(self.get_text('error'), f"{self.get_text('price')} {self.get_text('add_fail')} {self.get_text('database_error_or_duplicate')}")
         except Exception as e:
             # 添加错误处理，处理保存过程中可能出现的异常
-            messagebox.showerror(self.get_text('error'), f"{self.get_text('save_price_exception')}: {str(e)}")
\ No newline at end of file
+            messagebox.showerror(self.get_text('error'), f"{self.get_text('save_price_exception')}: {str(e)}")
+    
+    def offer_rebill(self, *prices):
+        """
+        价格变更后询问是否重新计算受影响的已有费用，确认后在后台执行
+        :param prices: 修改前后的价格对象
+        """
+        scope = rebilling.affected_scope(*prices)
+        if not scope:
+            return
+        
+        if self.rebill_thread and self.rebill_thread.is_alive():
+            messagebox.showinfo(self.get_text('info'), self.get_text('rebill_in_progress'))
+            return
+        
+        start_month, end_month, scopes = scope
+        if not messagebox.askyesno(self.get_text('rebill_title'), self.get_text('rebill_prompt').format(start_month, end_month)):
+            return
+        
+        # 回调只记录结果，界面由主线程轮询更新
+        rebill_state = {'done': False, 'result': None}
+        
+        def on_complete(result):
+            rebill_state['result'] = result
+            rebill_state['done'] = True
+        
+        self.rebill_thread = rebilling.rebill_async(start_month, end_month, scopes, on_complete)
+        self.poll_rebill(rebill_state)
+    
+    def poll_rebill(self, rebill_state):
+        """
+        轮询后台重新计算的结果，完成后提示
+        :param rebill_state: 后台线程写入的状态字典
+        """
+        if not rebill_state['done']:
+            self.parent.after(200, lambda: self.poll_rebill(rebill_state))
+            return
+        
+        result = rebill_state['result']
+        if result is None:
+            messagebox.showerror(self.get_text('error'), self.get_text('rebill_fail'))
+            return
+        
+        message = self.get_text('rebill_completed').format(result['charges'], result['changed'], result['report'])
+        if result['failed_months']:
+            message += "\n" + self.get_text('rebill_failed_months').format(', '.join(result['failed_months']))
+        messagebox.showinfo(self.get_text('success'), message)
@@ -10,15 +10,15 @@ from tkinter import ttk
 from tkinter import messagebox
 from tkinter import filedialog
 from datetime import datetime, timedelta
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, Alignment
-import xlrd
 import os
 from models.tenant import Tenant
 from models.meter import Meter
 from models.reading import MeterReading
 from models.charge import Charge
 from utils.language_utils import LanguageUtils
+from database import query_stats
+from utils import reading_import
+from utils.excel_writer import ExcelExportWriter
 
 class ReadingView:
     """抄表管理视图类"""
@@ -734,6 +734,37 @@ class ReadingView:
             # 更新字符数显示
             self.remark_length_label.configure(text=f"{len(current_text)}/200", foreground="gray" if len(current_text) < 200 else "red")
     
+    @classmethod
+    def fetch_charging_times(cls, readings):
+        """
+        批量获取抄表记录对应的计费时间（该租户该月费用记录的创建日期）
+        :param readings: 已关联水电表的抄表记录列表
+        :return: (租户ID, 月份) 到计费日期的字典
+        """
+        months = {cls.format_date(reading.reading_date)[0] for reading in readings}
+        
+        charging_times = {}
+        for charge in Charge.get_by_months(list(months)):
+            key = (charge.tenant_id, charge.month)
+            if key in charging_times or not charge.create_time:
+                continue
+            charging_times[key] = charge.create_time.split(' ')[0] if ' ' in charge.create_time else charge.create_time
+        return charging_times
+    
+    @classmethod
+    def fetch_reading_list(cls, month):
+        """
+        加载抄表记录列表所需的数据，不涉及界面控件
+        查询次数与记录条数无关
+        :param month: 月份
+        :return: (抄表记录列表, 租户列表, 计费时间字典)
+        """
+        readings = MeterReading.get_by_month(month)
+        tenants = Tenant.get_all()
+        charging_times = cls.fetch_charging_times(readings)
+        return readings, tenants, charging_times
+    
+    @query_stats.scoped('ReadingView.load_reading_list')
     def load_reading_list(self):
         """
         加载抄表记录列表
@@ -746,11 +777,10 @@ class ReadingView:
             # 获取当前月份
             month = self.month_var.get()
             
-            # 获取抄表记录
-            self.reading_list = MeterReading.get_by_month(month)
+            # 获取抄表记录、租户和计费时间，每次加载时重新查询，确保获取最新数据
+            self.reading_list, tenants, charging_times = self.fetch_reading_list(month)
             
             # 创建租户ID到名称的映射
-            tenants = Tenant.get_all()
             tenant_map = {t.id: t.name for t in tenants}
             
             # 添加到列表控件，添加序号列
@@ -762,15 +792,8 @@ class ReadingView:
                 # 使用统一的日期格式化函数
                 display_month, display_date = self.format_date(reading.reading_date)
                 
-                # 获取计费时间：根据租户ID和月份查找费用记录，使用费用记录的创建时间作为计费时间
-                # 每次加载数据时重新查询，确保获取最新数据，避免缓存导致数据不一致
-                charging_time = ""
-                charges = Charge.get_by_tenant(reading.meter.tenant_id)
-                for charge in charges:
-                    if charge.month == display_month:
-                        if charge.create_time:
-                            charging_time = charge.create_time.split(' ')[0] if ' ' in charge.create_time else charge.create_time
-                        break
+                # 获取计费时间：使用该租户该月费用记录的创建时间
+                charging_time = charging_times.get((reading.meter.tenant_id, display_month), "")
                 
                 # 翻译表类型
                 translated_meter_type = self.get_text(reading.meter.meter_type)
@@ -800,7 +823,8 @@ class ReadingView:
             # 更新统计信息
             self.update_stats()
     
-    def format_date(self, date_value):
+    @staticmethod
+    def format_date(date_value):
         """
         统一日期格式化函数，处理不同格式的日期值
         :param date_value: 日期值，可以是字符串、整数或日期对象
@@ -912,6 +936,9 @@ class ReadingView:
         # 更新抄表记录列表
         self.reading_list = filtered_readings
         
+        # 一次性查询计费时间，每次搜索时重新查询，确保获取最新数据
+        charging_times = self.fetch_charging_times(filtered_readings)
+        
         # 添加到列表控件，添加序号列
         for idx, reading in enumerate(filtered_readings, 1):
             if reading.meter:
@@ -919,15 +946,8 @@ class ReadingView:
                 # 使用统一的日期格式化函数
                 display_month, display_date = self.format_date(reading.reading_date)
                 
-                # 获取计费时间：根据租户ID和月份查找费用记录，使用费用记录的创建时间作为计费时间
-                # 每次搜索时重新查询，确保获取最新数据，避免缓存导致数据不一致
-                charging_time = ""
-                charges = Charge.get_by_tenant(reading.meter.tenant_id)
-                for charge in charges:
-                    if charge.month == display_month:
-                        if charge.create_time:
-                            charging_time = charge.create_time.split(' ')[0] if ' ' in charge.create_time else charge.create_time
-                        break
+                # 获取计费时间：使用该租户该月费用记录的创建时间
+                charging_time = charging_times.get((reading.meter.tenant_id, display_month), "")
                 
                 # 处理备注字段，确保None值显示为空字符串
                 remark_display = reading.remark if reading.remark is not None else ""
@@ -1298,57 +1318,30 @@ class ReadingView:
             messagebox.showwarning("警告", "请先选择要删除的抄表记录")
             return
         
-        # 收集选中记录的信息
-        selected_readings = []
-        cannot_delete_records = []
-        
-        # 检查每条选中记录的计费状态
+        # 列表行与self.reading_list顺序一致，按行号取对应的抄表记录
+        item_readings = {}
         for item in selected_items:
-            values = self.reading_tree.item(item, "values")
-            
-            # 查找对应的抄表记录
-            for reading in self.reading_list:
-                # 使用多个字段匹配查找对应的记录
-                if not reading.meter:
-                    reading.load_meter_info()
-                
-                if reading.meter:
-                    # 获取显示月份
-                    display_month, display_date = self.format_date(reading.reading_date)
-                    
-                    if (values[1] == display_month and 
-                        values[3] == reading.meter.meter_no and 
-                        values[4] == reading.meter.meter_type and 
-                        values[10] == display_date):
-                        
-                        # 检查计费状态
-                        is_charged = False
-                        charges = Charge.get_by_tenant(reading.meter.tenant_id)
-                        for charge in charges:
-                            if charge.month == display_month and charge.create_time:
-                                is_charged = True
-                                break
-                        
-                        if is_charged:
-                            # 已计费的记录，无法删除
-                            cannot_delete_records.append(reading)
-                        else:
-                            # 未计费的记录，可以删除
-                            selected_readings.append(reading)
-                        break
+            index = self.reading_tree.index(item)
+            if index < len(self.reading_list):
+                item_readings[item] = self.reading_list[index]
+        
+        # 一次查询检查全部选中记录的计费状态
+        blocked = MeterReading.get_delete_blockers([reading.id for reading in item_readings.values()])
+        selected_readings = [reading for reading in item_readings.values() if reading.id not in blocked]
+        cannot_delete_records = [reading for reading in item_readings.values() if blocked.get(reading.id) == 'charged']
         
         # 检查是否有不能删除的记录
         if cannot_delete_records:
+            tenant_map = {t.id: t.name for t in Tenant.get_all()}
             message = "以下记录已计费，无法删除：\n\n"
             for reading in cannot_delete_records:
-                tenant = Tenant.get_by_id(reading.meter.tenant_id) if reading.meter else None
-                tenant_name = tenant.name if tenant else "未知租户"
+                tenant_name = tenant_map.get(reading.meter.tenant_id, "未知租户") if reading.meter else "未知租户"
                 message += f"- {tenant_name} ({reading.meter.meter_no}，{reading.meter.meter_type})\n"
             messagebox.showwarning("操作限制", message)
-            
-            # 如果所有选中的记录都不能删除，直接返回
-            if not selected_readings:
-                return
+        
+        # 如果所有选中的记录都不能删除，直接返回
+        if not selected_readings:
+            return
         
         # 显示批量删除确认对话框
         selected_count = len(selected_readings)
@@ -1373,21 +1366,16 @@ class ReadingView:
         
         if messagebox.askyesno("确认删除", confirm_message):
             try:
-                # 执行批量删除操作
-                success_count = 0
-                fail_count = 0
-                
-                for reading in selected_readings:
-                    if reading.delete():
-                        success_count += 1
-                    else:
-                        fail_count += 1
+                # 执行批量删除操作，删除前在同一事务内再次检查
+                result = MeterReading.delete_many([reading.id for reading in selected_readings])
+                success_count = len(result['deleted'])
+                fail_count = selected_count - success_count
                 
                 # 显示操作结果
                 if success_count > 0:
                     messagebox.showinfo("成功", f"成功删除 {success_count} 条抄表记录" + (f"，失败 {fail_count} 条" if fail_count > 0 else ""))
-                    # 刷新列表
-                    self.load_reading_list()
+                    # 只移除已删除的行，不重新加载列表
+                    self.remove_reading_rows(result['deleted'])
                     # 清空表单
                     self.clear_form()
                     # 重置全选状态
@@ -1399,6 +1387,28 @@ class ReadingView:
                 # 添加必要的错误处理机制
                 messagebox.showerror("错误", f"删除抄表记录时发生异常: {str(e)}")
     
+    def remove_reading_rows(self, reading_ids):
+        """
+        从列表中移除指定抄表记录的行，剩余行重新编号并更新统计
+        :param reading_ids: 抄表记录ID列表
+        """
+        removed = set(reading_ids)
+        items = self.reading_tree.get_children()
+        remaining = []
+        idx = 0
+        for item, reading in zip(items, self.reading_list):
+            if reading.id in removed:
+                self.reading_tree.delete(item)
+                continue
+            remaining.append(reading)
+            idx += 1
+            values = list(self.reading_tree.item(item, "values"))
+            values[0] = idx
+            self.reading_tree.item(item, values=values, tags=('odd' if idx % 2 != 0 else 'even',))
+        self.reading_list = remaining
+        self.update_total_records_label()
+        self.update_stats()
+    
     def save_reading(self):
         """
         保存抄表记录，实现完整的数据持久化逻辑
@@ -1656,84 +1666,16 @@ class ReadingView:
             self.parent.config(cursor="wait")
             self.parent.update()
             
-            # 创建Excel工作簿
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "抄表数据"
-            
-            # 设置表头
-            headers = ["ID", "租户名称", "表编号", "表类型", "上次读数", "当前读数", "调整值","用量", "抄表日期", "抄表人"]
-            ws.append(headers)
-            
-            # 设置表头样式
-            for col in ws.columns:
-                max_length = 0
-                column = col[0].column_letter  # 获取列字母
-                # 设置表头字体和对齐方式
-                ws[column + "1"].font = Font(bold=True, size=12)
-                ws[column + "1"].alignment = Alignment(horizontal="center")
-                # 计算列宽
-                for cell in col:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(cell.value)
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)  # 限制最大宽度为50
-                ws.column_dimensions[column].width = adjusted_width
-            
             # 获取当前筛选条件
             month = self.month_var.get()
             tenant_name = self.tenant_var.get()
             
-            # 获取所有租户
-            tenants = Tenant.get_all()
-            tenant_map = {t.id: t.name for t in tenants}
-            tenant_id_map = {t.name: t.id for t in tenants}
-            
-            # 获取所有抄表记录
-            all_readings = MeterReading.get_all()
-            
-            # 应用筛选条件
-            filtered_readings = []
-            for reading in all_readings:
-                # 加载水电表信息（如果尚未加载）
-                if not reading.meter:
-                    reading.load_meter_info()
-                
-                if not reading.meter:
-                    continue
-                
-                # 按月份筛选
-                if month and reading.reading_date.startswith(month):
-                    pass
-                elif month and not reading.reading_date.startswith(month):
-                    continue
-                
-                # 按租户筛选
-                if tenant_name:
-                    tenant_id = tenant_id_map.get(tenant_name)
-                    if reading.meter.tenant_id != tenant_id:
-                        continue
-                
-                filtered_readings.append(reading)
-            
-            # 写入数据
-            for reading in filtered_readings:
-                if reading.meter:
-                    tenant_name = tenant_map.get(reading.meter.tenant_id, "未知租户")
-                    ws.append([
-                        reading.id,
-                        tenant_name,
-                        reading.meter.meter_no,
-                        reading.meter.meter_type,
-                        reading.previous_reading,
-                        reading.current_reading,
-                        reading.adjustment,
-                        reading.usage,
-                        reading.reading_date,
-                        reading.reader
-                    ])
+            # 流式写入Excel，数据行直接从数据库游标读取
+            writer = ExcelExportWriter()
+            sheet = writer.create_sheet("抄表数据")
+            headers = ["ID", "租户名称", "表编号", "表类型", "上次读数", "当前读数", "调整值","用量", "抄表日期", "抄表人"]
+            sheet.append(headers, "header")
+            sheet.stream(MeterReading.iter_export_rows(month, tenant_name))
             
             # 保存文件
             default_filename = f"抄表单_{datetime.now().strftime('%Y%m%d%H%M%S')}.xlsx"
@@ -1744,7 +1686,7 @@ class ReadingView:
             )
             
             if file_path:
-                wb.save(file_path)
+                writer.save(file_path)
                 messagebox.showinfo("成功", f"导出成功！\n文件路径：{file_path}")
         except Exception as e:
             messagebox.showerror("错误", f"导出抄表数据失败: {str(e)}")
@@ -1761,64 +1703,24 @@ class ReadingView:
         try:
             # 选择文件
             file_path = filedialog.askopenfilename(
-                filetypes=[("Excel文件", "*.xlsx;*.xls"), ("所有文件", "*.*")],
+                filetypes=[("Excel文件", "*.xlsx;*.xls"), ("CSV文件", "*.csv"), ("所有文件", "*.*")],
                 title="选择要导入的抄表Excel文件"
             )
             
             if not file_path:
                 return
             
-            # 根据文件扩展名选择处理方式
-            if file_path.endswith('.xlsx'):
-                # 使用openpyxl处理.xlsx文件
-                wb = load_workbook(file_path)
-                ws = wb.active
-                
-                # 获取表头
-                actual_headers = [cell.value for cell in ws[1]]
-                
-                # 获取所有数据行，忽略空行
-                all_rows = []
-                for row in ws.iter_rows(min_row=2, values_only=True):
-                    # 检查行是否全部为空
-                    if any(cell is not None for cell in row):
-                        all_rows.append(row)
-                
-                total_rows = len(all_rows)
-                
-                # 定义获取单元格值的函数
-                def get_cell_value(row_idx, col_idx):
-                    return all_rows[row_idx][col_idx]
-            elif file_path.endswith('.xls'):
-                # 使用xlrd处理.xls文件
-                wb = xlrd.open_workbook(file_path)
-                ws = wb.sheet_by_index(0)
-                
-                # 获取表头
-                actual_headers = ws.row_values(0)
-                
-                # 获取所有数据行，忽略空行
-                all_rows = []
-                for row_idx in range(1, ws.nrows):  # 从第二行开始（索引1）
-                    row = ws.row_values(row_idx)
-                    # 检查行是否全部为空
-                    if any(cell is not None and cell != '' for cell in row):
-                        all_rows.append(row)
-                
-                total_rows = len(all_rows)
-                
-                # 定义获取单元格值的函数
-                def get_cell_value(row_idx, col_idx):
-                    return all_rows[row_idx][col_idx]
-            else:
-                messagebox.showerror("错误", "不支持的文件格式，请选择.xlsx或.xls文件")
+            # 读取表头和数据行
+            try:
+                actual_headers, all_rows, datemode = reading_import.load_rows(file_path)
+            except ValueError as e:
+                messagebox.showerror("错误", str(e))
                 return
             
-            # 验证表头
-            expected_headers = ["租户名称", "表编号", "表类型", "上次读数", "当前读数","调整值", "用量", "抄表日期", "抄表人"]
+            total_rows = len(all_rows)
             
             # 检查是否包含所有必填表头
-            missing_headers = [header for header in expected_headers if header not in actual_headers]
+            missing_headers = reading_import.get_missing_headers(actual_headers)
             if missing_headers:
                 messagebox.showerror("错误", f"文件格式不正确，缺少以下必填列：{', '.join(missing_headers)}")
                 return
@@ -1844,212 +1746,39 @@ class ReadingView:
             
             progress_window.update()
             
-            # 初始化统计信息
-            success_count = 0
-            failed_count = 0
-            failed_reasons = []
-            
-            # 获取所有租户和水电表数据
-            meters = Meter.get_all()
-            meter_map = {f"{m.meter_no} ({m.meter_type})": m for m in meters}
-            
             # 1. 批量解析数据并进行初步验证，收集所有待导入记录
-            import_records = []
-            for row_idx in range(total_rows):
-                try:
-                    # 获取数据
-                    tenant_name = str(get_cell_value(row_idx, actual_headers.index("租户名称"))).strip() if get_cell_value(row_idx, actual_headers.index("租户名称")) is not None else ""
-                    meter_no = str(get_cell_value(row_idx, actual_headers.index("表编号"))).strip() if get_cell_value(row_idx, actual_headers.index("表编号")) is not None else ""
-                    meter_type = get_cell_value(row_idx, actual_headers.index("表类型"))
-                    previous_reading = get_cell_value(row_idx, actual_headers.index("上次读数"))
-                    current_reading = get_cell_value(row_idx, actual_headers.index("当前读数"))
-                    adjustment_value = get_cell_value(row_idx, actual_headers.index("调整值"))
-                    reading_date = get_cell_value(row_idx, actual_headers.index("抄表日期"))
-                    reader = get_cell_value(row_idx, actual_headers.index("抄表人"))
-                    
-                    # 数据验证
-                    if not tenant_name:
-                        failed_count += 1
-                        failed_reasons.append(f"第{row_idx + 2}行：租户名称不能为空")
-                        continue
-                    
-                    if not meter_no:
-                        failed_count += 1
-                        failed_reasons.append(f"第{row_idx + 2}行：表编号不能为空")
-                        continue
-                    
-                    if not meter_type or meter_type not in ["水", "电"]:
-                        failed_count += 1
-                        failed_reasons.append(f"第{row_idx + 2}行：表类型必须是'水'或'电'")
-                        continue
-                    
-                    # 查找水电表
-                    meter_key = f"{meter_no} ({meter_type})"
-                    if meter_key not in meter_map:
-                        failed_count += 1
-                        failed_reasons.append(f"第{row_idx + 2}行：水电表 '{meter_key}' 不存在")
-                        continue
-                    
-                    meter = meter_map[meter_key]
-                    
-                    # 验证读数和调整值是否为数字
-                    try:
-                        previous_reading = float(previous_reading)
-                        current_reading = float(current_reading)
-                        adjustment_value = float(adjustment_value) if adjustment_value else 0
-                    except ValueError:
-                        failed_count += 1
-                        failed_reasons.append(f"第{row_idx + 2}行：读数或调整值必须是数字")
-                        continue
-                    
-                    # 计算用量（包含调整值）
-                    usage = current_reading - previous_reading + adjustment_value
-                    # 注意：允许负的调整值，所以不再检查 usage < 0
-                    # 只检查当前读数是否小于上次读数
-                    if current_reading < previous_reading:
-                        failed_count += 1
-                        failed_reasons.append(f"第{row_idx + 2}行：当前读数不能小于上次读数")
-                        continue
-                    
-                    if not reading_date:
-                        failed_count += 1
-                        failed_reasons.append(f"第{row_idx + 2}行：抄表日期不能为空")
-                        continue
-                    
-                    # 处理日期格式
-                    if isinstance(reading_date, datetime):
-                        reading_date_str = reading_date.strftime("%Y-%m-%d")
-                    elif isinstance(reading_date, str):
-                        reading_date_str = reading_date
-                    elif hasattr(reading_date, 'value'):
-                        # 处理xlrd的日期类型
-                        reading_date_str = datetime(*xlrd.xldate_as_tuple(reading_date.value, wb.datemode)).strftime("%Y-%m-%d")
-                    else:
-                        try:
-                            reading_date_str = str(reading_date)
-                        except:
-                            failed_count += 1
-                            failed_reasons.append(f"第{row_idx + 2}行：无效的日期格式")
-                            continue
-                    
-                    if not reader:
-                        failed_count += 1
-                        failed_reasons.append(f"第{row_idx + 2}行：抄表人不能为空")
-                        continue
-                    
-                    # 获取所属月份（从抄表日期提取）
-                    reading_month = reading_date_str[:7]  # 格式：YYYY-MM
-                    
-                    # 添加到待导入记录列表
-                    import_records.append({
-                        'row_idx': row_idx,
-                        'tenant_name': tenant_name,
-                        'meter_no': meter_no,
-                        'meter_type': meter_type,
-                        'reading_month': reading_month,
-                        'reading_date_str': reading_date_str,
-                        'previous_reading': previous_reading,
-                        'current_reading': current_reading,
-                        'adjustment_value': adjustment_value,
-                        'usage': usage,
-                        'reader': reader,
-                        'meter': meter
-                    })
-                except Exception as e:
-                    failed_count += 1
-                    failed_reasons.append(f"第{row_idx + 2}行：{str(e)}")
-            
-            # 2. 重复导入校验
-            if import_records:
-                # 获取数据库中已存在的记录，构建唯一标识映射
-                existing_mappings = {}  # 键：(reading_month, tenant_name, meter_no)，值：True
-                
-                # 获取所有租户ID到名称的映射
-                tenants = Tenant.get_all()
-                tenant_id_to_name = {t.id: t.name for t in tenants}
-                
-                # 获取所有已存在的抄表记录，按月份分组
-                all_existing_readings = MeterReading.get_all()
-                for reading in all_existing_readings:
-                    if not reading.meter:
-                        reading.load_meter_info()
-                    if reading.meter:
-                        # 获取月份
-                        existing_month = reading.reading_date[:7]  # 格式：YYYY-MM
-                        tenant_name = str(tenant_id_to_name.get(reading.meter.tenant_id, "未知租户")).strip()
-                        meter_no = str(reading.meter.meter_no).strip()
-                        key = (existing_month, tenant_name, meter_no)
-                        existing_mappings[key] = True
+            import_records, failed_reasons = reading_import.parse_rows(actual_headers, all_rows, datemode)
+            parse_failed_count = len(failed_reasons)
+            
+            # 2. 重复导入校验，发现重复记录时完全拒绝本次导入
+            duplicate_records = reading_import.find_duplicates(import_records)
+            if duplicate_records:
+                # 构建错误信息
+                error_msg = "检测到重复数据，本次导入操作已取消。\n\n重复记录如下：\n"
+                error_msg += "行号 | 所属月份 | 租户名称 | 表编号 | 表类型\n"
+                error_msg += "-" * 60 + "\n"
+                for dup in duplicate_records:
+                    error_msg += f"{dup['row_idx']:4d} | {dup['reading_month']} | {dup['tenant_name']} | {dup['meter_no']} | {dup['meter_type']}\n"
+                error_msg += "\n重复原因：以上记录的[所属月份]、[租户名称]和[表编号]组合已存在于系统中\n"
+                error_msg += "建议：请检查并修改数据后重新尝试导入。"
                 
-                # 检查待导入记录是否重复
-                duplicate_records = []
-                for record in import_records:
-                    key = (record['reading_month'], record['tenant_name'], record['meter_no'])
-                    
-                    if key in existing_mappings:
-                        # 记录重复信息
-                        duplicate_records.append({
-                            'row_idx': record['row_idx'] + 2,  # 转换为Excel行号
-                            'tenant_name': record['tenant_name'],
-                            'meter_no': record['meter_no'],
-                            'meter_type': record['meter_type'],
-                            'reading_month': record['reading_month']
-                        })
-                
-                # 如果发现重复记录，完全拒绝本次导入
-                if duplicate_records:
-                    # 构建错误信息
-                    error_msg = "检测到重复数据，本次导入操作已取消。\n\n重复记录如下：\n"
-                    error_msg += "行号 | 所属月份 | 租户名称 | 表编号 | 表类型\n"
-                    error_msg += "-" * 60 + "\n"
-                    for dup in duplicate_records:
-                        error_msg += f"{dup['row_idx']:4d} | {dup['reading_month']} | {dup['tenant_name']} | {dup['meter_no']} | {dup['meter_type']}\n"
-                    error_msg += "\n重复原因：以上记录的[所属月份]、[租户名称]和[表编号]组合已存在于系统中\n"
-                    error_msg += "建议：请检查并修改数据后重新尝试导入。"
-                    
-                    # 关闭进度窗口
-                    progress_window.destroy()
-                    messagebox.showerror("导入失败", error_msg)
-                    return
+                # 关闭进度窗口
+                progress_window.destroy()
+                messagebox.showerror("导入失败", error_msg)
+                return
             
             # 3. 执行数据导入
-            for record in import_records:
-                try:
-                    # 创建并保存抄表记录
-                    reading = MeterReading(
-                        meter_id=record['meter'].id,
-                        reading_date=record['reading_date_str'],
-                        previous_reading=record['previous_reading'],
-                        current_reading=record['current_reading'],
-                        adjustment=record['adjustment_value'],
-                        usage=record['usage'],
-                        reader=record['reader']
-                    )
-                    
-                    if reading.save():
-                        success_count += 1
-                    else:
-                        failed_count += 1
-                        failed_reasons.append(f"第{record['row_idx'] + 2}行：保存失败")
-                        continue
-                except Exception as e:
-                    failed_count += 1
-                    failed_reasons.append(f"第{record['row_idx'] + 2}行：{str(e)}")
-                
-                # 更新进度
-                progress = int((success_count + failed_count) / total_rows * 100)
-                progress_bar['value'] = progress
-                progress_label.config(text=f"正在导入第 {success_count + failed_count}/{total_rows} 行...")
-                result_label.config(text=f"成功: {success_count}, 失败: {failed_count}")
-                progress_window.update()
-                
-                # 更新进度
-                progress = int((row_idx + 1) / total_rows * 100)
-                progress_bar['value'] = progress
-                progress_label.config(text=f"正在导入第 {row_idx + 1}/{total_rows} 行...")
-                result_label.config(text=f"成功: {success_count}, 失败: {failed_count}")
+            def update_progress(done, success, failed):
+                processed = parse_failed_count + done
+                progress_bar['value'] = int(processed / total_rows * 100)
+                progress_label.config(text=f"正在导入第 {processed}/{total_rows} 行...")
+                result_label.config(text=f"成功: {success}, 失败: {parse_failed_count + failed}")
                 progress_window.update()
             
+            success_count, save_failed_reasons = reading_import.save_records(import_records, update_progress)
+            failed_reasons.extend(save_failed_reasons)
+            failed_count = len(failed_reasons)
+            
             # 关闭进度窗口
             progress_window.destroy()
             
@@ -7,6 +7,7 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+from utils.style_registry import get_style_registry
 from license.license_manager import LicenseManager
 
 class RegisterView:
@@ -48,11 +49,8 @@ class RegisterView:
         """
         设置界面样式
         """
-        style = ttk.Style()
-        style.configure("Register.TLabel", font=(".AppleSystemUIFont", 12))
-        style.configure("Title.TLabel", font=(".AppleSystemUIFont", 16, "bold"))
-        style.configure("Status.TLabel", font=(".AppleSystemUIFont", 10))
-        style.configure("Register.TButton", font=(".AppleSystemUIFont", 11))
+        # 命名样式由注册表统一定义，重复打开注册窗口不再重新配置
+        get_style_registry().ensure_initialized(self.window)
     
     def _create_widgets(self):
         """
@@ -63,7 +61,7 @@ class RegisterView:
         main_frame.pack(fill=tk.BOTH, expand=True)
         
         # 标题
-        title_label = ttk.Label(main_frame, text="软件注册", style="Title.TLabel")
+        title_label = ttk.Label(main_frame, text="软件注册", style="RegisterTitle.TLabel")
         title_label.pack(pady=(0, 20))
         
         # 说明文本
@@ -106,7 +104,7 @@ class RegisterView:
         status_label = ttk.Label(
             main_frame, 
             textvariable=self.status_var,
-            style="Status.TLabel",
+            style="RegisterStatus.TLabel",
             foreground="#666666"
         )
         status_label.pack(pady=(0, 20))
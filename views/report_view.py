@@ -10,58 +10,12 @@ from tkinter import ttk
 from tkinter import messagebox
 from tkinter import filedialog
 from datetime import datetime
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.fonts import addMapping
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 import os
+from database import query_stats
+from utils.report_export import ReportExporter
 
-# 注册中文字体
-def register_chinese_fonts():
-    """
-    注册中文字体到reportlab
-    """
-    # 尝试从Windows系统字体目录加载常用中文字体
-    font_dirs = [
-        "C:\\Windows\\Fonts",
-        "C:\\Windows\\SysWOW64\\Fonts",
-        "D:\\Windows\\Fonts",
-        "D:\\Windows\\SysWOW64\\Fonts"
-    ]
-    
-    font_files = {
-        "SimHei": "simhei.ttf",  # 黑体
-        "SimSun": "simsun.ttc",  # 宋体
-        "Microsoft YaHei": "msyh.ttf"  # 微软雅黑
-    }
-    
-    # 找到并注册第一个可用的中文字体
-    for font_name, font_file in font_files.items():
-        for font_dir in font_dirs:
-            font_path = os.path.join(font_dir, font_file)
-            if os.path.exists(font_path):
-                try:
-                    # 注册常规字体
-                    pdfmetrics.registerFont(TTFont(font_name, font_path))
-                    # 为了兼容粗体，我们将常规字体同时注册为粗体
-                    pdfmetrics.registerFont(TTFont(f"{font_name}-Bold", font_path))
-                    # 添加字体映射，使中文能正常显示
-                    addMapping(font_name, 0, 0, font_name)  # 常规
-                    addMapping(font_name, 0, 1, f"{font_name}-Bold")  # 粗体
-                    return font_name
-                except Exception:
-                    continue
-    
-    # 如果没有找到系统字体，使用reportlab自带的字体或默认字体
-    return "Helvetica"
-
-# 注册中文字体并获取默认中文字体名称
-DEFAULT_CHINESE_FONT = register_chinese_fonts()
 from models.tenant import Tenant
-from models.charge import Charge
+from models.charge import Charge, STATUS_PAID
 from models.payment import Payment
 from models.settlement import Settlement
 
@@ -74,8 +28,8 @@ import numpy as np
 plt.rcParams['font.sans-serif'] = ['SimHei']  # 设置中文显示
 plt.rcParams['axes.unicode_minus'] = False  # 解决负号'-'显示为方块的问题
 
-class ReportView:
-    """报表管理视图类"""
+class ReportView(ReportExporter):
+    """报表管理视图类，报表导出方法继承自ReportExporter"""
     
     def __init__(self, parent, language_utils=None):
         """
@@ -86,14 +40,6 @@ class ReportView:
         self.parent = parent
         self.language_utils = language_utils
         self.create_widgets()
-    
-    def get_text(self, key):
-        """
-        获取翻译文本
-        :param key: 文本键名
-        :return: 翻译后的文本
-        """
-        return self.language_utils.get_text(key) if self.language_utils else key
         
     def update_language(self):
         """
@@ -480,6 +426,26 @@ class ReportView:
             # 显示结果和图表框架
             self.apply_layout()
     
+    @staticmethod
+    def fetch_monthly_report_data(month, tenant_name=None):
+        """
+        加载月度报表所需的数据，不涉及界面控件
+        :param month: 月份
+        :param tenant_name: 租户名称（可选），指定时只保留该租户的费用
+        :return: (费用列表, 租户列表)，费用状态由数据库维护，不需要再汇总已收金额
+        """
+        charges = Charge.get_by_month(month)
+        tenants = Tenant.get_all()
+        
+        # 如果指定了租户，过滤数据
+        if tenant_name:
+            tenant = next((t for t in tenants if t.name == tenant_name), None)
+            if tenant:
+                charges = [c for c in charges if c.tenant_id == tenant.id]
+        
+        return charges, tenants
+    
+    @query_stats.scoped('ReportView.generate_monthly_report')
     def generate_monthly_report(self, month, tenant_name, stat_type=None):
         """
         生成月度报表
@@ -491,14 +457,8 @@ class ReportView:
         if stat_type is None:
             stat_type = self.get_text('by_tenant')
         
-        # 获取费用数据
-        charges = Charge.get_by_month(month)
-        
-        # 如果指定了租户，过滤数据
-        if tenant_name:
-            tenant = next((t for t in Tenant.get_all() if t.name == tenant_name), None)
-            if tenant:
-                charges = [c for c in charges if c.tenant_id == tenant.id]
+        # 获取费用数据和租户
+        charges, tenants = self.fetch_monthly_report_data(month, tenant_name)
         
         # 处理空数据情况
         if not charges:
@@ -517,7 +477,6 @@ class ReportView:
             return
         
         # 租户ID到名称的映射
-        tenants = Tenant.get_all()
         tenant_map = {t.id: t.name for t in tenants}
         tenant_type_map = {t.id: t.type for t in tenants}
         
@@ -661,20 +620,8 @@ class ReportView:
             for charge in charges:
                 tenant_name = tenant_map.get(charge.tenant_id, self.get_text('unknown_tenant'))
                 
-                # 计算已收费用
-                paid_amount = sum(p.amount for p in Payment.get_by_charge(charge.id))
-                # 计算应收费用
-                due_amount = round(charge.total_charge - paid_amount, 2)
-                
-                # 动态计算状态
-                if due_amount == 0:
-                    status = self.get_text('paid')
-                elif due_amount > 0 and due_amount < charge.total_charge:
-                    status = self.get_text('partially_paid')
-                elif due_amount == charge.total_charge and paid_amount == 0:
-                    status = self.get_text('unpaid')
-                else:
-                    status = charge.status
+                # 状态由数据库按已收金额维护，直接翻译显示
+                status = Charge.status_text(charge.status, self.get_text)
                 
                 # 确保租户名称不超过列宽
                 display_name = tenant_name[:20] + "..." if len(tenant_name) > 20 else tenant_name
@@ -686,7 +633,7 @@ class ReportView:
                 total_electricity += charge.electricity_charge
                 total_charge_amount += charge.total_charge
                 
-                if status == self.get_text('paid'):
+                if charge.status == STATUS_PAID:
                     paid_count += 1
                 else:
                     unpaid_count += 1
@@ -880,20 +827,8 @@ class ReportView:
             for charge in charges:
                 tenant_name = tenant_map.get(charge.tenant_id, "未知租户")
                 
-                # 计算已收费用
-                paid_amount = sum(p.amount for p in Payment.get_by_charge(charge.id))
-                # 计算应收费用
-                due_amount = round(charge.total_charge - paid_amount, 2)
-                
-                # 动态计算状态
-                if due_amount == 0:
-                    status = self.get_text('paid')
-                elif due_amount > 0 and due_amount < charge.total_charge:
-                    status = self.get_text('partially_paid')
-                elif due_amount == charge.total_charge and paid_amount == 0:
-                    status = self.get_text('unpaid')
-                else:
-                    status = charge.status
+                # 状态由数据库按已收金额维护，直接翻译显示
+                status = Charge.status_text(charge.status, self.get_text)
                 
                 # 确保租户名称不超过列宽
                 display_name = tenant_name[:20] + "..." if len(tenant_name) > 20 else tenant_name
@@ -1125,314 +1060,13 @@ class ReportView:
             return
         
         try:
-            # 创建Workbook对象
-            wb = Workbook()
-            ws = wb.active
-            
-            # 根据报表类型生成不同的Excel内容
-            if report_type == "monthly":
-                ws.title = f"{self.get_text('monthly_report')}"
-                self.export_monthly_excel(ws, month, tenant_name)
-            elif report_type == "tenant_detail":
-                ws.title = f"{self.get_text('tenant_detail_report')}"
-                self.export_tenant_detail_excel(ws, month, tenant_name)
-            elif report_type == "payment_stat":
-                ws.title = f"{self.get_text('payment_stat_report_title')}"
-                self.export_payment_stat_excel(ws, month, tenant_name, stat_type)
-            elif report_type == "settlement":
-                ws.title = f"{self.get_text('water_electricity_settlement_report')}"
-                self.export_settlement_excel(ws, month, tenant_name)
-            
-            # 保存Excel文件
+            # 根据报表类型生成不同的Excel内容并保存
+            wb = self.build_workbook(report_type, month, tenant_name, stat_type)
             wb.save(file_path)
             messagebox.showinfo(self.get_text('success'), f"{self.get_text('excel_report_successfully_exported_to')}\n{file_path}")
         except Exception as e:
             messagebox.showerror(self.get_text('error'), f"{self.get_text('failed_to_export_excel_report')}：{str(e)}")
     
-    def export_monthly_excel(self, ws, month, tenant_name):
-        """
-        导出月度报表到Excel
-        :param ws: Worksheet对象
-        :param month: 月份
-        :param tenant_name: 租户名称（可选）
-        """
-        # 设置工作表标题
-        ws.title = f"月度报表_{month}"
-        
-        # 表头
-        header = [self.get_text('tenant_name'), f"{self.get_text('water_fee')}({self.get_text('yuan')})", f"{self.get_text('electricity_fee')}({self.get_text('yuan')})", f"{self.get_text('total_charge')}({self.get_text('yuan')})", self.get_text('status')]
-        ws.append(header)
-        
-        # 设置表头样式
-        for cell in ws[1]:
-            cell.font = Font(bold=True, size=11)
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            cell.fill = PatternFill(start_color="E0E0E0", end_color="E0E0E0", fill_type="solid")
-        
-        # 获取费用数据
-        charges = Charge.get_by_month(month)
-        
-        # 如果指定了租户，过滤数据
-        if tenant_name:
-            tenant = next((t for t in Tenant.get_all() if t.name == tenant_name), None)
-            if tenant:
-                charges = [c for c in charges if c.tenant_id == tenant.id]
-        
-        # 租户ID到名称的映射
-        tenants = Tenant.get_all()
-        tenant_map = {t.id: t.name for t in tenants}
-        
-        # 填充数据
-        for row_num, charge in enumerate(charges, start=2):
-            # 计算已收费用
-            paid_amount = sum(p.amount for p in Payment.get_by_charge(charge.id))
-            # 计算应收费用
-            due_amount = round(charge.total_charge - paid_amount, 2)
-            
-            # 动态计算状态
-            if due_amount == 0:
-                status = "已缴"
-            elif due_amount > 0 and due_amount < charge.total_charge:
-                status = "部分缴纳"
-            elif due_amount == charge.total_charge and paid_amount == 0:
-                status = "未缴"
-            else:
-                status = charge.status
-            
-            row_data = [
-                tenant_map.get(charge.tenant_id, "未知租户"),
-                charge.water_charge,
-                charge.electricity_charge,
-                charge.total_charge,
-                status
-            ]
-            
-            # 填充数据并设置样式
-            for col_num, value in enumerate(row_data, start=1):
-                cell = ws.cell(row=row_num, column=col_num, value=value)
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-        
-        # 添加总计行
-        ws.append([])
-        total_row = ws.max_row + 1
-        # 先创建单元格，然后设置font属性
-        total_cell = ws.cell(row=total_row, column=1, value=self.get_text('total'))
-        total_cell.font = Font(bold=True)
-        ws.cell(row=total_row, column=2, value=f"=SUM(B2:B{len(charges)+1})")
-        ws.cell(row=total_row, column=3, value=f"=SUM(C2:C{len(charges)+1})")
-        ws.cell(row=total_row, column=4, value=f"=SUM(D2:D{len(charges)+1})")
-        
-        # 设置列宽
-        ws.column_dimensions["A"].width = 25
-        ws.column_dimensions["B"].width = 12
-        ws.column_dimensions["C"].width = 12
-        ws.column_dimensions["D"].width = 15
-        ws.column_dimensions["E"].width = 12
-        
-        # 设置表格边框
-        for row in ws.iter_rows(min_row=1, max_row=total_row, min_col=1, max_col=5):
-            for cell in row:
-                cell.border = Border(left=Side(style="thin"), 
-                                   right=Side(style="thin"), 
-                                   top=Side(style="thin"), 
-                                   bottom=Side(style="thin"))
-    
-    def export_tenant_detail_excel(self, ws, month, tenant_name):
-        """
-        导出租户明细报表到Excel
-        :param ws: Worksheet对象
-        :param month: 月份
-        :param tenant_name: 租户名称（可选）
-        """
-        # 设置工作表标题
-        ws.title = f"租户明细报表_{month}"
-        
-        # 表头
-        header = ["租户名称", "月份", "水用量", "水单价", "水费", "电用量", "电单价", "电费", "总费用", "状态"]
-        ws.append(header)
-        
-        # 设置表头样式
-        for cell in ws[1]:
-            cell.font = Font(bold=True, size=11)
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            cell.fill = PatternFill(start_color="E0E0E0", end_color="E0E0E0", fill_type="solid")
-        
-        # 获取费用数据
-        charges = Charge.get_by_month(month)
-        
-        # 如果指定了租户，过滤数据
-        if tenant_name:
-            tenant = next((t for t in Tenant.get_all() if t.name == tenant_name), None)
-            if tenant:
-                charges = [c for c in charges if c.tenant_id == tenant.id]
-        
-        # 租户ID到名称的映射
-        tenants = Tenant.get_all()
-        tenant_map = {t.id: t.name for t in tenants}
-        
-        # 填充数据
-        for row_num, charge in enumerate(charges, start=2):
-            # 计算已收费用
-            paid_amount = sum(p.amount for p in Payment.get_by_charge(charge.id))
-            # 计算应收费用
-            due_amount = round(charge.total_charge - paid_amount, 2)
-            
-            # 动态计算状态
-            if due_amount == 0:
-                status = "已缴"
-            elif due_amount > 0 and due_amount < charge.total_charge:
-                status = "部分缴纳"
-            elif due_amount == charge.total_charge and paid_amount == 0:
-                status = "未缴"
-            else:
-                status = charge.status
-            
-            row_data = [
-                tenant_map.get(charge.tenant_id, "未知租户"),
-                charge.month,
-                charge.water_usage,
-                charge.water_price,
-                charge.water_charge,
-                charge.electricity_usage,
-                charge.electricity_price,
-                charge.electricity_charge,
-                charge.total_charge,
-                status
-            ]
-            
-            # 填充数据并设置样式
-            for col_num, value in enumerate(row_data, start=1):
-                cell = ws.cell(row=row_num, column=col_num, value=value)
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-        
-        # 设置列宽
-        ws.column_dimensions["A"].width = 25
-        ws.column_dimensions["B"].width = 10
-        ws.column_dimensions["C"].width = 12
-        ws.column_dimensions["D"].width = 10
-        ws.column_dimensions["E"].width = 12
-        ws.column_dimensions["F"].width = 12
-        ws.column_dimensions["G"].width = 10
-        ws.column_dimensions["H"].width = 12
-        ws.column_dimensions["I"].width = 15
-        ws.column_dimensions["J"].width = 12
-        
-        # 设置表格边框
-        for row in ws.iter_rows(min_row=1, max_row=ws.max_row, min_col=1, max_col=10):
-            for cell in row:
-                cell.border = Border(left=Side(style="thin"), 
-                                   right=Side(style="thin"), 
-                                   top=Side(style="thin"), 
-                                   bottom=Side(style="thin"))
-    
-    def export_payment_stat_excel(self, ws, month, tenant_name, stat_type):
-        """
-        导出收费统计报表到Excel
-        :param ws: Worksheet对象
-        :param month: 月份
-        :param tenant_name: 租户名称（可选）
-        :param stat_type: 统计方式
-        """
-        # 设置工作表标题
-        ws.title = f"收费统计报表_{month}"
-        
-        # 表头
-        header = ["统计项", "金额(元)", "占比"]
-        ws.append(header)
-        
-        # 设置表头样式
-        for cell in ws[1]:
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-        
-        # 获取收费数据
-        payments = Payment.get_by_month(month)
-        
-        # 租户ID到名称的映射
-        tenants = Tenant.get_all()
-        tenant_map = {t.id: t.name for t in tenants}
-        
-        # 费用ID到租户ID的映射
-        charges = Charge.get_by_month(month)
-        charge_tenant_map = {c.id: c.tenant_id for c in charges}
-        
-        # 租户ID到类型的映射
-        tenant_type_map = {t.id: t.type for t in tenants}
-        
-        # 统计数据
-        stat_data = {}
-        total_amount = 0
-        
-        for payment in payments:
-            tenant_id = charge_tenant_map.get(payment.charge_id, 0)
-            current_tenant_name = tenant_map.get(tenant_id, "未知租户")
-            
-            # 如果指定了租户，过滤数据
-            if tenant_name and current_tenant_name != tenant_name:
-                continue
-            
-            # 按统计方式分组
-            if stat_type == "按租户":
-                key = current_tenant_name
-            elif stat_type == "按类型":
-                key = tenant_type_map.get(tenant_id, "未知类型")
-            else:
-                key = current_tenant_name
-            
-            stat_data[key] = stat_data.get(key, 0) + payment.amount
-            total_amount += payment.amount
-        
-        # 填充数据
-        for key, amount in stat_data.items():
-            percentage = (amount / total_amount * 100) if total_amount > 0 else 0
-            row_data = [key, amount, f"{percentage:.2f}%"]
-            ws.append(row_data)
-        
-        # 添加总计行
-        ws.append([])
-        ws.append(["总计", total_amount, "100.00%"])
-        
-        # 设置A列宽度
-        ws.column_dimensions["A"].width = 20
-    
-    def export_settlement_excel(self, ws, month, tenant_name=None):
-        """
-        导出结算报表到Excel
-        :param ws: Worksheet对象
-        :param month: 月份
-        :param tenant_name: 租户名称（可选）
-        """
-        # 设置工作表标题
-        ws.title = f"结算报表_{month}"
-        
-        # 获取结算数据
-        settlement = Settlement.get_by_month(month)
-        
-        # 获取收费数据
-        payments = Payment.get_by_month(month)
-        total_payment = Payment.get_total_by_month(month)
-        
-        # 填充结算信息
-        ws.append(["结算报表"])
-        ws.append(["报表月份", month])
-        ws.append(["生成时间", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
-        ws.append([])
-        
-        ws.append(["收费统计"])
-        ws.append(["当月收费总金额", f"{total_payment:.2f} {self.get_text('yuan')}"])
-        ws.append(["收费记录条数", f"{len(payments)} 条"])
-        ws.append([])
-        
-        ws.append(["结算信息"])
-        if settlement:
-            ws.append(["结算日期", settlement.settle_date])
-            ws.append(["结算金额", f"{settlement.total_amount:.2f} {self.get_text('yuan')}"])
-            ws.append(["出纳姓名", settlement.cashier])
-            ws.append(["备注", settlement.notes if settlement.notes else "无"])
-        else:
-            ws.append(["本月尚未结算"])
-            ws.append(["建议结算金额", f"{total_payment:.2f} {self.get_text('yuan')}"])
-    
     def export_pdf(self):
         """
         导出PDF报表
@@ -1469,21 +1103,8 @@ class ReportView:
         file_path = os.path.join(export_dir, filename)
         
         try:
-            # 创建canvas对象，设置页边距和字体
-            c = canvas.Canvas(file_path, pagesize=A4)
-            
-            # 根据报表类型生成不同的PDF内容
-            if report_type == "monthly":
-                self.export_monthly_pdf(c, month, tenant_name)
-            elif report_type == "tenant_detail":
-                self.export_tenant_detail_pdf(c, month, tenant_name)
-            elif report_type == "payment_stat":
-                self.export_payment_stat_pdf(c, month, tenant_name, stat_type)
-            elif report_type == "settlement":
-                self.export_settlement_pdf(c, month, tenant_name)
-            
-            # 保存PDF文件
-            c.save()
+            # 根据报表类型生成不同的PDF内容并保存
+            self.write_pdf(file_path, report_type, month, tenant_name, stat_type)
             
             # 自动打开PDF文件
             os.startfile(file_path)
@@ -1492,612 +1113,6 @@ class ReportView:
         except Exception as e:
             messagebox.showerror(self.get_text('error'), f"{self.get_text('failed_to_export_pdf_report')}：{str(e)}")
     
-    def export_monthly_pdf(self, c, month, tenant_name):
-        """
-        导出月度报表到PDF
-        :param c: Canvas对象
-        :param month: 月份
-        :param tenant_name: 租户名称（可选）
-        """
-        # 页面设置
-        page_width, page_height = A4
-        margin = 50
-        
-        # 设置标题
-        c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 16)
-        title = self.get_text('monthly_water_electricity_report')
-        title_width = c.stringWidth(title, f"{DEFAULT_CHINESE_FONT}-Bold", 16)
-        c.drawString((page_width - title_width) / 2, page_height - margin - 20, title)
-        
-        # 设置基本信息
-        c.setFont(DEFAULT_CHINESE_FONT, 12)
-        y = page_height - margin - 40
-        c.drawString(margin, y, f"{self.get_text('report_month')}: {month}")
-        
-        y -= 15
-        c.drawString(margin, y, f"{self.get_text('generate_time')}: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        if tenant_name:
-            y -= 15
-            c.drawString(margin, y, f"{self.get_text('tenant')}: {tenant_name}")
-        
-        # 画分隔线
-        y -= 15
-        c.line(margin, y, page_width - margin, y)
-        
-        # 设置表头
-        c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-        headers = [self.get_text('tenant_name'), f"{self.get_text('water_fee')}({self.get_text('yuan')})", f"{self.get_text('electricity_fee')}({self.get_text('yuan')})", f"{self.get_text('total_charge')}({self.get_text('yuan')})", self.get_text('status')]
-        # 调整列宽，使布局更合理
-        col_widths = [150, 80, 80, 80, 80]
-        x_positions = [margin]
-        for i in range(1, len(col_widths)):
-            x_positions.append(x_positions[i-1] + col_widths[i-1])
-        
-        y -= 20
-        for i, header in enumerate(headers):
-            # 计算列标题居中位置
-            header_width = c.stringWidth(header, f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-            c.drawString(x_positions[i] + (col_widths[i] - header_width) / 2, y, header)
-        
-        y -= 15
-        # 画分隔线
-        c.line(margin, y, page_width - margin, y)
-        
-        # 获取费用数据
-        charges = Charge.get_by_month(month)
-        
-        # 如果指定了租户，过滤数据
-        if tenant_name:
-            tenant = next((t for t in Tenant.get_all() if t.name == tenant_name), None)
-            if tenant:
-                charges = [c for c in charges if c.tenant_id == tenant.id]
-        
-        # 租户ID到名称的映射
-        tenants = Tenant.get_all()
-        tenant_map = {t.id: t.name for t in tenants}
-        
-        # 设置数据字体
-        c.setFont(DEFAULT_CHINESE_FONT, 10)
-        
-        # 填充数据
-        for charge in charges:
-            y -= 15
-            # 确保不超过页边距
-            if y < margin + 50:
-                # 新建页面
-                c.showPage()
-                # 重新设置字体
-                c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-                # 重新绘制表头
-                for i, header in enumerate(headers):
-                    header_width = c.stringWidth(header, f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-                    c.drawString(x_positions[i] + (col_widths[i] - header_width) / 2, page_height - margin - 40, header)
-                
-                y = page_height - margin - 55
-                c.line(margin, y, page_width - margin, y)
-                y -= 15
-                c.setFont(DEFAULT_CHINESE_FONT, 10)
-            
-            tenant_name = tenant_map.get(charge.tenant_id, "未知租户")
-            
-            # 计算已收费用
-            paid_amount = sum(p.amount for p in Payment.get_by_charge(charge.id))
-            # 计算应收费用
-            due_amount = round(charge.total_charge - paid_amount, 2)
-            
-            # 动态计算状态
-            if due_amount == 0:
-                status = "已缴"
-            elif due_amount > 0 and due_amount < charge.total_charge:
-                status = "部分缴纳"
-            elif due_amount == charge.total_charge and paid_amount == 0:
-                status = "未缴"
-            else:
-                status = charge.status
-            
-            # 租户名称（左对齐）
-            c.drawString(x_positions[0], y, tenant_name[:20] + "..." if len(tenant_name) > 20 else tenant_name)
-            
-            # 水费（右对齐）
-            water_str = f"{charge.water_charge:.2f}"
-            water_width = c.stringWidth(water_str, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[1] + col_widths[1] - water_width - 5, y, water_str)
-            
-            # 电费（右对齐）
-            electricity_str = f"{charge.electricity_charge:.2f}"
-            electricity_width = c.stringWidth(electricity_str, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[2] + col_widths[2] - electricity_width - 5, y, electricity_str)
-            
-            # 总费用（右对齐）
-            total_str = f"{charge.total_charge:.2f}"
-            total_width = c.stringWidth(total_str, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[3] + col_widths[3] - total_width - 5, y, total_str)
-            
-            # 状态（居中）
-            status_width = c.stringWidth(status, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[4] + (col_widths[4] - status_width) / 2, y, status)
-        
-        # 画分隔线
-        y -= 15
-        c.line(margin, y, page_width - margin, y)
-        
-        # 计算总计
-        total_water = sum([c.water_charge for c in charges])
-        total_electricity = sum([c.electricity_charge for c in charges])
-        total_charge = sum([c.total_charge for c in charges])
-        
-        # 绘制总计行
-        y -= 15
-        c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-        
-        c.drawString(x_positions[0], y, "合计")
-        
-        total_water_str = f"{total_water:.2f}"
-        total_water_width = c.stringWidth(total_water_str, f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-        c.drawString(x_positions[1] + col_widths[1] - total_water_width - 5, y, total_water_str)
-        
-        total_electricity_str = f"{total_electricity:.2f}"
-        total_electricity_width = c.stringWidth(total_electricity_str, f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-        c.drawString(x_positions[2] + col_widths[2] - total_electricity_width - 5, y, total_electricity_str)
-        
-        total_charge_str = f"{total_charge:.2f}"
-        total_charge_width = c.stringWidth(total_charge_str, f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-        c.drawString(x_positions[3] + col_widths[3] - total_charge_width - 5, y, total_charge_str)
-    
-    def export_tenant_detail_pdf(self, c, month, tenant_name):
-        """
-        导出租户明细报表到PDF
-        :param c: Canvas对象
-        :param month: 月份
-        :param tenant_name: 租户名称（可选）
-        """
-        # 页面设置
-        page_width, page_height = A4
-        margin = 50
-        
-        # 设置标题
-        c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 16)
-        title = self.get_text('tenant_water_electricity_detail_report')
-        title_width = c.stringWidth(title, f"{DEFAULT_CHINESE_FONT}-Bold", 16)
-        c.drawString((page_width - title_width) / 2, page_height - margin - 20, title)
-        
-        # 设置基本信息
-        c.setFont(DEFAULT_CHINESE_FONT, 12)
-        y = page_height - margin - 40
-        c.drawString(margin, y, f"{self.get_text('report_month')}: {month}")
-        
-        y -= 15
-        c.drawString(margin, y, f"{self.get_text('generate_time')}: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        if tenant_name:
-            y -= 15
-            c.drawString(margin, y, f"{self.get_text('tenant')}: {tenant_name}")
-        
-        # 画分隔线
-        y -= 15
-        c.line(margin, y, page_width - margin, y)
-        
-        # 设置表头
-        c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-        headers = [self.get_text('tenant_name'), self.get_text('month'), self.get_text('water_usage'), self.get_text('water_unit_price'), self.get_text('water_fee'), self.get_text('electricity_usage'), self.get_text('electricity_unit_price'), self.get_text('electricity_fee'), self.get_text('total_charge'), self.get_text('status')]
-        # 调整列宽，使布局更合理
-        col_widths = [120, 60, 60, 60, 60, 60, 60, 60, 80, 60]
-        x_positions = [margin]
-        for i in range(1, len(col_widths)):
-            x_positions.append(x_positions[i-1] + col_widths[i-1])
-        
-        y -= 20
-        for i, header in enumerate(headers):
-            # 计算列标题居中位置
-            header_width = c.stringWidth(header, f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-            c.drawString(x_positions[i] + (col_widths[i] - header_width) / 2, y, header)
-        
-        y -= 15
-        # 画分隔线
-        c.line(margin, y, page_width - margin, y)
-        
-        # 获取费用数据
-        charges = Charge.get_by_month(month)
-        
-        # 如果指定了租户，过滤数据
-        if tenant_name:
-            tenant = next((t for t in Tenant.get_all() if t.name == tenant_name), None)
-            if tenant:
-                charges = [c for c in charges if c.tenant_id == tenant.id]
-        
-        # 租户ID到名称的映射
-        tenants = Tenant.get_all()
-        tenant_map = {t.id: t.name for t in tenants}
-        
-        # 设置数据字体
-        c.setFont(DEFAULT_CHINESE_FONT, 10)
-        
-        # 填充数据
-        for charge in charges:
-            y -= 15
-            # 确保不超过页边距
-            if y < margin + 50:
-                # 新建页面
-                c.showPage()
-                # 重新设置字体
-                c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-                # 重新绘制表头
-                for i, header in enumerate(headers):
-                    header_width = c.stringWidth(header, f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-                    c.drawString(x_positions[i] + (col_widths[i] - header_width) / 2, page_height - margin - 40, header)
-                
-                y = page_height - margin - 55
-                c.line(margin, y, page_width - margin, y)
-                y -= 15
-                c.setFont(DEFAULT_CHINESE_FONT, 10)
-            
-            tenant_name = tenant_map.get(charge.tenant_id, "未知租户")
-            
-            # 计算已收费用
-            paid_amount = sum(p.amount for p in Payment.get_by_charge(charge.id))
-            # 计算应收费用
-            due_amount = round(charge.total_charge - paid_amount, 2)
-            
-            # 动态计算状态
-            if due_amount == 0:
-                status = "已缴"
-            elif due_amount > 0 and due_amount < charge.total_charge:
-                status = "部分缴纳"
-            elif due_amount == charge.total_charge and paid_amount == 0:
-                status = "未缴"
-            else:
-                status = charge.status
-            
-            # 租户名称（左对齐）
-            c.drawString(x_positions[0], y, tenant_name[:15] + "..." if len(tenant_name) > 15 else tenant_name)
-            
-            # 月份（居中）
-            month_width = c.stringWidth(charge.month, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[1] + (col_widths[1] - month_width) / 2, y, charge.month)
-            
-            # 水用量（右对齐）
-            water_usage_str = f"{charge.water_usage:.2f}"
-            water_usage_width = c.stringWidth(water_usage_str, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[2] + col_widths[2] - water_usage_width - 5, y, water_usage_str)
-            
-            # 水单价（右对齐）
-            water_price_str = f"{charge.water_price:.2f}"
-            water_price_width = c.stringWidth(water_price_str, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[3] + col_widths[3] - water_price_width - 5, y, water_price_str)
-            
-            # 水费（右对齐）
-            water_charge_str = f"{charge.water_charge:.2f}"
-            water_charge_width = c.stringWidth(water_charge_str, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[4] + col_widths[4] - water_charge_width - 5, y, water_charge_str)
-            
-            # 电用量（右对齐）
-            electricity_usage_str = f"{charge.electricity_usage:.2f}"
-            electricity_usage_width = c.stringWidth(electricity_usage_str, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[5] + col_widths[5] - electricity_usage_width - 5, y, electricity_usage_str)
-            
-            # 电单价（右对齐）
-            electricity_price_str = f"{charge.electricity_price:.2f}"
-            electricity_price_width = c.stringWidth(electricity_price_str, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[6] + col_widths[6] - electricity_price_width - 5, y, electricity_price_str)
-            
-            # 电费（右对齐）
-            electricity_charge_str = f"{charge.electricity_charge:.2f}"
-            electricity_charge_width = c.stringWidth(electricity_charge_str, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[7] + col_widths[7] - electricity_charge_width - 5, y, electricity_charge_str)
-            
-            # 总费用（右对齐）
-            total_charge_str = f"{charge.total_charge:.2f}"
-            total_charge_width = c.stringWidth(total_charge_str, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[8] + col_widths[8] - total_charge_width - 5, y, total_charge_str)
-            
-            # 状态（居中）
-            status_width = c.stringWidth(status, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[9] + (col_widths[9] - status_width) / 2, y, status)
-    
-    def export_payment_stat_pdf(self, c, month, tenant_name, stat_type):
-        """
-        导出收费统计报表到PDF
-        :param c: Canvas对象
-        :param month: 月份
-        :param tenant_name: 租户名称（可选）
-        :param stat_type: 统计方式
-        """
-        # 页面设置
-        page_width, page_height = A4
-        margin = 50
-        
-        # 设置标题
-        c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 16)
-        title = self.get_text('payment_stat_report')
-        title_width = c.stringWidth(title, f"{DEFAULT_CHINESE_FONT}-Bold", 16)
-        c.drawString((page_width - title_width) / 2, page_height - margin - 20, title)
-        
-        # 设置基本信息
-        c.setFont(DEFAULT_CHINESE_FONT, 12)
-        y = page_height - margin - 40
-        c.drawString(margin, y, f"{self.get_text('report_month')}: {month}")
-        
-        y -= 15
-        c.drawString(margin, y, f"{self.get_text('stat_type')}: {stat_type}")
-        
-        y -= 15
-        c.drawString(margin, y, f"{self.get_text('generate_time')}: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        if tenant_name:
-            y -= 15
-            c.drawString(margin, y, f"{self.get_text('tenant')}: {tenant_name}")
-        
-        # 画分隔线
-        y -= 15
-        c.line(margin, y, page_width - margin, y)
-        
-        # 获取收费数据
-        payments = Payment.get_by_month(month)
-        
-        # 租户ID到名称的映射
-        tenants = Tenant.get_all()
-        tenant_map = {t.id: t.name for t in tenants}
-        
-        # 费用ID到租户ID的映射
-        charges = Charge.get_by_month(month)
-        charge_tenant_map = {c.id: c.tenant_id for c in charges}
-        
-        # 租户ID到类型的映射
-        tenant_type_map = {t.id: t.type for t in tenants}
-        
-        # 统计数据
-        stat_data = {}
-        total_amount = 0
-        
-        for payment in payments:
-            tenant_id = charge_tenant_map.get(payment.charge_id, 0)
-            current_tenant_name = tenant_map.get(tenant_id, "未知租户")
-            
-            # 如果指定了租户，过滤数据
-            if tenant_name and current_tenant_name != tenant_name:
-                continue
-            
-            # 按统计方式分组
-            if stat_type == "按租户":
-                key = current_tenant_name
-            elif stat_type == "按类型":
-                key = tenant_type_map.get(tenant_id, "未知类型")
-            else:
-                key = current_tenant_name
-            
-            stat_data[key] = stat_data.get(key, 0) + payment.amount
-            total_amount += payment.amount
-        
-        # 设置表头
-        c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-        headers = [self.get_text('stat_item'), f"{self.get_text('amount')}({self.get_text('yuan')})"]
-        # 调整列宽，使布局更合理
-        col_widths = [200, 100, 80]
-        x_positions = [margin]
-        for i in range(1, len(col_widths)):
-            x_positions.append(x_positions[i-1] + col_widths[i-1])
-        
-        y -= 20
-        for i, header in enumerate(headers):
-            # 计算列标题居中位置
-            header_width = c.stringWidth(header, f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-            c.drawString(x_positions[i] + (col_widths[i] - header_width) / 2, y, header)
-        
-        y -= 15
-        # 画分隔线
-        c.line(margin, y, page_width - margin, y)
-        
-        # 设置数据字体
-        c.setFont(DEFAULT_CHINESE_FONT, 10)
-        
-        # 填充数据
-        for key, amount in stat_data.items():
-            y -= 15
-            # 确保不超过页边距
-            if y < margin + 50:
-                # 新建页面
-                c.showPage()
-                # 重新设置字体
-                c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-                # 重新绘制表头
-                for i, header in enumerate(headers):
-                    header_width = c.stringWidth(header, f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-                    c.drawString(x_positions[i] + (col_widths[i] - header_width) / 2, page_height - margin - 40, header)
-                
-                y = page_height - margin - 55
-                c.line(margin, y, page_width - margin, y)
-                y -= 15
-                c.setFont(DEFAULT_CHINESE_FONT, 10)
-            
-            percentage = (amount / total_amount * 100) if total_amount > 0 else 0
-            
-            # 统计项（左对齐）
-            c.drawString(x_positions[0], y, key[:30] + "..." if len(key) > 30 else key)
-            
-            # 金额（右对齐）
-            amount_str = f"{amount:.2f}"
-            amount_width = c.stringWidth(amount_str, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[1] + col_widths[1] - amount_width - 5, y, amount_str)
-            
-            # 占比（右对齐）
-            percentage_str = f"{percentage:.2f}%"
-            percentage_width = c.stringWidth(percentage_str, DEFAULT_CHINESE_FONT, 10)
-            c.drawString(x_positions[2] + col_widths[2] - percentage_width - 5, y, percentage_str)
-        
-        # 画分隔线
-        y -= 15
-        c.line(margin, y, page_width - margin, y)
-        
-        # 绘制总计行
-        y -= 15
-        c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-        
-        c.drawString(x_positions[0], y, "合计")
-        
-        # 总计金额（右对齐）
-        total_str = f"{total_amount:.2f}"
-        total_width = c.stringWidth(total_str, f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-        c.drawString(x_positions[1] + col_widths[1] - total_width - 5, y, total_str)
-        
-        # 总计占比（右对齐）
-        c.drawString(x_positions[2] + col_widths[2] - c.stringWidth("100.00%", f"{DEFAULT_CHINESE_FONT}-Bold", 10) - 5, y, "100.00%")
-    
-    def export_settlement_pdf(self, c, month, tenant_name):
-        """
-        导出结算报表到PDF
-        :param c: Canvas对象
-        :param month: 月份
-        :param tenant_name: 租户名称（可选）
-        """
-        # 页面设置
-        page_width, page_height = A4
-        margin = 50
-        
-        # 设置标题
-        c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 16)
-        title = self.get_text('water_electricity_settlement_report')
-        title_width = c.stringWidth(title, f"{DEFAULT_CHINESE_FONT}-Bold", 16)
-        c.drawString((page_width - title_width) / 2, page_height - margin - 20, title)
-        
-        # 设置基本信息
-        c.setFont(DEFAULT_CHINESE_FONT, 12)
-        y = page_height - margin - 40
-        c.drawString(margin, y, f"{self.get_text('report_month')}: {month}")
-        
-        y -= 15
-        c.drawString(margin, y, f"{self.get_text('generate_time')}: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        # 画分隔线
-        y -= 15
-        c.line(margin, y, page_width - margin, y)
-        
-        # 获取结算数据
-        settlement = Settlement.get_by_month(month)
-        
-        # 获取收费数据
-        payments = Payment.get_by_month(month)
-        total_payment = Payment.get_total_by_month(month)
-        
-        # 收费统计
-        y -= 20
-        c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 12)
-        c.drawString(margin, y, self.get_text('payment_statistics'))
-        
-        y -= 15
-        c.setFont(DEFAULT_CHINESE_FONT, 10)
-        c.drawString(margin + 10, y, f"{self.get_text('total_monthly_payment')}: {total_payment:.2f} {self.get_text('yuan')}")
-        
-        y -= 15
-        c.drawString(margin + 10, y, f"{self.get_text('payment_records')}: {len(payments)} {self.get_text('items')}")
-        
-        # 按统计方式显示详细收费情况
-        # 获取收费数据
-        payments = Payment.get_by_month(month)
-        
-        # 租户ID到名称的映射
-        tenants = Tenant.get_all()
-        tenant_map = {t.id: t.name for t in tenants}
-        
-        # 费用ID到租户ID的映射
-        charges = Charge.get_by_month(month)
-        charge_tenant_map = {c.id: c.tenant_id for c in charges}
-        
-        # 租户ID到类型的映射
-        tenant_type_map = {t.id: t.type for t in tenants}
-        
-        # 统计数据
-        stat_data = {}
-        for payment in payments:
-            tenant_id = charge_tenant_map.get(payment.charge_id, 0)
-            current_tenant_name = tenant_map.get(tenant_id, self.get_text('unknown_tenant'))
-            current_tenant_type = tenant_type_map.get(tenant_id, self.get_text('unknown_type'))
-            
-            # 按租户类型统计
-            key = current_tenant_type
-            if key not in stat_data:
-                stat_data[key] = 0
-            stat_data[key] += payment.amount
-        
-        if stat_data:
-            y -= 20
-            c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 12)
-            c.drawString(margin, y, f"{self.get_text('stat_by_tenant_type')}:")
-            
-            # 设置表头
-            y -= 15
-            c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-            headers = [self.get_text('tenant_type'), f"{self.get_text('amount')}({self.get_text('yuan')})"]
-            # 调整列宽，使布局更合理
-            col_widths = [120, 100, 80]
-            x_positions = [margin + 10]
-            for i in range(1, len(col_widths)):
-                x_positions.append(x_positions[i-1] + col_widths[i-1])
-            
-            for i, header in enumerate(headers):
-                # 计算列标题居中位置
-                header_width = c.stringWidth(header, f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-                c.drawString(x_positions[i] + (col_widths[i] - header_width) / 2, y, header)
-            
-            y -= 15
-            # 画分隔线
-            c.line(margin + 10, y, page_width - margin, y)
-            
-            # 设置数据字体
-            c.setFont(DEFAULT_CHINESE_FONT, 10)
-            
-            # 填充数据
-            for key, amount in stat_data.items():
-                y -= 15
-                percentage = (amount / total_payment * 100) if total_payment > 0 else 0
-                
-                # 租户类型（左对齐）
-                c.drawString(x_positions[0], y, key)
-                
-                # 金额（右对齐）
-                amount_str = f"{amount:.2f}"
-                amount_width = c.stringWidth(amount_str, DEFAULT_CHINESE_FONT, 10)
-                c.drawString(x_positions[1] + col_widths[1] - amount_width - 5, y, amount_str)
-            
-            # 画分隔线
-            y -= 15
-            c.line(margin + 10, y, page_width - margin, y)
-            
-            # 绘制总计行
-            y -= 15
-            c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-            
-            c.drawString(x_positions[0], y, self.get_text('total'))
-            
-            # 总计金额（右对齐）
-            total_str = f"{total_payment:.2f}"
-            total_width = c.stringWidth(total_str, f"{DEFAULT_CHINESE_FONT}-Bold", 10)
-            c.drawString(x_positions[1] + col_widths[1] - total_width - 5, y, total_str)
-        
-        # 结算信息
-        y -= 30
-        c.setFont(f"{DEFAULT_CHINESE_FONT}-Bold", 12)
-        c.drawString(margin, y, self.get_text('settlement_info'))
-        
-        y -= 15
-        c.setFont(DEFAULT_CHINESE_FONT, 10)
-        if settlement:
-            c.drawString(margin + 10, y, f"{self.get_text('settlement_date')}: {settlement.settle_date}")
-            
-            y -= 15
-            c.drawString(margin + 10, y, f"{self.get_text('settlement_amount')}: {settlement.total_amount:.2f} {self.get_text('yuan')}")
-            
-            y -= 15
-            c.drawString(margin + 10, y, f"{self.get_text('cashier_name')}: {settlement.cashier}")
-            
-            y -= 15
-            c.drawString(margin + 10, y, f"{self.get_text('remarks')}: {settlement.notes if settlement.notes else self.get_text('none')}")
-        else:
-            c.drawString(margin + 10, y, self.get_text('no_settlement_this_month'))
-            
-            y -= 15
-            c.drawString(margin + 10, y, f"{self.get_text('suggested_settlement_amount')}: {total_payment:.2f} {self.get_text('yuan')}")
-    
     def generate_chart(self, report_type, month, tenant_name, stat_type):
         """
         生成图表
@@ -10,12 +10,10 @@ from tkinter import ttk
 from tkinter import messagebox
 from tkinter import filedialog
 from datetime import datetime
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment
-from openpyxl.utils import get_column_letter
 from models.settlement import Settlement
 from models.charge import Charge
 from models.payment import Payment
+from utils.excel_writer import ExcelExportWriter
 
 class SettlementView:
     """结算管理视图类"""
@@ -781,36 +779,21 @@ class SettlementView:
             self.parent.config(cursor="wait")
             self.parent.update()
             
-            # 创建Excel工作簿
-            wb = Workbook()
+            # 流式写入Excel，列宽按各表前若干行计算，最大30
+            writer = ExcelExportWriter(max_width=30)
             
             # 1. 生成结算汇总表
-            ws_summary = wb.active
-            ws_summary.title = f"{month}结算汇总"
+            ws_summary = writer.create_sheet(f"{month}结算汇总")
             
-            # 设置报表标题
-            ws_summary.merge_cells('A1:G1')
-            title_cell = ws_summary['A1']
-            title_cell.value = f"{month}月份结算报表"
-            title_cell.font = Font(bold=True, size=16)
-            title_cell.alignment = Alignment(horizontal="center", vertical="center")
-            
-            # 报表生成时间
-            ws_summary['A2'] = f"生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            ws_summary['A2'].font = Font(size=10, italic=True)
+            # 设置报表标题和生成时间
+            ws_summary.append([f"{month}月份结算报表"], "title", merge_to=7)
+            ws_summary.append([f"生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"], "note", fit=False)
             
             # 生成月度汇总数据
             summary_data = self.calculate_monthly_summary(month)
             
             # 汇总表头
-            summary_headers = ["项目", "金额/数量", "说明"]
-            ws_summary.append(summary_headers)
-            
-            # 设置表头样式
-            for cell in ws_summary[3]:
-                cell.font = Font(bold=True)
-                cell.alignment = Alignment(horizontal="center")
-                cell.border = None
+            ws_summary.append(["项目", "金额/数量", "说明"], "header")
             
             # 汇总数据
             summary_rows = [
@@ -821,22 +804,11 @@ class SettlementView:
                 ["总租户数", f"{summary_data['total_count']} 户", "当月有费用记录的租户总数"],
                 ["缴费率", f"{summary_data['payment_rate']:.2f}%", "已缴费租户占比"]
             ]
-            
-            for row_data in summary_rows:
-                ws_summary.append(row_data)
+            ws_summary.stream(summary_rows)
             
             # 2. 生成结算明细 sheet
-            ws_details = wb.create_sheet(title=f"{month}结算明细")
-            
-            # 明细表头
-            detail_headers = ["序号", "结算月份", "结算日期", "结算金额", "出纳", "备注"]
-            ws_details.append(detail_headers)
-            
-            # 设置表头样式
-            for cell in ws_details[1]:
-                cell.font = Font(bold=True)
-                cell.alignment = Alignment(horizontal="center")
-                cell.border = None
+            ws_details = writer.create_sheet(f"{month}结算明细")
+            ws_details.append(["序号", "结算月份", "结算日期", "结算金额", "出纳", "备注"], "header")
             
             # 获取结算记录
             settlement = Settlement.get_by_month(month)
@@ -850,49 +822,15 @@ class SettlementView:
                     settlement.notes
                 ])
             
-            # 3. 生成缴费明细 sheet
-            ws_payments = wb.create_sheet(title=f"{month}缴费明细")
-            
-            # 缴费明细表头
-            payment_headers = ["序号", "租户名称", "缴费金额", "缴费日期", "缴费方式", "收据号", "收费人"]
-            ws_payments.append(payment_headers)
-            
-            # 设置表头样式
-            for cell in ws_payments[1]:
-                cell.font = Font(bold=True)
-                cell.alignment = Alignment(horizontal="center")
-                cell.border = None
-            
-            # 获取缴费记录
-            payments = Payment.get_by_month(month)
-            for idx, payment in enumerate(payments, 1):
-                # 获取租户名称
-                tenant_name = "未知租户"
-                if payment.charge and payment.charge.tenant:
-                    tenant_name = payment.charge.tenant.name
-                elif payment.charge:
-                    # 如果charge对象存在但tenant对象不存在，尝试加载
-                    payment.charge.load_tenant_info()
-                    tenant_name = payment.charge.tenant.name if payment.charge.tenant else "未知租户"
-                
-                # Payment对象没有receipt_no和collector字段，使用payer字段
-                ws_payments.append([
-                    idx,
-                    tenant_name,
-                    f"{payment.amount:.2f}",
-                    payment.payment_date,
-                    payment.payment_method,
-                    "",  # receipt_no字段不存在，留空
-                    payment.payer  # 使用payer字段代替collector
-                ])
-            
-            # 设置列宽
-            for ws in wb.worksheets:
-                for column_cells in ws.columns:
-                    length = max(len(str(cell.value)) for cell in column_cells)
-                    # 处理合并单元格的情况，使用列的索引来获取列字母
-                    col_idx = column_cells[0].column
-                    ws.column_dimensions[get_column_letter(col_idx)].width = min(length + 2, 30)
+            # 3. 生成缴费明细 sheet，缴费记录直接从数据库游标逐行读取
+            ws_payments = writer.create_sheet(f"{month}缴费明细")
+            ws_payments.append(["序号", "租户名称", "缴费金额", "缴费日期", "缴费方式", "收据号", "收费人"], "header")
+            # 收费记录没有收据号字段，留空；收费人使用payer字段
+            ws_payments.stream(
+                [idx, tenant_name, f"{amount:.2f}", payment_date, payment_method, "", payer]
+                for idx, (tenant_name, amount, payment_date, payment_method, payer)
+                in enumerate(Payment.iter_month_rows(month), 1)
+            )
             
             # 让用户选择保存路径
             file_path = filedialog.asksaveasfilename(
@@ -906,7 +844,7 @@ class SettlementView:
                 return
             
             # 保存文件
-            wb.save(file_path)
+            writer.save(file_path)
             
             messagebox.showinfo(self.get_text('success'), f"{self.get_text('settlement_report_successfully_exported_to')}\n{file_path}")
         except Exception as e:
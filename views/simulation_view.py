@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+价格模拟视图
+输入若干候选价格方案，按历史用量试算各月各租户类型的收入变化，不修改任何费用记录
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from tkinter import messagebox
+from datetime import datetime
+
+from models.price import PriceBook
+from models.simulation import PriceSimulation
+
+class SimulationView:
+    """价格模拟视图类"""
+
+    def __init__(self, parent, language_utils):
+        """
+        初始化价格模拟视图
+        :param parent: 父窗口组件
+        :param language_utils: 语言工具类实例
+        """
+        self.parent = parent
+        self.language_utils = language_utils
+        # 已读取的模拟数据，月份范围不变时重复使用
+        self.simulation = None
+        # 方案名称 -> 候选价格
+        self.scenarios = {}
+        self.create_widgets()
+
+    def get_text(self, key):
+        """
+        获取翻译文本
+        :param key: 文本键名
+        :return: 翻译后的文本
+        """
+        return self.language_utils.get_text(key)
+
+    def create_widgets(self):
+        """
+        创建价格模拟界面组件
+        """
+        bind_text = self.language_utils.bind_text
+        main_frame = ttk.Frame(self.parent)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        # 月份范围
+        range_frame = ttk.Frame(main_frame)
+        range_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+
+        current_year = datetime.now().year
+        bind_text(ttk.Label(range_frame), lambda get_text: get_text('simulation_start_month') + ':').pack(side=tk.LEFT, padx=5)
+        self.start_month_var = tk.StringVar(value=f"{current_year - 3}-01")
+        ttk.Entry(range_frame, textvariable=self.start_month_var, width=10).pack(side=tk.LEFT, padx=5)
+        bind_text(ttk.Label(range_frame), lambda get_text: get_text('simulation_end_month') + ':').pack(side=tk.LEFT, padx=5)
+        self.end_month_var = tk.StringVar(value=datetime.now().strftime("%Y-%m"))
+        ttk.Entry(range_frame, textvariable=self.end_month_var, width=10).pack(side=tk.LEFT, padx=5)
+
+        self.data_label = ttk.Label(range_frame)
+        self.data_label.pack(side=tk.LEFT, padx=10)
+
+        # 候选价格方案
+        scenario_frame = ttk.LabelFrame(main_frame)
+        bind_text(scenario_frame, 'simulation_scenarios')
+        scenario_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+
+        input_frame = ttk.Frame(scenario_frame)
+        input_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+        bind_text(ttk.Label(input_frame), lambda get_text: get_text('simulation_scenario_name') + ':').pack(side=tk.LEFT, padx=5)
+        self.scenario_name_var = tk.StringVar()
+        ttk.Entry(input_frame, textvariable=self.scenario_name_var, width=12).pack(side=tk.LEFT, padx=5)
+        bind_text(ttk.Label(input_frame), lambda get_text: get_text('simulation_prices') + ':').pack(side=tk.LEFT, padx=5)
+        self.prices_var = tk.StringVar()
+        ttk.Entry(input_frame, textvariable=self.prices_var, width=40).pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        bind_text(ttk.Button(input_frame, command=self.add_scenario), 'simulation_add_scenario').pack(side=tk.LEFT, padx=5)
+        bind_text(ttk.Button(input_frame, command=self.remove_scenario), 'simulation_remove_scenario').pack(side=tk.LEFT, padx=5)
+        bind_text(ttk.Button(input_frame, command=self.run_simulation), 'simulation_run').pack(side=tk.LEFT, padx=5)
+
+        # 价格格式说明和当前价格
+        self.hint_label = ttk.Label(scenario_frame, justify=tk.LEFT)
+        bind_text(self.hint_label, self.get_hint_text)
+        self.hint_label.pack(side=tk.TOP, fill=tk.X, padx=10, pady=2)
+
+        self.scenario_listbox = tk.Listbox(scenario_frame, height=4)
+        self.scenario_listbox.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+
+        # 模拟结果
+        result_frame = ttk.Frame(main_frame)
+        result_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        columns = ("scenario", "month", "tenant_type", "baseline", "simulated", "delta")
+        headings = {
+            "scenario": 'simulation_scenario_name',
+            "month": 'month',
+            "tenant_type": 'tenant_type',
+            "baseline": 'simulation_baseline',
+            "simulated": 'simulation_simulated',
+            "delta": 'simulation_delta',
+        }
+        self.result_tree = ttk.Treeview(result_frame, columns=columns, show="headings")
+        for column in columns:
+            def set_heading(get_text, column=column):
+                self.result_tree.heading(column, text=get_text(headings[column]))
+            set_heading(self.get_text)
+            self.language_utils.bind_callback(self.result_tree, set_heading, f"heading_{column}")
+            self.result_tree.column(column, width=120, anchor=tk.E if column in ("baseline", "simulated", "delta") else tk.W)
+
+        scrollbar = ttk.Scrollbar(result_frame, orient=tk.VERTICAL, command=self.result_tree.yview)
+        self.result_tree.configure(yscrollcommand=scrollbar.set)
+        self.result_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    def get_hint_text(self, get_text):
+        """
+        生成价格格式说明，附带当前生效的价格，便于在此基础上调整
+        :param get_text: 取文本函数
+        :return: 说明文本
+        """
+        current = []
+        for resource_type in ('水', '电'):
+            price = PriceBook.current_price(resource_type, '全部')
+            if price:
+                current.append(f"{resource_type}={price.price}")
+        return get_text('simulation_price_hint').format(', '.join(current) or '-')
+
+    def add_scenario(self):
+        """
+        添加候选价格方案
+        """
+        prices = PriceSimulation.parse_price_set(self.prices_var.get())
+        if prices is None:
+            messagebox.showwarning(self.get_text('warning'), self.get_text('simulation_price_format_error'))
+            return
+
+        name = self.scenario_name_var.get().strip() or f"{self.get_text('simulation_scenario')}{len(self.scenarios) + 1}"
+        if name not in self.scenarios:
+            self.scenario_listbox.insert(tk.END, f"{name}: {self.prices_var.get().strip()}")
+        else:
+            index = list(self.scenarios).index(name)
+            self.scenario_listbox.delete(index)
+            self.scenario_listbox.insert(index, f"{name}: {self.prices_var.get().strip()}")
+        self.scenarios[name] = prices
+        self.scenario_name_var.set("")
+
+    def remove_scenario(self):
+        """
+        删除选中的候选价格方案
+        """
+        selection = self.scenario_listbox.curselection()
+        if not selection:
+            return
+        index = selection[0]
+        name = list(self.scenarios)[index]
+        del self.scenarios[name]
+        self.scenario_listbox.delete(index)
+
+    def get_simulation(self):
+        """
+        获取模拟数据，月份范围变化时重新读取
+        :return: 价格模拟对象或None
+        """
+        start_month = self.start_month_var.get().strip()
+        end_month = self.end_month_var.get().strip()
+        for month in (start_month, end_month):
+            try:
+                datetime.strptime(month, "%Y-%m")
+            except ValueError:
+                messagebox.showwarning(self.get_text('warning'), self.get_text('simulation_month_format_error'))
+                return None
+
+        if (self.simulation is None or self.simulation.start_month != start_month
+                or self.simulation.end_month != end_month):
+            self.simulation = PriceSimulation(start_month, end_month)
+            self.data_label.config(text=self.get_text('simulation_data_loaded').format(
+                len(self.simulation.months), len(self.simulation.month_idx)))
+        return self.simulation
+
+    def run_simulation(self):
+        """
+        试算全部方案并显示各月各租户类型的收入变化，每个方案最后一行为合计
+        """
+        if not self.scenarios:
+            messagebox.showwarning(self.get_text('warning'), self.get_text('simulation_no_scenario'))
+            return
+
+        simulation = self.get_simulation()
+        if simulation is None:
+            return
+
+        self.result_tree.delete(*self.result_tree.get_children())
+        total_text = self.get_text('simulation_total')
+        for result in simulation.evaluate_many(self.scenarios):
+            for row in result.rows():
+                self.result_tree.insert("", tk.END, values=(
+                    result.name, row['month'], row['tenant_type'],
+                    f"{row['baseline']:.2f}", f"{row['simulated']:.2f}", f"{row['delta']:+.2f}"))
+            totals = result.totals()
+            self.result_tree.insert("", tk.END, values=(
+                result.name, total_text, "",
+                f"{totals['baseline']:.2f}", f"{totals['simulated']:.2f}", f"{totals['delta']:+.2f}"))
@@ -10,10 +10,10 @@ from tkinter import ttk
 from tkinter import messagebox
 from tkinter import filedialog
 from models.tenant import Tenant
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, Alignment
+from openpyxl import load_workbook
 import datetime
 from utils.language_utils import LanguageUtils
+from utils.excel_writer import ExcelExportWriter
 
 class TenantView:
     """租户管理视图类"""
@@ -547,54 +547,18 @@ class TenantView:
             self.parent.config(cursor="wait")
             self.parent.update()
             
-            # 创建Excel工作簿
-            wb = Workbook()
-            ws = wb.active
-            ws.title = self.get_text("tenant_information")
+            # 获取当前筛选条件
+            filters = {
+                'name': self.search_name.get(),
+                'type': self.search_type.get(),
+            }
             
-            # 设置表头
+            # 流式写入Excel，数据行直接从数据库游标读取
+            writer = ExcelExportWriter()
+            sheet = writer.create_sheet(self.get_text("tenant_information"))
             headers = [self.get_text("tenant_id"), self.get_text("tenant_name"), self.get_text("tenant_type"), self.get_text("contact_person"), self.get_text("phone"), self.get_text("email"), self.get_text("address"), self.get_text("create_time")]
-            ws.append(headers)
-            
-            # 设置表头样式
-            for col in ws.columns:
-                max_length = 0
-                column = col[0].column_letter  # 获取列字母
-                # 设置表头字体和对齐方式
-                ws[column + "1"].font = Font(bold=True, size=12)
-                ws[column + "1"].alignment = Alignment(horizontal="center")
-                # 计算列宽
-                for cell in col:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(cell.value)
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)  # 限制最大宽度为50
-                ws.column_dimensions[column].width = adjusted_width
-            
-            # 获取当前筛选条件下的租户列表
-            name = self.search_name.get()
-            type = self.search_type.get()
-            filters = {}
-            if name:
-                filters['name'] = name
-            if type:
-                filters['type'] = type
-            tenant_list = Tenant.get_all(filters)
-            
-            # 写入数据
-            for tenant in tenant_list:
-                ws.append([
-                    tenant.id,
-                    tenant.name,
-                    tenant.type,
-                    tenant.contact_person,
-                    tenant.phone,
-                    tenant.email,
-                    tenant.address,
-                    tenant.create_time if tenant.create_time else ""
-                ])
+            sheet.append(headers, "header")
+            sheet.stream(Tenant.iter_export_rows(filters))
             
             # 保存文件
             default_filename = f"租户信息_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.xlsx"
@@ -605,7 +569,7 @@ class TenantView:
             )
             
             if file_path:
-                wb.save(file_path)
+                writer.save(file_path)
                 messagebox.showinfo(self.get_text("success"), f"{self.get_text('export_tenant_success').format(file_path)}")
         except Exception as e:
             messagebox.showerror(self.get_text("error"), f"{self.get_text('export_tenant_fail').format(str(e))}")